@@ -0,0 +1,411 @@
+"""This module provides the command used to (re)process the data of many experiment sessions in parallel.
+
+Sessions are expected to be stored as root/<mouse>/<day>_<date>, with each session directory containing the
+DataLogger output directory (*_data_log). The root directory can also point to a single mouse or session directory.
+
+Example:
+    python batch_processing.py --root path/to/raw_data --workers 8
+"""
+
+import os
+from typing import Any
+from pathlib import Path
+import argparse
+from datetime import datetime
+import traceback
+from dataclasses import asdict, replace
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from tqdm import tqdm
+from data_processing import (
+    OutputFormats,
+    StreamFormats,
+    get_output_file,
+    process_camera_logs,
+    read_recorded_parameters,
+    extract_microcontroller_data,
+    extract_raw_microcontroller_data,
+)
+from microcontroller import ControllerParameters
+from processing_cache import ProcessingManifest
+from ataraxis_base_utilities import LogLevel, console, ensure_directory_exists
+from ataraxis_data_structures import assemble_log_archives
+
+# The glob patterns used to discover DataLogger output directories when the root directory is the experiment
+# directory, a mouse directory, or a single session directory.
+_LOG_DIRECTORY_PATTERNS = ("*/*/*_data_log", "*/*_data_log", "*_data_log")
+
+# The name of the per-session log file written to the processed data directory.
+_PROCESSING_LOG_NAME = "processing.log"
+
+# The IDs of the VideoSystem instances whose log archives store the camera frame timestamps.
+_CAMERA_IDS = (101, 102, 103)
+
+
+def find_sessions(root_directory: Path) -> tuple[Path, ...]:
+    """Finds all session directories under the root directory that contain raw or assembled log data.
+
+    Args:
+        root_directory: The path to the experiment, mouse, or session directory to search.
+
+    Returns:
+        A sorted tuple of session directory paths.
+    """
+    sessions: set[Path] = set()
+    for pattern in _LOG_DIRECTORY_PATTERNS:
+        for log_directory in root_directory.glob(pattern):
+            if not log_directory.is_dir():
+                continue
+            if any(log_directory.glob("*.npy")) or any(log_directory.glob("*_log.npz")):
+                sessions.add(log_directory.parent)
+    return tuple(sorted(sessions))
+
+
+def _summarize_raw_entries(log_directory: Path, source_ids: tuple[int, ...]) -> dict[str, list[Any]]:
+    """Returns the number and the name of the last raw .npy log entry for each of the input sources.
+
+    The summary only uses the entry names, so it is cheap to compute even for directories with millions of entries.
+    Since the entry names store the acquisition time, any new entry changes the summary.
+    """
+    summary: dict[str, list[Any]] = {f"{source_id:03d}_": [0, ""] for source_id in source_ids}
+    with os.scandir(log_directory) as iterator:
+        for entry in iterator:
+            prefix = entry.name[:4]
+            if prefix in summary and entry.name.endswith(".npy"):
+                summary[prefix][0] += 1
+                summary[prefix][1] = max(summary[prefix][1], entry.name)
+    return summary
+
+
+def _write_log(log_file: Path, message: str) -> None:
+    """Appends the timestamped message to the session processing log file."""
+    with log_file.open("a", encoding="utf-8") as log:
+        log.write(f"[{datetime.now().astimezone().isoformat(timespec='seconds')}] {message}\n")
+
+
+def process_session(
+    session_directory: Path,
+    parameters: ControllerParameters | tuple[ControllerParameters, ...],
+    workers: int = 1,
+    *,
+    remove_sources: bool = True,
+    force: bool = False,
+    formats: StreamFormats | None = None,
+) -> None:
+    """Assembles the log archives of the session and extracts the microcontroller and camera data as .feather files.
+
+    Notes:
+        The extracted data and the processing log are saved to the 'processed' subdirectory of the session. The
+        processing manifest stored in that directory is used to skip the stages whose input archives, parameters, and
+        parser code did not change since the last run.
+
+        If the session was acquired by several microcontrollers (arenas), the data of each microcontroller is saved to
+        the 'controller_<id>' subdirectory of the 'processed' directory. If the session contains several DataLogger
+        output directories, the data of each directory is saved to the subdirectory named after that directory.
+
+    Args:
+        session_directory: The path to the session directory that contains the DataLogger output directory.
+        parameters: The hardware module parameters used at runtime to acquire the session data, or a tuple of
+            parameters for each microcontroller used at runtime.
+        workers: The number of worker processes used by each processing step.
+        remove_sources: Determines whether to remove the raw .npy log entries after assembling them into archives.
+        force: Determines whether to re-run all processing stages, regardless of the processing manifest state.
+        formats: The file formats used to save each processed data stream. If not provided, all streams are saved as
+            uncompressed .feather files.
+    """
+    if formats is None:
+        formats = StreamFormats()
+    controllers = parameters if isinstance(parameters, tuple) else (parameters,)
+
+    processed_directory = session_directory.joinpath("processed")
+    ensure_directory_exists(processed_directory)
+    log_file = processed_directory.joinpath(_PROCESSING_LOG_NAME)
+    log_file.unlink(missing_ok=True)
+    _write_log(log_file, f"Processing session {session_directory} with {parameters}.")
+    manifest = ProcessingManifest(processed_directory=processed_directory)
+
+    log_directories = sorted(session_directory.glob("*_data_log"))
+    for log_directory in log_directories:
+        # Uses a separate output directory and separate manifest stages for each DataLogger output directory, so that
+        # the directories do not overwrite each other's outputs and records.
+        if len(log_directories) == 1:
+            log_output_directory = processed_directory
+        else:
+            log_output_directory = processed_directory.joinpath(log_directory.name)
+            ensure_directory_exists(log_output_directory)
+
+        # Combines the raw log entries into a single .npz log file for each source, if this was not done at runtime.
+        if any(log_directory.glob("*.npy")):
+            _write_log(log_file, f"Assembling the log archives in {log_directory.name}...")
+            try:
+                assemble_log_archives(
+                    log_directory=log_directory,
+                    max_workers=workers,
+                    remove_sources=remove_sources,
+                    memory_mapping=False,
+                    verbose=False,
+                    verify_integrity=False,
+                )
+            except Exception:  # noqa: BLE001
+                # The truncated entries left by a crashed runtime prevent assembling the archives. In this case, the
+                # microcontroller data is extracted directly from the raw log entries below.
+                _write_log(log_file, f"Unable to assemble the log archives.\n{traceback.format_exc()}")
+
+        for runtime_controller in controllers:
+            # The valve artifact window is read from the session record, so the manifest only re-runs the stage if the
+            # recorded window differs from the window used by the previous run.
+            controller = read_recorded_parameters(log_directory=log_directory, parameters=runtime_controller)
+            if len(controllers) == 1:
+                stage = f"{log_directory.name}/microcontroller"
+                output_directory = log_output_directory
+            else:
+                stage = f"{log_directory.name}/microcontroller_{controller.controller_id}"
+                output_directory = log_output_directory.joinpath(f"controller_{controller.controller_id}")
+                ensure_directory_exists(output_directory)
+
+            log_path = log_directory.joinpath(f"{controller.controller_id}_log.npz")
+            if not log_path.exists():
+                source_ids = (controller.controller_id, controller.parameter_source_id)
+                summary = _summarize_raw_entries(log_directory=log_directory, source_ids=source_ids)
+                if not summary[f"{controller.controller_id:03d}_"][0]:
+                    _write_log(log_file, f"No microcontroller log archive found for {controller.controller_id}.")
+                    continue
+
+                record = manifest.create_record(
+                    inputs=(),
+                    parameters={**asdict(controller), "formats": asdict(formats), "raw_entries": summary},
+                )
+                if not force and manifest.is_current(stage=f"{stage}_raw", record=record):
+                    _write_log(log_file, f"The {controller.controller_id} raw log data is up to date. Skipping...")
+                else:
+                    _write_log(log_file, f"Extracting the {controller.controller_id} data from the raw log entries...")
+                    outputs = extract_raw_microcontroller_data(
+                        log_directory=log_directory,
+                        output_directory=output_directory,
+                        parameters=controller,
+                        formats=formats,
+                    )
+                    manifest.update(stage=f"{stage}_raw", record=record, outputs=outputs)
+                continue
+
+            # The parameter change events are stored in the archive of the parameter source, if it exists.
+            inputs: tuple[Path, ...] = (log_path,)
+            parameter_log_path = log_directory.joinpath(f"{controller.parameter_source_id}_log.npz")
+            if parameter_log_path.exists():
+                inputs = (log_path, parameter_log_path)
+            record = manifest.create_record(
+                inputs=inputs, parameters={**asdict(controller), "formats": asdict(formats)}
+            )
+            if not force and manifest.is_current(stage=stage, record=record):
+                _write_log(log_file, f"The microcontroller data in {log_path.name} is up to date. Skipping...")
+            else:
+                _write_log(log_file, f"Extracting the microcontroller data from {log_path.name}...")
+                outputs = extract_microcontroller_data(
+                    log_path=log_path,
+                    output_directory=output_directory,
+                    parameters=controller,
+                    workers=workers,
+                    formats=formats,
+                )
+                manifest.update(stage=stage, record=record, outputs=outputs)
+
+        camera_logs = tuple(log_directory.joinpath(f"{camera_id}_log.npz") for camera_id in _CAMERA_IDS)
+        record = manifest.create_record(
+            inputs=tuple(path for path in camera_logs if path.exists()),
+            parameters={"format": formats.camera, "compact_timestamps": formats.compact_timestamps},
+        )
+        camera_stage = f"{log_directory.name}/cameras"
+        if not force and manifest.is_current(stage=camera_stage, record=record):
+            _write_log(log_file, "The camera frame timestamps are up to date. Skipping...")
+        else:
+            _write_log(log_file, "Extracting the camera frame timestamps...")
+            frame_rates = process_camera_logs(
+                log_directory=log_directory,
+                output_directory=log_output_directory,
+                workers=workers,
+                output_format=formats.camera,
+                compact_timestamps=formats.compact_timestamps,
+            )
+            for camera_name, fps in frame_rates.items():
+                _write_log(log_file, f"The {camera_name} camera acquired {fps:.2f} frames / second.")
+            outputs = tuple(
+                get_output_file(log_output_directory / f"{name}_camera_timestamps", output_format=formats.camera)
+                for name in frame_rates
+            )
+            manifest.update(stage=camera_stage, record=record, outputs=outputs)
+
+    _write_log(log_file, "Processing: complete.")
+
+
+def _process_session_safely(
+    session_directory: Path,
+    parameters: ControllerParameters | tuple[ControllerParameters, ...],
+    *,
+    workers: int,
+    remove_sources: bool,
+    force: bool,
+    formats: StreamFormats,
+) -> tuple[Path, str | None]:
+    """Runs process_session() and returns the error message instead of raising, so that a single failed session
+    does not abort the whole batch. The traceback of the error is written to the session processing log.
+    """
+    try:
+        process_session(
+            session_directory=session_directory,
+            parameters=parameters,
+            workers=workers,
+            remove_sources=remove_sources,
+            force=force,
+            formats=formats,
+        )
+    except Exception as error:  # noqa: BLE001
+        log_file = session_directory.joinpath("processed", _PROCESSING_LOG_NAME)
+        if log_file.parent.exists():
+            _write_log(log_file, f"Processing: failed.\n{traceback.format_exc()}")
+        return session_directory, f"{type(error).__name__}: {error}"
+    return session_directory, None
+
+
+def process_sessions(
+    root_directory: Path,
+    parameters: ControllerParameters | tuple[ControllerParameters, ...] | None = None,
+    workers: int | None = None,
+    *,
+    remove_sources: bool = True,
+    force: bool = False,
+    formats: StreamFormats | None = None,
+) -> tuple[Path, ...]:
+    """Processes all sessions found under the root directory in parallel.
+
+    Each session is processed by a separate worker process, which uses a single core to avoid oversubscribing the
+    CPU when many sessions are processed at the same time.
+
+    Args:
+        root_directory: The path to the experiment, mouse, or session directory to process.
+        parameters: The hardware module parameters used at runtime to acquire the processed data, or a tuple of
+            parameters for each microcontroller used at runtime. If not provided, the parameters are derived from the
+            calibration data defined in the microcontroller module.
+        workers: The number of sessions to process in parallel. If not provided, uses all available CPU cores.
+        remove_sources: Determines whether to remove the raw .npy log entries after assembling them into archives.
+        force: Determines whether to re-run all processing stages, regardless of the processing manifest state.
+        formats: The file formats used to save each processed data stream. If not provided, all streams are saved as
+            uncompressed .feather files.
+
+    Returns:
+        A tuple of session directories that could not be processed.
+    """
+    if parameters is None:
+        parameters = ControllerParameters.from_calibration()
+    if formats is None:
+        formats = StreamFormats()
+
+    sessions = find_sessions(root_directory)
+    if len(sessions) == 0:
+        console.echo(message=f"No sessions with log data found under {root_directory}.", level=LogLevel.WARNING)
+        return ()
+
+    workers = max(1, min(workers if workers is not None else (os.cpu_count() or 1), len(sessions)))
+    console.echo(message=f"Processing {len(sessions)} sessions using {workers} workers...", level=LogLevel.INFO)
+
+    failed: list[Path] = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _process_session_safely,
+                session,
+                parameters,
+                workers=1,
+                remove_sources=remove_sources,
+                force=force,
+                formats=formats,
+            )
+            for session in sessions
+        ]
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Processing sessions", unit="session"):
+            session_directory, error = future.result()
+            if error is not None:
+                failed.append(session_directory)
+                tqdm.write(f"Unable to process {session_directory}: {error}")
+
+    if failed:
+        console.echo(
+            message=(
+                f"Unable to process {len(failed)} out of {len(sessions)} sessions. See the {_PROCESSING_LOG_NAME} "
+                f"file in each session's processed directory for details."
+            ),
+            level=LogLevel.ERROR,
+        )
+    else:
+        console.echo(message=f"All {len(sessions)} sessions: processed.", level=LogLevel.SUCCESS)
+
+    return tuple(sorted(failed))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Reprocesses the logged data of all sessions under the root directory."
+    )
+    parser.add_argument("--root", type=Path, required=True, help="The experiment, mouse, or session directory.")
+    parser.add_argument("--workers", type=int, default=None, help="The number of sessions to process in parallel.")
+    parser.add_argument(
+        "--keep-sources", action="store_true", help="Keeps the raw .npy log entries after assembling the archives."
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Re-runs all processing stages, even if their inputs did not change."
+    )
+    parser.add_argument(
+        "--output-format",
+        type=OutputFormats,
+        choices=tuple(OutputFormats),
+        default=OutputFormats.UNCOMPRESSED_IPC,
+        help="The file format used to save all processed data streams.",
+    )
+    parser.add_argument(
+        "--controller-ids",
+        type=int,
+        nargs="+",
+        default=None,
+        help="The IDs of all microcontrollers used to acquire the sessions, if the sessions used several arenas.",
+    )
+    parser.add_argument(
+        "--parameter-source-ids",
+        type=int,
+        nargs="+",
+        default=None,
+        help="The parameter event source IDs of the microcontrollers, in the same order as the --controller-ids.",
+    )
+    parser.add_argument(
+        "--compact-timestamps",
+        action="store_true",
+        help=(
+            "Stores the analog and camera timestamps as compact deltas instead of full uint64 values. The files "
+            "saved with compact timestamps have to be read with the read_dataframe() function."
+        ),
+    )
+    arguments = parser.parse_args()
+
+    if not console.enabled:
+        console.enable()
+
+    controller_parameters = None
+    if arguments.controller_ids is not None:
+        calibration = ControllerParameters.from_calibration()
+        source_ids = arguments.parameter_source_ids
+        if source_ids is None and len(arguments.controller_ids) == 1:
+            source_ids = [calibration.parameter_source_id]
+        if source_ids is None or len(source_ids) != len(arguments.controller_ids):
+            parser.error("Provide one --parameter-source-ids value for each of the --controller-ids.")
+        controller_parameters = tuple(
+            replace(calibration, controller_id=controller_id, parameter_source_id=source_id)
+            for controller_id, source_id in zip(arguments.controller_ids, source_ids, strict=True)
+        )
+
+    failed_sessions = process_sessions(
+        root_directory=arguments.root,
+        parameters=controller_parameters,
+        workers=arguments.workers,
+        remove_sources=not arguments.keep_sources,
+        force=arguments.force,
+        formats=StreamFormats.from_format(arguments.output_format, compact_timestamps=arguments.compact_timestamps),
+    )
+    raise SystemExit(1 if failed_sessions else 0)
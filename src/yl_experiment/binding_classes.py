@@ -2,10 +2,10 @@ from pathlib import Path
 import tempfile
 
 import numpy as np
-import polars as pl
 import keyboard
 from visualizers import BehaviorVisualizer
 from ataraxis_time import PrecisionTimer
+from data_processing import process_camera_logs
 from microcontroller import AMCInterface
 from ataraxis_video_system import (
     VideoSystem,
@@ -13,7 +13,6 @@ from ataraxis_video_system import (
     CameraInterfaces,
     OutputPixelFormats,
     EncoderSpeedPresets,
-    extract_logged_camera_timestamps,
 )
 from ataraxis_base_utilities import LogLevel, console
 from ataraxis_data_structures import DataLogger
@@ -117,58 +116,26 @@ class VideoSystems:
         self._cameras_started = False
         console.echo("VideoSystems: All cameras terminated.", level=LogLevel.SUCCESS)
 
-    def _save_time_stamps(self, log_path: Path, output_file: Path):
-        """Extracts and save time stamps of each frame, computes the frame rates of
-        the interfaced cameras based on logged timestamp data.
-
-        Args:
-            log_path (Path): The path to the assembled log archive (.npz file) containing the logged data.
-
-        Notes:
-            This method save the extracted timestamps to disk and returns the computed frame rates.
-
-        Returns:
-             fps (np.float64): The computed frame rate based on the extracted timestamps.
-        """
-        timestamps = extract_logged_camera_timestamps(log_path=log_path)
-
-        # Saves the extracted timestamps to a .feather file
-        timestamp_array = np.array(timestamps, dtype=np.uint64)
-        timestamp_dataframe = pl.DataFrame({"time_us": timestamp_array})
-        timestamp_dataframe.write_ipc(file=output_file)
-
-        # Computes and prints the frame rate of the camera based on the extracted frame timestamp data.
-        time_diffs = np.diff(timestamp_array)
-        fps = 1 / (np.mean(time_diffs) / 1e6)
-
-        return fps
+    @property
+    def cameras(self) -> dict[str, VideoSystem]:
+        """Returns the VideoSystem instance of each camera, using the camera names as keys."""
+        return {"top": self._top_camera, "left": self._left_camera, "right": self._right_camera}
 
     def extract_video_time_stamps(self, output_directory: Path) -> None:
         """Extracts and save time stamps of each frame for all cameras, computes the frame rates of
         the interfaced cameras based on logged timestamp data.
         """
         console.echo("Extracting frame acquisition timestamps from the assembled log archive...")
-        fps_top = self._save_time_stamps(
-            log_path=self._data_logger.output_directory.joinpath("102_log.npz"),
-            output_file=output_directory / "top_camera_timestamps.feather",
-        )
-
-        fps_left = self._save_time_stamps(
-            log_path=self._data_logger.output_directory.joinpath("101_log.npz"),
-            output_file=output_directory / "left_camera_timestamps.feather",
-        )
-
-        fps_right = self._save_time_stamps(
-            log_path=self._data_logger.output_directory.joinpath("103_log.npz"),
-            output_file=output_directory / "right_camera_timestamps.feather",
+        frame_rates = process_camera_logs(
+            log_directory=self._data_logger.output_directory, output_directory=output_directory
         )
 
         console.echo(
             message=(
                 f"According to the extracted timestamps, the interfaced cameras had acquisition frame rates of:\n "
-                f"Top camera has {fps_top:.2f} frames / second\n"
-                f"Left camera has {fps_left:.2f} frames / second\n"
-                f"Right camera has {fps_right:.2f} frames / second\n"
+                f"Top camera has {frame_rates.get('top', 0.0):.2f} frames / second\n"
+                f"Left camera has {frame_rates.get('left', 0.0):.2f} frames / second\n"
+                f"Right camera has {frame_rates.get('right', 0.0):.2f} frames / second\n"
                 f"Time stamps saved."
             ),
             level=LogLevel.SUCCESS,
@@ -327,7 +294,7 @@ class LinearTrackFunctions:
 
                     if valve_right_active:
                         self.mc.right_valve.dispense_volume(volume=_TRAINING_WATER)
-                        self.visualizer.add_right_valve_event()
+                        self.visualizer.add_right_valve_event(volume=_TRAINING_WATER)
                         delivery_num += 1
                         valve_right_active = False
                         delivery_timer.reset()
@@ -337,7 +304,7 @@ class LinearTrackFunctions:
                 # Manually deliver water
                 if keyboard.is_pressed("r"):
                     self.mc.right_valve.dispense_volume(volume=_TRAINING_WATER)
-                    self.visualizer.add_right_valve_event()
+                    self.visualizer.add_right_valve_event(volume=_TRAINING_WATER)
                     delivery_num += 1
 
                 if keyboard.is_pressed("q"):
@@ -349,7 +316,7 @@ class LinearTrackFunctions:
                     break
 
         finally:
-            total_volume = self.mc.dispensed_volume()  
+            total_volume = self.mc.dispensed_volume()
             self.vs._right_camera.stop()  # Stop only the right camera
             self.visualizer.close()
             self._stop()
@@ -392,11 +359,11 @@ class LinearTrackFunctions:
 
                 if keyboard.is_pressed("e"):
                     self.mc.left_valve.dispense_volume(volume=_TESTING_WATER)
-                    self.visualizer.add_left_valve_event()
+                    self.visualizer.add_left_valve_event(volume=_TESTING_WATER)
 
                 if keyboard.is_pressed("r"):
                     self.mc.right_valve.dispense_volume(volume=_TESTING_WATER)
-                    self.visualizer.add_right_valve_event()
+                    self.visualizer.add_right_valve_event(volume=_TESTING_WATER)
 
                 if lick_left > prev_lick_left:
                     self.visualizer.add_left_lick_event()
@@ -0,0 +1,568 @@
+"""This module provides the WebDashboard class, a headless alternative to the BehaviorVisualizer that streams the
+runtime data to a web page served by the acquisition machine.
+
+The dashboard server runs in a separate process, so neither the network traffic nor the rendering competes with the
+runtime control process. The control process only packs the lick, valve, analog input, and counter updates into small
+binary frames at a bounded rate and passes them to the server process, which forwards each frame to all connected
+browsers over WebSocket. The web page renders the data in the browser. By default, the server only accepts the
+connections from the acquisition machine itself. To open the dashboard on other machines of the local network, start it
+with the '0.0.0.0' host, which binds the server to all network interfaces.
+
+Each frame is a little-endian byte sequence that stores: the frame format version (uint8), the bit-mask of the events
+detected since the previous frame (uint8; left lick, right lick, left valve, and right valve, from the lowest bit), the
+frame sequence number (uint32), the session time in milliseconds (uint32), the total number of left licks, right licks,
+left rewards, and right rewards (uint32 each), the total dispensed volume in microliters (float32), the number of analog
+points (uint16), and the analog points as pairs of the minimum and the maximum sample (uint16 each), in 12-bit ADC
+units. The totals are sent with every frame, so the browsers that skip frames or connect in the middle of the session
+still display the correct counters.
+
+Example:
+    python dashboard.py --port 8765
+"""
+
+from enum import IntEnum
+from queue import Full
+import base64
+import socket
+import struct
+import asyncio
+import hashlib
+import argparse
+from functools import partial
+from multiprocessing import (
+    Queue as MPQueue,
+    Process,
+)
+
+import numpy as np
+from numpy.typing import NDArray
+from ataraxis_time import PrecisionTimer
+from ataraxis_base_utilities import LogLevel, console
+
+# The version of the frame format. Has to match the version expected by the web page.
+_FRAME_VERSION = 1
+
+# The layout of the fixed part of each frame. The analog points follow the fixed part.
+_FRAME_HEADER = struct.Struct("<BBIIIIIIfH")
+
+# The interval, in milliseconds, at which the runtime data is published to the server. This bounds the frame rate to
+# 10 frames per second regardless of the runtime cycle rate.
+_PUBLISH_INTERVAL_MS = 100
+
+# The maximum number of analog points (minimum and maximum sample pairs) sent with each frame. Together with the publish
+# interval, this bounds the size of the frames regardless of the analog sampling rate.
+_ANALOG_POINTS = 20
+
+# The maximum number of frames waiting to be sent by the server process. If the server falls behind, the new frames
+# are dropped instead of blocking the runtime control process.
+_FRAME_QUEUE_SIZE = 100
+
+# The maximum number of bytes waiting to be sent to a single browser. The frames are not sent to the browsers that do
+# not keep up with the stream until they receive the pending data.
+_CLIENT_BUFFER_LIMIT = 65536
+
+# The default address and port of the dashboard server. The default address only makes the dashboard available to the
+# browsers running on the acquisition machine.
+_DEFAULT_HOST = "127.0.0.1"
+_DEFAULT_PORT = 8765
+
+# The address that binds the server to all network interfaces. The dashboard is served to the whole local network, so
+# it is only used when requested explicitly.
+_ALL_INTERFACES = "0.0.0.0"  # noqa: S104
+
+# The GUID appended to the WebSocket key during the opening handshake, as defined by RFC 6455.
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# The 7-bit payload length values that mark the WebSocket frames whose length is stored in the following 16-bit or
+# 64-bit field, as defined by RFC 6455.
+_EXTENDED_LENGTH_16 = 126
+_EXTENDED_LENGTH_64 = 127
+
+# The smallest payload length, in bytes, that has to be stored in the 64-bit length field.
+_MINIMUM_LENGTH_64 = 65536
+
+# The largest payload, in bytes, accepted from the browsers. The browsers only send the control frames, whose payload
+# is limited to 125 bytes, so larger frames are rejected before their payload is read.
+_MAXIMUM_CLIENT_PAYLOAD = 125
+
+# The WebSocket close status code that reports the frame that is too large to process, as defined by RFC 6455.
+_MESSAGE_TOO_BIG = 1009
+
+# The probabilities of the lick and the valve events in each cycle of the simulated session published by the module CLI.
+_SIMULATED_LICK_PROBABILITY = 0.05
+_SIMULATED_REWARD_PROBABILITY = 0.005
+
+# The web page served by the dashboard. It parses the frames described in the module docstring and renders the last 10
+# seconds of the lick, valve, and analog input data together with the session counters.
+_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Runtime Behavior Dashboard</title>
+<style>
+body { font-family: Arial, sans-serif; margin: 16px; background: #fff; }
+#counters { font-size: 16px; margin-bottom: 8px; }
+canvas { width: 100%; height: 480px; border: 1px solid #ccc; }
+</style>
+</head>
+<body>
+<div id="counters">Connecting...</div>
+<canvas id="plot" width="1200" height="480"></canvas>
+<script>
+const WINDOW = 10000;
+const LANES = [
+    ["Left lick", "#c40223"], ["Right lick", "#c40223"], ["Left valve", "#0086bf"], ["Right valve", "#0086bf"]
+];
+const events = [[], [], [], []];
+const analog = [];
+let lastTime = 0;
+const canvas = document.getElementById("plot");
+const context = canvas.getContext("2d");
+const counters = document.getElementById("counters");
+
+function connect() {
+    const socket = new WebSocket(`ws://${location.host}/stream`);
+    socket.binaryType = "arraybuffer";
+    socket.onmessage = (message) => receive(new DataView(message.data));
+    socket.onclose = () => { counters.textContent = "Disconnected. Reconnecting..."; setTimeout(connect, 1000); };
+}
+
+function receive(view) {
+    if (view.getUint8(0) !== 1) return;
+    const mask = view.getUint8(1);
+    const time = view.getUint32(6, true);
+    const totals = [10, 14, 18, 22].map((offset) => view.getUint32(offset, true));
+    const volume = view.getFloat32(26, true);
+    const points = view.getUint16(30, true);
+    for (let lane = 0; lane < 4; lane++) if (mask & (1 << lane)) events[lane].push(time);
+    const step = lastTime > 0 && time > lastTime ? (time - lastTime) / points : 0;
+    for (let index = 0; index < points; index++) {
+        const offset = 32 + index * 4;
+        const pointTime = time - (points - 1 - index) * step;
+        analog.push([pointTime, view.getUint16(offset, true), view.getUint16(offset + 2, true)]);
+    }
+    lastTime = time;
+    counters.textContent = `Session time: ${(time / 60000).toFixed(1)} min | Licks (L / R): ${totals[0]} / ` +
+        `${totals[1]} | Rewards (L / R): ${totals[2]} / ${totals[3]} | Dispensed volume: ${volume.toFixed(1)} uL`;
+}
+
+function draw() {
+    const width = canvas.width, height = canvas.height, laneHeight = 40, start = lastTime - WINDOW;
+    const x = (time) => ((time - start) / WINDOW) * width;
+    for (const lane of events) while (lane.length && lane[0] < start) lane.shift();
+    while (analog.length && analog[0][0] < start) analog.shift();
+    context.clearRect(0, 0, width, height);
+    context.font = "12px Arial";
+    LANES.forEach(([label, color], lane) => {
+        const top = lane * laneHeight;
+        context.fillStyle = "#000";
+        context.fillText(label, 4, top + 14);
+        context.fillStyle = color;
+        for (const time of events[lane]) context.fillRect(x(time), top + 4, 3, laneHeight - 8);
+    });
+    const top = LANES.length * laneHeight + 10, plotHeight = height - top - 10;
+    if (analog.length) {
+        let minimum = Infinity, maximum = -Infinity;
+        for (const point of analog) { minimum = Math.min(minimum, point[1]); maximum = Math.max(maximum, point[2]); }
+        const margin = Math.max((maximum - minimum) * 0.05, 1);
+        const y = (value) => top + plotHeight * (1 - (value - minimum + margin) / (maximum - minimum + 2 * margin));
+        context.strokeStyle = "#00a368";
+        context.beginPath();
+        for (const point of analog) {
+            context.moveTo(x(point[0]), y(point[1]));
+            context.lineTo(x(point[0]), y(point[2]) - 1);
+        }
+        context.stroke();
+        context.fillStyle = "#000";
+        context.fillText(`Analog input: ${minimum} - ${maximum} ADC units`, 4, top + 14);
+    }
+    requestAnimationFrame(draw);
+}
+
+connect();
+requestAnimationFrame(draw);
+</script>
+</body>
+</html>
+"""
+
+
+class _WebSocketOpcodes(IntEnum):
+    """Stores the WebSocket frame opcodes used by the dashboard server, as defined by RFC 6455."""
+
+    BINARY = 0x2
+    CLOSE = 0x8
+    PING = 0x9
+    PONG = 0xA
+
+
+def _encode_websocket_frame(payload: bytes, opcode: int = _WebSocketOpcodes.BINARY) -> bytes:
+    """Wraps the input payload into an unmasked WebSocket frame. Uses the binary frame opcode by default."""
+    size = len(payload)
+    if size < _EXTENDED_LENGTH_16:
+        header = struct.pack("!BB", 0x80 | opcode, size)
+    elif size < _MINIMUM_LENGTH_64:
+        header = struct.pack("!BBH", 0x80 | opcode, _EXTENDED_LENGTH_16, size)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, _EXTENDED_LENGTH_64, size)
+    return header + payload
+
+
+async def _read_client_frames(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """Reads the WebSocket frames sent by the browser until the browser closes the connection.
+
+    The browser does not send any data to the dashboard, so the frames are discarded. The ping frames are answered
+    with pong frames, and the close frames are echoed back before returning. The frames whose payload exceeds the
+    control frame limit close the connection without reading the payload.
+    """
+    while True:
+        first, second = await reader.readexactly(2)
+        opcode = first & 0x0F
+        size = second & 0x7F
+        if size == _EXTENDED_LENGTH_16:
+            (size,) = struct.unpack("!H", await reader.readexactly(2))
+        elif size == _EXTENDED_LENGTH_64:
+            (size,) = struct.unpack("!Q", await reader.readexactly(8))
+        if size > _MAXIMUM_CLIENT_PAYLOAD:
+            status = struct.pack("!H", _MESSAGE_TOO_BIG)
+            writer.write(_encode_websocket_frame(payload=status, opcode=_WebSocketOpcodes.CLOSE))
+            await writer.drain()
+            return
+        mask = await reader.readexactly(4) if second & 0x80 else bytes(4)
+        payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(await reader.readexactly(size)))
+
+        if opcode == _WebSocketOpcodes.CLOSE:
+            writer.write(_encode_websocket_frame(payload=payload[:2], opcode=_WebSocketOpcodes.CLOSE))
+            await writer.drain()
+            return
+        if opcode == _WebSocketOpcodes.PING:
+            writer.write(_encode_websocket_frame(payload=payload, opcode=_WebSocketOpcodes.PONG))
+
+
+async def _handle_connection(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter, clients: set[asyncio.StreamWriter]
+) -> None:
+    """Serves the web page or upgrades the connection to the WebSocket stream, depending on the requested path.
+
+    Args:
+        reader: The stream used to read the request.
+        writer: The stream used to write the response.
+        clients: The set of the WebSocket streams that receive the published frames.
+    """
+    try:
+        request = await reader.readuntil(b"\r\n\r\n")
+        lines = request.decode("latin-1").split("\r\n")
+        path = lines[0].split(" ")[1] if len(lines[0].split(" ")) > 1 else ""
+        headers = {
+            name.strip().lower(): value.strip() for name, _, value in (line.partition(":") for line in lines[1:])
+        }
+
+        if path == "/stream" and headers.get("upgrade", "").lower() == "websocket":
+            key = headers.get("sec-websocket-key", "") + _WEBSOCKET_GUID
+            # RFC 6455 requires SHA-1 to derive the handshake response. The hash is not used for security.
+            accept = base64.b64encode(hashlib.sha1(key.encode()).digest()).decode()  # noqa: S324
+            writer.write(
+                (
+                    "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                    f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+                ).encode()
+            )
+            await writer.drain()
+            clients.add(writer)
+            await _read_client_frames(reader=reader, writer=writer)
+        elif path == "/":
+            body = _PAGE.encode()
+            writer.write(
+                (
+                    "HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+                ).encode()
+                + body
+            )
+            await writer.drain()
+        else:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+        pass
+    finally:
+        clients.discard(writer)
+        writer.close()
+
+
+async def _run_server(frame_queue: MPQueue, host: str, port: int) -> None:  # type: ignore[type-arg]
+    """Serves the dashboard and forwards the published frames to all connected browsers until the None sentinel is
+    received from the frame queue.
+    """
+    clients: set[asyncio.StreamWriter] = set()
+    server = await asyncio.start_server(partial(_handle_connection, clients=clients), host=host, port=port)
+    loop = asyncio.get_running_loop()
+    async with server:
+        while True:
+            frame = await loop.run_in_executor(None, frame_queue.get)
+            if frame is None:
+                break
+            message = _encode_websocket_frame(payload=frame)
+            for writer in tuple(clients):
+                if writer.transport.get_write_buffer_size() < _CLIENT_BUFFER_LIMIT:
+                    writer.write(message)
+
+        for writer in tuple(clients):
+            writer.close()
+
+
+def _serve(frame_queue: MPQueue, host: str, port: int) -> None:  # type: ignore[type-arg]
+    """Runs the dashboard server.
+
+    This function is the target for the dashboard server process.
+
+    Args:
+        frame_queue: The queue used to receive the frames published by the runtime control process.
+        host: The address of the network interface used by the server.
+        port: The port used by the server.
+    """
+    asyncio.run(_run_server(frame_queue=frame_queue, host=host, port=port))
+
+
+def _decimate(samples: NDArray[np.uint16], points: int) -> NDArray[np.uint16]:
+    """Splits the input samples into at most the requested number of equal segments and returns the minimum and the
+    maximum sample of each segment, interleaved.
+    """
+    segments = min(points, samples.size)
+    starts = np.linspace(start=0, stop=samples.size, num=segments, endpoint=False).astype(np.intp)
+    decimated = np.empty(shape=segments * 2, dtype=np.uint16)
+    decimated[0::2] = np.minimum.reduceat(samples, starts)
+    decimated[1::2] = np.maximum.reduceat(samples, starts)
+    return decimated
+
+
+class WebDashboard:
+    """Streams the lick, valve, analog input, and session counter data to the web dashboard in real time.
+
+    This class exposes the same runtime interface as the BehaviorVisualizer class and can be used in its place to
+    move the rendering out of the runtime control process. The dashboard is available at http://<host>:<port> while
+    the dashboard is open.
+
+    Notes:
+        This class is designed to run in the main thread of the runtime control process. To publish the data, call the
+        'update' class method as part of the runtime cycle method. The method has an internal rate limiter, so the
+        data is published at most once every 100 milliseconds, regardless of how often the method is called.
+
+        Calling this initializer does not start the dashboard server. Call the open() class method to start the
+        server before starting runtime.
+
+    Args:
+        host: The address of the network interface used by the server. The default address only makes the dashboard
+            available on the acquisition machine. Use '0.0.0.0' to make it available to all machines on the local
+            network.
+        port: The port used by the server.
+
+    Attributes:
+        _host: Stores the address of the network interface used by the server.
+        _port: Stores the port used by the server.
+        _frame_queue: Stores the queue used to pass the frames to the server process.
+        _server_process: Stores the dashboard server process.
+        _update_timer: The PrecisionTimer instance used to limit the frame rate.
+        _session_timer: The PrecisionTimer instance used to timestamp the frames.
+        _sequence: Stores the sequence number of the next frame.
+        _events: Stores the bit-mask of the events added since the previous frame.
+        _left_licks: Stores the total number of left lick events.
+        _right_licks: Stores the total number of right lick events.
+        _left_rewards: Stores the total number of left valve activations.
+        _right_rewards: Stores the total number of right valve activations.
+        _volume: Stores the total volume of water, in microliters, dispensed by the valve activations.
+        _analog_samples: Stores the analog input samples added since the previous frame.
+        _dropped_frames: Tracks the number of frames dropped because the server process did not keep up.
+    """
+
+    def __init__(self, host: str = _DEFAULT_HOST, port: int = _DEFAULT_PORT) -> None:
+        self._host: str = host
+        self._port: int = port
+        self._frame_queue: MPQueue = MPQueue(maxsize=_FRAME_QUEUE_SIZE)  # type: ignore[type-arg]
+        self._server_process: Process | None = None
+        self._update_timer = PrecisionTimer("ms")
+        self._session_timer = PrecisionTimer("ms")
+
+        self._sequence: int = 0
+        self._events: int = 0
+        self._left_licks: int = 0
+        self._right_licks: int = 0
+        self._left_rewards: int = 0
+        self._right_rewards: int = 0
+        self._volume: float = 0.0
+        self._analog_samples: list[NDArray[np.uint16]] = []
+        self._dropped_frames: int = 0
+
+    def open(self) -> None:
+        """Starts the dashboard server process.
+
+        This method must be called before any data can be published.
+        """
+        if self._server_process is not None:
+            return  # Already open
+
+        self._server_process = Process(target=_serve, args=(self._frame_queue, self._host, self._port), daemon=True)
+        self._server_process.start()
+        self._update_timer.reset()
+        self._session_timer.reset()
+
+        address = socket.gethostname() if self._host == _ALL_INTERFACES else self._host
+        console.echo(
+            message=f"Runtime behavior dashboard is available at http://{address}:{self._port}.",
+            level=LogLevel.SUCCESS,
+        )
+
+    def __del__(self) -> None:
+        """Ensures the server process is stopped when the class is garbage-collected."""
+        self.close()
+
+    def update(self) -> None:
+        """Publishes the data added since the previous update to the dashboard.
+
+        Notes:
+            The method has an internal update frequency limiter. Therefore, to achieve optimal performance, call this
+            method as frequently as possible and rely on the internal limiter to force the specific update frequency.
+        """
+        # Does not do anything until the server is started
+        if self._server_process is None:
+            return
+
+        if self._update_timer.elapsed < _PUBLISH_INTERVAL_MS:
+            return
+        self._update_timer.reset()
+
+        if self._analog_samples:
+            samples = np.concatenate(self._analog_samples)
+            analog = _decimate(samples=samples, points=_ANALOG_POINTS)
+            self._analog_samples.clear()
+        else:
+            analog = np.empty(shape=0, dtype=np.uint16)
+
+        frame = (
+            _FRAME_HEADER.pack(
+                _FRAME_VERSION,
+                self._events,
+                self._sequence,
+                self._session_timer.elapsed & 0xFFFFFFFF,
+                self._left_licks,
+                self._right_licks,
+                self._left_rewards,
+                self._right_rewards,
+                self._volume,
+                analog.size // 2,
+            )
+            + analog.astype("<u2").tobytes()
+        )
+        self._events = 0
+        self._sequence = (self._sequence + 1) & 0xFFFFFFFF
+
+        try:
+            self._frame_queue.put_nowait(frame)
+        except Full:
+            self._dropped_frames += 1
+
+    def close(self) -> None:
+        """Stops the dashboard server process."""
+        if self._server_process is None:
+            return
+
+        try:
+            self._frame_queue.put(None, timeout=1)  # Sentinel that stops the server
+        except Full:
+            self._server_process.terminate()
+        self._server_process.join(timeout=5)
+        if self._server_process.is_alive():
+            self._server_process.terminate()
+        self._server_process = None
+
+        if self._dropped_frames:
+            console.echo(
+                message=(
+                    f"The dashboard server did not keep up with the runtime and {self._dropped_frames} frames were "
+                    f"dropped."
+                ),
+                level=LogLevel.WARNING,
+            )
+
+    def add_analog_samples(self, samples: NDArray[np.uint16]) -> None:
+        """Adds the analog input samples received since the previous call to the next published frame.
+
+        Args:
+            samples: The one-dimensional numpy array that stores the new samples, in 12-bit ADC units, returned by the
+                AnalogInterface's read_samples() method.
+        """
+        if self._server_process is None or samples.size == 0:
+            return
+        self._analog_samples.append(samples)
+
+    def add_left_lick_event(self) -> None:
+        """Publishes a new left lick event with the next frame."""
+        self._events |= 0b0001
+        self._left_licks += 1
+
+    def add_right_lick_event(self) -> None:
+        """Publishes a new right lick event with the next frame."""
+        self._events |= 0b0010
+        self._right_licks += 1
+
+    def add_left_valve_event(self, volume: float = 0.0) -> None:
+        """Publishes a new left valve activation event with the next frame.
+
+        Args:
+            volume: The volume of water, in microliters, dispensed by the valve activation.
+        """
+        self._events |= 0b0100
+        self._left_rewards += 1
+        self._volume += float(volume)
+
+    def add_right_valve_event(self, volume: float = 0.0) -> None:
+        """Publishes a new right valve activation event with the next frame.
+
+        Args:
+            volume: The volume of water, in microliters, dispensed by the valve activation.
+        """
+        self._events |= 0b1000
+        self._right_rewards += 1
+        self._volume += float(volume)
+
+    @property
+    def is_open(self) -> bool:
+        """Returns True if the dashboard server is currently running."""
+        return self._server_process is not None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves the runtime behavior dashboard with simulated data.")
+    parser.add_argument(
+        "--host",
+        type=str,
+        default=_DEFAULT_HOST,
+        help="The address of the network interface to use. Use 0.0.0.0 to serve the dashboard to the local network.",
+    )
+    parser.add_argument("--port", type=int, default=_DEFAULT_PORT, help="The port to use.")
+    arguments = parser.parse_args()
+
+    if not console.enabled:
+        console.enable()
+
+    # Publishes a simulated session, which is used to check the dashboard without connecting to the hardware.
+    dashboard = WebDashboard(host=arguments.host, port=arguments.port)
+    dashboard.open()
+    generator = np.random.default_rng()
+    cycle_timer = PrecisionTimer("ms")
+    console.echo(message="Publishing simulated data. Press Ctrl+C to stop.", level=LogLevel.INFO)
+    try:
+        while True:
+            cycle_timer.delay(delay=20)
+            dashboard.add_analog_samples(generator.normal(loc=2000, scale=50, size=20).clip(0, 4095).astype(np.uint16))
+            if generator.random() < _SIMULATED_LICK_PROBABILITY:
+                dashboard.add_left_lick_event()
+            if generator.random() < _SIMULATED_LICK_PROBABILITY:
+                dashboard.add_right_lick_event()
+            if generator.random() < _SIMULATED_REWARD_PROBABILITY:
+                dashboard.add_left_valve_event(volume=10.0)
+            dashboard.update()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        dashboard.close()
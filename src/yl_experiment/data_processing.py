@@ -1,14 +1,345 @@
-"""This module provides methods for processing the data acquired by the microcontroller at runtime."""
+"""This module provides methods for processing the data acquired by the microcontroller and the cameras at runtime."""
 
-from typing import Any
+import os
+from enum import StrEnum
+import json
+import shutil
+from typing import Any, Literal
 from pathlib import Path
+from dataclasses import replace, dataclass
 
+from tqdm import tqdm
 import numpy as np
 import polars as pl
+import pyarrow as pa
+from pyarrow import (
+    ipc,
+    parquet as pq,
+)
+from task_logic import TASK_METADATA_SECTION
 from numpy.typing import NDArray
-from microcontroller import AMCInterface, ModuleTypeCodes
+from microcontroller import (
+    PARAMETER_EVENT_COLUMNS,
+    AMCInterface,
+    ModuleTypeCodes,
+    AnalogStateCodes,
+    ControllerParameters,
+)
+from process_placement import SESSION_METADATA_NAME
+from ataraxis_video_system import extract_logged_camera_timestamps
+from ataraxis_base_utilities import LogLevel, console
 from ataraxis_data_structures import DataLogger
-from ataraxis_communication_interface import ExtractedModuleData, extract_logged_hardware_module_data
+from ataraxis_communication_interface import (
+    ExtractedModuleData,
+    ExtractedMessageData,
+    extract_logged_hardware_module_data,
+)
+from ataraxis_communication_interface.communication import SerialProtocols, SerialPrototypes
+
+# The default maximum inter-lick interval, in microseconds, that still keeps two consecutive licks in the same lick
+# bout. Licks separated by a longer pause start a new bout. 500 ms is the conventional bout criterion for rodent
+# licking microstructure analysis.
+_LICK_BOUT_GAP_US = 500000
+
+# The default minimum number of licks that a lick bout has to contain to be included in the bout table.
+_MINIMUM_BOUT_LICKS = 1
+
+# The default range and resolution, in microseconds, of the valve edge to sensor contact cross-correlogram used to
+# estimate the valve artifact window.
+_ARTIFACT_MAXIMUM_LAG_US = 200000
+_ARTIFACT_BIN_WIDTH_US = 1000
+
+# The number of Poisson standard deviations the contact onset count of a correlogram bin has to exceed the baseline
+# count by to be attributed to the valve artifacts.
+_ARTIFACT_SIGNIFICANCE = 3.0
+
+# Maps the IDs of the VideoSystem instances used at runtime to the names of the cameras they manage.
+_CAMERA_NAMES = {101: "left", 102: "top", 103: "right"}
+
+# The type and ID codes of all hardware modules whose data is extracted from the microcontroller log, in the order
+# expected by the module data parsers.
+_PROCESSED_MODULES = (
+    (ModuleTypeCodes.VALVE_MODULE, 1),  # Left valve
+    (ModuleTypeCodes.VALVE_MODULE, 2),  # Right valve
+    (ModuleTypeCodes.LICK_MODULE, 1),  # Left lick sensor
+    (ModuleTypeCodes.LICK_MODULE, 2),  # Right lick sensor
+    (ModuleTypeCodes.ANALOG_MODULE, 1),  # Analog module 1
+)
+
+# The size of the header of each raw log entry. The header stores the uint8 source ID and the uint64 acquisition time.
+ENTRY_HEADER_SIZE = 9
+
+# The size of the module message header, which stores the protocol, module type, module ID, command, and event codes.
+MODULE_HEADER_SIZE = 5
+
+# The largest event code reserved for the service messages. Except for the command completion messages, the service
+# messages are not extracted from the log.
+_SERVICE_CODE_THRESHOLD = 50
+
+# The event code of the module messages that report the completion of a command.
+_COMMAND_COMPLETE_CODE = 2
+
+# The number of raw log entries read between the checkpoints saved by the raw log reader.
+_CHECKPOINT_INTERVAL = 20000
+
+# The number of rows stored in each Parquet row group. Each row group stores the minimum and maximum value of every
+# column, which allows readers to skip the row groups outside the queried time window.
+_PARQUET_ROW_GROUP_SIZE = 262144
+
+
+class OutputFormats(StrEnum):
+    """Stores the file formats supported for saving the processed data streams."""
+
+    UNCOMPRESSED_IPC = "uncompressed_ipc"
+    """Uncompressed Feather (Arrow IPC) files. These files are the largest, but support memory-mapping."""
+    LZ4_IPC = "lz4_ipc"
+    """LZ4-compressed Feather (Arrow IPC) files. Fast to decompress, but have to be fully loaded into memory."""
+    ZSTD_IPC = "zstd_ipc"
+    """ZSTD-compressed Feather (Arrow IPC) files. Smaller than LZ4 files, at the cost of slower writing."""
+    PARQUET = "parquet"
+    """ZSTD-compressed Parquet files with per-row-group column statistics. Typically the smallest option."""
+
+
+@dataclass(frozen=True)
+class StreamFormats:
+    """Stores the file format used to save each processed data stream."""
+
+    valve: OutputFormats = OutputFormats.UNCOMPRESSED_IPC
+    """The format of the cumulative volume and per-pulse valve files."""
+    lick: OutputFormats = OutputFormats.UNCOMPRESSED_IPC
+    """The format of the lick sensor voltage files."""
+    analog: OutputFormats = OutputFormats.UNCOMPRESSED_IPC
+    """The format of the analog signal file."""
+    lick_microstructure: OutputFormats = OutputFormats.UNCOMPRESSED_IPC
+    """The format of the lick event and lick bout files."""
+    camera: OutputFormats = OutputFormats.UNCOMPRESSED_IPC
+    """The format of the camera frame timestamp files."""
+    compact_timestamps: bool = False
+    """Determines whether to store the timestamps of the regular cadence streams (analog signal and camera frames) as
+    deltas between consecutive timestamps. Files saved with compact timestamps do not contain the 'time_us' column and
+    have to be read with the read_dataframe() or scan_dataframe() functions."""
+
+    @classmethod
+    def from_format(cls, output_format: OutputFormats, *, compact_timestamps: bool = False) -> "StreamFormats":
+        """Creates the instance that uses the input format for all data streams."""
+        output_format = OutputFormats(output_format)
+        return cls(
+            valve=output_format,
+            lick=output_format,
+            analog=output_format,
+            lick_microstructure=output_format,
+            camera=output_format,
+            compact_timestamps=compact_timestamps,
+        )
+
+
+# Maps the IPC output formats to the compression codecs used by the Arrow IPC writer.
+_IPC_COMPRESSION: dict[OutputFormats, Literal["lz4", "zstd"] | None] = {
+    OutputFormats.UNCOMPRESSED_IPC: None,
+    OutputFormats.LZ4_IPC: "lz4",
+    OutputFormats.ZSTD_IPC: "zstd",
+}
+
+# The schema metadata key that stores the base timestamp of the files with compact (delta-encoded) timestamps.
+_TIME_BASE_KEY = b"time_base_us"
+
+# The unsigned integer datatypes that can be used to store the timestamp deltas, from the smallest to the largest.
+_DELTA_DTYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+def get_output_file(output_file: Path, output_format: OutputFormats) -> Path:
+    """Returns the path to the output file with the extension that matches the output format.
+
+    Args:
+        output_file: The path to the output file. The extension of the path is ignored.
+        output_format: The format used to save the file.
+
+    Returns:
+        The path to the output file with the '.parquet' extension for Parquet files and '.feather' for IPC files.
+    """
+    return output_file.with_suffix(".parquet" if output_format == OutputFormats.PARQUET else ".feather")
+
+
+def _compact_timestamps(dataframe: pl.DataFrame) -> tuple[pl.DataFrame, dict[bytes, bytes]]:
+    """Replaces the 'time_us' column of the dataframe with the deltas between consecutive timestamps.
+
+    Notes:
+        The deltas are stored using the smallest unsigned integer datatype that fits the largest delta. For regular
+        cadence streams, such as the analog signal or the camera frames, this is uint16, which reduces the timestamp
+        column size 4-fold. The first timestamp is stored in the schema metadata and the first delta is always 0, so
+        the original timestamps are restored exactly by the cumulative sum of the deltas.
+
+    Args:
+        dataframe: The Polars DataFrame with the 'time_us' column sorted in ascending order.
+
+    Returns:
+        A tuple of two elements. The first element is the dataframe with the 'time_us' column replaced by the
+        'time_delta_us' column. The second element is the schema metadata that stores the base timestamp. If the
+        dataframe is empty or the timestamps are not sorted, returns the input dataframe and empty metadata.
+    """
+    timestamps: NDArray[np.uint64] = dataframe["time_us"].to_numpy()
+    if timestamps.size == 0 or np.any(timestamps[1:] < timestamps[:-1]):
+        return dataframe, {}
+
+    deltas = np.diff(timestamps, prepend=timestamps[:1])
+    largest_delta = deltas.max()
+    dtype = next(dtype for dtype in _DELTA_DTYPES if largest_delta <= np.iinfo(dtype).max)
+
+    index = dataframe.get_column_index("time_us")
+    compact_dataframe = dataframe.drop("time_us").insert_column(
+        index, pl.Series(name="time_delta_us", values=deltas.astype(dtype))
+    )
+    return compact_dataframe, {_TIME_BASE_KEY: str(timestamps[0]).encode()}
+
+
+def _expand_timestamps(dataframe: pl.DataFrame, time_base: bytes) -> pl.DataFrame:
+    """Restores the 'time_us' column of the dataframe saved with compact timestamps.
+
+    Args:
+        dataframe: The Polars DataFrame that stores the 'time_delta_us' column.
+        time_base: The base timestamp stored in the schema metadata of the file.
+
+    Returns:
+        The dataframe with the 'time_delta_us' column replaced by the 'time_us' column.
+    """
+    if "time_delta_us" not in dataframe.columns:
+        return dataframe
+
+    timestamps = np.cumsum(dataframe["time_delta_us"].to_numpy(), dtype=np.uint64)
+    timestamps += np.uint64(int(time_base))
+
+    index = dataframe.get_column_index("time_delta_us")
+    return dataframe.drop("time_delta_us").insert_column(index, pl.Series(name="time_us", values=timestamps))
+
+
+def write_dataframe(
+    dataframe: pl.DataFrame, output_file: Path, output_format: OutputFormats, *, compact_timestamps: bool = False
+) -> Path:
+    """Saves the dataframe to the output file using the requested format.
+
+    Notes:
+        If the same stream was previously saved using a different file extension, the outdated file is removed to
+        ensure the readers always load the most recent data.
+
+        Files saved with compact timestamps have to be read with the read_dataframe() or scan_dataframe() functions,
+        which transparently restore the 'time_us' column.
+
+    Args:
+        dataframe: The Polars DataFrame to save.
+        output_file: The path to the output file. The extension of the path is replaced to match the output format.
+        output_format: The format used to save the file.
+        compact_timestamps: Determines whether to store the 'time_us' column as the deltas between consecutive
+            timestamps. This is only beneficial for regular cadence streams.
+
+    Returns:
+        The path to the saved file.
+    """
+    metadata: dict[bytes, bytes] = {}
+    if compact_timestamps:
+        dataframe, metadata = _compact_timestamps(dataframe=dataframe)
+
+    table = dataframe.to_arrow()
+    if metadata:
+        table = table.replace_schema_metadata(metadata)
+
+    output_file = get_output_file(output_file=output_file, output_format=output_format)
+    if output_format == OutputFormats.PARQUET:
+        pq.write_table(
+            table=table,
+            where=output_file,
+            compression="zstd",
+            write_statistics=True,
+            row_group_size=_PARQUET_ROW_GROUP_SIZE,
+        )
+        output_file.with_suffix(".feather").unlink(missing_ok=True)
+    else:
+        options = ipc.IpcWriteOptions(compression=_IPC_COMPRESSION[output_format])
+        with ipc.new_file(sink=str(output_file), schema=table.schema, options=options) as writer:
+            writer.write_table(table)
+        output_file.with_suffix(".parquet").unlink(missing_ok=True)
+    return output_file
+
+
+def _resolve_file(file: Path) -> Path:
+    """Returns the path to the existing processed data file, checking both the .feather and .parquet extensions."""
+    if not file.exists():
+        alternative_file = file.with_suffix(".feather" if file.suffix == ".parquet" else ".parquet")
+        if alternative_file.exists():
+            return alternative_file
+    return file
+
+
+def read_dataframe(file: Path, columns: list[str] | None = None) -> pl.DataFrame:
+    """Reads the processed data file saved in any of the supported output formats.
+
+    Notes:
+        The file extension is resolved automatically, so the stream can be requested using either the .feather or the
+        .parquet path. Uncompressed IPC files are memory-mapped. If the file was saved with compact timestamps, the
+        'time_us' column is restored from the stored deltas.
+
+    Args:
+        file: The path to the processed data file.
+        columns: The names of the columns to read. If not provided, reads all columns.
+
+    Returns:
+        The Polars DataFrame that stores the loaded data.
+    """
+    file = _resolve_file(file)
+
+    # Reads IPC files through the Arrow memory map. Uncompressed files are accessed without copying, and compressed
+    # files are decompressed into memory.
+    reader = None
+    if file.suffix == ".parquet":
+        schema = pq.read_schema(file, memory_map=True)
+    else:
+        reader = ipc.open_file(pa.memory_map(str(file), "r"))
+        schema = reader.schema
+
+    time_base = (schema.metadata or {}).get(_TIME_BASE_KEY)
+    if columns is not None and time_base is not None:
+        columns = ["time_delta_us" if column == "time_us" else column for column in columns]
+
+    if reader is None:
+        table = pq.read_table(file, columns=columns, memory_map=True)
+    else:
+        table = reader.read_all()
+        if columns is not None:
+            table = table.select(columns)
+
+    dataframe = pl.DataFrame(pl.from_arrow(table, rechunk=False))
+    if time_base is not None:
+        dataframe = _expand_timestamps(dataframe=dataframe, time_base=time_base)
+    return dataframe
+
+
+def scan_dataframe(file: Path) -> pl.LazyFrame:
+    """Lazily scans the processed data file saved in any of the supported output formats.
+
+    Notes:
+        Unlike read_dataframe(), this function does not load any data until the returned LazyFrame is collected. For
+        files saved with compact timestamps, the 'time_us' column is defined as an expression over the stored deltas
+        and is only computed if the query uses it.
+
+    Args:
+        file: The path to the processed data file.
+
+    Returns:
+        The Polars LazyFrame that represents the file data.
+    """
+    file = _resolve_file(file)
+    if file.suffix == ".parquet":
+        schema = pq.read_schema(file, memory_map=True)
+        frame = pl.scan_parquet(source=file)
+    else:
+        schema = ipc.open_file(pa.memory_map(str(file), "r")).schema
+        frame = pl.scan_ipc(source=file, memory_map=True)
+
+    time_base = (schema.metadata or {}).get(_TIME_BASE_KEY)
+    if time_base is None:
+        return frame
+
+    timestamps = pl.col("time_delta_us").cast(pl.UInt64).cum_sum() + pl.lit(int(time_base), dtype=pl.UInt64)
+    return frame.with_columns(timestamps.alias("time_delta_us")).rename({"time_delta_us": "time_us"})
 
 
 def _interpolate_data(
@@ -67,22 +398,75 @@ def _interpolate_data(
     return np.interp(seed_timestamps, timestamps, data)  # type: ignore[no-any-return]
 
 
+def _pair_valve_cycles(
+    open_timestamps: NDArray[np.uint64], closed_timestamps: NDArray[np.uint64]
+) -> tuple[NDArray[np.uint64], NDArray[np.uint64]]:
+    """Merges the valve open and valve closed message streams and pairs them into open-close cycles (pulses).
+
+    The pairing follows the runtime ValveInterface logic: only the first open message received while the valve is
+    closed starts a pulse, and only the first closed message received while the valve is open ends it. Repeated open
+    or closed messages do not change the valve state and are ignored.
+
+    Notes:
+        Both input arrays are expected to be sorted, which is always the case for the logged data. The merge relies on
+        the stable sort, which detects the two pre-sorted runs and merges them in linear time.
+
+        If the data ends while the valve is open, the returned onset array contains one more element than the offset
+        array. The last onset then marks the unterminated final pulse.
+
+    Args:
+        open_timestamps: The one-dimensional numpy array that stores the timestamps of the valve open messages.
+        closed_timestamps: The one-dimensional numpy array that stores the timestamps of the valve closed messages.
+
+    Returns:
+        A tuple of two numpy arrays. The first array stores the pulse onset timestamps, and the second array stores the
+        matching pulse offset timestamps.
+    """
+    # Merges both streams into a single chronologically ordered stream of valve states (1 = open, 0 = closed). Open
+    # messages precede closed messages with the same timestamp.
+    timestamps = np.concatenate((open_timestamps, closed_timestamps))
+    states = np.concatenate(
+        (np.ones(open_timestamps.size, dtype=np.int8), np.zeros(closed_timestamps.size, dtype=np.int8))
+    )
+    merge_order = np.argsort(timestamps, kind="stable")
+    timestamps = timestamps[merge_order]
+    states = states[merge_order]
+
+    # Finds state transitions. Prepending 0 reflects that the valve is closed at the onset of the runtime. Repeated
+    # messages produce no transition, so every rising edge is followed by at most one falling edge.
+    edges = np.diff(states, prepend=np.int8(0))
+    return timestamps[edges == 1], timestamps[edges == -1]
+
+
 def _parse_valve_data(
     extracted_module_data: ExtractedModuleData,
     output_file: Path,
+    pulse_output_file: Path,
+    *,
     scale_coefficient: np.float64,
     nonlinearity_exponent: np.float64,
-) -> None:
-    """Extracts and saves the data acquired by the ValveModule during runtime as a .feather file.
+    output_format: OutputFormats = OutputFormats.UNCOMPRESSED_IPC,
+) -> tuple[Path, Path]:
+    """Extracts and saves the data acquired by the ValveModule during runtime as .feather files.
 
     Args:
         extracted_module_data: The ExtractedModuleData instance that stores the data logged by the module during
             runtime.
-        output_file: The path to the output .feather file where to save the extracted data.
+        output_file: The path to the output .feather file where to save the cumulative dispensed volume data.
+        pulse_output_file: The path to the output .feather file where to save the per-pulse data.
         scale_coefficient: Stores the scale coefficient used in the fitted power law equation that translates valve
             pulses into dispensed water volumes.
         nonlinearity_exponent: Stores the nonlinearity exponent used in the fitted power law equation that
             translates valve pulses into dispensed water volumes.
+        output_format: The format used to save the output files.
+
+    Returns:
+        A tuple of two paths. The first path points to the cumulative volume file, and the second path points to the
+        per-pulse file.
+
+    Notes:
+        The cumulative volume file stores the total volume of water dispensed by the valve at each pulse offset. The
+        per-pulse file stores the onset, offset, duration, and the dispensed volume of each open-close cycle.
     """
     log_data = extracted_module_data.event_data
 
@@ -90,91 +474,345 @@ def _parse_valve_data(
 
     # The way this module is implemented guarantees there is at least one code 52 message, but there may be no code
     # 51 messages.
-    open_data = log_data.get(np.uint8(51), [])
+    open_data = log_data.get(np.uint8(51), ())
     closed_data = log_data[np.uint8(52)]
 
-    # If there were no valve open events, no water was dispensed. In this case, uses the first code 53 timestamp
-    # to report a zero-volume reward and ends the runtime early.
-    if not open_data:
-        module_dataframe = pl.DataFrame(
-            {
-                "time_us": np.array([closed_data[0].timestamp], dtype=np.uint64),
-                "dispensed_water_volume_uL": np.array([0], dtype=np.float64),
-            }
+    # Extracts Open (Code 51) and Closed (Code 52) message timestamps. Timestamps use uint64 datatype.
+    open_timestamps = np.array([v.timestamp for v in open_data], dtype=np.uint64)
+    closed_timestamps = np.array([v.timestamp for v in closed_data], dtype=np.uint64)
+
+    # Pairs the messages into open-close cycles.
+    onsets, offsets = _pair_valve_cycles(open_timestamps=open_timestamps, closed_timestamps=closed_timestamps)
+
+    # If the runtime ended while the valve was open, discards the unterminated pulse, as its volume cannot be resolved.
+    if onsets.size > offsets.size:
+        message = (
+            f"The valve {extracted_module_data.module_id} data ends with the valve open. The final pulse that started "
+            f"at {onsets[-1]} us is excluded from the dispensed volume data."
         )
-        module_dataframe.write_ipc(file=output_file, compression="uncompressed")
-        return
-
-    # Precreates the storage numpy arrays for both message types. Timestamps use uint64 datatype. Although valve
-    # trigger values are boolean, they are translated into the total volume of water, in microliters, dispensed to the
-    # animal at each time-point and store that value as a float64.
-    n_on = len(open_data)
-    n_off = len(closed_data)
-    total_length = n_on + n_off
-    timestamps: NDArray[np.uint64] = np.empty(total_length, dtype=np.uint64)
-    volume: NDArray[np.float64] = np.empty(total_length, dtype=np.float64)
+        console.echo(message=message, level=LogLevel.WARNING)
+        onsets = onsets[: offsets.size]
 
     # The water is dispensed gradually while the valve stays open. Therefore, the full reward volume is dispensed
     # when the valve goes from open to closed. Based on calibration data, uses a conversion factor to translate
-    # the time the valve remains open into the fluid volume dispensed to the animal, which is then used to convert each
-    # Open/Close cycle duration into the dispensed volume.
+    # the time the valve remains open into the fluid volume dispensed to the animal.
+    pulse_durations = offsets - onsets
+    # noinspection PyTypeChecker
+    pulse_volumes = np.round(
+        scale_coefficient * np.power(pulse_durations.astype(np.float64), nonlinearity_exponent), decimals=8
+    )
 
-    # Extracts Open (Code 51) trigger codes. Statically assigns the value '1' to denote Open signals.
-    timestamps[:n_on] = np.array([v.timestamp for v in open_data], dtype=np.uint64)
-    volume[:n_on] = 1  # Open state
+    pulse_dataframe = pl.DataFrame(
+        {
+            "onset_time_us": onsets,
+            "offset_time_us": offsets,
+            "duration_us": pulse_durations,
+            "dispensed_water_volume_uL": pulse_volumes,
+        }
+    )
+    pulse_output_file = write_dataframe(
+        dataframe=pulse_dataframe, output_file=pulse_output_file, output_format=output_format
+    )
 
-    # Extracts Closed (Code 52) trigger codes.
-    timestamps[n_on:] = np.array([v.timestamp for v in closed_data], dtype=np.uint64)
-    volume[n_on:] = 0  # Closed state
+    # Converts per-pulse volumes into the cumulative dispensed volume, sampled at each pulse offset. The initial volume
+    # of 0 is reported using the first timestamp of the module data. That timestamp communicates the initial valve
+    # state, which should be closed.
+    first_timestamp = closed_timestamps[0]
+    if open_timestamps.size > 0:
+        first_timestamp = min(first_timestamp, open_timestamps[0])
+    reward_timestamps = np.insert(offsets, 0, first_timestamp)
+    volumes = np.insert(np.round(np.cumsum(pulse_volumes), decimals=8), 0, 0.0)
 
-    # Sorts both arrays based on timestamps.
-    sort_indices = np.argsort(timestamps)
-    timestamps = timestamps[sort_indices]
-    volume = volume[sort_indices]
+    # Creates a Polars DataFrame with the processed data
+    module_dataframe = pl.DataFrame(
+        {
+            "time_us": reward_timestamps,
+            "dispensed_water_volume_uL": volumes,
+        }
+    )
 
-    # Find falling and rising edges. Falling edges are valve-closing events, rising edges are valve-opening events.
-    edges = np.diff(volume, prepend=volume[0])
-    rising_edges = np.where(edges == 1)[0]
-    falling_edges = np.where(edges == -1)[0]
+    output_file = write_dataframe(dataframe=module_dataframe, output_file=output_file, output_format=output_format)
+    return output_file, pulse_output_file
 
-    # Samples the timestamp array to only include timestamps for the falling edges. That is, when the valve has
-    # finished delivering water
-    reward_timestamps = timestamps[falling_edges]
 
-    # Calculates pulse durations in microseconds for each open-close cycle. Since the original timestamp array
-    # contains alternating HIGH / LOW edges, each falling edge has to match to a rising edge.
-    pulse_durations: NDArray[np.float64] = (timestamps[falling_edges] - timestamps[rising_edges]).astype(np.float64)
+def classify_runtime_licks(
+    voltages: NDArray[np.uint16], lick_threshold: np.uint16 | NDArray[np.uint16]
+) -> NDArray[np.bool_]:
+    """Reproduces the lick detection logic of the runtime LickInterface for the input sequence of voltage readouts.
 
-    # Converts the time the Valve stayed open into the dispensed water volume, in microliters.
-    # noinspection PyTypeChecker
-    volumes = np.cumsum(scale_coefficient * np.power(pulse_durations, nonlinearity_exponent))
-    volumes = np.round(volumes, decimals=8)
+    At runtime, the LickInterface counts a lick only when a readout reaches the lick threshold for the first time
+    after a zero readout. This function implements the same state machine without looping over readouts. Zero readouts
+    split the sequence into segments, and the first readout at or above the threshold in each segment is a lick onset.
 
-    # The processing logic above removes the initial water volume of 0. This re-adds the initial volume using the
-    # first timestamp of the module data. That timestamp communicates the initial valve state, which should be 0.
-    reward_timestamps = np.insert(reward_timestamps, 0, timestamps[0])
-    volumes = np.insert(volumes, 0, 0.0)
+    Notes:
+        The runtime interface starts in the 'no zero readout' state, so readouts that precede the first zero readout
+        can never be counted as licks. This function replicates this behavior.
 
-    # Creates a Polars DataFrame with the processed data
-    module_dataframe = pl.DataFrame(
+    Args:
+        voltages: The one-dimensional numpy array that stores the lick sensor voltage readouts in the order they were
+            received by the PC.
+        lick_threshold: The voltage threshold for detecting the interaction with the sensor as a lick. The threshold
+            is inclusive. If the threshold was changed during runtime, this is the array that stores the threshold
+            used for each readout.
+
+    Returns:
+        A boolean numpy array with the same shape as the input voltages array that marks lick onset readouts.
+    """
+    # Assigns each readout the index of the zero-delimited segment it belongs to. Segment 0 contains all readouts
+    # received before the first zero readout.
+    segments = np.cumsum(voltages == 0)
+
+    # Finds all readouts that would trigger a lick if the interface was armed by a preceding zero readout. Zero
+    # readouts are excluded to support the zero threshold, as the runtime interface never counts them as licks.
+    candidates = np.flatnonzero((voltages >= lick_threshold) & (voltages != 0) & (segments > 0))
+
+    # Only keeps the first candidate in each segment, as the interface disarms itself after counting a lick.
+    candidate_segments = segments[candidates]
+    first_in_segment = np.ones(candidates.size, dtype=np.bool_)
+    first_in_segment[1:] = candidate_segments[1:] != candidate_segments[:-1]
+
+    onsets = np.zeros(voltages.shape, dtype=np.bool_)
+    onsets[candidates[first_in_segment]] = True
+    return onsets
+
+
+def _sweep_lick_thresholds(voltages: NDArray[np.uint16], thresholds: NDArray[np.uint16]) -> NDArray[np.uint64]:
+    """Computes the number of licks the runtime LickInterface would detect for each of the input lick thresholds.
+
+    This function evaluates all thresholds in a single pass over the voltage data. Since the interface counts at most
+    one lick per zero-delimited segment, a segment contains a lick for the given threshold if and only if its peak
+    voltage reaches the threshold. The peak voltage of each segment is computed once and reused for all thresholds.
+
+    Args:
+        voltages: The one-dimensional numpy array that stores the lick sensor voltage readouts in the order they were
+            received by the PC.
+        thresholds: The one-dimensional numpy array that stores the lick thresholds to evaluate.
+
+    Returns:
+        A numpy array with the same shape as the thresholds array that stores the number of licks detected for each
+        threshold.
+    """
+    # Computes the peak voltage of each segment that starts with a zero readout. Readouts before the first zero
+    # readout are ignored, as they cannot produce licks.
+    zero_indices = np.flatnonzero(voltages == 0)
+    if zero_indices.size == 0:
+        return np.zeros(thresholds.shape, dtype=np.uint64)
+    peaks = np.sort(np.maximum.reduceat(voltages, zero_indices))
+
+    # Zero readouts are never counted as licks, so a threshold of 0 behaves the same as a threshold of 1.
+    effective_thresholds = np.maximum(thresholds, 1)
+    return (peaks.size - np.searchsorted(peaks, effective_thresholds, side="left")).astype(np.uint64)
+
+
+def evaluate_lick_thresholds(lick_files: tuple[Path, ...], thresholds: NDArray[np.uint16]) -> pl.DataFrame:
+    """Computes the number of licks the runtime LickInterface would detect in each of the input lick sensor files for
+    each of the candidate lick thresholds.
+
+    This function is used to tune the lick detection threshold across many sessions using the already processed data.
+
+    Args:
+        lick_files: The paths to the lick sensor .feather files generated by the process_microcontroller_log()
+            function.
+        thresholds: The one-dimensional numpy array that stores the candidate lick thresholds, in raw 12-bit ADC units.
+
+    Returns:
+        A Polars DataFrame with one row for each file and threshold combination. The 'file' column stores the path to
+        the evaluated file, the 'lick_threshold' column stores the evaluated threshold, and the 'lick_count' column
+        stores the number of licks detected using that threshold.
+    """
+    thresholds = np.asarray(thresholds, dtype=np.uint16)
+    frames = []
+    for lick_file in lick_files:
+        voltages: NDArray[np.uint16] = read_dataframe(file=lick_file, columns=["voltage_12_bit_adc"])[
+            "voltage_12_bit_adc"
+        ].to_numpy()
+        frames.append(
+            pl.DataFrame(
+                {
+                    "file": [str(lick_file)] * thresholds.size,
+                    "lick_threshold": thresholds,
+                    "lick_count": _sweep_lick_thresholds(voltages=voltages, thresholds=thresholds),
+                }
+            )
+        )
+
+    # Returns an empty table with the expected schema if no files were evaluated.
+    if not frames:
+        return pl.DataFrame(schema={"file": pl.String, "lick_threshold": pl.UInt16, "lick_count": pl.UInt64})
+
+    return pl.concat(frames)
+
+
+def _find_valve_artifacts(
+    timestamps: NDArray[np.uint64], valve_edges: NDArray[np.uint64], artifact_window_us: int
+) -> NDArray[np.bool_]:
+    """Marks the lick sensor readouts received during the artifact suppression window that follows each valve edge.
+
+    Args:
+        timestamps: The sorted timestamps of the lick sensor readouts.
+        valve_edges: The sorted timestamps of all valve opening and closing reports.
+        artifact_window_us: The duration, in microseconds, of the suppression window that follows each valve edge.
+
+    Returns:
+        A boolean numpy array with the same shape as the input timestamps array that marks the suppressed readouts.
+    """
+    if artifact_window_us <= 0 or valve_edges.size == 0:
+        return np.zeros(timestamps.shape, dtype=np.bool_)
+
+    # Finds the last valve edge received before (or together with) each readout.
+    previous_edges = np.searchsorted(valve_edges, timestamps, side="right") - 1
+    has_edge = previous_edges >= 0
+    elapsed: NDArray[np.uint64] = timestamps - valve_edges[np.maximum(previous_edges, 0)]
+    return np.logical_and(has_edge, elapsed < artifact_window_us)
+
+
+def _get_valve_edges(data: tuple[ExtractedModuleData, ...]) -> NDArray[np.uint64]:
+    """Returns the sorted timestamps of the opening and closing reports of all valves in the input module data."""
+    timestamps = [
+        np.array([message.timestamp for message in module.event_data.get(np.uint8(code), ())], dtype=np.uint64)
+        for module in data
+        if module.module_type == ModuleTypeCodes.VALVE_MODULE
+        for code in (51, 52)  # Valve Open, Valve Closed
+    ]
+    return np.sort(np.concatenate(timestamps)) if timestamps else np.empty(0, dtype=np.uint64)
+
+
+def estimate_valve_artifact_window(
+    processed_directories: tuple[Path, ...],
+    maximum_lag_us: int = _ARTIFACT_MAXIMUM_LAG_US,
+    bin_width_us: int = _ARTIFACT_BIN_WIDTH_US,
+) -> tuple[pl.DataFrame, int]:
+    """Cross-correlates the valve edges with the lick sensor contact onsets across sessions to estimate the duration of
+    the valve artifact window.
+
+    Switching a valve can induce voltage transients in the lick sensor circuit, which are detected as tongue contacts
+    shortly after the valve opens or closes. This function computes the histogram of the delays between each valve edge
+    and the contact onsets that follow it (the cross-correlogram) and compares each bin to the baseline contact rate.
+    The estimated window spans the consecutive bins starting at the valve edge whose onset count significantly exceeds
+    the baseline.
+
+    Notes:
+        The contact onsets are the nonzero readouts that follow a zero readout, independent of the lick threshold and
+        the runtime artifact suppression, so the sessions processed with the suppression enabled can be analyzed. All
+        computations are vectorized over the edges and onsets of each session.
+
+    Args:
+        processed_directories: The paths to the processed session directories that store the valve pulse and the lick
+            sensor files generated by the process_microcontroller_log() function.
+        maximum_lag_us: The maximum delay, in microseconds, between the valve edge and the contact onset included in
+            the correlogram.
+        bin_width_us: The width, in microseconds, of each correlogram bin.
+
+    Returns:
+        A tuple of two elements. The first element is a Polars DataFrame that stores the lag of each correlogram bin
+        ('lag_us'), the number of contact onsets in that bin ('onset_count'), the onset rate per valve edge, in Hz
+        ('onset_rate_hz'), and whether the bin is attributed to the valve artifacts ('artifact'). The second element is
+        the estimated artifact window, in microseconds.
+    """
+    bin_count = int(np.ceil(maximum_lag_us / bin_width_us))
+    counts = np.zeros(bin_count, dtype=np.int64)
+    edge_count = 0
+    for directory in processed_directories:
+        pulses = [
+            read_dataframe(file=directory / f"{side}_valve_pulses.feather", columns=["onset_time_us", "offset_time_us"])
+            for side in ("left", "right")
+        ]
+        edges = np.sort(np.concatenate([pulse[column].to_numpy() for pulse in pulses for column in pulse.columns]))
+        edge_count += edges.size * 2  # Each edge is correlated with both lick sensors
+
+        for side in ("left", "right"):
+            readouts = read_dataframe(
+                file=directory / f"{side}_lick_sensor.feather", columns=["time_us", "voltage_12_bit_adc"]
+            )
+            contacts = readouts["voltage_12_bit_adc"].to_numpy() != 0
+            onsets = readouts["time_us"].to_numpy()[contacts & ~np.concatenate(([True], contacts[:-1]))]
+
+            # Finds the range of onsets that follow each edge within the maximum lag and expands it into edge-onset
+            # pairs without looping over the edges.
+            starts = np.searchsorted(onsets, edges, side="left")
+            stops = np.searchsorted(onsets, edges + np.uint64(maximum_lag_us), side="left")
+            pair_counts = stops - starts
+            pair_offsets = np.arange(pair_counts.sum()) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+            paired_onsets = onsets[np.repeat(starts, pair_counts) + pair_offsets]
+            lags = paired_onsets - np.repeat(edges, pair_counts)
+            counts += np.bincount((lags // bin_width_us).astype(np.int64), minlength=bin_count)[:bin_count]
+
+    # Uses the median bin as the baseline, which is robust to both the artifact bins and the licking that follows the
+    # rewards. The artifact window spans the leading run of bins that exceed the baseline.
+    baseline = float(np.median(counts))
+    artifact_bins = counts > baseline + _ARTIFACT_SIGNIFICANCE * np.sqrt(max(baseline, 1.0))
+    window_bins = bin_count if artifact_bins.all() else int(np.argmin(artifact_bins))
+    artifact = np.arange(bin_count) < window_bins
+
+    correlogram = pl.DataFrame(
         {
-            "time_us": reward_timestamps,
-            "dispensed_water_volume_uL": volumes,
+            "lag_us": np.arange(bin_count, dtype=np.uint64) * np.uint64(bin_width_us),
+            "onset_count": counts.astype(np.uint64),
+            "onset_rate_hz": counts / max(edge_count, 1) / (bin_width_us / 1e6),
+            "artifact": artifact,
         }
     )
+    return correlogram, window_bins * bin_width_us
 
-    # Saves extracted data using Feather format and no compression to support memory-mapping the file during processing.
-    module_dataframe.write_ipc(file=output_file, compression="uncompressed")
 
+def build_threshold_array(
+    readout_count: int, lick_threshold: int | np.uint16, threshold_schedule: tuple[tuple[int, int], ...] = ()
+) -> NDArray[np.uint16]:
+    """Returns the lick threshold used for each readout received from the lick sensor.
+
+    Args:
+        readout_count: The number of readouts received from the lick sensor.
+        lick_threshold: The threshold used for the readouts received before the first threshold switch.
+        threshold_schedule: The lick thresholds applied during runtime, stored as (switch index, threshold) tuples in
+            the order they were applied. Each switch index is the number of readouts received before the threshold
+            took effect.
+
+    Returns:
+        The one-dimensional numpy array that stores the threshold of each readout, in the order the readouts were
+        received.
+    """
+    thresholds = np.full(readout_count, lick_threshold, dtype=np.uint16)
+    if not threshold_schedule:
+        return thresholds
 
-def _parse_lick_data(extracted_module_data: ExtractedModuleData, output_file: Path, lick_threshold: np.uint16) -> None:
+    # Finds the last switch applied before each readout.
+    switch_indices = np.array([index for index, _ in threshold_schedule], dtype=np.int64)
+    switch_thresholds = np.array([threshold for _, threshold in threshold_schedule], dtype=np.uint16)
+    positions = np.searchsorted(switch_indices, np.arange(readout_count), side="right") - 1
+    switched = positions >= 0
+    thresholds[switched] = switch_thresholds[positions[switched]]
+    return thresholds
+
+
+def _parse_lick_data(
+    extracted_module_data: ExtractedModuleData,
+    output_file: Path,
+    *,
+    lick_threshold: np.uint16,
+    output_format: OutputFormats = OutputFormats.UNCOMPRESSED_IPC,
+    threshold_schedule: tuple[tuple[int, int], ...] = (),
+    valve_edges: NDArray[np.uint64] | None = None,
+    artifact_window_us: int = 0,
+) -> Path:
     """Extracts and saves the data acquired by the LickModule during runtime as a .feather file.
 
     Args:
         extracted_module_data: The ExtractedModuleData instance that stores the data logged by the module during
             runtime.
         output_file: The path to the output .feather file where to save the extracted data.
-        lick_threshold: The voltage threshold for detecting the interaction with the sensor as a lick.
+        lick_threshold: The voltage threshold for detecting the interaction with the sensor as a lick at the onset of
+            the runtime.
+        output_format: The format used to save the output file.
+        threshold_schedule: The lick thresholds applied during runtime, stored as (switch index, threshold) tuples in
+            the order they were applied. The switch index is the number of readouts received before the threshold
+            took effect.
+        valve_edges: The sorted timestamps of all valve opening and closing reports. Used together with the
+            artifact_window_us argument to reproduce the runtime valve artifact suppression.
+        artifact_window_us: The duration, in microseconds, of the window after each valve edge during which the
+            readouts were ignored by the runtime lick detection. A value of 0 disables the suppression.
+
+    Returns:
+        The path to the saved file.
 
     Notes:
         The extraction classifies lick events based on the lick threshold used during runtime. The
@@ -186,6 +824,14 @@ def _parse_lick_data(extracted_module_data: ExtractedModuleData, output_file: Pa
         12-bit ADC voltages associated with each lick. This way, it is possible to spot issues with the lick detection
         system by applying a different lick threshold from the one used at runtime, potentially augmenting data
         analysis.
+
+        The 'lick_onset' column marks the readouts counted as licks by the runtime LickInterface. Unlike the
+        'lick_state' column, it only marks the first readout at or above the threshold after a zero readout, so the
+        number of marked readouts matches the lick count reported at runtime.
+
+        The 'valve_artifact' column marks the readouts received during the valve artifact suppression window. Similar
+        to the runtime LickInterface, these readouts are excluded from the lick detection, and their 'lick_state'
+        repeats the state of the last readout received before the window.
     """
     log_data = extracted_module_data.event_data
 
@@ -201,14 +847,36 @@ def _parse_lick_data(extracted_module_data: ExtractedModuleData, output_file: Pa
     timestamps = np.array([v.timestamp for v in voltage_data], dtype=np.uint64)
     voltages = np.array([v.data for v in voltage_data], dtype=np.uint16)
 
+    # Reconstructs the threshold used for each readout. The readouts are still stored in the order they were received,
+    # which is the order used by the switch indices.
+    thresholds = build_threshold_array(
+        readout_count=voltages.size, lick_threshold=lick_threshold, threshold_schedule=threshold_schedule
+    )
+
     # Sorts all arrays by timestamp. This is technically not needed as the extracted values are already sorted by
     # timestamp, but this is still done for additional safety.
     sort_indices = np.argsort(timestamps)
     timestamps = timestamps[sort_indices]
     voltages = voltages[sort_indices]
+    thresholds = thresholds[sort_indices]
+
+    # Marks the readouts received during the valve artifact suppression window.
+    artifacts = _find_valve_artifacts(
+        timestamps=timestamps,
+        valve_edges=valve_edges if valve_edges is not None else np.empty(0, dtype=np.uint64),
+        artifact_window_us=artifact_window_us,
+    )
+    valid = np.flatnonzero(~artifacts)
+
+    # Creates a lick binary classification column based on the class threshold. Note, the threshold is inclusive. The
+    # artifact readouts repeat the state of the last valid readout, or the 'no lick' state if there is none.
+    licks = (voltages >= thresholds).astype(np.uint8)
+    last_valid = np.maximum.accumulate(np.where(artifacts, -1, np.arange(voltages.size)))
+    licks = np.where(last_valid >= 0, licks[np.maximum(last_valid, 0)], 0).astype(np.uint8)
 
-    # Creates a lick binary classification column based on the class threshold. Note, the threshold is inclusive.
-    licks = (voltages >= lick_threshold).astype(np.uint8)
+    # Marks the readouts that the runtime LickInterface counted as licks.
+    onsets = np.zeros(voltages.shape, dtype=np.uint8)
+    onsets[valid] = classify_runtime_licks(voltages=voltages[valid], lick_threshold=thresholds[valid])
 
     # Creates a Polars DataFrame with the processed data
     module_dataframe = pl.DataFrame(
@@ -216,14 +884,23 @@ def _parse_lick_data(extracted_module_data: ExtractedModuleData, output_file: Pa
             "time_us": timestamps,
             "voltage_12_bit_adc": voltages,
             "lick_state": licks,
+            "lick_onset": onsets,
+            "valve_artifact": artifacts.astype(np.uint8),
         }
     )
 
-    # Saves extracted data using Feather format and no compression to support memory-mapping the file during processing.
-    module_dataframe.write_ipc(file=output_file, compression="uncompressed")
+    return write_dataframe(dataframe=module_dataframe, output_file=output_file, output_format=output_format)
 
 
-def _parse_analog_data(extracted_module_data: ExtractedModuleData, output_file: Path) -> None:
+def _parse_analog_data(
+    extracted_module_data: ExtractedModuleData,
+    output_file: Path,
+    output_format: OutputFormats = OutputFormats.UNCOMPRESSED_IPC,
+    sample_interval_us: int = 1000,
+    *,
+    compact_timestamps: bool = False,
+    interval_schedule: tuple[tuple[int, int], ...] = (),
+) -> Path:
     """Extracts and saves the data acquired by the AnalogModule during runtime as a .feather file. Essentially the same
        as the lick data extraction, but without applying any thresholding.
 
@@ -231,21 +908,66 @@ def _parse_analog_data(extracted_module_data: ExtractedModuleData, output_file:
         extracted_module_data: The ExtractedModuleData instance that stores the data logged by the module during
             runtime.
         output_file: The path to the output .feather file where to save the extracted data.
+        output_format: The format used to save the output file.
+        sample_interval_us: The interval, in microseconds, between the samples acquired in the batched mode. Used to
+            reconstruct the timestamps of the individual samples sent in each batch.
+        compact_timestamps: Determines whether to store the sample timestamps as deltas between consecutive samples.
+            Since the module is polled at a fixed interval, this shrinks the timestamp column 4-fold.
+        interval_schedule: The sampling intervals applied during runtime, stored as (switch index, interval) tuples in
+            the order they were applied. Each switch index is the number of messages received from the module before
+            the interval took effect. The batches received before the first switch use the 'sample_interval_us'.
+
+    Returns:
+        The path to the saved file.
 
     Notes:
         This module is used to record the timestamps of continuous analog signals, so the photometry data can be time-aligned
         and counter the internal drift of doric console timestamps. The extraction preserves the raw 12-bit ADC voltages
         associated with each analog signal sample.
+
+        The samples acquired in the batched mode are unpacked into the same columns as the individually sent samples.
+        Each batch is received right after its last sample is acquired, so the timestamp of each sample is computed
+        by stepping back from the batch reception time by the sampling interval.
     """
     log_data = extracted_module_data.event_data
 
-    voltage_data = log_data[np.uint8(51)]
+    voltage_data = log_data.get(np.uint8(AnalogStateCodes.VOLTAGE_READOUT), ())
     timestamps = np.array([v.timestamp for v in voltage_data], dtype=np.uint64)
     voltages = np.array([v.data for v in voltage_data], dtype=np.uint16)
 
-    # Sorts all arrays by timestamp. This is technically not needed as the extracted values are already sorted by
-    # timestamp, but this is still done for additional safety.
-    sort_indices = np.argsort(timestamps)
+    batch_data = log_data.get(np.uint8(AnalogStateCodes.VOLTAGE_BATCH), ())
+    if len(batch_data) > 0:
+        batches = [np.asarray(v.data, dtype=np.uint16).ravel() for v in batch_data]
+        batch_sizes = np.array([batch.size for batch in batches], dtype=np.int64)
+        batch_voltages = np.concatenate(batches)
+        batch_times = np.array([v.timestamp for v in batch_data], dtype=np.uint64)
+
+        # Resolves the sampling interval of each batch. The switch indices count all messages received from the module
+        # in the order they were received, so the position of each batch in that order is recovered from the reception
+        # times of all messages.
+        intervals = np.full(batch_times.size, sample_interval_us, dtype=np.uint64)
+        if interval_schedule:
+            order = np.argsort(np.concatenate((timestamps, batch_times)), kind="stable")
+            message_indices = np.empty(order.size, dtype=np.int64)
+            message_indices[order] = np.arange(order.size)
+            switch_indices = np.array([index for index, _ in interval_schedule], dtype=np.int64)
+            switch_intervals = np.array([interval for _, interval in interval_schedule], dtype=np.uint64)
+            positions = np.searchsorted(switch_indices, message_indices[timestamps.size :], side="right") - 1
+            switched = positions >= 0
+            intervals[switched] = switch_intervals[positions[switched]]
+
+        # For each sample, computes the number of samples acquired after it in the same batch and uses it to offset
+        # the sample timestamp from the batch reception time.
+        last_indices = np.repeat(np.cumsum(batch_sizes) - 1, batch_sizes)
+        offsets = (last_indices - np.arange(batch_voltages.size)).astype(np.uint64) * np.repeat(intervals, batch_sizes)
+        batch_timestamps = np.repeat(batch_times, batch_sizes)
+
+        timestamps = np.concatenate((timestamps, batch_timestamps - offsets))
+        voltages = np.concatenate((voltages, batch_voltages))
+
+    # Sorts all arrays by timestamp. This is needed to interleave the individually sent and the batched samples, if
+    # the module was used in both modes during the same runtime.
+    sort_indices = np.argsort(timestamps, kind="stable")
     timestamps = timestamps[sort_indices]
     voltages = voltages[sort_indices]
 
@@ -257,71 +979,763 @@ def _parse_analog_data(extracted_module_data: ExtractedModuleData, output_file:
         }
     )
 
-    module_dataframe.write_ipc(file=output_file, compression="uncompressed")
+    return write_dataframe(
+        dataframe=module_dataframe,
+        output_file=output_file,
+        output_format=output_format,
+        compact_timestamps=compact_timestamps,
+    )
 
 
-def process_microcontroller_log(data_logger: DataLogger, microcontroller: AMCInterface, output_directory: Path) -> None:
-    """Reads the .npz log file generated by the DataLogger instance for the target microcontroller and extracts the
-    data recorded by all hardware modules as .feather files.
+def _extract_lick_edges(
+    timestamps: NDArray[np.uint64], lick_states: NDArray[np.uint8]
+) -> tuple[NDArray[np.uint64], NDArray[np.uint64]]:
+    """Extracts the timestamps of the lick onset (rising) and offset (falling) edges from the binary lick state data.
 
     Notes:
-        This function should be called at the end of each runtime to process the logged data.
+        The sensor is assumed to be in the 'no lick' state before the first readout. If the data ends while the tongue
+        is still in contact with the sensor, the final (unterminated) onset is discarded, as its duration cannot be
+        resolved. Therefore, the returned arrays always have the same length and each onset is followed by its
+        matching offset.
 
     Args:
-        data_logger: The DataLogger instance used at runtime to log the microcontroller data.
-        microcontroller: The AMCInterface instance used at runtime to communicate with the microcontroller.
+        timestamps: The one-dimensional numpy array that stores the timestamps of the lick sensor readouts.
+        lick_states: The one-dimensional numpy array that stores the binary lick state for each readout.
+
+    Returns:
+        A tuple of two numpy arrays. The first array stores the lick onset timestamps, and the second array stores the
+        lick offset timestamps.
+    """
+    # Computes the state transitions in a single pass. Casts the states to a signed type to resolve falling edges as
+    # negative values. Prepending 0 ensures that a lick that starts at the first readout is still detected.
+    edges = np.diff(lick_states.astype(np.int8), prepend=np.int8(0))
+    onsets = timestamps[edges == 1]
+    offsets = timestamps[edges == -1]
+
+    # Since the state before the first readout is always 0, every offset is preceded by an onset. The only possible
+    # mismatch is a trailing onset without the matching offset, which is discarded here.
+    onsets = onsets[: offsets.size]
+
+    return onsets, offsets
+
+
+def _parse_lick_microstructure(
+    lick_file: Path,
+    event_output_file: Path,
+    bout_output_file: Path,
+    *,
+    bout_gap_us: int,
+    minimum_bout_licks: int,
+    output_format: OutputFormats = OutputFormats.UNCOMPRESSED_IPC,
+) -> tuple[Path, Path]:
+    """Extracts the lick events and lick bouts from the processed lick sensor data and saves them as .feather files.
+
+    Args:
+        lick_file: The path to the .feather file generated by the _parse_lick_data() function.
+        event_output_file: The path to the output .feather file where to save the per-lick event table.
+        bout_output_file: The path to the output .feather file where to save the per-bout statistics table.
+        bout_gap_us: The maximum inter-lick interval, in microseconds, for two consecutive licks to belong to the same
+            bout.
+        minimum_bout_licks: The minimum number of licks a bout has to contain to be included in the bout table.
+        output_format: The format used to save the output files.
+
+    Returns:
+        A tuple of two paths. The first path points to the lick event file, and the second path points to the lick bout
+        file.
+
+    Notes:
+        All computations are vectorized and scale linearly with the number of readouts. The event table stores the
+        onset, offset, duration, and the interval to the previous lick onset for each lick. The first lick uses an
+        inter-lick interval of 0. The bout table stores the onset and offset of each bout, the number of licks, the
+        total tongue contact time, the mean inter-lick interval, and the lick rate within each bout. Single-lick bouts
+        use a mean inter-lick interval and a lick rate of 0.
+    """
+    # Memory-maps the lick data (if it is stored uncompressed) to avoid copying multi-million-row sessions into RAM.
+    lick_data = read_dataframe(file=lick_file)
+    timestamps: NDArray[np.uint64] = lick_data["time_us"].to_numpy()
+    lick_states: NDArray[np.uint8] = lick_data["lick_state"].to_numpy()
+
+    onsets, offsets = _extract_lick_edges(timestamps=timestamps, lick_states=lick_states)
+    lick_count = onsets.size
+
+    # Computes the tongue contact duration for each lick and the interval between consecutive lick onsets.
+    durations = (offsets - onsets).astype(np.uint32)
+    intervals = np.diff(onsets, prepend=onsets[:1])
+
+    # Segments licks into bouts. A new bout starts at the first lick and at every lick that follows a pause longer than
+    # the bout gap. The cumulative sum over bout starts assigns each lick the index of its bout.
+    bout_starts = intervals > bout_gap_us
+    if lick_count > 0:
+        bout_starts[0] = True
+    bout_indices = (np.cumsum(bout_starts, dtype=np.uint32) - 1).astype(np.uint32)
+
+    event_dataframe = pl.DataFrame(
+        {
+            "onset_time_us": onsets,
+            "offset_time_us": offsets,
+            "duration_us": durations,
+            "inter_lick_interval_us": intervals,
+            "bout_index": bout_indices,
+        }
+    )
+    event_output_file = write_dataframe(
+        dataframe=event_dataframe, output_file=event_output_file, output_format=output_format
+    )
+
+    # Resolves the first and last lick of each bout. Reduction operations over the bout start indices compute per-bout
+    # statistics without looping over bouts.
+    first_licks = np.flatnonzero(bout_starts)
+    last_licks = np.append(first_licks[1:], lick_count)[: first_licks.size] - 1
+    bout_lick_counts = (last_licks - first_licks + 1).astype(np.uint32)
+    contact_times = (
+        np.add.reduceat(durations.astype(np.uint64), first_licks) if lick_count > 0 else np.empty(0, dtype=np.uint64)
+    )
+
+    # The sum of inter-lick intervals inside a bout telescopes into the distance between its first and last onset, so
+    # the mean interval and the lick rate do not require a separate reduction pass.
+    onset_spans = (onsets[last_licks] - onsets[first_licks]).astype(np.float64)
+    interval_counts = bout_lick_counts.astype(np.float64) - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_intervals = np.where(interval_counts > 0, onset_spans / interval_counts, 0.0)
+        lick_rates = np.where(onset_spans > 0, interval_counts / (onset_spans / 1e6), 0.0)
+
+    bout_dataframe = pl.DataFrame(
+        {
+            "bout_index": np.arange(first_licks.size, dtype=np.uint32),
+            "onset_time_us": onsets[first_licks],
+            "offset_time_us": offsets[last_licks],
+            "duration_us": offsets[last_licks] - onsets[first_licks],
+            "lick_count": bout_lick_counts,
+            "contact_time_us": contact_times,
+            "mean_inter_lick_interval_us": np.round(mean_intervals, decimals=3),
+            "lick_rate_hz": np.round(lick_rates, decimals=3),
+        }
+    ).filter(pl.col("lick_count") >= minimum_bout_licks)
+    bout_output_file = write_dataframe(
+        dataframe=bout_dataframe, output_file=bout_output_file, output_format=output_format
+    )
+    return event_output_file, bout_output_file
+
+
+def process_lick_microstructure(
+    processed_directory: Path,
+    bout_gap_us: int = _LICK_BOUT_GAP_US,
+    minimum_bout_licks: int = _MINIMUM_BOUT_LICKS,
+    output_format: OutputFormats = OutputFormats.UNCOMPRESSED_IPC,
+) -> tuple[Path, ...]:
+    """Extracts the lick events and lick bouts for both lick sensors from the processed session data.
+
+    Notes:
+        This function is called by process_microcontroller_log() using the default bout parameters. It can be called
+        again on already processed sessions to re-segment the licks using different bout parameters.
+
+    Args:
+        processed_directory: The path to the directory that stores the .feather files generated by the
+            process_microcontroller_log() function. The extracted lick event and bout files are saved to the same
+            directory.
+        bout_gap_us: The maximum inter-lick interval, in microseconds, for two consecutive licks to belong to the same
+            bout.
+        minimum_bout_licks: The minimum number of licks a bout has to contain to be included in the bout table.
+        output_format: The format used to save the lick event and lick bout files.
+
+    Returns:
+        A tuple of paths to the generated lick event and lick bout files.
+    """
+    output_files: list[Path] = []
+    for side in ("left", "right"):
+        output_files.extend(
+            _parse_lick_microstructure(
+                lick_file=processed_directory / f"{side}_lick_sensor.feather",
+                event_output_file=processed_directory / f"{side}_lick_events.feather",
+                bout_output_file=processed_directory / f"{side}_lick_bouts.feather",
+                bout_gap_us=bout_gap_us,
+                minimum_bout_licks=minimum_bout_licks,
+                output_format=output_format,
+            )
+        )
+    return tuple(output_files)
+
+
+def parse_raw_entry(entry: NDArray[np.uint8]) -> tuple[int, NDArray[np.uint8]]:
+    """Splits the raw log entry into the acquisition time and the logged payload.
+
+    Args:
+        entry: The raw log entry, as stored in the .npy entry files and the .npz log archives.
+
+    Returns:
+        A tuple of two elements. The first element is the acquisition time of the entry, relative to the onset of the
+        source. The onset entry always uses the acquisition time of 0 and stores the onset, in microseconds elapsed
+        since UTC epoch onset, as its payload. The second element is the payload view of the entry.
+    """
+    return entry[1:ENTRY_HEADER_SIZE].view(np.uint64).item(), entry[ENTRY_HEADER_SIZE:]
+
+
+def parse_message_data(payload: NDArray[np.uint8]) -> np.number | NDArray[np.number] | None:
+    """Extracts the copy of the data object from the logged module message payload.
+
+    Args:
+        payload: The payload of the raw log entry that stores the module message, returned by parse_raw_entry().
+
+    Returns:
+        The data object of the data message or None, if the payload stores a state message.
+    """
+    if payload.size <= MODULE_HEADER_SIZE:
+        return None
+    prototype = SerialPrototypes.get_prototype_for_code(code=payload[MODULE_HEADER_SIZE])
+    if prototype is None:
+        return None
+    data: NDArray[np.number] = payload[MODULE_HEADER_SIZE + 1 :].view(prototype.dtype)
+    return data.copy() if isinstance(prototype, np.ndarray) else data[0].copy()
+
+
+def _build_parameter_events(entries: list[NDArray[np.uint8]]) -> pl.DataFrame:
+    """Converts the raw log entries of the parameter change events into a Polars DataFrame.
+
+    Args:
+        entries: The raw log entries logged by the AMCInterface under the parameter source ID, including the onset
+            entry.
+
+    Returns:
+        A Polars DataFrame that stores the absolute UTC time of each event in the 'time_us' column, followed by one
+        column for each value listed in PARAMETER_EVENT_COLUMNS. The events are sorted by time.
+    """
+    onset_us = 0
+    times = []
+    values = []
+    for entry in entries:
+        time, payload = parse_raw_entry(entry)
+        if time == 0:
+            onset_us = int(payload.view(np.int64).item())
+        else:
+            times.append(time)
+            values.append(payload.view(np.uint64))
+
+    events = np.array(values, dtype=np.uint64).reshape(-1, len(PARAMETER_EVENT_COLUMNS))
+    dataframe = pl.DataFrame(
+        {
+            "time_us": np.array(times, dtype=np.uint64) + np.uint64(onset_us),
+            **{column: events[:, index] for index, column in enumerate(PARAMETER_EVENT_COLUMNS)},
+        },
+        schema={"time_us": pl.UInt64, **dict.fromkeys(PARAMETER_EVENT_COLUMNS, pl.UInt64)},
+    )
+    return dataframe.sort("time_us")
+
+
+def read_parameter_events(log_path: Path) -> pl.DataFrame:
+    """Reads the parameter change events from the .npz log archive of the parameter source.
+
+    If the archive does not exist, for example, because the session was acquired before the parameters could be
+    changed during runtime, returns an empty DataFrame.
+    """
+    if not log_path.exists():
+        return _build_parameter_events(entries=[])
+    with np.load(log_path, allow_pickle=False, fix_imports=False) as archive:
+        return _build_parameter_events(entries=[archive[item] for item in archive.files])
+
+
+def read_recorded_parameters(log_directory: Path, parameters: ControllerParameters) -> ControllerParameters:
+    """Replaces the runtime parameters that are not stored in the log with the values recorded for the session.
+
+    Notes:
+        The AMCInterface records its parameters in the metadata file of the session directory that contains the
+        DataLogger output directory. Currently, only the valve artifact window is read from the record. The sessions
+        acquired before the window was recorded did not suppress the valve artifacts, so their window is set to 0.
+
+    Args:
+        log_directory: The path to the DataLogger output directory that stores the microcontroller log.
+        parameters: The hardware module parameters used to process the microcontroller data.
+
+    Returns:
+        The input parameters with the valve artifact window used at runtime.
+    """
+    metadata_path = log_directory.parent.joinpath(SESSION_METADATA_NAME)
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8")) if metadata_path.exists() else {}
+    record = metadata.get(f"controller_{parameters.controller_id}", {})
+    return replace(parameters, valve_artifact_window_us=int(record.get("valve_artifact_window_us", 0)))
+
+
+def read_task_times(session_directory: Path, controller_id: int) -> tuple[int | None, int | None]:
+    """Reads the times at which the task started and was opened manually during runtime.
+
+    Notes:
+        The runtime records both times in the session metadata file. For the sessions acquired before the times were
+        recorded, the task start is approximated by the onset of the microcontroller log, as the runtime starts the
+        task right after starting the microcontroller, and the task is assumed to open after the acclimation period.
+
+    Args:
+        session_directory: The path to the session directory that stores the metadata file and the DataLogger output
+            directory.
+        controller_id: The ID of the microcontroller whose log onset is used as the task start of the sessions that
+            did not record it.
+
+    Returns:
+        A tuple of two elements. The first element is the task start time, and the second element is the time the task
+        was opened manually. Both times are in microseconds elapsed since UTC epoch onset. Each element is None if the
+        time is not available.
+    """
+    metadata_path = session_directory.joinpath(SESSION_METADATA_NAME)
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8")) if metadata_path.exists() else {}
+    if (task_times := metadata.get(TASK_METADATA_SECTION)) is not None:
+        return task_times["start_us"], task_times["open_us"] if task_times["manual_open"] else None
+
+    # The onset entry uses the acquisition time of 0. It is read from the log archive or, if the archive was not
+    # assembled, from the raw log entry.
+    onset_name = f"{controller_id:03d}_{0:020d}"
+    for log_directory in session_directory.glob("*_data_log"):
+        archive_path = log_directory.joinpath(f"{controller_id}_log.npz")
+        entry_path = log_directory.joinpath(f"{onset_name}.npy")
+        if archive_path.exists():
+            with np.load(archive_path, allow_pickle=False) as archive:
+                if onset_name not in archive.files:
+                    continue
+                _, payload = parse_raw_entry(archive[onset_name])
+        elif entry_path.exists():
+            _, payload = parse_raw_entry(np.load(entry_path, allow_pickle=False))
+        else:
+            continue
+        return int(payload.view(np.int64).item()), None
+    return None, None
+
+
+def get_threshold_schedule(parameter_events: pl.DataFrame, module_id: int) -> tuple[tuple[int, int], ...]:
+    """Returns the lick thresholds applied during runtime to the lick sensor with the given ID, stored as
+    (switch index, threshold) tuples in the order they were applied.
+    """
+    events = parameter_events.filter(
+        (pl.col("module_type") == int(ModuleTypeCodes.LICK_MODULE)) & (pl.col("module_id") == module_id)
+    ).sort("version")
+    return tuple(zip(events["switch_index"].to_list(), events["lick_threshold"].to_list(), strict=True))
+
+
+def get_interval_schedule(parameter_events: pl.DataFrame, module_id: int) -> tuple[tuple[int, int], ...]:
+    """Returns the sampling intervals, in microseconds, applied during runtime to the analog module with the given ID,
+    stored as (switch index, interval) tuples in the order they were applied.
+    """
+    events = parameter_events.filter(
+        (pl.col("module_type") == int(ModuleTypeCodes.ANALOG_MODULE)) & (pl.col("module_id") == module_id)
+    ).sort("version")
+    return tuple(zip(events["switch_index"].to_list(), events["polling_delay_us"].to_list(), strict=True))
+
+
+def extract_microcontroller_data(
+    log_path: Path,
+    output_directory: Path,
+    parameters: ControllerParameters,
+    workers: int = -1,
+    formats: StreamFormats | None = None,
+) -> tuple[Path, ...]:
+    """Reads the .npz log file generated for the AMC microcontroller and extracts the data recorded by all hardware
+    modules as .feather files.
+
+    Notes:
+        Unlike process_microcontroller_log(), this function does not require the runtime AMCInterface and DataLogger
+        instances, which allows reprocessing the data of previously acquired sessions.
+
+        The parameter change events are read from the log archive of the parameter source, stored next to the
+        microcontroller log archive. The events are saved as the 'parameter_events' file and used to reproduce the lick
+        thresholds applied during runtime.
+
+    Args:
+        log_path: The path to the .npz log archive of the microcontroller.
         output_directory: The path to the directory where to save the extracted .feather files.
+        parameters: The hardware module parameters used at runtime to acquire the processed data.
+        workers: The number of worker processes used to read the log archive. A value of -1 uses all available
+            CPU cores.
+        formats: The file formats used to save each extracted data stream. If not provided, all streams are saved as
+            uncompressed .feather files.
 
+    Returns:
+        A tuple of paths to all generated files.
     """
-    # Determines the path to the microcontroller log file.
-    log_path = data_logger.output_directory.joinpath(f"{microcontroller.controller_id}_log.npz")
+    if formats is None:
+        formats = StreamFormats()
 
     # Reads the log file and extracts the data for each module used at runtime.
     data = extract_logged_hardware_module_data(
         log_path=log_path,
-        module_type_id=(
-            (ModuleTypeCodes.VALVE_MODULE, 1),  # Left valve
-            (ModuleTypeCodes.VALVE_MODULE, 2),  # Right valve
-            (ModuleTypeCodes.LICK_MODULE, 1),  # Left lick sensor
-            (ModuleTypeCodes.LICK_MODULE, 2),  # Right lick sensor
-            (ModuleTypeCodes.ANALOG_MODULE, 1),  # Analog module 1
-        ),
+        module_type_id=tuple((int(module_type), module_id) for module_type, module_id in _PROCESSED_MODULES),
+        n_workers=workers,
     )
+    parameter_events = read_parameter_events(log_path.with_name(f"{parameters.parameter_source_id}_log.npz"))
+    return _save_module_data(
+        data=data,
+        output_directory=output_directory,
+        parameters=parameters,
+        formats=formats,
+        parameter_events=parameter_events,
+    )
+
+
+def _save_module_data(
+    data: tuple[ExtractedModuleData, ...],
+    output_directory: Path,
+    parameters: ControllerParameters,
+    formats: StreamFormats,
+    parameter_events: pl.DataFrame,
+) -> tuple[Path, ...]:
+    """Parses the data extracted for all hardware modules and saves it to the output directory.
 
-    # Parses the extracted data for each module and saves the output as .feather files in the requested directory:
+    Args:
+        data: The data of each hardware module, stored in the order of the _PROCESSED_MODULES tuple.
+        output_directory: The path to the directory where to save the extracted .feather files.
+        parameters: The hardware module parameters used at runtime to acquire the processed data.
+        formats: The file formats used to save each extracted data stream.
+        parameter_events: The parameter change events logged during runtime.
+
+    Returns:
+        A tuple of paths to all generated files.
+    """
+    # Parses the extracted data for each module and saves the output in the requested directory:
+
+    # Parameter change events
+    parameter_file = write_dataframe(
+        dataframe=parameter_events,
+        output_file=output_directory / "parameter_events.feather",
+        output_format=formats.lick,
+    )
 
     # Left Valve
-    _parse_valve_data(
+    left_valve_files = _parse_valve_data(
         extracted_module_data=data[0],
         output_file=output_directory / "left_valve_data.feather",
-        scale_coefficient=microcontroller.left_valve.scale_coefficient,
-        nonlinearity_exponent=microcontroller.left_valve.nonlinearity_exponent,
+        pulse_output_file=output_directory / "left_valve_pulses.feather",
+        scale_coefficient=np.float64(parameters.left_valve_scale_coefficient),
+        nonlinearity_exponent=np.float64(parameters.left_valve_nonlinearity_exponent),
+        output_format=formats.valve,
     )
 
     # Right Valve
-    _parse_valve_data(
+    right_valve_files = _parse_valve_data(
         extracted_module_data=data[1],
         output_file=output_directory / "right_valve_data.feather",
-        scale_coefficient=microcontroller.right_valve.scale_coefficient,
-        nonlinearity_exponent=microcontroller.right_valve.nonlinearity_exponent,
+        pulse_output_file=output_directory / "right_valve_pulses.feather",
+        scale_coefficient=np.float64(parameters.right_valve_scale_coefficient),
+        nonlinearity_exponent=np.float64(parameters.right_valve_nonlinearity_exponent),
+        output_format=formats.valve,
     )
 
-    # Left Lick Sensor
-    _parse_lick_data(
+    # Left Lick Sensor. Both lick sensors use the edges of both valves to suppress the valve artifacts.
+    valve_edges = _get_valve_edges(data=data)
+    left_lick_file = _parse_lick_data(
         extracted_module_data=data[2],
         output_file=output_directory / "left_lick_sensor.feather",
-        lick_threshold=microcontroller.left_lick_sensor.lick_threshold,
+        lick_threshold=np.uint16(parameters.left_lick_threshold),
+        output_format=formats.lick,
+        threshold_schedule=get_threshold_schedule(parameter_events=parameter_events, module_id=1),
+        valve_edges=valve_edges,
+        artifact_window_us=parameters.valve_artifact_window_us,
     )
 
     # Right Lick Sensor
-    _parse_lick_data(
+    right_lick_file = _parse_lick_data(
         extracted_module_data=data[3],
         output_file=output_directory / "right_lick_sensor.feather",
-        lick_threshold=microcontroller.left_lick_sensor.lick_threshold,
+        lick_threshold=np.uint16(parameters.right_lick_threshold),
+        output_format=formats.lick,
+        threshold_schedule=get_threshold_schedule(parameter_events=parameter_events, module_id=2),
+        valve_edges=valve_edges,
+        artifact_window_us=parameters.valve_artifact_window_us,
     )
 
     # Analog Module
-    _parse_analog_data(
+    analog_file = _parse_analog_data(
         extracted_module_data=data[4],
         output_file=output_directory / "analog_signal.feather",
+        output_format=formats.analog,
+        sample_interval_us=parameters.analog_sample_interval_us,
+        compact_timestamps=formats.compact_timestamps,
+        interval_schedule=get_interval_schedule(parameter_events=parameter_events, module_id=1),
+    )
+
+    # Lick microstructure. Uses the lick sensor files generated above to extract lick events and bouts.
+    microstructure_files = process_lick_microstructure(
+        processed_directory=output_directory, output_format=formats.lick_microstructure
+    )
+
+    return (
+        *left_valve_files,
+        *right_valve_files,
+        left_lick_file,
+        right_lick_file,
+        analog_file,
+        *microstructure_files,
+        parameter_file,
+    )
+
+
+def _read_raw_entry(file: Path) -> NDArray[np.uint8] | None:
+    """Reads the raw log entry file, returning None if the file is truncated or otherwise unreadable."""
+    try:
+        return np.asarray(np.load(file, allow_pickle=False), dtype=np.uint8)
+    except (ValueError, OSError, EOFError):
+        return None
+
+
+def _save_checkpoint(
+    checkpoint_directory: Path, onset_us: int, last_time: int, skipped: int, entries: list[Any]
+) -> None:
+    """Saves the progress of the raw log reader as the next chunk of the checkpoint.
+
+    Notes:
+        Each chunk only stores the entries read since the previous chunk and the reader state after reading them, so
+        the cost of saving a checkpoint does not grow with the number of previously read entries. The chunk is first
+        written under a temporary name and then renamed, so an interruption while saving the chunk never corrupts the
+        checkpoint.
+
+    Args:
+        checkpoint_directory: The path to the directory that stores the checkpoint chunks.
+        onset_us: The onset of the data acquisition, in microseconds elapsed since UTC epoch onset.
+        last_time: The acquisition time of the last read raw log entry.
+        skipped: The number of skipped raw log entries.
+        entries: The module message entries read since the previous chunk.
+    """
+    checkpoint_directory.mkdir(parents=True, exist_ok=True)
+    index = sum(1 for _ in checkpoint_directory.glob("chunk_*.npz"))
+    partial_file = checkpoint_directory.joinpath("partial.npz")
+    with partial_file.open("wb") as file:
+        np.savez(
+            file,
+            state=np.array([onset_us, last_time, skipped], dtype=np.uint64),
+            sizes=np.array([entry.size for entry in entries], dtype=np.uint64),
+            entries=np.concatenate(entries) if entries else np.empty(0, dtype=np.uint8),
+        )
+    partial_file.replace(checkpoint_directory.joinpath(f"chunk_{index:06d}.npz"))
+
+
+def _load_checkpoint(checkpoint_directory: Path) -> tuple[int | None, int, int, list[Any]]:
+    """Loads the progress of the raw log reader saved by the _save_checkpoint() function.
+
+    Returns:
+        A tuple of four elements: the onset of the data acquisition, the acquisition time of the last read raw log
+        entry, the number of skipped raw log entries, and the module message entries read before the checkpoint. If
+        the checkpoint does not exist, returns None, -1, 0, and an empty list.
+    """
+    onset_us: int | None = None
+    last_time = -1
+    skipped = 0
+    entries: list[Any] = []
+    for chunk_file in sorted(checkpoint_directory.glob("chunk_*.npz")):
+        with np.load(chunk_file, allow_pickle=False) as chunk:
+            onset_us, last_time, skipped = (int(value) for value in chunk["state"])
+            if chunk["sizes"].size:
+                boundaries = np.cumsum(chunk["sizes"].astype(np.int64))[:-1]
+                entries.extend(np.split(chunk["entries"], boundaries))
+    return onset_us, last_time, skipped, entries
+
+
+def _build_module_data(entries: list[NDArray[np.uint8]], onset_us: int) -> tuple[ExtractedModuleData, ...]:
+    """Converts the raw module message entries into the ExtractedModuleData instances of all processed modules.
+
+    Args:
+        entries: The raw log entries of all processed module messages, in the order they were received.
+        onset_us: The onset of the data acquisition, in microseconds elapsed since UTC epoch onset.
+
+    Returns:
+        A tuple of ExtractedModuleData instances, stored in the order of the _PROCESSED_MODULES tuple.
+    """
+    event_data: dict[tuple[int, int], dict[np.uint8, list[ExtractedMessageData]]] = {
+        (int(module_type), module_id): {} for module_type, module_id in _PROCESSED_MODULES
+    }
+    for entry in entries:
+        time, payload = parse_raw_entry(entry)
+        message = ExtractedMessageData(
+            timestamp=np.uint64(onset_us + time),
+            command=np.uint8(payload[3]),
+            data=parse_message_data(payload),
+        )
+        event_data[(int(payload[1]), int(payload[2]))].setdefault(np.uint8(payload[4]), []).append(message)
+
+    return tuple(
+        ExtractedModuleData(
+            module_type=module_type,
+            module_id=module_id,
+            event_data={event: tuple(messages) for event, messages in events.items()},
+        )
+        for (module_type, module_id), events in event_data.items()
+    )
+
+
+def extract_raw_microcontroller_data(
+    log_directory: Path,
+    output_directory: Path,
+    parameters: ControllerParameters,
+    formats: StreamFormats | None = None,
+) -> tuple[Path, ...]:
+    """Reads the raw .npy log entries generated for the AMC microcontroller and extracts the data recorded by all
+    hardware modules as .feather files.
+
+    Notes:
+        This function does not require assembling the log entries into the .npz archive, so it can recover the data of
+        runtimes that crashed before the archive was assembled. The entries are read in the order they were acquired.
+        Truncated or otherwise unreadable entries, such as the entries that were being written when the runtime
+        crashed, are skipped.
+
+        The parameter change events are read from the raw entries of the parameter source and are saved as the
+        'parameter_events' file.
+
+        The reader periodically saves its progress to the '<controller_id>_raw_log_checkpoint' directory in the output
+        directory. If the reader is interrupted, calling it again resumes reading from the last checkpoint. The
+        checkpoint is removed once all data is extracted.
+
+    Args:
+        log_directory: The path to the DataLogger output directory that stores the raw .npy log entries.
+        output_directory: The path to the directory where to save the extracted .feather files and the checkpoint.
+        parameters: The hardware module parameters used at runtime to acquire the processed data.
+        formats: The file formats used to save each extracted data stream. If not provided, all streams are saved as
+            uncompressed .feather files.
+
+    Returns:
+        A tuple of paths to all generated files.
+    """
+    if formats is None:
+        formats = StreamFormats()
+
+    # Lists the raw entries of the microcontroller in the acquisition order. Entry names store the source ID and the
+    # acquisition time, and the onset entry always uses the acquisition time of 0.
+    prefix = f"{parameters.controller_id:03d}_"
+    with os.scandir(log_directory) as iterator:
+        names = [entry.name for entry in iterator if entry.name.startswith(prefix) and entry.name.endswith(".npy")]
+    times = sorted(int(name[len(prefix) : -len(".npy")]) for name in names)
+
+    # Restores the progress of the previous run, if it was checkpointed.
+    checkpoint_directory = output_directory.joinpath(f"{parameters.controller_id}_raw_log_checkpoint")
+    onset_us, last_time, skipped, entries = _load_checkpoint(checkpoint_directory=checkpoint_directory)
+    saved = len(entries)
+    if last_time >= 0:
+        console.echo(
+            message=f"Resuming the raw log extraction from the checkpoint with {len(entries)} module messages.",
+            level=LogLevel.INFO,
+        )
+
+    pending = [time for time in times if time > last_time]
+    modules = {(int(module_type), module_id) for module_type, module_id in _PROCESSED_MODULES}
+    for count, time in enumerate(tqdm(pending, desc="Reading raw log entries", unit="entry"), start=1):
+        entry = _read_raw_entry(log_directory.joinpath(f"{prefix}{time:020d}.npy"))
+        last_time = time
+        if entry is None or entry.size <= ENTRY_HEADER_SIZE:
+            skipped += 1
+        elif time == 0:
+            onset_us = int(parse_raw_entry(entry)[1].view(np.int64).item())
+        else:
+            # Only keeps the data and state messages of the processed modules. Except for the command completion
+            # messages, the service messages are discarded.
+            _, payload = parse_raw_entry(entry)
+            if (
+                payload.size >= MODULE_HEADER_SIZE
+                and payload[0] in (SerialProtocols.MODULE_STATE, SerialProtocols.MODULE_DATA)
+                and (payload[4] == _COMMAND_COMPLETE_CODE or payload[4] > _SERVICE_CODE_THRESHOLD)
+                and (int(payload[1]), int(payload[2])) in modules
+            ):
+                entries.append(entry)
+
+        if count % _CHECKPOINT_INTERVAL == 0 and onset_us is not None:
+            _save_checkpoint(checkpoint_directory, onset_us, last_time, skipped, entries[saved:])
+            saved = len(entries)
+
+    if onset_us is None:
+        message = (
+            f"Unable to extract the microcontroller data from the raw log entries in {log_directory}. The onset entry "
+            f"of the microcontroller {parameters.controller_id} is missing or unreadable."
+        )
+        console.error(message=message, error=ValueError)
+        # Fallback to appease mypy, should not be reachable
+        raise ValueError(message)  # pragma: no cover
+
+    _save_checkpoint(checkpoint_directory, onset_us, last_time, skipped, entries[saved:])
+    if skipped:
+        console.echo(
+            message=f"Skipped {skipped} truncated or unreadable raw log entries in {log_directory}.",
+            level=LogLevel.WARNING,
+        )
+
+    # Reads the parameter change events. There are few such events, so they are not checkpointed.
+    parameter_prefix = f"{parameters.parameter_source_id:03d}_"
+    with os.scandir(log_directory) as iterator:
+        parameter_names = sorted(
+            entry.name for entry in iterator if entry.name.startswith(parameter_prefix) and entry.name.endswith(".npy")
+        )
+    parameter_entries = [
+        entry
+        for name in parameter_names
+        if (entry := _read_raw_entry(log_directory.joinpath(name))) is not None and entry.size > ENTRY_HEADER_SIZE
+    ]
+
+    data = _build_module_data(entries=entries, onset_us=onset_us)
+    outputs = _save_module_data(
+        data=data,
+        output_directory=output_directory,
+        parameters=parameters,
+        formats=formats,
+        parameter_events=_build_parameter_events(entries=parameter_entries),
     )
+
+    # The checkpoint is only needed to resume the interrupted extraction.
+    shutil.rmtree(checkpoint_directory, ignore_errors=True)
+    return outputs
+
+
+def process_microcontroller_log(data_logger: DataLogger, microcontroller: AMCInterface, output_directory: Path) -> None:
+    """Reads the .npz log file generated by the DataLogger instance for the target microcontroller and extracts the
+    data recorded by all hardware modules as .feather files.
+
+    Notes:
+        This function should be called at the end of each runtime to process the logged data.
+
+    Args:
+        data_logger: The DataLogger instance used at runtime to log the microcontroller data.
+        microcontroller: The AMCInterface instance used at runtime to communicate with the microcontroller.
+        output_directory: The path to the directory where to save the extracted .feather files.
+
+    """
+    extract_microcontroller_data(
+        log_path=data_logger.output_directory.joinpath(f"{microcontroller.controller_id}_log.npz"),
+        output_directory=output_directory,
+        parameters=microcontroller.parameters,
+    )
+
+
+def process_camera_logs(
+    log_directory: Path,
+    output_directory: Path,
+    workers: int = -1,
+    output_format: OutputFormats = OutputFormats.UNCOMPRESSED_IPC,
+    *,
+    compact_timestamps: bool = False,
+) -> dict[str, float]:
+    """Extracts the frame acquisition timestamps of all cameras from the .npz log archives stored in the input
+    directory and saves them as .feather files.
+
+    Notes:
+        Cameras whose log archives are not found in the log directory are skipped. This allows using the function
+        for sessions acquired without the video systems.
+
+    Args:
+        log_directory: The path to the DataLogger output directory that stores the assembled .npz log archives.
+        output_directory: The path to the directory where to save the extracted .feather files.
+        workers: The number of worker processes used to read each log archive. A value of -1 uses all available
+            CPU cores.
+        output_format: The format used to save the timestamp files.
+        compact_timestamps: Determines whether to store the frame timestamps as deltas between consecutive frames.
+
+    Returns:
+        A dictionary that maps the name of each processed camera to its acquisition frame rate, in frames per second,
+        computed from the extracted timestamps.
+    """
+    frame_rates: dict[str, float] = {}
+    for camera_id, camera_name in _CAMERA_NAMES.items():
+        log_path = log_directory.joinpath(f"{camera_id}_log.npz")
+        if not log_path.exists():
+            continue
+
+        timestamps = np.array(extract_logged_camera_timestamps(log_path=log_path, n_workers=workers), dtype=np.uint64)
+        write_dataframe(
+            dataframe=pl.DataFrame({"time_us": timestamps}),
+            output_file=output_directory / f"{camera_name}_camera_timestamps.feather",
+            output_format=output_format,
+            compact_timestamps=compact_timestamps,
+        )
+
+        # Computes the frame rate of the camera based on the extracted frame timestamp data.
+        frame_rates[camera_name] = float(1 / (np.mean(np.diff(timestamps)) / 1e6)) if timestamps.size > 1 else 0.0
+
+    return frame_rates
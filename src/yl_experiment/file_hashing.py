@@ -0,0 +1,42 @@
+"""This module provides the function used to compute the checksums of the acquired and the processed data files.
+
+The module has no dependencies outside the standard library, so it can be imported by the lightweight tools, such as
+the background session transfer process, without importing the data processing pipeline.
+"""
+
+import mmap
+import hashlib
+from pathlib import Path
+
+# The size, in bytes, of the chunks fed to the hash function when hashing memory-mapped files. 8 MB chunks keep the
+# hashing throughput close to the memory bandwidth without holding large file regions in the working set.
+_HASH_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def hash_file(file_path: Path) -> str:
+    """Computes the BLAKE2b hash of the file contents.
+
+    Notes:
+        The file is memory-mapped and hashed in chunks, so the hashed data is never copied into Python-managed memory.
+
+    Args:
+        file_path: The path to the file to hash.
+
+    Returns:
+        The hexadecimal representation of the file hash.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with file_path.open("rb") as file:
+        # Empty files cannot be memory-mapped.
+        if file_path.stat().st_size == 0:
+            return digest.hexdigest()
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            view = memoryview(mapped_file)
+            try:
+                for start in range(0, len(view), _HASH_CHUNK_SIZE):
+                    digest.update(view[start : start + _HASH_CHUNK_SIZE])
+            finally:
+                view.release()
+
+    return digest.hexdigest()
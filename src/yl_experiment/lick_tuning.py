@@ -0,0 +1,310 @@
+"""This module provides the tool used to tune the signal and delta thresholds of the lick sensors.
+
+The LickModule only reports the readouts that reach the signal threshold and differ from the previously reported readout
+by at least the delta threshold, so these thresholds determine how many messages each lick sensor sends while polling at
+~1 kHz. The tool replays the voltage traces logged by already processed sessions through the same filter using the
+candidate thresholds. For each candidate, it reports the number of messages the sensors would have sent and how well the
+licks detected from the filtered traces agree with the licks detected at runtime, and then recommends the candidate with
+the lowest message rate that still detects the licks correctly. The licks detected at runtime, the lick thresholds
+applied during runtime, and the readouts ignored due to the valve artifacts are read from the processed session data.
+
+Example:
+    python lick_tuning.py path/to/session_1/processed path/to/session_2/processed --output lick_tuning.csv
+"""
+
+from pathlib import Path
+import argparse
+
+import numpy as np
+import polars as pl
+from numpy.typing import NDArray
+from data_processing import read_dataframe, build_threshold_array, classify_runtime_licks, get_threshold_schedule
+from microcontroller import ControllerParameters
+from ataraxis_base_utilities import LogLevel, console
+
+# The evaluated candidate thresholds, in 12-bit ADC units. The tool evaluates every combination of these values.
+_SIGNAL_THRESHOLDS = (350, 400, 450, 500, 600, 700)
+_DELTA_THRESHOLDS = (180, 220, 260, 300, 350, 400, 500)
+
+# The maximum delay, in microseconds, between a lick detected at runtime and the matching lick detected from the
+# filtered trace. Stricter filtering can delay the lick onset to a later readout of the same tongue contact.
+_MATCH_TOLERANCE_US = 20000
+
+# The IDs of the lick sensor modules, used to select the runtime lick threshold changes of each sensor.
+_SENSOR_IDS = {"left_lick_sensor": 1, "right_lick_sensor": 2}
+
+# The minimum lick agreement of the recommended candidate. The agreement is the number of matched licks divided by the
+# number of licks detected by either method, so the default only accepts the candidates that detect every runtime lick
+# without producing spurious licks.
+_MINIMUM_AGREEMENT = 1.0
+
+
+def _replay_filter(
+    voltages: NDArray[np.uint16], signal_threshold: int, delta_thresholds: tuple[int, ...]
+) -> tuple[NDArray[np.uint16], NDArray[np.bool_]]:
+    """Replays the readout filter of the LickModule for the input sequence of voltage readouts using the signal
+    threshold and each of the delta thresholds.
+
+    The module pulls the readouts below the signal threshold to 0 and only reports the readouts that differ from the
+    previously reported readout by at least the delta threshold.
+
+    Notes:
+        The comparison to the previously reported readout makes the filter sequential, so it cannot be vectorized.
+        Instead, all delta thresholds are replayed in a single pass over the readouts, and only the readouts that
+        differ from their predecessor are visited. A readout equal to its predecessor is never reported: either the
+        predecessor was reported, so the difference is 0, or it was not, so the difference to the previously reported
+        readout is the same as for the predecessor. This skips the runs of zero readouts produced by the signal
+        threshold.
+
+    Args:
+        voltages: The one-dimensional numpy array that stores the voltage readouts in the order they were received.
+        signal_threshold: The evaluated signal threshold, in ADC units.
+        delta_thresholds: The evaluated delta thresholds, in ADC units.
+
+    Returns:
+        A tuple of two elements. The first element is the array of readouts pulled to 0 below the signal threshold.
+        The second element is the two-dimensional boolean array that marks the reported readouts for each delta
+        threshold, in the order of the input delta thresholds.
+    """
+    signals = np.where(voltages < signal_threshold, 0, voltages).astype(np.uint16)
+
+    # The module starts with the previous readout of 0, so the leading zero readouts are never reported.
+    changes = np.flatnonzero(np.diff(signals, prepend=np.uint16(0)) != 0)
+
+    previous = [0] * len(delta_thresholds)
+    reported_indices: list[list[int]] = [[] for _ in delta_thresholds]
+    for index, signal in zip(changes.tolist(), signals[changes].tolist(), strict=True):
+        for candidate, delta_threshold in enumerate(delta_thresholds):
+            if abs(signal - previous[candidate]) >= delta_threshold:
+                reported_indices[candidate].append(index)
+                previous[candidate] = signal
+
+    reported = np.zeros((len(delta_thresholds), voltages.size), dtype=np.bool_)
+    for candidate, (indices, delta_threshold) in enumerate(zip(reported_indices, delta_thresholds, strict=True)):
+        # With the delta threshold of 0, every readout differs from the previously reported readout by at least 0.
+        reported[candidate, indices if delta_threshold > 0 else slice(None)] = True
+    return signals, reported
+
+
+def _match_licks(reference: NDArray[np.uint64], candidate: NDArray[np.uint64]) -> tuple[int, float]:
+    """Matches the candidate lick onsets to the reference lick onsets.
+
+    Each reference lick is matched to the first candidate lick that occurs at the same time or later, within the match
+    tolerance. Both input arrays have to be sorted.
+
+    Returns:
+        The number of matched licks and the median delay, in microseconds, of the matched candidate licks.
+    """
+    if reference.size == 0 or candidate.size == 0:
+        return 0, 0.0
+    indices = np.searchsorted(candidate, reference, side="left")
+    valid = indices < candidate.size
+    delays = candidate[indices[valid]] - reference[valid]
+    matched = delays <= _MATCH_TOLERANCE_US
+
+    # Each candidate lick can only match one reference lick.
+    matched_indices = np.unique(indices[valid][matched])
+    median_delay = float(np.median(delays[matched])) if matched.any() else 0.0
+    return int(matched_indices.size), median_delay
+
+
+def _load_trace(
+    lick_file: Path, lick_threshold: int | None
+) -> tuple[NDArray[np.uint64], NDArray[np.uint16], NDArray[np.uint16], NDArray[np.bool_], NDArray[np.uint64]]:
+    """Loads the lick sensor trace stored in the input file together with the runtime lick detection context.
+
+    Notes:
+        The lick thresholds applied during runtime are reconstructed from the 'parameter_events' file stored in the
+        same directory. The runtime lick onsets and the readouts ignored due to the valve artifacts are read from the
+        file. The files processed before these columns were stored are classified using the runtime thresholds, and
+        none of their readouts are ignored.
+
+    Args:
+        lick_file: The path to the lick sensor file.
+        lick_threshold: The lick detection threshold used at the onset of the runtime, in ADC units. If not provided,
+            uses the threshold of the calibrated runtime parameters for the sensor.
+
+    Returns:
+        The timestamps and the voltages of the readouts, the runtime lick threshold used for each readout, the mask of
+        the readouts used by the runtime lick detection, and the timestamps of the runtime lick onsets.
+    """
+    name = lick_file.stem
+    if lick_threshold is None:
+        parameters = ControllerParameters.from_calibration()
+        lick_threshold = parameters.right_lick_threshold if name.startswith("right") else parameters.left_lick_threshold
+
+    dataframe = read_dataframe(file=lick_file)
+    timestamps: NDArray[np.uint64] = dataframe["time_us"].to_numpy()
+    voltages: NDArray[np.uint16] = dataframe["voltage_12_bit_adc"].to_numpy()
+
+    # The readouts are stored in the order they were received, which is the order used by the switch indices.
+    schedule: tuple[tuple[int, int], ...] = ()
+    events_file = lick_file.with_name(f"parameter_events{lick_file.suffix}")
+    if name in _SENSOR_IDS and (events_file.exists() or events_file.with_suffix(".parquet").exists()):
+        schedule = get_threshold_schedule(parameter_events=read_dataframe(events_file), module_id=_SENSOR_IDS[name])
+    thresholds = build_threshold_array(
+        readout_count=voltages.size, lick_threshold=lick_threshold, threshold_schedule=schedule
+    )
+
+    valid = np.ones(voltages.shape, dtype=np.bool_)
+    if "valve_artifact" in dataframe.columns:
+        valid = dataframe["valve_artifact"].to_numpy() == 0
+
+    if "lick_onset" in dataframe.columns:
+        onsets = dataframe["lick_onset"].to_numpy() > 0
+    else:
+        onsets = np.zeros(voltages.shape, dtype=np.bool_)
+        onsets[valid] = classify_runtime_licks(voltages=voltages[valid], lick_threshold=thresholds[valid])
+    return timestamps, voltages, thresholds, valid, timestamps[onsets]
+
+
+def tune_lick_thresholds(
+    lick_files: tuple[Path, ...],
+    signal_thresholds: tuple[int, ...] = _SIGNAL_THRESHOLDS,
+    delta_thresholds: tuple[int, ...] = _DELTA_THRESHOLDS,
+    lick_threshold: int | None = None,
+) -> pl.DataFrame:
+    """Replays the voltage traces stored in the input lick sensor files using each combination of the candidate
+    signal and delta thresholds.
+
+    Notes:
+        The logged traces only contain the readouts reported under the runtime thresholds, so the replay is exact for
+        the runtime thresholds and approximates the stricter candidates. The candidates below the runtime thresholds
+        cannot be evaluated and should not be included.
+
+        The licks are detected from each filtered trace using the runtime lick detection logic, the lick thresholds
+        applied during runtime, and the valve artifact suppression. The lick onsets detected at runtime serve as the
+        reference for the agreement.
+
+    Args:
+        lick_files: The paths to the lick sensor files generated by the process_microcontroller_log() function.
+        signal_thresholds: The candidate signal thresholds, in ADC units.
+        delta_thresholds: The candidate delta thresholds, in ADC units.
+        lick_threshold: The lick detection threshold used at the onset of the runtime, in ADC units. If not provided,
+            uses the threshold of the calibrated runtime parameters for each sensor.
+
+    Returns:
+        A Polars DataFrame with one row for each candidate. The table stores the total number of messages the sensors
+        would have sent, the average message rate per sensor, the message rate relative to the runtime message rate,
+        the number of runtime and candidate licks, the number of matched licks, the lick agreement, and the median
+        onset delay of the matched licks.
+    """
+    traces = [_load_trace(lick_file=lick_file, lick_threshold=lick_threshold) for lick_file in lick_files]
+
+    duration = sum(float(trace[0][-1] - trace[0][0]) / 1e6 for trace in traces if trace[0].size > 1)
+    runtime_messages = sum(trace[1].size for trace in traces)
+    reference_licks = sum(trace[4].size for trace in traces)
+
+    # Replays each trace once for each signal threshold, evaluating all delta thresholds in the same pass.
+    candidates = [(signal, delta) for signal in signal_thresholds for delta in delta_thresholds]
+    messages = dict.fromkeys(candidates, 0)
+    candidate_licks = dict.fromkeys(candidates, 0)
+    matched_licks = dict.fromkeys(candidates, 0)
+    delays: dict[tuple[int, int], list[float]] = {candidate: [] for candidate in candidates}
+    for signal_threshold in signal_thresholds:
+        for timestamps, voltages, thresholds, valid, reference in traces:
+            signals, reported = _replay_filter(
+                voltages=voltages, signal_threshold=signal_threshold, delta_thresholds=delta_thresholds
+            )
+            for delta_threshold, delta_reported in zip(delta_thresholds, reported, strict=True):
+                # The runtime lick detection ignores the readouts received during the valve artifact window.
+                detected = delta_reported & valid
+                onsets = classify_runtime_licks(voltages=signals[detected], lick_threshold=thresholds[detected])
+                candidate = timestamps[detected][onsets]
+                matched, delay = _match_licks(reference=reference, candidate=candidate)
+
+                key = (signal_threshold, delta_threshold)
+                messages[key] += int(delta_reported.sum())
+                candidate_licks[key] += candidate.size
+                matched_licks[key] += matched
+                if matched:
+                    delays[key].append(delay)
+
+    rows = []
+    for key in candidates:
+        total_licks = reference_licks + candidate_licks[key] - matched_licks[key]
+        rows.append(
+            {
+                "signal_threshold": key[0],
+                "delta_threshold": key[1],
+                "messages": messages[key],
+                "message_rate": messages[key] / duration if duration > 0 else 0.0,
+                "relative_rate": messages[key] / runtime_messages if runtime_messages > 0 else 0.0,
+                "runtime_licks": reference_licks,
+                "candidate_licks": candidate_licks[key],
+                "matched_licks": matched_licks[key],
+                "agreement": matched_licks[key] / total_licks if total_licks > 0 else 1.0,
+                "median_delay_us": float(np.median(delays[key])) if delays[key] else 0.0,
+            }
+        )
+
+    return pl.DataFrame(rows)
+
+
+def recommend_thresholds(results: pl.DataFrame, minimum_agreement: float = _MINIMUM_AGREEMENT) -> tuple[int, int]:
+    """Selects the recommended signal and delta thresholds from the tuning results.
+
+    Notes:
+        The recommended thresholds are selected from the candidates whose lick agreement is at least the minimum
+        agreement (or the candidates with the highest agreement, if none are). They produce the fewest messages and,
+        among the equally efficient candidates, the shortest lick onset delay and the lowest thresholds.
+
+    Args:
+        results: The tuning results returned by the tune_lick_thresholds() function.
+        minimum_agreement: The minimum lick agreement of the recommended candidate.
+
+    Returns:
+        The recommended signal and delta thresholds, in ADC units.
+    """
+    candidates = results.filter(pl.col("agreement") >= minimum_agreement)
+    if candidates.height == 0:
+        candidates = results.filter(pl.col("agreement") == pl.col("agreement").max())
+    best = candidates.sort("messages", "median_delay_us", "signal_threshold", "delta_threshold").row(0, named=True)
+    return int(best["signal_threshold"]), int(best["delta_threshold"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tunes the signal and delta thresholds of the lick sensors.")
+    parser.add_argument("directories", type=Path, nargs="+", help="The processed session data directories.")
+    parser.add_argument(
+        "--lick-threshold", type=int, default=None, help="The lick detection threshold at runtime onset, in ADC units."
+    )
+    parser.add_argument(
+        "--agreement", type=float, default=_MINIMUM_AGREEMENT, help="The minimum lick agreement to recommend."
+    )
+    parser.add_argument("--output", type=Path, default=None, help="The optional .csv file to save the results to.")
+    arguments = parser.parse_args()
+
+    if not console.enabled:
+        console.enable()
+
+    files = tuple(
+        sorted(
+            path
+            for directory in arguments.directories
+            for path in directory.iterdir()
+            if path.stem.endswith("_lick_sensor") and path.suffix in {".feather", ".parquet"}
+        )
+    )
+    if not files:
+        message = "Unable to tune the lick thresholds, as no lick sensor files were found."
+        console.error(message=message, error=ValueError)
+
+    tuning_results = tune_lick_thresholds(lick_files=files, lick_threshold=arguments.lick_threshold)
+    if arguments.output is not None:
+        tuning_results.write_csv(arguments.output)
+
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        console.echo(message=f"Lick threshold tuning results:\n{tuning_results}", level=LogLevel.SUCCESS)
+
+    recommended_signal, recommended_delta = recommend_thresholds(
+        results=tuning_results, minimum_agreement=arguments.agreement
+    )
+    console.echo(
+        message=(
+            f"Recommended thresholds: signal threshold {recommended_signal}, delta threshold {recommended_delta}. "
+            f"Apply them during runtime via the lick sensor update_parameters() method or update the "
+            f"_LICK_SIGNAL_THRESHOLD and _LICK_DELTA_THRESHOLD constants."
+        ),
+        level=LogLevel.SUCCESS,
+    )
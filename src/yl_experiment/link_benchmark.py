@@ -0,0 +1,558 @@
+"""This module provides the benchmark used to tune the serial link parameters of the AMCInterface.
+
+The benchmark replaces the microcontroller with a simulated stand-in that generates the lick, analog, valve, and
+keepalive messages at the rates expected at runtime. The messages are passed through a model of the serial link and of
+the PC communication process, which is parameterized with the per-message logging time measured on this PC. For each
+evaluated link configuration, the benchmark measures the message latency, the keepalive round-trip latency, and the
+maximum message rate the link sustains without overflowing the microcontroller buffer, and then recommends the
+configuration with the most headroom.
+
+The controller scaling benchmark runs several simulated microcontrollers in parallel processes, each submitting its
+messages to one shared DataLogger, to estimate how many concurrent sessions (arenas) this PC supports.
+
+Example:
+    python link_benchmark.py --duration 10 --output link_benchmark.csv
+    python link_benchmark.py --duration 10 --controllers 8
+"""
+
+from queue import Queue
+from pathlib import Path
+import argparse
+import tempfile
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing import (
+    Queue as MPQueue,
+    Manager,
+    Process,
+)
+
+import numpy as np
+import polars as pl
+from numpy.typing import NDArray
+from ataraxis_time import PrecisionTimer
+from microcontroller import LinkConfiguration, estimate_message_size
+from ataraxis_base_utilities import LogLevel, console
+from ataraxis_data_structures import DataLogger, LogPackage
+
+# The evaluated link parameters. The benchmark evaluates every combination of these values.
+_BAUDRATES = (115200, 460800, 921600)
+_BUFFER_SIZES = (1024, 8192, 32768)
+_KEEPALIVE_INTERVALS = (250, 1000, 5000)
+
+# The message payload sizes, in bytes. Data messages carry the protocol code, the 5-byte module header, and the data
+# object. State messages carry the protocol code and the 4-byte module header. The keepalive command carries the
+# protocol code, the command code and the return code, and the keepalive reply carries the protocol code and the
+# reception code.
+_UINT16_DATA_PAYLOAD = 1 + 5 + 2
+_STATE_PAYLOAD = 1 + 4
+_KEEPALIVE_COMMAND_PAYLOAD = 3
+_KEEPALIVE_REPLY_PAYLOAD = 2
+
+# The time, in seconds, the microcontroller needs to process the keepalive command and queue the reply.
+_CONTROLLER_TURNAROUND = 50e-6
+
+# The duration, in seconds, the valve stays open when dispensing a reward.
+_VALVE_PULSE_DURATION = 0.05
+
+# The 99th percentile latency, in milliseconds, above which the link is considered saturated.
+_LATENCY_LIMIT_MS = 10.0
+
+# The largest load multiplier evaluated when searching for the maximum sustainable message rate.
+_MAXIMUM_LOAD_SCALE = 256.0
+
+# The minimum ratio between the maximum sustainable and the expected message rate for a configuration to be recommended.
+_MINIMUM_HEADROOM = 4.0
+
+# The maximum time, in seconds, the DataLogger may need to save the queued messages after all controllers stop for the
+# evaluated number of controllers to be considered sustainable.
+_MAXIMUM_DRAIN_TIME = 1.0
+
+# The interval, in milliseconds, at which the depth of the DataLogger queue is sampled during the scaling benchmark.
+_QUEUE_SAMPLING_INTERVAL = 10
+
+# The ID of the first simulated microcontroller. Each additional microcontroller uses the next ID.
+_FIRST_CONTROLLER_ID = 111
+
+
+@dataclass(frozen=True)
+class LinkLoad:
+    """Stores the message rates generated by the hardware modules at runtime."""
+
+    lick_message_rate: float = 50.0
+    """The number of messages sent by each lick sensor per second. The sensors are polled at ~1 kHz, but the delta
+    filtering only reports the readouts that differ from the previous readout."""
+    analog_sample_rate: float = 1e6 / 16600
+    """The number of samples acquired by the analog input per second."""
+    analog_batch_size: int = 1
+    """The number of analog samples sent with each message."""
+    valve_event_rate: float = 0.2
+    """The number of rewards dispensed by each valve per second. Each reward generates the valve open and closed
+    messages."""
+
+    @property
+    def message_rate(self) -> float:
+        """Returns the total number of module messages sent per second."""
+        return 2 * self.lick_message_rate + self.analog_sample_rate / self.analog_batch_size + 4 * self.valve_event_rate
+
+
+def measure_processing_time(repetitions: int = 20000) -> float:
+    """Measures the time, in seconds, the communication process spends submitting each received message to the logger.
+
+    Notes:
+        The communication process sends every received message to the DataLogger through the multiprocessing manager
+        queue. This is the most expensive step of processing each message on the PC, so it bounds the message rate the
+        communication process can sustain.
+
+    Args:
+        repetitions: The number of messages to submit to the queue.
+
+    Returns:
+        The mean time, in seconds, needed to submit a single message.
+    """
+    manager = Manager()
+    queue = manager.Queue()
+    data = np.zeros(shape=estimate_message_size(_UINT16_DATA_PAYLOAD), dtype=np.uint8)
+    timer = PrecisionTimer("us")
+    try:
+        timer.reset()
+        for index in range(repetitions):
+            queue.put(LogPackage(source_id=np.uint8(111), acquisition_time=np.uint64(index), serialized_data=data))
+        elapsed = timer.elapsed
+    finally:
+        manager.shutdown()
+    return elapsed / repetitions / 1e6
+
+
+def _generate_messages(
+    configuration: LinkConfiguration, load: LinkLoad, scale: float, duration: float, generator: np.random.Generator
+) -> tuple[NDArray[np.float64], NDArray[np.int64], NDArray[np.bool_]]:
+    """Generates the messages sent by the simulated microcontroller.
+
+    Args:
+        configuration: The evaluated link configuration.
+        load: The expected message rates of the hardware modules.
+        scale: The multiplier applied to all module message rates.
+        duration: The duration of the simulated runtime, in seconds.
+        generator: The random number generator used to generate the message times.
+
+    Returns:
+        A tuple of three arrays sorted by the message time. The first array stores the time each message is queued
+        for transmission, the second array stores the message sizes, and the third array marks the keepalive replies.
+    """
+    times = []
+    sizes = []
+
+    # The lick sensor messages and the valve rewards occur at random times.
+    for _ in range(2):
+        count = generator.poisson(load.lick_message_rate * scale * duration)
+        times.append(generator.uniform(0, duration, count))
+        sizes.append(np.full(count, estimate_message_size(_UINT16_DATA_PAYLOAD)))
+
+        count = generator.poisson(load.valve_event_rate * scale * duration)
+        openings = generator.uniform(0, duration, count)
+        times.extend((openings, openings + _VALVE_PULSE_DURATION))
+        sizes.extend((np.full(count, estimate_message_size(_STATE_PAYLOAD)),) * 2)
+
+    # The analog input messages are sent at a fixed interval.
+    interval = load.analog_batch_size / (load.analog_sample_rate * scale)
+    analog_times = np.arange(generator.uniform(0, interval), duration, interval, dtype=np.float64)
+    times.append(analog_times)
+    analog_payload = _UINT16_DATA_PAYLOAD + 2 * (load.analog_batch_size - 1)
+    sizes.append(np.full(analog_times.size, estimate_message_size(analog_payload)))
+
+    # The keepalive replies are queued after the keepalive command is transmitted to and processed by the controller.
+    command_time = estimate_message_size(_KEEPALIVE_COMMAND_PAYLOAD) / configuration.capacity
+    keepalive_times = np.arange(0, duration, configuration.keepalive_interval / 1000, dtype=np.float64) + command_time
+    times.append(keepalive_times + _CONTROLLER_TURNAROUND)
+    sizes.append(np.full(keepalive_times.size, estimate_message_size(_KEEPALIVE_REPLY_PAYLOAD)))
+    keepalive = np.zeros(sum(array.size for array in times), dtype=np.bool_)
+    keepalive[-keepalive_times.size :] = True
+
+    all_times = np.concatenate(times)
+    order = np.argsort(all_times, kind="stable")
+    return all_times[order], np.concatenate(sizes).astype(np.int64)[order], keepalive[order]
+
+
+def _simulate_link(
+    configuration: LinkConfiguration,
+    load: LinkLoad,
+    *,
+    scale: float,
+    duration: float,
+    processing_time: float,
+    seed: int,
+) -> tuple[float, float, bool, float]:
+    """Simulates the transmission and the processing of the messages sent by the microcontroller.
+
+    Notes:
+        The messages are transmitted one at a time at the nominal link capacity and are then processed one at a time
+        by the PC communication process. If the bytes waiting to be transmitted or processed exceed the
+        microcontroller buffer size, the buffer overflows and the simulation ends early.
+
+    Returns:
+        A tuple of four elements: the 99th percentile message latency, in milliseconds, the 99th percentile keepalive
+        round-trip latency, in milliseconds, whether the buffer overflowed, and the fraction of the link capacity used
+        by the messages.
+    """
+    times, sizes, keepalive = _generate_messages(
+        configuration=configuration,
+        load=load,
+        scale=scale,
+        duration=duration,
+        generator=np.random.default_rng(seed),
+    )
+    transmission_times = sizes / configuration.capacity
+    latencies: NDArray[np.float64] = np.zeros(times.size, dtype=np.float64)
+    pending: deque[tuple[float, int]] = deque()
+    pending_bytes = 0
+    link_free = 0.0
+    processing_free = 0.0
+    overflow = False
+    for index in range(times.size):
+        time = times[index]
+
+        # Releases the messages processed by the PC before the current message is queued.
+        while pending and pending[0][0] <= time:
+            pending_bytes -= pending.popleft()[1]
+        pending_bytes += sizes[index]
+        if pending_bytes > configuration.buffer_size:
+            overflow = True
+            latencies = latencies[:index]
+            keepalive = keepalive[:index]
+            break
+
+        link_free = max(time, link_free) + transmission_times[index]
+        processing_free = max(link_free, processing_free) + processing_time
+        pending.append((processing_free, sizes[index]))
+        latencies[index] = processing_free - time
+
+    command_time = estimate_message_size(_KEEPALIVE_COMMAND_PAYLOAD) / configuration.capacity
+    round_trips = latencies[keepalive] + command_time + _CONTROLLER_TURNAROUND
+    return (
+        float(np.percentile(latencies, 99)) * 1000 if latencies.size else 0.0,
+        float(np.percentile(round_trips, 99)) * 1000 if round_trips.size else 0.0,
+        overflow,
+        float(sizes.sum() / (duration * configuration.capacity)),
+    )
+
+
+def _find_maximum_scale(
+    configuration: LinkConfiguration, load: LinkLoad, duration: float, processing_time: float, seed: int
+) -> float:
+    """Finds the largest multiplier of the expected message rates that the link sustains without saturating."""
+
+    def is_sustained(scale: float) -> bool:
+        latency, _, overflow, _ = _simulate_link(
+            configuration, load, scale=scale, duration=duration, processing_time=processing_time, seed=seed
+        )
+        return not overflow and latency <= _LATENCY_LIMIT_MS
+
+    # Doubles the load until the link saturates and then narrows down the saturation point by bisection.
+    lower = 0.0
+    upper = 1.0
+    while upper <= _MAXIMUM_LOAD_SCALE and is_sustained(upper):
+        lower = upper
+        upper *= 2
+    if upper > _MAXIMUM_LOAD_SCALE:
+        return lower
+
+    for _ in range(6):
+        middle = (lower + upper) / 2
+        if is_sustained(middle):
+            lower = middle
+        else:
+            upper = middle
+    return lower
+
+
+def benchmark_link(
+    load: LinkLoad | None = None, duration: float = 10.0, processing_time: float | None = None, seed: int = 0
+) -> pl.DataFrame:
+    """Evaluates all combinations of the benchmarked link parameters under the simulated runtime load.
+
+    Args:
+        load: The expected message rates of the hardware modules. If not provided, uses the rates of the default
+            acquisition runtime.
+        duration: The duration, in seconds, of each simulated runtime.
+        processing_time: The time, in seconds, the PC needs to process each message. If not provided, it is measured
+            on this PC.
+        seed: The seed of the random number generator used to generate the message times.
+
+    Returns:
+        A Polars DataFrame with one row for each evaluated configuration. The table stores the link parameters, the
+        link utilization, the 99th percentile message and keepalive round-trip latencies at the expected load, and the
+        maximum sustainable message rate with its ratio to the expected message rate (headroom).
+    """
+    if load is None:
+        load = LinkLoad()
+    if processing_time is None:
+        processing_time = measure_processing_time()
+        console.echo(
+            message=f"The communication process needs {processing_time * 1e6:.1f} us to log each message.",
+            level=LogLevel.INFO,
+        )
+
+    rows = []
+    for baudrate in _BAUDRATES:
+        for buffer_size in _BUFFER_SIZES:
+            for keepalive_interval in _KEEPALIVE_INTERVALS:
+                configuration = LinkConfiguration(
+                    baudrate=baudrate, buffer_size=buffer_size, keepalive_interval=keepalive_interval
+                )
+                latency, round_trip, overflow, utilization = _simulate_link(
+                    configuration, load, scale=1.0, duration=duration, processing_time=processing_time, seed=seed
+                )
+                scale = 0.0 if overflow else _find_maximum_scale(configuration, load, duration, processing_time, seed)
+                rows.append(
+                    {
+                        "baudrate": baudrate,
+                        "buffer_size": buffer_size,
+                        "keepalive_interval": keepalive_interval,
+                        "utilization": round(utilization, 4),
+                        "latency_p99_ms": round(latency, 3),
+                        "round_trip_p99_ms": round(round_trip, 3),
+                        "maximum_message_rate": round(scale * load.message_rate, 1),
+                        "headroom": round(scale, 2),
+                    }
+                )
+
+    return pl.DataFrame(rows)
+
+
+def _produce_messages(
+    logger_queue: Queue,  # type: ignore[type-arg]
+    result_queue: MPQueue,  # type: ignore[type-arg]
+    *,
+    controller_id: int,
+    load: LinkLoad,
+    duration: float,
+    seed: int,
+) -> None:
+    """Submits the messages of a single simulated microcontroller to the DataLogger at the times they are received.
+
+    This function is the target of the producer processes used by the controller scaling benchmark. Each message is
+    submitted once its reception time passes, and the delay between the reception time and the moment the submission
+    completes is reported as the message lateness.
+
+    Args:
+        logger_queue: The input queue of the shared DataLogger.
+        result_queue: The queue used to send the lateness of all messages, in milliseconds, to the benchmark process.
+        controller_id: The ID of the simulated microcontroller, used as the source ID of the logged messages.
+        load: The expected message rates of the hardware modules.
+        duration: The duration of the simulated runtime, in seconds.
+        seed: The seed of the random number generator used to generate the message times.
+    """
+    times, sizes, _ = _generate_messages(
+        configuration=LinkConfiguration(),
+        load=load,
+        scale=1.0,
+        duration=duration,
+        generator=np.random.default_rng(seed),
+    )
+    times_us = (times * 1e6).astype(np.uint64)
+    payloads = {int(size): np.zeros(shape=int(size), dtype=np.uint8) for size in np.unique(sizes)}
+    source_id = np.uint8(controller_id)
+    lateness = np.zeros(times.size, dtype=np.float64)
+
+    timer = PrecisionTimer("us")
+    timer.reset()
+    for index in range(times.size):
+        remaining = int(times_us[index]) - timer.elapsed
+        if remaining > 0:
+            timer.delay(delay=remaining, allow_sleep=True, block=False)
+        logger_queue.put(
+            LogPackage(
+                source_id=source_id, acquisition_time=times_us[index], serialized_data=payloads[int(sizes[index])]
+            )
+        )
+        lateness[index] = (timer.elapsed - int(times_us[index])) / 1000
+
+    result_queue.put(lateness)
+
+
+def benchmark_controller_scaling(
+    maximum_controllers: int = 8, load: LinkLoad | None = None, duration: float = 10.0, seed: int = 0
+) -> pl.DataFrame:
+    """Evaluates how the shared DataLogger copes with an increasing number of concurrently running microcontrollers.
+
+    Notes:
+        Each simulated microcontroller runs in its own process, like the communication process of each AMCInterface,
+        and submits its messages to one shared DataLogger. The evaluated number of controllers is sustainable if the
+        99th percentile message lateness stays below 10 ms and the DataLogger saves all queued messages within 1 second
+        after the controllers stop.
+
+    Args:
+        maximum_controllers: The largest number of concurrently running microcontrollers to evaluate.
+        load: The expected message rates of the hardware modules of each microcontroller. If not provided, uses the
+            rates of the default acquisition runtime.
+        duration: The duration, in seconds, of each simulated runtime.
+        seed: The seed of the random number generator used to generate the message times.
+
+    Returns:
+        A Polars DataFrame with one row for each evaluated number of controllers. The table stores the total message
+        rate, the 99th percentile and the maximum message lateness, the maximum depth of the DataLogger queue, the time
+        needed to save the queued messages after the controllers stop, and whether the load is sustainable.
+    """
+    if load is None:
+        load = LinkLoad()
+
+    rows = []
+    timer = PrecisionTimer("ms")
+    for controllers in range(1, maximum_controllers + 1):
+        with tempfile.TemporaryDirectory() as directory:
+            logger = DataLogger(output_directory=Path(directory), instance_name="scaling_benchmark")
+            logger.start()
+            result_queue: MPQueue = MPQueue()  # type: ignore[type-arg]
+            producers = [
+                Process(
+                    target=_produce_messages,
+                    args=(logger.input_queue, result_queue),
+                    kwargs={
+                        "controller_id": _FIRST_CONTROLLER_ID + index,
+                        "load": load,
+                        "duration": duration,
+                        "seed": seed + index,
+                    },
+                    daemon=True,
+                )
+                for index in range(controllers)
+            ]
+            for producer in producers:
+                producer.start()
+
+            # Samples the logger queue depth until all producers report their results.
+            results: list[NDArray[np.float64]] = []
+            maximum_depth = 0
+            while len(results) < controllers:
+                maximum_depth = max(maximum_depth, logger.input_queue.qsize())
+                while not result_queue.empty():
+                    results.append(result_queue.get())
+                timer.delay(delay=_QUEUE_SAMPLING_INTERVAL, allow_sleep=True, block=False)
+            for producer in producers:
+                producer.join()
+
+            timer.reset()
+            while not logger.input_queue.empty():
+                timer.delay(delay=1, allow_sleep=True, block=False)
+            drain_time = timer.elapsed / 1000
+            logger.stop()
+
+        lateness = np.concatenate(results)
+        latency = float(np.percentile(lateness, 99))
+        rows.append(
+            {
+                "controllers": controllers,
+                "message_rate": round(controllers * load.message_rate, 1),
+                "lateness_p99_ms": round(latency, 3),
+                "lateness_max_ms": round(float(lateness.max()), 3),
+                "maximum_queue_depth": maximum_depth,
+                "drain_time_s": round(drain_time, 3),
+                "sustained": latency <= _LATENCY_LIMIT_MS and drain_time <= _MAXIMUM_DRAIN_TIME,
+            }
+        )
+        console.echo(
+            message=(
+                f"Evaluated {controllers} controllers: p99 lateness {latency:.3f} ms, maximum queue depth "
+                f"{maximum_depth}, drain time {drain_time:.3f} s."
+            ),
+            level=LogLevel.INFO,
+        )
+
+    return pl.DataFrame(rows)
+
+
+def recommend_sessions_per_pc(results: pl.DataFrame) -> int:
+    """Returns the largest number of concurrent sessions (microcontrollers) this PC sustains.
+
+    Notes:
+        The number of sessions is limited to the largest evaluated number of controllers for which all smaller numbers
+        of controllers are also sustained. A return value of 0 means that even a single controller is not sustained.
+
+    Args:
+        results: The benchmark results returned by the benchmark_controller_scaling() function.
+    """
+    sessions = 0
+    for row in results.sort("controllers").iter_rows(named=True):
+        if not row["sustained"]:
+            break
+        sessions = row["controllers"]
+    return sessions
+
+
+def recommend_configuration(results: pl.DataFrame) -> LinkConfiguration:
+    """Selects the recommended link configuration from the benchmark results.
+
+    Notes:
+        The recommended configuration is selected from the configurations that sustain at least 4 times the expected
+        message rate (or all configurations, if none do). It has the lowest keepalive round-trip latency and, among the
+        equally fast configurations, the shortest keepalive interval and the smallest buffer.
+
+    Args:
+        results: The benchmark results returned by the benchmark_link() function.
+
+    Returns:
+        The recommended link configuration.
+    """
+    candidates = results.filter(pl.col("headroom") >= _MINIMUM_HEADROOM)
+    if candidates.height == 0:
+        candidates = results.filter(pl.col("headroom") == pl.col("headroom").max())
+    best = candidates.sort("round_trip_p99_ms", "keepalive_interval", "buffer_size").row(0, named=True)
+    return LinkConfiguration(
+        baudrate=best["baudrate"], buffer_size=best["buffer_size"], keepalive_interval=best["keepalive_interval"]
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the serial link configurations of the AMCInterface.")
+    parser.add_argument("--duration", type=float, default=10.0, help="The duration of each simulated runtime, in s.")
+    parser.add_argument("--lick-rate", type=float, default=50.0, help="The messages per second of each lick sensor.")
+    parser.add_argument("--analog-rate", type=float, default=1e6 / 16600, help="The analog samples per second.")
+    parser.add_argument("--analog-batch", type=int, default=1, help="The number of analog samples per message.")
+    parser.add_argument("--output", type=Path, default=None, help="The optional .csv file to save the results to.")
+    parser.add_argument(
+        "--controllers",
+        type=int,
+        default=None,
+        help="If provided, runs the controller scaling benchmark for up to this many concurrent controllers instead.",
+    )
+    arguments = parser.parse_args()
+
+    if not console.enabled:
+        console.enable()
+
+    runtime_load = LinkLoad(
+        lick_message_rate=arguments.lick_rate,
+        analog_sample_rate=arguments.analog_rate,
+        analog_batch_size=arguments.analog_batch,
+    )
+    if arguments.controllers is not None:
+        scaling_results = benchmark_controller_scaling(
+            maximum_controllers=arguments.controllers, load=runtime_load, duration=arguments.duration
+        )
+        if arguments.output is not None:
+            scaling_results.write_csv(arguments.output)
+        with pl.Config(tbl_rows=-1, tbl_cols=-1):
+            console.echo(message=f"Controller scaling benchmark results:\n{scaling_results}", level=LogLevel.SUCCESS)
+        console.echo(
+            message=f"This PC sustains {recommend_sessions_per_pc(scaling_results)} concurrent sessions.",
+            level=LogLevel.SUCCESS,
+        )
+        raise SystemExit(0)
+
+    benchmark_results = benchmark_link(load=runtime_load, duration=arguments.duration)
+    if arguments.output is not None:
+        benchmark_results.write_csv(arguments.output)
+
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        console.echo(message=f"Serial link benchmark results:\n{benchmark_results}", level=LogLevel.SUCCESS)
+
+    recommended = recommend_configuration(benchmark_results)
+    console.echo(
+        message=(
+            f"Recommended configuration: baudrate {recommended.baudrate}, buffer size {recommended.buffer_size} bytes, "
+            f"keepalive interval {recommended.keepalive_interval} ms. Pass it to the AMCInterface as the "
+            f"link_configuration argument."
+        ),
+        level=LogLevel.SUCCESS,
+    )
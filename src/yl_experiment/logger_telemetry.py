@@ -0,0 +1,396 @@
+"""This module provides the monitor that tracks the throughput and the backpressure of the DataLogger during the
+acquisition session.
+
+The monitor runs in a separate process that samples the depth of the DataLogger input queue and scans the log entries
+written to the DataLogger output directory at a low rate. The most recent sample is published via a SharedMemoryArray,
+so it can be read by the session script at any time, and all samples are saved next to the DataLogger output directory
+and summarized when the monitor is stopped. A growing backlog or write latency indicates that the disk does not keep
+up with the data sources, which is reported before the buffered data is lost.
+
+The DataLogger process moves the entries from its input queue to an unbounded thread pool as soon as they arrive, so
+the input queue stays nearly empty even when the disk falls behind. The monitor therefore estimates the number of
+entries waiting to be written from the write latency and the entry rate of each source.
+"""
+
+import os
+from enum import IntEnum
+import time
+from pathlib import Path
+from multiprocessing import (
+    Queue as MPQueue,
+    Process,
+)
+
+import numpy as np
+import polars as pl
+from ataraxis_time import PrecisionTimer
+from ataraxis_base_utilities import LogLevel, console
+from ataraxis_data_structures import DataLogger, SharedMemoryArray
+
+# The IDs of the sources that log data during the acquisition session: the microcontroller (111) and the left (101),
+# top (102), and right (103) camera VideoSystem instances.
+_SOURCE_IDS = (111, 101, 102, 103)
+
+# The interval, in milliseconds, at which the depth of the DataLogger input queue is sampled. Sampling the queue is
+# cheap, so it is sampled more frequently than the output directory to capture short bursts of backpressure.
+_QUEUE_INTERVAL_MS = 250
+
+# The minimum interval, in milliseconds, at which the DataLogger output directory is scanned. Listing the directory
+# requires enumerating all entries written since the start of the session, so the interval is also extended to keep the
+# time spent scanning below 1 / _SCAN_INTERVAL_FACTOR of the session time as the directory grows.
+_SCAN_INTERVAL_MS = 5000
+_SCAN_INTERVAL_FACTOR = 100
+
+# The span of acquisition time, in microseconds, below the newest counted entry of each source within which the entries
+# written out of acquisition order by the logger threads are still counted.
+_REORDER_WINDOW_US = 10_000_000
+
+# The backlog and the write latency above which the monitor warns that the logger does not keep up with the sources.
+_BACKLOG_WARNING = 1000
+_LATENCY_WARNING_MS = 1000.0
+
+# The length of the log entry file names: 3-digit source ID, '_', 20-digit acquisition time, and '.npy'.
+_ENTRY_NAME_LENGTH = 28
+
+
+class _TelemetryFields(IntEnum):
+    """Defines the indices of the telemetry values stored in the SharedMemoryArray.
+
+    The entry rates of the individual sources are stored after the last field, in the order of the monitored source IDs.
+    """
+
+    TERMINATOR = 0
+    QUEUE_DEPTH = 1
+    MAXIMUM_QUEUE_DEPTH = 2
+    PENDING_ENTRIES = 3
+    ENTRIES_PER_SECOND = 4
+    BYTES_PER_SECOND = 5
+    WORST_LATENCY_MS = 6
+    SOURCE_RATES = 7
+
+
+class _LogScanner:
+    """Scans the DataLogger output directory and counts the log entries written since the previous scan.
+
+    Notes:
+        The scanner does not recount the directory. Instead, it only counts the entries acquired after the newest
+        entry counted by the previous scan, and the entries written out of acquisition order by the logger threads
+        within the reorder window below that entry. Only the newly counted entries are inspected, which limits the
+        number of file metadata queries to the entries written during the scan interval. The write latency of each
+        inspected entry is the difference between its modification time and its acquisition time, which is resolved
+        using the UTC onset timestamp logged by each source at the beginning of the session.
+
+    Args:
+        log_directory: The path to the DataLogger output directory.
+        source_ids: The IDs of the monitored log sources.
+
+    Attributes:
+        _log_directory: Stores the path to the DataLogger output directory.
+        _onsets: Stores the UTC onset timestamp, in microseconds, of each source whose onset entry was read.
+        _latest: Stores the acquisition time of the newest counted entry for each source.
+        _recent: Stores the names of the counted entries that fall within the reorder window of each source.
+        _entry_sizes: Stores the mean size, in bytes, of the inspected entries for each source.
+    """
+
+    def __init__(self, log_directory: Path, source_ids: tuple[int, ...]) -> None:
+        self._log_directory: Path = log_directory
+        self._onsets: dict[int, int] = {}
+        self._latest: dict[int, int] = dict.fromkeys(source_ids, -1)
+        self._recent: set[str] = set()
+        self._entry_sizes: dict[int, float] = dict.fromkeys(source_ids, 0.0)
+
+    def _read_onset(self, source_id: int, path: str) -> None:
+        """Reads the UTC onset timestamp of the source from its onset log entry.
+
+        The onset entry stores the source ID (1 byte), the acquisition time (8 bytes), and the onset UTC timestamp, in
+        microseconds (8 bytes). Entries that are still being written are skipped and read during the next scan.
+        """
+        try:
+            data = np.load(path, allow_pickle=False)
+            self._onsets[source_id] = int(data[9:17].view(np.uint64)[0])
+        except (OSError, ValueError, IndexError):
+            return
+
+    def scan(self) -> tuple[dict[int, int], float, float, dict[int, float]]:
+        """Scans the output directory for the log entries written since the previous scan.
+
+        Returns:
+            A tuple of four elements. The first element is a dictionary that maps each source ID to the number of new
+            entries. The second element is the estimated number of bytes written since the previous scan. The third
+            element is the worst write latency of the inspected entries, in milliseconds. The fourth element is a
+            dictionary that maps each source ID to the mean write latency of its inspected entries, in milliseconds.
+        """
+        new_entries = dict.fromkeys(self._latest, 0)
+        latest = dict(self._latest)
+        sizes: dict[int, list[int]] = {source_id: [] for source_id in self._latest}
+        latencies: dict[int, list[float]] = {source_id: [] for source_id in self._latest}
+        with os.scandir(self._log_directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if len(name) != _ENTRY_NAME_LENGTH or not name.endswith(".npy"):
+                    continue
+                source_id = int(name[:3])
+                if source_id not in new_entries:
+                    continue
+
+                # The onset entry may still be written during the scan that counts it, so it is read until it succeeds.
+                acquisition_time = int(name[4:24])
+                if acquisition_time == 0 and source_id not in self._onsets:
+                    self._read_onset(source_id=source_id, path=entry.path)
+
+                # Skips the entries counted by the previous scans.
+                if acquisition_time <= self._latest[source_id] and (
+                    acquisition_time <= self._latest[source_id] - _REORDER_WINDOW_US or name in self._recent
+                ):
+                    continue
+                new_entries[source_id] += 1
+                self._recent.add(name)
+                latest[source_id] = max(latest[source_id], acquisition_time)
+
+                stat = entry.stat()
+                sizes[source_id].append(stat.st_size)
+                if acquisition_time != 0 and source_id in self._onsets:
+                    latency = (stat.st_mtime_ns // 1000 - self._onsets[source_id] - acquisition_time) / 1000
+                    latencies[source_id].append(latency)
+
+        # Forgets the counted entries that fall out of the reorder window.
+        self._latest = latest
+        self._recent = {name for name in self._recent if int(name[4:24]) > latest[int(name[:3])] - _REORDER_WINDOW_US}
+
+        new_bytes = 0.0
+        mean_latencies: dict[int, float] = {}
+        for source_id, count in new_entries.items():
+            if sizes[source_id]:
+                self._entry_sizes[source_id] = float(np.mean(sizes[source_id]))
+            new_bytes += count * self._entry_sizes[source_id]
+            mean_latencies[source_id] = float(np.mean(latencies[source_id])) if latencies[source_id] else 0.0
+
+        worst_latency = max((max(values) for values in latencies.values() if values), default=0.0)
+        return new_entries, new_bytes, worst_latency, mean_latencies
+
+
+def _monitor_cycle(
+    telemetry_array: SharedMemoryArray,
+    input_queue: MPQueue,  # type: ignore[type-arg]
+    log_directory: Path,
+    *,
+    source_ids: tuple[int, ...],
+    output_file: Path,
+    echo_warnings: bool,
+) -> None:
+    """Samples the DataLogger telemetry until the monitor is stopped and saves all samples to the output file.
+
+    This function is the target for the telemetry monitor process.
+
+    Args:
+        telemetry_array: The SharedMemoryArray used to publish the most recent telemetry sample.
+        input_queue: The DataLogger input queue.
+        log_directory: The path to the DataLogger output directory.
+        source_ids: The IDs of the monitored log sources.
+        output_file: The path to the .feather file used to save all telemetry samples.
+        echo_warnings: Determines whether to print the warnings issued when the logger falls behind the sources.
+    """
+    if echo_warnings and not console.enabled:
+        console.enable()
+
+    telemetry_array.connect()
+    scanner = _LogScanner(log_directory=log_directory, source_ids=source_ids)
+    session_timer = PrecisionTimer("ms")
+    queue_timer = PrecisionTimer("ms")
+    scan_timer = PrecisionTimer("ms")
+    samples: list[dict[str, float]] = []
+    interval_depth = 0
+    worst_latency = 0.0
+    scan_interval = float(_SCAN_INTERVAL_MS)
+    behind = False
+
+    try:
+        while not telemetry_array[_TelemetryFields.TERMINATOR]:
+            queue_timer.delay(delay=_QUEUE_INTERVAL_MS, allow_sleep=True, block=False)
+            queue_timer.reset()
+
+            depth = input_queue.qsize()
+            interval_depth = max(interval_depth, depth)
+            telemetry_array[_TelemetryFields.QUEUE_DEPTH] = depth
+            telemetry_array[_TelemetryFields.MAXIMUM_QUEUE_DEPTH] = max(
+                telemetry_array[_TelemetryFields.MAXIMUM_QUEUE_DEPTH], depth
+            )
+
+            if scan_timer.elapsed < scan_interval:
+                continue
+            elapsed_s = scan_timer.elapsed / 1000
+            scan_timer.reset()
+
+            scan_start = time.perf_counter()
+            new_entries, new_bytes, latency, mean_latencies = scanner.scan()
+            scan_interval = max(_SCAN_INTERVAL_MS, (time.perf_counter() - scan_start) * 1000 * _SCAN_INTERVAL_FACTOR)
+            worst_latency = max(worst_latency, latency)
+
+            # The entries of each source written with the mean latency L were handed to the logger L milliseconds
+            # earlier, so approximately rate * L entries of the source are waiting to be written at any time.
+            pending = sum(
+                new_entries[source_id] / elapsed_s * mean_latencies[source_id] / 1000 for source_id in source_ids
+            )
+            sample = {
+                "time_s": session_timer.elapsed / 1000,
+                "maximum_queue_depth": float(interval_depth),
+                "pending_entries": pending,
+                "entries_per_second": sum(new_entries.values()) / elapsed_s,
+                "bytes_per_second": new_bytes / elapsed_s,
+                "worst_latency_ms": latency,
+            }
+            for source_id in source_ids:
+                sample[f"source_{source_id}_entries_per_second"] = new_entries[source_id] / elapsed_s
+            samples.append(sample)
+
+            telemetry_array[_TelemetryFields.PENDING_ENTRIES] = pending
+            telemetry_array[_TelemetryFields.ENTRIES_PER_SECOND] = sample["entries_per_second"]
+            telemetry_array[_TelemetryFields.BYTES_PER_SECOND] = sample["bytes_per_second"]
+            telemetry_array[_TelemetryFields.WORST_LATENCY_MS] = worst_latency
+            for index, source_id in enumerate(source_ids, start=_TelemetryFields.SOURCE_RATES):
+                telemetry_array[index] = sample[f"source_{source_id}_entries_per_second"]
+
+            # Warns once each time the logger starts falling behind the sources.
+            backlog = interval_depth + pending
+            is_behind = backlog > _BACKLOG_WARNING or latency > _LATENCY_WARNING_MS
+            if is_behind and not behind:
+                console.echo(
+                    message=(
+                        f"The DataLogger does not keep up with the data sources: about {backlog:.0f} entries are "
+                        f"waiting to be written and the write latency reached {latency:.0f} ms."
+                    ),
+                    level=LogLevel.WARNING,
+                )
+            behind = is_behind
+            interval_depth = 0
+    finally:
+        telemetry_array.disconnect()
+        if samples:
+            pl.DataFrame(samples).write_ipc(file=output_file, compression="uncompressed")
+
+
+class LoggerTelemetry:
+    """Monitors the throughput and the backpressure of the DataLogger during the acquisition session.
+
+    Notes:
+        The monitor has to be started after the DataLogger is started and stopped before the DataLogger is stopped.
+        All samples are saved to the <logger name>_logger_telemetry.feather file next to the DataLogger output
+        directory.
+
+    Args:
+        data_logger: The DataLogger instance to monitor.
+        source_ids: The IDs of the monitored log sources.
+
+    Attributes:
+        _data_logger: Stores the monitored DataLogger instance.
+        _source_ids: Stores the IDs of the monitored log sources.
+        _output_file: Stores the path to the .feather file that stores all telemetry samples.
+        _telemetry_array: Stores the SharedMemoryArray that publishes the most recent telemetry sample.
+        _monitor_process: Stores the process that samples the telemetry.
+    """
+
+    def __init__(self, data_logger: DataLogger, source_ids: tuple[int, ...] = _SOURCE_IDS) -> None:
+        self._data_logger: DataLogger = data_logger
+        self._source_ids: tuple[int, ...] = source_ids
+        self._output_file: Path = data_logger.output_directory.with_name(f"{data_logger.name}_logger_telemetry.feather")
+        self._telemetry_array: SharedMemoryArray = SharedMemoryArray.create_array(
+            name=f"{data_logger.name}_logger_telemetry",
+            prototype=np.zeros(shape=_TelemetryFields.SOURCE_RATES + len(source_ids), dtype=np.float64),
+            exists_ok=True,
+        )
+        self._monitor_process: Process | None = None
+
+    def __del__(self) -> None:
+        """Ensures the telemetry array is properly cleaned up when the class is garbage-collected."""
+        self._telemetry_array.disconnect()
+        self._telemetry_array.destroy()
+
+    def start(self) -> None:
+        """Starts the process that samples the DataLogger telemetry."""
+        if self._monitor_process is not None:
+            return
+
+        self._monitor_process = Process(
+            target=_monitor_cycle,
+            args=(self._telemetry_array, self._data_logger.input_queue, self._data_logger.output_directory),
+            kwargs={
+                "source_ids": self._source_ids,
+                "output_file": self._output_file,
+                "echo_warnings": console.enabled,
+            },
+            daemon=True,
+        )
+        self._monitor_process.start()
+        self._telemetry_array.connect()
+
+    def stop(self) -> dict[str, float]:
+        """Stops the telemetry process and prints the summary of the DataLogger performance during the session.
+
+        Returns:
+            A dictionary that stores the session summary: the mean and the peak entry and byte rates, the mean entry
+            rate of each source, the maximum input queue depth, the maximum estimated backlog, and the worst write
+            latency.
+        """
+        if self._monitor_process is None:
+            return {}
+
+        self._telemetry_array[_TelemetryFields.TERMINATOR] = 1
+        self._monitor_process.join()
+        self._monitor_process = None
+        self._telemetry_array.disconnect()
+
+        if not self._output_file.exists():
+            console.echo(message="No DataLogger telemetry was collected during the session.", level=LogLevel.WARNING)
+            return {}
+
+        samples = pl.read_ipc(source=self._output_file, memory_map=False)
+        entry_rates = samples["entries_per_second"].to_numpy()
+        byte_rates = samples["bytes_per_second"].to_numpy()
+        summary = {
+            "mean_entries_per_second": float(np.mean(entry_rates)),
+            "peak_entries_per_second": float(np.max(entry_rates)),
+            "mean_bytes_per_second": float(np.mean(byte_rates)),
+            "peak_bytes_per_second": float(np.max(byte_rates)),
+            "maximum_queue_depth": float(np.max(samples["maximum_queue_depth"].to_numpy())),
+            "maximum_pending_entries": float(np.max(samples["pending_entries"].to_numpy())),
+            "worst_latency_ms": float(np.max(samples["worst_latency_ms"].to_numpy())),
+        }
+        for source_id in self._source_ids:
+            source_rates = samples[f"source_{source_id}_entries_per_second"].to_numpy()
+            summary[f"source_{source_id}_entries_per_second"] = float(np.mean(source_rates))
+
+        rates = ", ".join(
+            f"{source_id}: {summary[f'source_{source_id}_entries_per_second']:.1f}" for source_id in self._source_ids
+        )
+        console.echo(
+            message=(
+                f"DataLogger telemetry: {summary['mean_entries_per_second']:.1f} entries / second on average "
+                f"(peak {summary['peak_entries_per_second']:.1f}), {summary['mean_bytes_per_second'] / 1e6:.2f} MB / "
+                f"second on average (peak {summary['peak_bytes_per_second'] / 1e6:.2f}), maximum queue depth "
+                f"{summary['maximum_queue_depth']:.0f}, maximum backlog {summary['maximum_pending_entries']:.0f} "
+                f"entries, worst write latency {summary['worst_latency_ms']:.0f} ms. Entries / second by source: "
+                f"{rates}."
+            ),
+            level=LogLevel.INFO,
+        )
+        return summary
+
+    @property
+    def snapshot(self) -> dict[str, float]:
+        """Returns the most recent telemetry sample published by the monitor process."""
+        snapshot = {
+            "queue_depth": float(self._telemetry_array[_TelemetryFields.QUEUE_DEPTH]),
+            "maximum_queue_depth": float(self._telemetry_array[_TelemetryFields.MAXIMUM_QUEUE_DEPTH]),
+            "pending_entries": float(self._telemetry_array[_TelemetryFields.PENDING_ENTRIES]),
+            "entries_per_second": float(self._telemetry_array[_TelemetryFields.ENTRIES_PER_SECOND]),
+            "bytes_per_second": float(self._telemetry_array[_TelemetryFields.BYTES_PER_SECOND]),
+            "worst_latency_ms": float(self._telemetry_array[_TelemetryFields.WORST_LATENCY_MS]),
+        }
+        for index, source_id in enumerate(self._source_ids, start=_TelemetryFields.SOURCE_RATES):
+            snapshot[f"source_{source_id}_entries_per_second"] = float(self._telemetry_array[index])
+        return snapshot
+
+    @property
+    def shared_memory_names(self) -> tuple[str, ...]:
+        """Returns the names of all shared memory buffers created by the monitor."""
+        return (self._telemetry_array.name,)
@@ -3,18 +3,27 @@ from datetime import datetime
 
 import numpy as np
 import keyboard
+from dashboard import WebDashboard
+from task_logic import TASK_METADATA_SECTION, AlternationTask
 from visualizers import BehaviorVisualizer
-from ataraxis_time import PrecisionTimer
+from ataraxis_time import PrecisionTimer, TimestampFormats, get_timestamp
 from binding_classes import VideoSystems
 from data_processing import process_microcontroller_log
 from microcontroller import AMCInterface
+from logger_telemetry import LoggerTelemetry
+from session_transfer import STAGING_ROOT, start_transfer, get_staging_directory
+from process_placement import ProcessPlacement, SessionProcesses, update_session_metadata
+from session_resources import ResourceRegistry
 from ataraxis_base_utilities import LogLevel, console, ensure_directory_exists
 from ataraxis_data_structures import DataLogger, assemble_log_archives
 
 REWARD_VOLUME = np.float64(10)  # 10uL
 EXPERIMENT_DIR = Path(
     "C:\\Users\\yapici\\Dropbox\\Research_projects\\dopamine\\mazes\\linear_track\\10_percent_sucrose\\2026Mar_DAT_sated\\raw_data"
-    )
+)
+USE_STAGING = False  # Acquires the data to the local staging directory first to keep the Dropbox client idle.
+PROCESS_PLACEMENT = ProcessPlacement()  # Reserves cores for the communication and logger processes.
+USE_DASHBOARD = False  # Streams the runtime data to the web dashboard instead of the matplotlib window.
 
 
 def run_experiment() -> None:
@@ -28,17 +37,32 @@ def run_experiment() -> None:
     if not console.enabled:
         console.enable()
 
-    data_logger = DataLogger(output_directory=output_dir, instance_name="linear_track")
-    mc = AMCInterface(data_logger=data_logger)
-    vs = VideoSystems(data_logger=data_logger, output_directory=output_dir)
-    visualizer = BehaviorVisualizer()
+    # Records the session resources as soon as they are created, so they can be released after a crash
+    registry = ResourceRegistry()
+    processes = SessionProcesses(on_update=registry.register_processes)  # Identifies the processes of each component
+    with processes.track("logger"):
+        data_logger = DataLogger(output_directory=output_dir, instance_name="linear_track")
+    with processes.track("controller"):
+        mc = AMCInterface(data_logger=data_logger)
+    telemetry = LoggerTelemetry(data_logger=data_logger)
+    with processes.track("cameras"):
+        vs = VideoSystems(data_logger=data_logger, output_directory=output_dir)
+    visualizer = WebDashboard() if USE_DASHBOARD else BehaviorVisualizer()
+    registry.register_session(data_logger=data_logger, microcontrollers=(mc,), video_systems=vs, telemetry=telemetry)
 
     try:
-        data_logger.start()  # Has to be done before starting any data-generation processes
-        vs.start()
+        with processes.track("logger"):
+            data_logger.start()  # Has to be done before starting any data-generation processes
+        with processes.track("telemetry"):
+            telemetry.start()  # Samples the DataLogger queue depth and write throughput at a low rate
+        with processes.track("cameras"):
+            vs.start()
 
         # Start the microcontroller, execute reward delivery logic
-        mc.start()
+        with processes.track("controller"):
+            mc.start()
+        # Pins the time-critical processes to the reserved cores. Has to be done after starting all processes.
+        PROCESS_PLACEMENT.apply(output_directory=output_dir, processes=processes)
         mc.connect_to_smh()  # Establishes connections to SharedMemoryArray for all modules
         visualizer.open()  # Open the visualizer window
 
@@ -48,27 +72,29 @@ def run_experiment() -> None:
         mc.analog_input.check_state()
 
         # Initialize the timers
-        acclimation_timer = PrecisionTimer("s")
+        session_timer = PrecisionTimer("us")
         cycle_timer = PrecisionTimer("ms")
-        valve_delay_timer = PrecisionTimer("ms")  # Timer for valve delay
 
-        # During acclimation period, the valves are closed
-        valve_left_active = False
-        valve_right_active = False
-        valve_delay_active = False  # Flag to track if we're in delay period
-        valve_triggered_side = None  # Track which side triggered the delay
-
-        prev_lick_left = mc.left_lick_sensor.lick_count
-        prev_lick_right = mc.right_lick_sensor.lick_count
+        # During acclimation period, the valves are closed. The task logic is shared with the session replay engine.
+        task = AlternationTask()
 
         # Before experiment tasak starts, wait for 8 minutes for experimenter to attach fiber to
         # the mouse and acclimate the animal to the arena
         # Cut off this period in the data processing if necessary
+        session_timer.reset()
+        task.start(
+            time_us=session_timer.elapsed,
+            left_licks=int(mc.left_lick_sensor.lick_count),
+            right_licks=int(mc.right_lick_sensor.lick_count),
+        )
 
-        acclimation_timer.reset()
-        valve_delay_timer.reset()
-
-        _once = False
+        # Records the task start time, so that the offline evaluators use the same acclimation period as the runtime
+        task_times: dict[str, int | bool | None] = {
+            "start_us": get_timestamp(output_format=TimestampFormats.INTEGER),  # type: ignore[dict-item]
+            "open_us": None,
+            "manual_open": False,
+        }
+        update_session_metadata(output_directory=output_dir, section=TASK_METADATA_SECTION, data=task_times)
 
         console.echo("Experiment starts. Press 'q' to stop the experiment.", level=LogLevel.SUCCESS)
         console.echo("8 minutes of pre-task acclimation period starts. Press 'p' to manually proceed")
@@ -76,63 +102,45 @@ def run_experiment() -> None:
         while True:
             cycle_timer.delay(delay=20)  # 20ms delay to prevent CPU overuse
 
+            visualizer.add_analog_samples(mc.analog_input.read_samples())
             visualizer.update()
-
-            lick_left = mc.left_lick_sensor.lick_count
-            lick_right = mc.right_lick_sensor.lick_count
-
-            # Check if acclimation period has passed, or 'p' has been pressed to proceed
-            # If it has, activate valves
-            if not _once:
-                if acclimation_timer.elapsed >= 480 or keyboard.is_pressed("p"):
-                    valve_left_active = True
-                    valve_right_active = True
-                    _once = True
-                    console.echo("Task opens.", level=LogLevel.SUCCESS)
-
-            # Check if valve delay period has ended
-            if valve_delay_active and valve_delay_timer.elapsed >= 500:
-                # Reactivate the opposite valve after 1 second delay
-                if valve_triggered_side == "left":
-                    valve_right_active = True
-                elif valve_triggered_side == "right":
-                    valve_left_active = True
-                valve_delay_active = False
-                valve_triggered_side = None
+            mc.apply_parameter_updates()  # Sends and logs the sensor parameters changed during runtime
+            registry.heartbeat()  # Marks the session as responsive for the cleanup command
+
+            # Check if acclimation period has passed, or 'p' has been pressed to proceed, and whether the licks
+            # detected since the last cycle have to be rewarded
+            open_requested = not task.task_open and keyboard.is_pressed("p")
+            decisions = task.update(
+                time_us=session_timer.elapsed,
+                left_licks=int(mc.left_lick_sensor.lick_count),
+                right_licks=int(mc.right_lick_sensor.lick_count),
+                open_task=open_requested,
+            )
+            if decisions.task_opened:
+                console.echo("Task opens.", level=LogLevel.SUCCESS)
+                task_times["open_us"] = get_timestamp(output_format=TimestampFormats.INTEGER)  # type: ignore[assignment]
+                task_times["manual_open"] = open_requested
+                update_session_metadata(output_directory=output_dir, section=TASK_METADATA_SECTION, data=task_times)
 
             if keyboard.is_pressed("e"):
                 mc.left_valve.dispense_volume(volume=REWARD_VOLUME)
-                visualizer.add_left_valve_event()
+                visualizer.add_left_valve_event(volume=REWARD_VOLUME)
 
             if keyboard.is_pressed("r"):
                 mc.right_valve.dispense_volume(volume=REWARD_VOLUME)
-                visualizer.add_right_valve_event()
+                visualizer.add_right_valve_event(volume=REWARD_VOLUME)
 
-            if lick_left > prev_lick_left:
+            if decisions.left_lick:
                 visualizer.add_left_lick_event()
-                if valve_left_active:
-                    mc.left_valve.dispense_volume(volume=REWARD_VOLUME)
-                    visualizer.add_left_valve_event()
-
-                    valve_left_active = False
-                    valve_right_active = False
-                    valve_delay_active = True
-                    valve_triggered_side = "left"
-                    valve_delay_timer.reset()
+            if decisions.left_reward:
+                mc.left_valve.dispense_volume(volume=REWARD_VOLUME)
+                visualizer.add_left_valve_event(volume=REWARD_VOLUME)
 
-            if lick_right > prev_lick_right:
+            if decisions.right_lick:
                 visualizer.add_right_lick_event()
-                if valve_right_active:
-                    mc.right_valve.dispense_volume(volume=REWARD_VOLUME)
-                    visualizer.add_right_valve_event()
-
-                    valve_left_active = False
-                    valve_right_active = False
-                    valve_delay_active = True
-                    valve_triggered_side = "right"
-                    valve_delay_timer.reset()
-
-            prev_lick_left, prev_lick_right = lick_left, lick_right
+            if decisions.right_reward:
+                mc.right_valve.dispense_volume(volume=REWARD_VOLUME)
+                visualizer.add_right_valve_event(volume=REWARD_VOLUME)
 
             if keyboard.is_pressed("q"):
                 console.echo("Stopping the experiment due to the 'q' key press.")
@@ -147,10 +155,13 @@ def run_experiment() -> None:
         total_volume = mc.dispensed_volume()  # Store total dispensed volume before stopping the microcontroller
 
         vs.stop()
+        mc.report_link_utilization()  # Reports the serial link load, has to be called before disconnecting
         mc.disconnect_to_smh()  # Disconnects from SharedMemoryArray for all modules
         mc.stop()
         visualizer.close()
+        telemetry.stop()  # Prints the summary of the DataLogger performance during the session
         data_logger.stop()  # Data logger needs to be stopped last
+        registry.close()  # All registered resources are released at this point
         console.echo("Experiment: ended.", level=LogLevel.SUCCESS)
         console.echo(f"Total dispensed volume: {total_volume:.2f} uL", level=LogLevel.SUCCESS)
 
@@ -179,21 +190,34 @@ if __name__ == "__main__":
     mouse = input("Input experiment mouse ID (e.g., DATM1): ")
     exp_day = input("Input experiment day (e.g., day_1): ")
 
-    date = datetime.now().strftime("%Y%m%d")
+    date = datetime.now().astimezone().strftime("%Y%m%d")
     exp_day = f"{exp_day}_{date}"
 
-    # Create output directory
-    output_dir = EXPERIMENT_DIR / mouse / exp_day
-    if output_dir.exists():
-        console.echo(f"Output directory {output_dir} already exists. Data may be overwritten.", level=LogLevel.WARNING)
+    # Create output directory. In the staging mode, the data is acquired to the local staging directory and transferred
+    # to the (Dropbox-synced) final directory by a background process after the experiment ends. The staging directory
+    # left by an interrupted transfer would be merged with the new session data, so it is also checked.
+    final_dir = EXPERIMENT_DIR / mouse / exp_day
+    output_dir = get_staging_directory(final_directory=final_dir) if USE_STAGING else final_dir
+    for existing_dir in dict.fromkeys((final_dir, output_dir)):
+        if not existing_dir.exists():
+            continue
+        console.echo(
+            f"Output directory {existing_dir} already exists. Data may be overwritten.", level=LogLevel.WARNING
+        )
         continuation = input("Data will be overwritten. Do you still want to continue? (y/n): ").lower()
         if continuation != "y":
             console.echo("Experiment aborted.", level=LogLevel.INFO)
             exit()
         else:
-            console.echo(f"Output directory {output_dir} has been overwritten.", level=LogLevel.INFO)
-
+            console.echo(f"Output directory {existing_dir} has been overwritten.", level=LogLevel.INFO)
     ensure_directory_exists(output_dir)
 
     # Run experiment
     run_experiment()
+
+    if USE_STAGING:
+        start_transfer(source_directory=output_dir, destination_directory=final_dir)
+        console.echo(
+            f"Transferring the session data to {final_dir} in the background. See {STAGING_ROOT} for transfer logs.",
+            level=LogLevel.INFO,
+        )
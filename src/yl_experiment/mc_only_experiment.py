@@ -3,17 +3,25 @@ from datetime import datetime
 
 import numpy as np
 import keyboard
+from dashboard import WebDashboard
 from visualizers import BehaviorVisualizer
 from ataraxis_time import PrecisionTimer
 from data_processing import process_microcontroller_log
 from microcontroller import AMCInterface
+from logger_telemetry import LoggerTelemetry
+from session_transfer import STAGING_ROOT, start_transfer, get_staging_directory
+from process_placement import ProcessPlacement, SessionProcesses
+from session_resources import ResourceRegistry
 from ataraxis_base_utilities import LogLevel, console, ensure_directory_exists
 from ataraxis_data_structures import DataLogger, assemble_log_archives
 
 _REWARD_VOLUME = np.float64(10)  # 10uL
 _EXPERIMENT_DIR = Path(
     "C:\\Users\\yapici\\Dropbox\\Research_projects\\dopamine\\mazes\\linear_track\\lickometer_test\\drifting_test"
-    )
+)
+_USE_STAGING = False  # Acquires the data to the local staging directory first to keep the Dropbox client idle.
+_PROCESS_PLACEMENT = ProcessPlacement()  # Reserves cores for the communication and logger processes.
+_USE_DASHBOARD = False  # Streams the runtime data to the web dashboard instead of the matplotlib window.
 
 
 def run_test_experiment() -> None:
@@ -28,15 +36,28 @@ def run_test_experiment() -> None:
     if not console.enabled:
         console.enable()
 
-    data_logger = DataLogger(output_directory=output_dir, instance_name="linear_track")
-    mc = AMCInterface(data_logger=data_logger)
-    visualizer = BehaviorVisualizer()
+    # Records the session resources as soon as they are created, so they can be released after a crash
+    registry = ResourceRegistry()
+    processes = SessionProcesses(on_update=registry.register_processes)  # Identifies the processes of each component
+    with processes.track("logger"):
+        data_logger = DataLogger(output_directory=output_dir, instance_name="linear_track")
+    with processes.track("controller"):
+        mc = AMCInterface(data_logger=data_logger)
+    telemetry = LoggerTelemetry(data_logger=data_logger, source_ids=(111,))
+    visualizer = WebDashboard() if _USE_DASHBOARD else BehaviorVisualizer()
+    registry.register_session(data_logger=data_logger, microcontrollers=(mc,), telemetry=telemetry)
 
     try:
-        data_logger.start()  # Has to be done before starting any data-generation processes
+        with processes.track("logger"):
+            data_logger.start()  # Has to be done before starting any data-generation processes
+        with processes.track("telemetry"):
+            telemetry.start()  # Samples the DataLogger queue depth and write throughput at a low rate
 
         # Start the microcontroller, execute reward delivery logic
-        mc.start()
+        with processes.track("controller"):
+            mc.start()
+        # Pins the time-critical processes to the reserved cores. Has to be done after starting all processes.
+        _PROCESS_PLACEMENT.apply(output_directory=output_dir, processes=processes)
         mc.connect_to_smh()  # Establishes connections to SharedMemoryArray for all modules
         visualizer.open()  # Open the visualizer window
 
@@ -68,7 +89,10 @@ def run_test_experiment() -> None:
         while True:
             cycle_timer.delay(delay=20)  # 20ms delay to prevent CPU overuse
 
+            visualizer.add_analog_samples(mc.analog_input.read_samples())
             visualizer.update()
+            mc.apply_parameter_updates()  # Sends and logs the sensor parameters changed during runtime
+            registry.heartbeat()  # Marks the session as responsive for the cleanup command
 
             lick_left = mc.left_lick_sensor.lick_count
             lick_right = mc.right_lick_sensor.lick_count
@@ -84,17 +108,17 @@ def run_test_experiment() -> None:
 
             if keyboard.is_pressed("e"):
                 mc.left_valve.dispense_volume(volume=_REWARD_VOLUME)
-                visualizer.add_left_valve_event()
+                visualizer.add_left_valve_event(volume=_REWARD_VOLUME)
 
             if keyboard.is_pressed("r"):
                 mc.right_valve.dispense_volume(volume=_REWARD_VOLUME)
-                visualizer.add_right_valve_event()
+                visualizer.add_right_valve_event(volume=_REWARD_VOLUME)
 
             if lick_left > prev_lick_left:
                 visualizer.add_left_lick_event()
                 if valve_left_active:
                     mc.left_valve.dispense_volume(volume=_REWARD_VOLUME)
-                    visualizer.add_left_valve_event()
+                    visualizer.add_left_valve_event(volume=_REWARD_VOLUME)
 
                     valve_left_active = False
                     valve_right_active = True
@@ -103,7 +127,7 @@ def run_test_experiment() -> None:
                 visualizer.add_right_lick_event()
                 if valve_right_active:
                     mc.right_valve.dispense_volume(volume=_REWARD_VOLUME)
-                    visualizer.add_right_valve_event()
+                    visualizer.add_right_valve_event(volume=_REWARD_VOLUME)
 
                     valve_left_active = True
                     valve_right_active = False
@@ -123,10 +147,13 @@ def run_test_experiment() -> None:
         total_volume = mc.dispensed_volume()  # Store total dispensed volume before stopping the microcontroller
         console.echo(f"Total dispensed volume: {total_volume:.2f} uL", level=LogLevel.SUCCESS)
 
+        mc.report_link_utilization()  # Reports the serial link load, has to be called before disconnecting
         mc.disconnect_to_smh()  # Disconnects from SharedMemoryArray for all modules
         mc.stop()
         visualizer.close()
+        telemetry.stop()  # Prints the summary of the DataLogger performance during the session
         data_logger.stop()  # Data logger needs to be stopped last
+        registry.close()  # All registered resources are released at this point
         console.echo("Experiment: ended.", level=LogLevel.SUCCESS)
 
         # Combines all log entries into a single .npz log file for each source.
@@ -153,12 +180,21 @@ if __name__ == "__main__":
     mouse = input("Input experiment mouse ID (e.g., DATM1): ")
     exp_day = input("Input experiment day (e.g., day_1): ")
 
-    date = datetime.now().strftime("%Y%m%d")
+    date = datetime.now().astimezone().strftime("%Y%m%d")
     exp_day = f"{exp_day}_{date}"
 
-    # Create output directory
-    output_dir = _EXPERIMENT_DIR / mouse / exp_day
+    # Create output directory. In the staging mode, the data is acquired to the local staging directory and
+    # transferred to the (Dropbox-synced) final directory by a background process after the experiment ends.
+    final_dir = _EXPERIMENT_DIR / mouse / exp_day
+    output_dir = get_staging_directory(final_directory=final_dir) if _USE_STAGING else final_dir
     ensure_directory_exists(output_dir)
 
     # Run experiment
-    run_test_experiment()
\ No newline at end of file
+    run_test_experiment()
+
+    if _USE_STAGING:
+        start_transfer(source_directory=output_dir, destination_directory=final_dir)
+        console.echo(
+            f"Transferring the session data to {final_dir} in the background. See {STAGING_ROOT} for transfer logs.",
+            level=LogLevel.INFO,
+        )
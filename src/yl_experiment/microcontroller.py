@@ -1,13 +1,16 @@
 """This module provides the API for interfacing with hardware modules managed by a Teensy 4.0 microcontroller."""
 
+from abc import abstractmethod
 from enum import IntEnum
 from typing import TYPE_CHECKING, Any
+from dataclasses import asdict, dataclass
 
 import numpy as np
-from ataraxis_time import PrecisionTimer
+from ataraxis_time import PrecisionTimer, TimestampFormats, get_timestamp
 from scipy.optimize import curve_fit
+from process_placement import update_session_metadata
 from ataraxis_base_utilities import LogLevel, console
-from ataraxis_data_structures import DataLogger, SharedMemoryArray
+from ataraxis_data_structures import DataLogger, LogPackage, SharedMemoryArray
 from ataraxis_communication_interface import (
     ModuleData,
     ModuleState,
@@ -17,6 +20,9 @@ from ataraxis_communication_interface import (
 
 # Prevents typing-related imports from being imported at runtime
 if TYPE_CHECKING:
+    from pathlib import Path
+    from collections.abc import Callable
+
     from numpy.typing import NDArray
 
 # Defines constants used in this module
@@ -33,6 +39,39 @@ _CONTROLLER_BUFFER_SIZE = 8192
 _CONTROLLER_BAUDRATE = 115200
 _CONTROLLER_KEEPALIVE_INTERVAL = 1000
 
+# Serial link traffic estimation parameters
+# The number of bytes added to each message payload by the transport layer: the start byte, the payload size byte, the
+# COBS overhead byte, the delimiter byte, and the 2-byte CRC16 checksum.
+_PACKET_OVERHEAD_BYTES = 6
+
+# The number of bytes occupied on the wire by the keepalive reception code that the microcontroller sends once per
+# keepalive interval: the protocol code, the reception code, and the packet overhead.
+_KEEPALIVE_MESSAGE_BYTES = 2 + _PACKET_OVERHEAD_BYTES
+
+# The number of bits transmitted for each byte of data over the UART link (8N1: start bit, 8 data bits, stop bit).
+_BITS_PER_BYTE = 10
+
+# The duration, in milliseconds, of the windows used to compute the peak message rate of each module.
+_RATE_WINDOW_DURATION = 1000
+
+# The log source ID used by the parameter change events of the default controller's modules. Has to be unique across
+# all sources that use the same DataLogger, including the cameras (101-103) and the controllers.
+_PARAMETER_SOURCE_ID = np.uint8(121)
+
+# The names of the values stored in each logged parameter change event, in the order they are serialized. Each value is
+# serialized as an uint64 integer.
+PARAMETER_EVENT_COLUMNS = (
+    "module_type",
+    "module_id",
+    "version",
+    "switch_index",
+    "signal_threshold",
+    "delta_threshold",
+    "averaging_pool",
+    "polling_delay_us",
+    "lick_threshold",
+)
+
 # Valve module calibration parameters
 # The delay between calibration pulses in us. Should never be below 200000.
 _VALVE_CALIBRAZTION_COUNT = np.uint16(200)  # The of calibration pulses to use at each calibration level.
@@ -75,6 +114,13 @@ _LICK_DELTA_THRESHOLD = np.uint16(180)
 # Initial value: 2
 _LICK_AVERAGING_POOL = np.uint8(2)
 
+# In microseconds. The duration of the window after each valve opening or closing during which the lick sensor readouts
+# are ignored by the runtime lick detection. Switching the valve can induce voltage transients in the lick sensor
+# circuit that would otherwise be detected as licks and trigger extra rewards. Use the estimate_valve_artifact_window()
+# function of the data_processing module to derive this value from the recorded sessions. A value of 0 disables the
+# suppression.
+_VALVE_ARTIFACT_WINDOW = np.uint32(20000)
+
 # The number of microseconds to delay between polling (checking) the lick sensor. A value of 1000 means 1 ms, which
 # gives a polling rate of ~1000 HZ.
 # Initial value: 1000
@@ -96,6 +142,22 @@ _ANALOG_AVERAGING_POOL = np.uint8(2)
 # here we set it to 100Hz sampling rate.
 _ANALOG_POLLING_DELAY = np.uint32(16600)
 
+# In the batched mode, the module accumulates the samples acquired at the polling interval and sends them to the PC as
+# a single array message. This removes the per-sample message framing, timestamping, and logging overhead, which is
+# required to acquire the analog signal at ~1 kHz without saturating the serial link.
+# The number of samples sent with each batch message. 15 is the largest uint16 array supported by the serial protocol.
+_ANALOG_BATCH_SIZE = np.uint8(15)
+_MAXIMUM_ANALOG_BATCH_SIZE = 15
+
+# The number of microseconds to delay between acquiring consecutive samples in the batched mode. A value of 1000 means
+# 1 ms, which gives a sampling rate of ~1000 HZ.
+_ANALOG_BATCH_POLLING_DELAY = np.uint32(1000)
+
+# The number of the most recent analog samples kept in shared memory for the runtime visualizers. At the batched
+# sampling rate of ~1000 HZ, this holds ~16 seconds of the signal, so the main process can skip several visualizer
+# updates without losing samples.
+_ANALOG_TRACE_SIZE = 16384
+
 
 class ModuleTypeCodes(IntEnum):
     """Stores the module type (family) codes used by the hardware modules supported by this library version."""
@@ -119,7 +181,560 @@ class _LickStateCodes(IntEnum):
     VOLTAGE_READOUT_CHANGED = 51
 
 
-class ValveInterface(ModuleInterface):
+class _ParameterFields(IntEnum):
+    """Stores the indices of the values stored in the parameter channel of each configurable module."""
+
+    REQUESTED_VERSION = 0
+    """The version of the most recently requested parameters. Incremented by each parameter update request."""
+    APPLIED_VERSION = 1
+    """The version of the parameters currently used to process the module data."""
+    SWITCH_INDEX = 2
+    """The number of data messages received from the module before the applied parameters took effect."""
+    SIGNAL_THRESHOLD = 3
+    DELTA_THRESHOLD = 4
+    AVERAGING_POOL = 5
+    POLLING_DELAY = 6
+    LICK_THRESHOLD = 7
+    APPLIED_LICK_THRESHOLD = 8
+    """The lick threshold used by the communication process since the applied parameters took effect."""
+    SENT_VERSION = 9
+    """The version of the parameters most recently sent to the microcontroller by the main process."""
+    SENT_LICK_THRESHOLD = 10
+    """The lick threshold sent together with the most recently sent parameters."""
+
+
+class AnalogStateCodes(IntEnum):
+    """Stores the message state codes used by the AnalogModule instances to send the acquired samples to the PC."""
+
+    VOLTAGE_READOUT = 51
+    VOLTAGE_BATCH = 52
+
+
+def fit_valve_calibration(
+    valve_calibration_data: tuple[tuple[int | float, int | float], ...],
+) -> tuple[np.float64, np.float64]:
+    """Fits the power law model that maps valve pulse durations to dispensed fluid volumes to the calibration data.
+
+    Notes:
+        In the calibration model, fluid_volume = A * (pulse_duration)^B. This function is used by ValveInterface
+        instances at initialization and by offline data processing pipelines that need the calibration parameters
+        without connecting to the microcontroller.
+
+    Args:
+        valve_calibration_data: A tuple of tuples that contains the data required to map pulse duration to delivered
+            fluid volume. Each sub-tuple should contain the integer that specifies the pulse duration in microseconds
+            and a float that specifies the delivered fluid volume in microliters.
+
+    Returns:
+        A tuple of two elements. The first element is the scale coefficient (A), and the second element is the
+        nonlinearity exponent (B). Both are rounded to 8 decimal places.
+    """
+    # Extracts pulse durations and fluid volumes into separate arrays
+    pulse_durations: NDArray[np.float64] = np.array([x[0] for x in valve_calibration_data], dtype=np.float64)
+    fluid_volumes: NDArray[np.float64] = np.array([x[1] for x in valve_calibration_data], dtype=np.float64)
+
+    # Defines the power-law model. Our calibration data suggests that the Valve performs in a non-linear fashion
+    # and is better calibrated using the power law, rather than a linear fit
+    def power_law_model(pulse_duration: Any, a: Any, b: Any, /) -> Any:
+        return a * np.power(pulse_duration, b)
+
+    # Fits the power-law model to the input calibration data
+    # noinspection PyTupleAssignmentBalance
+    params, _ = curve_fit(f=power_law_model, xdata=pulse_durations, ydata=fluid_volumes)
+    scale_coefficient, nonlinearity_exponent = params
+    return (
+        np.round(a=np.float64(scale_coefficient), decimals=8),
+        np.round(a=np.float64(nonlinearity_exponent), decimals=8),
+    )
+
+
+@dataclass(frozen=True)
+class ControllerParameters:
+    """Stores the hardware module parameters required to process the data logged by the AMC microcontroller.
+
+    Offline processing pipelines use instances of this class in place of a live AMCInterface instance, which allows
+    reprocessing the logged data without connecting to the microcontroller.
+
+    Notes:
+        The valve calibration coefficients have no defaults, as the volumes computed using placeholder coefficients
+        would be silently wrong. Use the from_calibration() method to create the instance using the calibration data
+        defined in this module.
+    """
+
+    left_valve_scale_coefficient: float
+    """The scale coefficient (A) of the left valve power law calibration model."""
+    left_valve_nonlinearity_exponent: float
+    """The nonlinearity exponent (B) of the left valve power law calibration model."""
+    right_valve_scale_coefficient: float
+    """The scale coefficient (A) of the right valve power law calibration model."""
+    right_valve_nonlinearity_exponent: float
+    """The nonlinearity exponent (B) of the right valve power law calibration model."""
+    controller_id: int = int(_CONTROLLED_ID)
+    """The unique ID of the microcontroller whose data is processed. Used to locate the log archive."""
+    parameter_source_id: int = int(_PARAMETER_SOURCE_ID)
+    """The log source ID used by the parameter change events of the microcontroller's modules. Used to locate the
+    parameter event log archive."""
+    left_lick_threshold: int = int(_LICK_DETECTION_THRESHOLD)
+    """The voltage threshold, in ADC units, used to detect left sensor licks at runtime."""
+    right_lick_threshold: int = int(_LICK_DETECTION_THRESHOLD)
+    """The voltage threshold, in ADC units, used to detect right sensor licks at runtime."""
+    analog_sample_interval_us: int = int(_ANALOG_BATCH_POLLING_DELAY)
+    """The interval, in microseconds, between the analog samples acquired in the batched mode. Used to reconstruct
+    the timestamps of the individual samples from the reception time of each batch."""
+    valve_artifact_window_us: int = int(_VALVE_ARTIFACT_WINDOW)
+    """The duration, in microseconds, of the window after each valve opening or closing during which the lick sensor
+    readouts were ignored by the runtime lick detection."""
+
+    @classmethod
+    def from_calibration(cls) -> "ControllerParameters":
+        """Creates the instance using the valve calibration data and the lick thresholds defined in this module."""
+        left_scale, left_exponent = fit_valve_calibration(_LEFT_VALVE_CALIBRATION_DATA)
+        right_scale, right_exponent = fit_valve_calibration(_RIGHT_VALVE_CALIBRATION_DATA)
+        return cls(
+            left_valve_scale_coefficient=float(left_scale),
+            left_valve_nonlinearity_exponent=float(left_exponent),
+            right_valve_scale_coefficient=float(right_scale),
+            right_valve_nonlinearity_exponent=float(right_exponent),
+        )
+
+
+class _LinkMonitoredInterface(ModuleInterface):
+    """Extends the ModuleInterface class with the counters that track the serial link traffic generated by the module.
+
+    The counters are updated by the communication process each time the interface receives a message from the module
+    and are shared with other processes via a SharedMemoryArray. They are used to estimate how close the
+    microcontroller-to-PC link is to saturation.
+
+    Notes:
+        Only the messages whose event codes are listed in the 'data_codes' argument are passed to the interface, so
+        the command completion messages are not counted. For all modules used in this library, these messages make up
+        a negligible portion of the traffic.
+
+    Args:
+        module_type: The code that identifies the type (family) of the interfaced module.
+        module_id: The unique identifier of the interfaced module instance.
+        data_codes: The set of event codes of the messages passed to the process_received_data() method.
+        error_codes: The set of event codes of the messages that communicate runtime errors.
+        controller_id: The unique identifier of the microcontroller that manages the module. Used to namespace the
+            SharedMemoryArray instances of the module, so that the modules of several microcontrollers can be used on
+            the same PC at the same time.
+
+    Attributes:
+        _tracker_prefix: Stores the prefix of the names of all SharedMemoryArray instances used by the interface.
+        _link_tracker: Stores the SharedMemoryArray that tracks the number of messages received from the module (index
+            0), the estimated number of bytes these messages occupied on the wire (index 1), and the peak number of
+            messages received per second (index 2).
+        _window_timer: A PrecisionTimer instance initialized in the Communication process to measure the message rate
+            windows.
+        _window_messages: Tracks the number of messages received during the current message rate window.
+        _timer_factory: Stores the callable used to create the timers of the interface from their precision.
+        _shared_arrays: Stores all SharedMemoryArray instances created by the interface, which are destroyed when the
+            interface is garbage-collected.
+    """
+
+    def __init__(
+        self,
+        module_type: np.uint8,
+        module_id: np.uint8,
+        data_codes: set[np.uint8] | None,
+        error_codes: set[np.uint8] | None,
+        controller_id: np.uint8 = _CONTROLLED_ID,
+    ) -> None:
+        self._shared_arrays: list[SharedMemoryArray] = []
+        super().__init__(
+            module_type=module_type,
+            module_id=module_id,
+            data_codes=data_codes,
+            error_codes=error_codes,
+        )
+
+        self._tracker_prefix: str = f"{controller_id}_{self._module_type}_{self._module_id}"
+        self._link_tracker: SharedMemoryArray = self._create_array(
+            name=f"{self._tracker_prefix}_link_tracker",
+            prototype=np.zeros(shape=3, dtype=np.float64),
+        )
+        self._window_timer: PrecisionTimer | None = None
+        self._window_messages: int = 0
+        self._timer_factory: Callable[[str], PrecisionTimer] = PrecisionTimer
+
+    def __del__(self) -> None:
+        """Ensures all SharedMemoryArray instances of the interface are properly cleaned up when the class is
+        garbage-collected.
+        """
+        self.release_shared_memory()
+
+    def release_shared_memory(self) -> None:
+        """Disconnects from and destroys all SharedMemoryArray instances created by the interface.
+
+        Notes:
+            The interface cannot be used after calling this method. The method is used by the session replay engine,
+            which releases the arrays as soon as the replay ends, so the same session can be replayed again without
+            waiting for the interfaces to be garbage-collected.
+        """
+        for array in self._shared_arrays:
+            array.disconnect()
+            array.destroy()
+        self._shared_arrays.clear()
+
+    def _create_array(self, name: str, prototype: "NDArray[Any]") -> SharedMemoryArray:
+        """Creates the SharedMemoryArray owned by the interface.
+
+        Notes:
+            The array names are namespaced by the microcontroller ID and the module type and ID, so an existing array
+            with the same name means that the same module is already managed by another interface, for example, by
+            another runtime that uses the same microcontroller ID. Such arrays are never reused or overwritten.
+
+        Args:
+            name: The name of the array.
+            prototype: The prototype of the array.
+
+        Returns:
+            The created SharedMemoryArray instance.
+
+        Raises:
+            FileExistsError: If the shared memory buffer with the same name already exists.
+        """
+        try:
+            array = SharedMemoryArray.create_array(name=name, prototype=prototype, exists_ok=False)
+        except FileExistsError:
+            # Releases the arrays created before the failure, as the partially initialized interface is never used.
+            for created_array in self._shared_arrays:
+                created_array.destroy()
+            self._shared_arrays.clear()
+            message = (
+                f"Unable to initialize the interface of the module {self._module_id} of type {self._module_type}. The "
+                f"shared memory array {name} already exists. Use a unique controller ID for each microcontroller used "
+                f"on this PC, and use the session_resources module to clean up the arrays left by crashed sessions."
+            )
+            console.error(message=message, error=FileExistsError)
+            # Fallback to appease mypy, should not be reachable
+            raise FileExistsError(message) from None  # pragma: no cover
+        self._shared_arrays.append(array)
+        return array
+
+    def initialize_remote_assets(self) -> None:
+        """Connects to the link tracker SharedMemoryArray and initializes the message rate window timer."""
+        self._link_tracker.connect()
+        self._window_timer = self._timer_factory("ms")
+
+    def terminate_remote_assets(self) -> None:
+        """Disconnects from the link tracker SharedMemoryArray."""
+        self._link_tracker.disconnect()
+
+    def set_timer_factory(self, timer_factory: "Callable[[str], PrecisionTimer]") -> None:
+        """Replaces the callable used to create the timers of the interface.
+
+        Notes:
+            This method is used by the session replay engine to run the interface on a virtual clock. It has to be
+            called before the initialize_remote_assets() method.
+
+        Args:
+            timer_factory: The callable that accepts the timer precision ('us', 'ms', or 's') and returns the object
+                that exposes the 'elapsed' property and the reset() method of the PrecisionTimer class.
+        """
+        self._timer_factory = timer_factory
+
+    def _count_message(self, message: ModuleData | ModuleState) -> None:
+        """Adds the received message to the link traffic counters."""
+        # The payload consists of the protocol code, the message header, and, for data messages, the data object.
+        payload_size = 1 + message.message.size
+        if isinstance(message, ModuleData):
+            payload_size += np.asarray(message.data_object).nbytes
+        size = estimate_message_size(payload_size)
+
+        # The communication process is the only writer, so the counters are updated without acquiring the lock.
+        with self._link_tracker.array(with_lock=False) as tracker:
+            tracker[0] += 1
+            tracker[1] += size
+
+            self._window_messages += 1
+            elapsed = self._window_timer.elapsed  # type: ignore[union-attr]
+            if elapsed >= _RATE_WINDOW_DURATION:
+                tracker[2] = max(tracker[2], self._window_messages * 1000 / elapsed)
+                self._window_messages = 0
+                self._window_timer.reset()  # type: ignore[union-attr]
+
+    @property
+    def link_statistics(self) -> tuple[int, int, float]:
+        """Returns the number of messages received from the module, the estimated number of bytes these messages
+        occupied on the wire, and the peak number of messages received per second.
+        """
+        messages, size, peak_rate = self._link_tracker[:]
+        return int(messages), int(size), float(peak_rate)
+
+
+class _ConfigurableInterface(_LinkMonitoredInterface):
+    """Extends the _LinkMonitoredInterface class with the parameter channel that allows changing the module parameters
+    during runtime.
+
+    The parameter channel is a SharedMemoryArray that stores the most recently requested module parameters and the
+    version of these parameters. Any process connected to the channel can request new parameters via the
+    update_parameters() method. The AMCInterface running in the main process periodically sends the requested
+    parameters to the microcontroller and logs each parameter change as a timestamped event.
+
+    The modules whose data is processed by the communication process switch to the sent parameters before processing
+    the next received message and record the number of messages processed before the switch. The main process sends
+    the next requested parameters only after it logs the switch to the previously sent parameters, so every switch
+    used by the communication process is logged, and the switch index of each logged event is preserved.
+
+    Args:
+        module_type: The code that identifies the type (family) of the interfaced module.
+        module_id: The unique identifier of the interfaced module instance.
+        data_codes: The set of event codes of the messages passed to the process_received_data() method.
+        controller_id: The unique identifier of the microcontroller that manages the module.
+        signal_threshold: The initial signal threshold, in ADC units, used by the module.
+        delta_threshold: The initial minimum readout difference, in ADC units, used by the module.
+        averaging_pool: The initial number of readouts averaged into each reported value.
+        polling_delay: The initial delay, in microseconds, between consecutive readouts.
+        lick_threshold: The initial lick detection threshold, in ADC units, used to classify the module data.
+
+    Attributes:
+        _parameter_channel: Stores the SharedMemoryArray that stores the requested and the applied module parameters.
+        _sent_version: Tracks the version of the parameters most recently sent to the microcontroller.
+        _sent_parameters: Stores the snapshot of the parameter channel most recently sent to the microcontroller.
+        _logged_version: Tracks the version of the parameters most recently logged as a parameter change event.
+        _polling: Tracks whether the module is currently polling its sensor.
+        _processed_messages: Tracks the number of messages processed by the communication process.
+        _applied_version: Tracks the version of the parameters used by the communication process.
+    """
+
+    _applied_by_communication_process: bool = False
+    """Determines whether the new parameters take effect when the communication process processes the next message
+    received from the module, rather than as soon as they are sent to the microcontroller. This is used by the modules
+    whose data is processed differently depending on the parameters used to acquire it."""
+
+    def __init__(
+        self,
+        module_type: np.uint8,
+        module_id: np.uint8,
+        data_codes: set[np.uint8],
+        controller_id: np.uint8,
+        *,
+        signal_threshold: int,
+        delta_threshold: int,
+        averaging_pool: int,
+        polling_delay: int,
+        lick_threshold: int = 0,
+    ) -> None:
+        super().__init__(
+            module_type=module_type,
+            module_id=module_id,
+            data_codes=data_codes,
+            error_codes=None,
+            controller_id=controller_id,
+        )
+
+        prototype = np.zeros(shape=len(_ParameterFields), dtype=np.uint64)
+        prototype[_ParameterFields.SIGNAL_THRESHOLD] = signal_threshold
+        prototype[_ParameterFields.DELTA_THRESHOLD] = delta_threshold
+        prototype[_ParameterFields.AVERAGING_POOL] = averaging_pool
+        prototype[_ParameterFields.POLLING_DELAY] = polling_delay
+        prototype[_ParameterFields.LICK_THRESHOLD] = lick_threshold
+        prototype[_ParameterFields.APPLIED_LICK_THRESHOLD] = lick_threshold
+        self._parameter_channel: SharedMemoryArray = self._create_array(
+            name=f"{self._tracker_prefix}_parameter_channel",
+            prototype=prototype,
+        )
+        self._sent_version: int = 0
+        self._sent_parameters: NDArray[np.uint64] = prototype.copy()
+        self._logged_version: int = 0
+        self._polling: bool = False
+        self._processed_messages: int = 0
+        self._applied_version: int = 0
+
+    def initialize_remote_assets(self) -> None:
+        """Connects to the parameter channel SharedMemoryArray."""
+        self._parameter_channel.connect()
+        super().initialize_remote_assets()
+
+    def terminate_remote_assets(self) -> None:
+        """Disconnects from the parameter channel SharedMemoryArray."""
+        self._parameter_channel.disconnect()
+        super().terminate_remote_assets()
+
+    def update_parameters(
+        self,
+        *,
+        signal_threshold: int | None = None,
+        delta_threshold: int | None = None,
+        averaging_pool: int | None = None,
+        polling_delay: int | None = None,
+        lick_threshold: int | None = None,
+    ) -> None:
+        """Requests the module to use the new parameters.
+
+        Notes:
+            This method can be called from any process connected to the parameter channel, for example, by an
+            operator interface or an automated threshold tuner. The request takes effect once the AMCInterface sends
+            the parameters to the microcontroller during the next apply_parameter_updates() call. Only the provided
+            parameters are changed.
+
+        Args:
+            signal_threshold: The signal threshold, in ADC units. Readouts below this threshold are pulled to 0.
+            delta_threshold: The minimum difference, in ADC units, between consecutive readouts for the new readout to
+                be reported to the PC. Only used by the lick sensors.
+            averaging_pool: The number of readouts averaged into each reported value.
+            polling_delay: The delay, in microseconds, between consecutive readouts.
+            lick_threshold: The threshold, in ADC units, for classifying a readout as a lick. Only used by the lick
+                sensors.
+        """
+        values = {
+            _ParameterFields.SIGNAL_THRESHOLD: signal_threshold,
+            _ParameterFields.DELTA_THRESHOLD: delta_threshold,
+            _ParameterFields.AVERAGING_POOL: averaging_pool,
+            _ParameterFields.POLLING_DELAY: polling_delay,
+            _ParameterFields.LICK_THRESHOLD: lick_threshold,
+        }
+        with self._parameter_channel.array(with_lock=True) as channel:
+            for field, value in values.items():
+                if value is not None:
+                    channel[field] = value
+            channel[_ParameterFields.REQUESTED_VERSION] += 1
+
+    @abstractmethod
+    def _send_configuration(self, parameters: "NDArray[np.uint64]", *, restart: bool = True) -> None:
+        """Sends the parameters stored in the input parameter channel snapshot to the module.
+
+        If the module is polling its sensor and 'restart' is True, this method also restarts the polling using the new
+        polling delay.
+        """
+        raise NotImplementedError  # pragma: no cover
+
+    def apply_parameter_updates(self, *, send: bool = True) -> "NDArray[np.uint64] | None":
+        """Sends the requested parameters to the microcontroller and reports the newly applied parameters.
+
+        This method is called by the AMCInterface in the main process. The newly requested parameters are only sent
+        after the previously sent parameters were applied, so each applied set of parameters is reported exactly once.
+
+        Args:
+            send: Determines whether to send the requested parameters to the microcontroller. The session replay
+                disables sending, as it reproduces the parameter switches without the microcontroller.
+
+        Returns:
+            The values of the applied parameters, ordered as PARAMETER_EVENT_COLUMNS, if the parameters changed since
+            the last call, or None otherwise.
+        """
+        with self._parameter_channel.array(with_lock=True) as channel:
+            parameters = channel.copy()
+
+        # Reports the switch to the previously sent parameters before sending the new ones, as sending the new
+        # parameters replaces the sent parameter snapshot.
+        event = None
+        applied_version = int(parameters[_ParameterFields.APPLIED_VERSION])
+        if applied_version != self._logged_version:
+            switch_index = int(parameters[_ParameterFields.SWITCH_INDEX])
+            event = self._build_event(version=applied_version, switch_index=switch_index)
+
+        requested_version = int(parameters[_ParameterFields.REQUESTED_VERSION])
+        if requested_version != self._sent_version and applied_version == self._sent_version:
+            if send:
+                self._send_configuration(parameters)
+            sent_event = self._record_sent_parameters(parameters)
+            if sent_event is not None:
+                event = sent_event
+        return event
+
+    def _record_sent_parameters(self, parameters: "NDArray[np.uint64]") -> "NDArray[np.uint64] | None":
+        """Records the parameters stored in the input parameter channel snapshot as sent to the microcontroller.
+
+        Returns:
+            The parameter change event of the sent parameters if they are applied as soon as they are sent, or None if
+            they are applied by the communication process.
+        """
+        requested_version = int(parameters[_ParameterFields.REQUESTED_VERSION])
+        self._sent_version = requested_version
+        self._sent_parameters = parameters
+
+        if self._applied_by_communication_process:
+            # The communication process switches to the sent parameters before processing the next message.
+            with self._parameter_channel.array(with_lock=True) as channel:
+                channel[_ParameterFields.SENT_LICK_THRESHOLD] = parameters[_ParameterFields.LICK_THRESHOLD]
+                channel[_ParameterFields.SENT_VERSION] = requested_version
+            return None
+
+        # The modules whose data is not processed at runtime use the new parameters as soon as they are sent.
+        self._parameter_channel[_ParameterFields.APPLIED_VERSION] = requested_version
+        return self._build_event(version=requested_version, switch_index=0)
+
+    def _build_event(self, version: int, switch_index: int) -> "NDArray[np.uint64]":
+        """Marks the sent parameters with the input version as logged and returns their parameter change event."""
+        self._logged_version = version
+        parameters = self._sent_parameters
+        return np.array(
+            [
+                self._module_type,
+                self._module_id,
+                version,
+                switch_index,
+                parameters[_ParameterFields.SIGNAL_THRESHOLD],
+                parameters[_ParameterFields.DELTA_THRESHOLD],
+                parameters[_ParameterFields.AVERAGING_POOL],
+                parameters[_ParameterFields.POLLING_DELAY],
+                parameters[_ParameterFields.LICK_THRESHOLD],
+            ],
+            dtype=np.uint64,
+        )
+
+    def _switch_parameters(self) -> bool:
+        """Switches to the parameters most recently sent by the main process if they were sent since the last processed
+        message.
+
+        This method is called by the communication process before processing each received message.
+
+        Returns:
+            True if the parameters were switched, False otherwise.
+        """
+        # The version is checked without acquiring the lock, as it is only incremented by the main process.
+        with self._parameter_channel.array(with_lock=False) as channel:
+            sent_version = int(channel[_ParameterFields.SENT_VERSION])
+        if sent_version == self._applied_version:
+            return False
+
+        with self._parameter_channel.array(with_lock=True) as channel:
+            self._applied_version = int(channel[_ParameterFields.SENT_VERSION])
+            channel[_ParameterFields.APPLIED_LICK_THRESHOLD] = channel[_ParameterFields.SENT_LICK_THRESHOLD]
+            channel[_ParameterFields.SWITCH_INDEX] = self._processed_messages
+            channel[_ParameterFields.APPLIED_VERSION] = self._applied_version
+        return True
+
+    def _get_parameter(self, field: _ParameterFields) -> int:
+        """Returns the current value of the requested parameter stored in the parameter channel."""
+        return int(self._parameter_channel[field])
+
+
+@dataclass(frozen=True)
+class LinkConfiguration:
+    """Stores the parameters of the serial link between the PC and the AMC microcontroller.
+
+    The default values are used by all acquisition runtimes. Use the link_benchmark module to evaluate alternative
+    configurations under the expected runtime load.
+    """
+
+    baudrate: int = _CONTROLLER_BAUDRATE
+    """The baudrate of the serial link. Teensy microcontrollers communicate over USB, which ignores this value, so it
+    only determines the nominal capacity used to report the link utilization."""
+    buffer_size: int = _CONTROLLER_BUFFER_SIZE
+    """The size, in bytes, of the microcontroller's serial buffer."""
+    keepalive_interval: int = _CONTROLLER_KEEPALIVE_INTERVAL
+    """The interval, in milliseconds, at which the PC sends the keepalive messages to the microcontroller."""
+
+    @property
+    def capacity(self) -> float:
+        """Returns the nominal number of bytes the link can transmit per second in each direction."""
+        return self.baudrate / _BITS_PER_BYTE
+
+
+def estimate_message_size(payload_size: int) -> int:
+    """Returns the number of bytes occupied on the wire by the message with the given payload size.
+
+    Args:
+        payload_size: The size of the message payload, in bytes. The payload includes the protocol code, the message
+            header, and the data object.
+    """
+    return payload_size + _PACKET_OVERHEAD_BYTES
+
+
+class ValveInterface(_LinkMonitoredInterface):
     """Interfaces with ValveModule instances running on Ataraxis MicroControllers.
 
     ValveModule instances control a solenoid valve to dispense precise volumes of fluid.
@@ -135,6 +750,7 @@ class ValveInterface(ModuleInterface):
             and a float that specifies the delivered fluid volume in microliters.
         debug: A boolean flag that configures the interface to dump certain data received from the microcontroller into
             the terminal. This is used during debugging and system calibration and should be disabled for most runtimes.
+        controller_id: The unique identifier of the microcontroller that manages the module.
 
     Attributes:
         _scale_coefficient: Stores the power law scale coefficient derived from the calibration data.
@@ -151,6 +767,10 @@ class ValveInterface(ModuleInterface):
             delivered by the valve during runtime.
         _previous_volume: Tracks the volume of fluid, in microliters, dispensed during the last dispense_volume()
             method runtime.
+        _edge_timer: A PrecisionTimer instance initialized in the Communication process to track the time elapsed since
+            the valve last reported opening or closing. This is used by the LickInterface instances to suppress the
+            valve artifacts.
+        _edge_received: Tracks whether the valve reported opening or closing since the Communication process started.
     """
 
     def __init__(
@@ -159,6 +779,7 @@ class ValveInterface(ModuleInterface):
         valve_calibration_data: tuple[tuple[int | float, int | float], ...],
         *,
         debug: bool = False,
+        controller_id: np.uint8 = _CONTROLLED_ID,
     ) -> None:
         error_codes = None
         # kOpen, kClosed, kCalibrated
@@ -176,54 +797,49 @@ class ValveInterface(ModuleInterface):
             module_id=module_id,
             data_codes=data_codes,
             error_codes=error_codes,
+            controller_id=controller_id,
         )
 
-        # Extracts pulse durations and fluid volumes into separate arrays
-        pulse_durations: NDArray[np.float64] = np.array([x[0] for x in valve_calibration_data], dtype=np.float64)
-        fluid_volumes: NDArray[np.float64] = np.array([x[1] for x in valve_calibration_data], dtype=np.float64)
-
-        # Defines the power-law model. Our calibration data suggests that the Valve performs in a non-linear fashion
-        # and is better calibrated using the power law, rather than a linear fit
-        def power_law_model(pulse_duration: Any, a: Any, b: Any, /) -> Any:
-            return a * np.power(pulse_duration, b)
-
-        # Fits the power-law model to the input calibration data and saves the fit parameters and covariance matrix to
-        # class attributes
-        # noinspection PyTupleAssignmentBalance
-        params, _ = curve_fit(f=power_law_model, xdata=pulse_durations, ydata=fluid_volumes)
-        scale_coefficient, nonlinearity_exponent = params
-        self._scale_coefficient: np.float64 = np.round(a=np.float64(scale_coefficient), decimals=8)
-        self._nonlinearity_exponent: np.float64 = np.round(a=np.float64(nonlinearity_exponent), decimals=8)
+        # Fits the power-law model to the input calibration data and saves the fit parameters to class attributes
+        self._scale_coefficient: np.float64
+        self._nonlinearity_exponent: np.float64
+        self._scale_coefficient, self._nonlinearity_exponent = fit_valve_calibration(valve_calibration_data)
 
         # Precreates a shared memory array used to track and share valve state data. Index 0 tracks the total amount of
         # fluid dispensed by the valve during runtime.
-        self._valve_tracker: SharedMemoryArray = SharedMemoryArray.create_array(
-            name=f"{self._module_type}_{self._module_id}_valve_tracker",
+        self._valve_tracker: SharedMemoryArray = self._create_array(
+            name=f"{self._tracker_prefix}_valve_tracker",
             prototype=np.zeros(shape=1, dtype=np.float64),
-            exists_ok=True,
         )
         self._previous_state: bool = False
         self._cycle_timer: PrecisionTimer | None = None
         self._previous_volume: np.float64 = np.float64(0.0)
-
-    def __del__(self) -> None:
-        """Ensures the reward tracker is properly cleaned up when the class is garbage-collected."""
-        self._valve_tracker.disconnect()
-        self._valve_tracker.destroy()
+        self._edge_timer: PrecisionTimer | None = None
+        self._edge_received: bool = False
 
     def initialize_remote_assets(self) -> None:
         """Connects to the reward tracker SharedMemoryArray and initializes the cycle PrecisionTimer from the
         Communication process.
         """
         self._valve_tracker.connect()
-        self._cycle_timer = PrecisionTimer("us")
+        self._cycle_timer = self._timer_factory("us")
+        self._edge_timer = self._timer_factory("us")
+        super().initialize_remote_assets()
 
     def terminate_remote_assets(self) -> None:
         """Disconnects from the reward tracker SharedMemoryArray."""
         self._valve_tracker.disconnect()
+        super().terminate_remote_assets()
 
     def process_received_data(self, message: ModuleData | ModuleState) -> None:
         """Processes incoming data sent by the module to the PC."""
+        self._count_message(message)
+
+        # Records the time of each valve state report, as switching the valve may produce lick sensor artifacts.
+        if message.event in (_ValveStateCodes.VALVE_OPEN, _ValveStateCodes.VALVE_CLOSED):
+            self._edge_timer.reset()  # type: ignore[union-attr]
+            self._edge_received = True
+
         if message.event == _ValveStateCodes.VALVE_OPEN:
             if self._debug:
                 console.echo("Valve Opened")
@@ -308,6 +924,19 @@ class ValveInterface(ModuleInterface):
         self.send_parameters(parameter_data=(pulse_duration, _VALVE_CALIBRAZTION_COUNT))
         self.send_command(command=np.uint8(4), noblock=_BOOL_FALSE, repetition_delay=_ZERO_LONG)
 
+    def time_since_edge(self) -> int | None:
+        """Returns the time, in microseconds, elapsed since the valve last reported opening or closing.
+
+        Notes:
+            This method is only used by the LickInterface instances running in the Communication process.
+
+        Returns:
+            The elapsed time, in microseconds, or None, if the valve did not report opening or closing yet.
+        """
+        if not self._edge_received:
+            return None
+        return int(self._edge_timer.elapsed)  # type: ignore[union-attr]
+
     @property
     def scale_coefficient(self) -> np.float64:
         """Returns the scaling coefficient (A) derived during the power-law calibration.
@@ -334,15 +963,30 @@ class ValveInterface(ModuleInterface):
         return self._valve_tracker[0]  # type: ignore[no-any-return]
 
 
-class LickInterface(ModuleInterface):
+class LickInterface(_ConfigurableInterface):
     """Interfaces with LickModule instances running on Ataraxis MicroControllers.
 
     LickModule monitor conductive lick sensors to detect animal interactions with fluid dispensing tubes (lick-ports).
 
+    Notes:
+        The sensor parameters and the lick threshold can be changed during runtime via the update_parameters() method.
+        Once the AMCInterface sends the new parameters during its apply_parameter_updates() call, the communication
+        process switches to the new lick threshold before processing the next received readout and records the number
+        of readouts processed before the switch, which allows reproducing the runtime lick classification exactly
+        during data processing. The requested parameters are not used until they are sent and logged.
+
+        The readouts received shortly after any of the monitored valves opened or closed are ignored by the lick
+        detection, as switching the valves can induce voltage transients that would otherwise be detected as licks.
+
     Args:
         module_id: The unique identifier for the LickModule instance.
         debug: A boolean flag that configures the interface to dump certain data received from the microcontroller into
             the terminal. This is used during debugging and system calibration and should be disabled for most runtimes.
+        controller_id: The unique identifier of the microcontroller that manages the module.
+        valves: The ValveInterface instances managed by the same microcontroller whose state reports start the artifact
+            suppression window.
+        artifact_window: The duration, in microseconds, of the window after each valve opening or closing during which
+            the readouts are ignored by the lick detection. A value of 0 disables the suppression.
 
     Attributes:
         _lick_threshold: Stores the threshold voltage to use for detecting a tongue contact.
@@ -353,9 +997,21 @@ class LickInterface(ModuleInterface):
             initialization.
         _previous_readout_zero: Stores a boolean indicator of whether the previous voltage readout was a 0-value.
         _once: Ensures that the sensor detection configuration is applied exactly once per instance life cycle.
+        _valves: Stores the ValveInterface instances whose state reports start the artifact suppression window.
+        _artifact_window: Stores the duration, in microseconds, of the artifact suppression window.
     """
 
-    def __init__(self, module_id: np.uint8, *, debug: bool = False) -> None:
+    _applied_by_communication_process = True
+
+    def __init__(
+        self,
+        module_id: np.uint8,
+        *,
+        debug: bool = False,
+        controller_id: np.uint8 = _CONTROLLED_ID,
+        valves: tuple[ValveInterface, ...] = (),
+        artifact_window: int = int(_VALVE_ARTIFACT_WINDOW),
+    ) -> None:
         data_codes: set[np.uint8] = {np.uint8(51)}  # kChanged
         self._debug: bool = debug
 
@@ -364,20 +1020,26 @@ class LickInterface(ModuleInterface):
             module_type=np.uint8(ModuleTypeCodes.LICK_MODULE),
             module_id=module_id,
             data_codes=data_codes,
-            error_codes=None,
+            controller_id=controller_id,
+            signal_threshold=int(_LICK_SIGNAL_THRESHOLD),
+            delta_threshold=int(_LICK_DELTA_THRESHOLD),
+            averaging_pool=int(_LICK_AVERAGING_POOL),
+            polling_delay=int(_LICK_POLLING_DELAY),
+            lick_threshold=int(_LICK_DETECTION_THRESHOLD),
         )
 
         self._lick_threshold: np.uint16 = _LICK_DETECTION_THRESHOLD
+        self._valves: tuple[ValveInterface, ...] = valves
+        self._artifact_window: int = artifact_window
 
         # Statically computes the voltage resolution of each analog step, assuming a 3.3V ADC with 12-bit resolution.
         self._volt_per_adc_unit: np.float64 = np.round(a=np.float64(3.3 / (2**12)), decimals=8)
 
         # Precreates a shared memory array used to track and share the total number of licks recorded by the sensor
         # since class initialization.
-        self._lick_tracker: SharedMemoryArray = SharedMemoryArray.create_array(
-            name=f"{self._module_type}_{self._module_id}_lick_tracker",
+        self._lick_tracker: SharedMemoryArray = self._create_array(
+            name=f"{self._tracker_prefix}_lick_tracker",
             prototype=np.zeros(shape=1, dtype=np.uint64),
-            exists_ok=True,
         )
 
         # Precreates storage variables used to prevent excessive lick reporting
@@ -385,21 +1047,23 @@ class LickInterface(ModuleInterface):
 
         self._once: bool = True
 
-    def __del__(self) -> None:
-        """Ensures the lick_tracker is properly cleaned up when the class is garbage-collected."""
-        self._lick_tracker.disconnect()
-        self._lick_tracker.destroy()
-
     def initialize_remote_assets(self) -> None:
         """Connects to the SharedMemoryArray used to communicate lick status to other processes."""
         self._lick_tracker.connect()
+        super().initialize_remote_assets()
 
     def terminate_remote_assets(self) -> None:
         """Disconnects from the lick-tracker SharedMemoryArray."""
         self._lick_tracker.disconnect()  # Does not destroy the array to support start / stop cycling.
+        super().terminate_remote_assets()
 
     def process_received_data(self, message: ModuleData | ModuleState) -> None:
         """Processes incoming data sent by the module to the PC."""
+        self._count_message(message)
+        if self._switch_parameters():
+            self._lick_threshold = np.uint16(self._get_parameter(_ParameterFields.APPLIED_LICK_THRESHOLD))
+        self._processed_messages += 1
+
         # Currently, only code 51 messages are passed to this method. From each, extracts the detected voltage level.
         detected_voltage: np.uint16 = message.data_object  # type: ignore[union-attr, assignment]
 
@@ -407,6 +1071,11 @@ class LickInterface(ModuleInterface):
         if self._debug:
             console.echo(f"Lick ADC signal: {detected_voltage}")
 
+        # Ignores the readouts received during the artifact suppression window. The ignored readouts neither count as
+        # licks nor re-arm the detection, so a tongue contact that spans the window is still counted only once.
+        if self._artifact_window > 0 and self._in_artifact_window():
+            return
+
         # Since the sensor is pulled to 0 to indicate lack of tongue contact, a zero-readout necessarily means no
         # lick. Sets zero-tracker to 1 to indicate that a zero-state has been encountered
         if detected_voltage == 0:
@@ -426,17 +1095,45 @@ class LickInterface(ModuleInterface):
             # This disables further reports until the sensor sends a zero-value again
             self._previous_readout_zero = False
 
-    def check_state(self, repetition_delay: np.uint32 = _LICK_POLLING_DELAY) -> None:
+    def _send_configuration(self, parameters: "NDArray[np.uint64]", *, restart: bool = True) -> None:
+        """Sends the sensor parameters stored in the input parameter channel snapshot to the module."""
+        self.send_parameters(
+            parameter_data=(
+                np.uint16(parameters[_ParameterFields.SIGNAL_THRESHOLD]),
+                np.uint16(parameters[_ParameterFields.DELTA_THRESHOLD]),
+                np.uint8(parameters[_ParameterFields.AVERAGING_POOL]),
+            )
+        )
+        if restart and self._polling:
+            self.send_command(
+                command=np.uint8(1),
+                noblock=_BOOL_FALSE,
+                repetition_delay=np.uint32(parameters[_ParameterFields.POLLING_DELAY]),
+            )
+
+    def _in_artifact_window(self) -> bool:
+        """Determines whether any of the monitored valves opened or closed during the artifact suppression window."""
+        for valve in self._valves:
+            elapsed = valve.time_since_edge()
+            if elapsed is not None and elapsed < self._artifact_window:
+                return True
+        return False
+
+    def check_state(self, repetition_delay: np.uint32 | None = None) -> None:
         """Checks and reports the voltage level detected by the lick sensor to the PC.
 
         Args:
             repetition_delay: The time, in microseconds, to delay before repeating the command. When set to 0, the
-                command only runs once.
+                command only runs once. If not provided, uses the polling delay stored in the parameter channel.
         """
         # Applies sensor configuration parameters the first time the method is called
         if self._once:
-            self.send_parameters(parameter_data=(_LICK_SIGNAL_THRESHOLD, _LICK_DELTA_THRESHOLD, _LICK_AVERAGING_POOL))
+            with self._parameter_channel.array(with_lock=True) as channel:
+                self._send_configuration(channel.copy(), restart=False)
             self._once = False
+        if repetition_delay is None:
+            repetition_delay = np.uint32(self._get_parameter(_ParameterFields.POLLING_DELAY))
+        self._polling = bool(repetition_delay > 0)
         self.send_command(command=np.uint8(1), noblock=_BOOL_FALSE, repetition_delay=repetition_delay)
 
     def get_adc_units_from_volts(self, voltage: float) -> np.uint16:
@@ -468,25 +1165,56 @@ class LickInterface(ModuleInterface):
     @property
     def lick_threshold(self) -> np.uint16:
         """Returns the voltage threshold, in raw ADC units of a 12-bit Analog-to-Digital voltage converter that is
-        interpreted as the animal licking the sensor.
+        interpreted as the animal licking the sensor at the onset of the runtime.
+
+        Notes:
+            The thresholds applied during runtime are logged as parameter change events.
         """
         return self._lick_threshold
 
+    @property
+    def artifact_window(self) -> int:
+        """Returns the duration, in microseconds, of the window after each valve opening or closing during which the
+        readouts are ignored by the lick detection.
+        """
+        return self._artifact_window
+
 
-class AnalogInterface(ModuleInterface):
+class AnalogInterface(_ConfigurableInterface):
     """Interfaces with AnalogModule instances running on Ataraxis MicroControllers.
 
+    Notes:
+        The module supports two acquisition modes. In the default mode, each sample is sent to the PC as a separate
+        message. In the batched mode, the module sends the samples in batches of up to 15 samples, and the
+        timestamps of individual samples are reconstructed during data processing.
+
+        The signal threshold, the averaging pool, and the polling delay can be changed during runtime via the
+        update_parameters() method. If the module is polling, it is restarted using the new parameters. The
+        communication process records the number of messages received before each change of the parameters, which
+        allows reconstructing the sampling interval used by each batch during data processing.
 
     Args:
         module_id: The unique identifier for the AnalogModule instance.
+        debug: A boolean flag that configures the interface to dump the received data into the terminal.
+        controller_id: The unique identifier of the microcontroller that manages the module.
 
     Attributes:
         _volt_per_adc_unit: Stores the conversion factor to translate the raw analog values recorded by the 12-bit ADC
             into voltage in Volts.
+        _sample_interval: Stores the interval, in microseconds, between the samples acquired in the batched mode at the
+            onset of the batched acquisition.
+        _batched: Tracks whether the module is configured to acquire the samples in the batched mode.
+        _batch_size: Stores the number of samples sent in each batch in the batched mode.
+        _analog_tracker: Stores the total number of samples received from the module since runtime onset.
+        _analog_trace: The ring buffer that stores the most recent samples received from the module.
+        _written_samples: Tracks the number of samples written to the ring buffer by the communication process.
+        _read_position: Tracks the number of samples already returned by the read_samples() method.
     """
 
-    def __init__(self, module_id: np.uint8, debug: bool = False) -> None:
-        data_codes: set[np.uint8] = {np.uint8(51)}  # kNonZero
+    _applied_by_communication_process = True
+
+    def __init__(self, module_id: np.uint8, debug: bool = False, *, controller_id: np.uint8 = _CONTROLLED_ID) -> None:
+        data_codes: set[np.uint8] = {np.uint8(51), np.uint8(52)}  # kNonZero, kBatch
         self._debug: bool = debug
 
         # Initializes the subclassed ModuleInterface using the input instance data. Type data is hardcoded.
@@ -494,55 +1222,237 @@ class AnalogInterface(ModuleInterface):
             module_type=np.uint8(ModuleTypeCodes.ANALOG_MODULE),  # ModuleTypeCodes.ANALOG_MODULE
             module_id=module_id,
             data_codes=data_codes,
-            error_codes=None,
+            controller_id=controller_id,
+            signal_threshold=int(_ANALOG_SIGNAL_THRESHOLD),
+            delta_threshold=0,
+            averaging_pool=int(_ANALOG_AVERAGING_POOL),
+            polling_delay=int(_ANALOG_POLLING_DELAY),
         )
 
         self._volt_per_adc_unit: np.float64 = np.round(a=np.float64(3.3 / (2**12)), decimals=8)
 
-        # We don't need any trackers for now, just need to initialize one for PC to detect the module
-        self._analog_tracker: SharedMemoryArray = SharedMemoryArray.create_array(
-            name=f"{self._module_type}_{self._module_id}_analog_tracker",
+        # The communication process writes each received sample to the trace ring buffer and then advances the sample
+        # counter stored in the tracker, so the main process can read the samples without acquiring the locks.
+        self._analog_tracker: SharedMemoryArray = self._create_array(
+            name=f"{self._tracker_prefix}_analog_tracker",
             prototype=np.zeros(shape=1, dtype=np.uint64),
-            exists_ok=True,
         )
+        self._analog_trace: SharedMemoryArray = self._create_array(
+            name=f"{self._tracker_prefix}_analog_trace",
+            prototype=np.zeros(shape=_ANALOG_TRACE_SIZE, dtype=np.uint16),
+        )
+        self._written_samples: int = 0
+        self._read_position: int = 0
 
         self._once: bool = True
-
-    def __del__(self) -> None:
-        """Ensures the lick_tracker is properly cleaned up when the class is garbage-collected."""
-        self._analog_tracker.disconnect()
-        self._analog_tracker.destroy()
+        self._sample_interval: np.uint32 = _ANALOG_BATCH_POLLING_DELAY
+        self._batched: bool = False
+        self._batch_size: np.uint8 = _ANALOG_BATCH_SIZE
 
     def initialize_remote_assets(self) -> None:
-        """Connects to the SharedMemoryArray used to communicate lick status to other processes."""
+        """Connects to the SharedMemoryArrays used to communicate the received samples to other processes."""
         self._analog_tracker.connect()
+        self._analog_trace.connect()
+        super().initialize_remote_assets()
 
     def terminate_remote_assets(self) -> None:
-        """Disconnects from the lick-tracker SharedMemoryArray."""
-        self._analog_tracker.disconnect()  # Does not destroy the array to support start / stop cycling.
+        """Disconnects from the analog tracker and trace SharedMemoryArrays."""
+        # Does not destroy the arrays to support start / stop cycling.
+        self._analog_tracker.disconnect()
+        self._analog_trace.disconnect()
+        super().terminate_remote_assets()
 
     def process_received_data(self, message: ModuleData | ModuleState) -> None:
         """Processes incoming data sent by the module to the PC."""
-        # Currently, only code 51 messages are passed to this method. From each, extracts the detected voltage level.
-        detected_voltage: np.uint16 = message.data_object  # type: ignore[union-attr, assignment]
+        self._count_message(message)
+        self._switch_parameters()
+        self._processed_messages += 1
+
+        # Code 51 messages carry a single voltage level, and code 52 messages carry a batch of voltage levels.
+        samples = np.atleast_1d(message.data_object)  # type: ignore[union-attr]
+
+        # Writes the samples to the ring buffer before advancing the counter, so that the main process never reads the
+        # samples that are still being written.
+        positions = np.arange(self._written_samples, self._written_samples + samples.size) % _ANALOG_TRACE_SIZE
+        with self._analog_trace.array(with_lock=False) as trace:
+            trace[positions] = samples
+        self._written_samples += samples.size
+        self._analog_tracker[0] = np.uint64(self._written_samples)
 
         # If the class is initialized in debug mode, prints each received voltage level to the terminal.
         if self._debug:
-            console.echo(f"Analog ADC signal: {detected_voltage}")
+            console.echo(f"Analog ADC signal: {message.data_object}")  # type: ignore[union-attr]
 
-    def check_state(self, repetition_delay: np.uint32 = _ANALOG_POLLING_DELAY) -> None:
+    def _send_configuration(self, parameters: "NDArray[np.uint64]", *, restart: bool = True) -> None:
+        """Sends the parameters stored in the input parameter channel snapshot to the module and, if the module is
+        polling, restarts the polling in the current acquisition mode.
+        """
+        signal_threshold = np.uint16(parameters[_ParameterFields.SIGNAL_THRESHOLD])
+        averaging_pool = np.uint8(parameters[_ParameterFields.AVERAGING_POOL])
+        polling_delay = np.uint32(parameters[_ParameterFields.POLLING_DELAY])
+        if self._batched:
+            self.send_parameters(parameter_data=(signal_threshold, averaging_pool, self._batch_size))
+        else:
+            self.send_parameters(parameter_data=(signal_threshold, averaging_pool))
+        if restart and self._polling:
+            command = np.uint8(2 if self._batched else 1)
+            self.send_command(command=command, noblock=_BOOL_FALSE, repetition_delay=polling_delay)
+
+    def check_state(self, repetition_delay: np.uint32 | None = None) -> None:
         """Checks and reports the voltage level detected by the photometry analog input to the PC.
 
         Args:
             repetition_delay: The time, in microseconds, to delay before repeating the command. When set to 0, the
-                command only runs once.
+                command only runs once. If not provided, uses the polling delay stored in the parameter channel.
         """
-        # Applies sensor configuration parameters the first time the method is called
-        if self._once:
-            self.send_parameters(parameter_data=(_ANALOG_SIGNAL_THRESHOLD, _ANALOG_AVERAGING_POOL))
+        # Applies sensor configuration parameters the first time the method is called or after the module was used in
+        # the batched mode.
+        if self._once or self._batched:
+            self._batched = False
+            with self._parameter_channel.array(with_lock=True) as channel:
+                self._send_configuration(channel.copy(), restart=False)
             self._once = False
+        if repetition_delay is None:
+            repetition_delay = np.uint32(self._get_parameter(_ParameterFields.POLLING_DELAY))
+        self._polling = bool(repetition_delay > 0)
         self.send_command(command=np.uint8(1), noblock=_BOOL_FALSE, repetition_delay=repetition_delay)
 
+    def check_state_batched(
+        self,
+        repetition_delay: np.uint32 = _ANALOG_BATCH_POLLING_DELAY,
+        batch_size: np.uint8 = _ANALOG_BATCH_SIZE,
+    ) -> None:
+        """Samples the photometry analog input at the requested interval and reports the samples to the PC in batches.
+
+        Notes:
+            This command requires the AnalogModule firmware that supports the batched acquisition (command code 2).
+            The sampling interval is sent as a parameter update, so the AMCInterface logs it as a parameter change event
+            once the communication process applies it. During data processing, the logged interval is used to
+            reconstruct the timestamp of each sample from the reception time of its batch. To change the sampling
+            interval during the acquisition, use the update_parameters() method, which also logs the change.
+
+        Args:
+            repetition_delay: The time, in microseconds, to delay between acquiring consecutive samples.
+            batch_size: The number of samples to accumulate before sending them to the PC. Has to be between 1 and 15.
+        """
+        if not 0 < batch_size <= _MAXIMUM_ANALOG_BATCH_SIZE:
+            message = (
+                f"Unable to start the batched acquisition for the AnalogModule {self._module_id}. The batch size has "
+                f"to be between 1 and {_MAXIMUM_ANALOG_BATCH_SIZE}, but got {batch_size}."
+            )
+            console.error(message=message, error=ValueError)
+
+        # Requests the batched polling delay as a new version of the parameters, so that the communication process
+        # records the message index at which the interval takes effect and the interval is logged by the next
+        # apply_parameter_updates() call. Storing the delay in the parameter channel also makes the parameter updates
+        # restart the batched acquisition at the same rate unless they change the polling delay.
+        with self._parameter_channel.array(with_lock=True) as channel:
+            channel[_ParameterFields.POLLING_DELAY] = repetition_delay
+            channel[_ParameterFields.REQUESTED_VERSION] += 1
+            parameters = channel.copy()
+        self._batch_size = np.uint8(batch_size)
+        self._sample_interval = np.uint32(repetition_delay)
+        self._batched = True
+        self._once = False
+        self._send_configuration(parameters, restart=False)
+        self._record_sent_parameters(parameters)
+        self._polling = bool(repetition_delay > 0)
+        self.send_command(command=np.uint8(2), noblock=_BOOL_FALSE, repetition_delay=repetition_delay)
+
+    def read_samples(self) -> "NDArray[np.uint16]":
+        """Returns the samples received from the module since the previous call to this method.
+
+        Notes:
+            This method has to be called from the main process, after connect_to_smh(). If the method is called less
+            frequently than the ring buffer fills up, only the most recent samples are returned.
+
+        Returns:
+            The one-dimensional numpy array that stores the new samples, in 12-bit ADC units, in the order they were
+            received.
+        """
+        written = int(self._analog_tracker[0])
+
+        # The communication process restarts the counter when the interface is stopped and started again.
+        if written < self._read_position:
+            self._read_position = 0
+        start = max(self._read_position, written - _ANALOG_TRACE_SIZE)
+        self._read_position = written
+        if written <= start:
+            return np.empty(shape=0, dtype=np.uint16)
+
+        positions = np.arange(start, written) % _ANALOG_TRACE_SIZE
+        with self._analog_trace.array(with_lock=False) as trace:
+            samples: NDArray[np.uint16] = trace[positions]  # Fancy indexing copies the samples out of the buffer
+        return samples
+
+    @property
+    def sample_interval(self) -> np.uint32:
+        """Returns the interval, in microseconds, between the samples acquired in the batched mode at the onset of the
+        batched acquisition.
+        """
+        return self._sample_interval
+
+    @property
+    def sample_count(self) -> np.uint64:
+        """Returns the total number of samples received from the module since runtime onset."""
+        return self._analog_tracker[0]  # type: ignore[no-any-return]
+
+
+def create_module_interfaces(
+    controller_id: np.uint8 = _CONTROLLED_ID, valve_artifact_window: int = int(_VALVE_ARTIFACT_WINDOW)
+) -> tuple[ValveInterface, ValveInterface, LickInterface, LickInterface, AnalogInterface]:
+    """Creates the interfaces of all hardware modules managed by the AMC microcontroller.
+
+    Notes:
+        This function is used by the AMCInterface class and by the session replay engine, which feeds the logged
+        module messages to the same interfaces without connecting to the microcontroller.
+
+    Args:
+        controller_id: The unique identifier of the microcontroller that manages the modules.
+        valve_artifact_window: The duration, in microseconds, of the window after each valve opening or closing during
+            which the lick sensor readouts are ignored by the runtime lick detection.
+
+    Returns:
+        The left valve, right valve, left lick sensor, right lick sensor, and analog input interfaces, in this order.
+    """
+    left_valve = ValveInterface(
+        module_id=np.uint8(1),
+        valve_calibration_data=_LEFT_VALVE_CALIBRATION_DATA,
+        debug=False,
+        controller_id=controller_id,
+    )
+
+    right_valve = ValveInterface(
+        module_id=np.uint8(2),
+        valve_calibration_data=_RIGHT_VALVE_CALIBRATION_DATA,
+        debug=False,
+        controller_id=controller_id,
+    )
+
+    left_lick_sensor = LickInterface(
+        module_id=np.uint8(1),
+        debug=False,
+        controller_id=controller_id,
+        valves=(left_valve, right_valve),
+        artifact_window=valve_artifact_window,
+    )
+
+    right_lick_sensor = LickInterface(
+        module_id=np.uint8(2),
+        debug=False,
+        controller_id=controller_id,
+        valves=(left_valve, right_valve),
+        artifact_window=valve_artifact_window,
+    )
+
+    analog_input = AnalogInterface(
+        module_id=np.uint8(1),
+        debug=False,
+        controller_id=controller_id,
+    )
+
+    return left_valve, right_valve, left_lick_sensor, right_lick_sensor, analog_input
+
 
 class AMCInterface:
     """Interfaces with all Ataraxis Micro Controller (AMC) interfaces used to acquire non-video behavior data.
@@ -554,66 +1464,89 @@ class AMCInterface:
         Calling the initializer does not start the underlying processes. Use the start() method before issuing other
         commands to properly initialize all remote processes.
 
+        To run several arenas from the same PC, create one instance for each arena's microcontroller, using a unique
+        controller ID and port for each instance, and the same DataLogger for all instances. Each instance runs its own
+        communication process, and the shared memory arrays of its modules are namespaced by the controller ID.
+
     Args:
         data_logger: The initialized DataLogger instance used to log the data generated by the managed microcontrollers.
             For most runtimes, this argument is resolved by the _MesoscopeExperiment or _BehaviorTraining classes that
             initialize this class.
+        link_configuration: The parameters of the serial link used to communicate with the microcontroller. If not
+            provided, uses the default configuration.
+        controller_id: The unique identifier of the microcontroller. Also used as the log source ID of the
+            microcontroller, so it has to be unique across all sources that use the same DataLogger.
+        port: The serial port used to communicate with the microcontroller.
+        valve_artifact_window: The duration, in microseconds, of the window after each valve opening or closing during
+            which the lick sensor readouts are ignored by the runtime lick detection. A value of 0 disables the
+            suppression.
+        parameter_source_id: The log source ID used by the parameter change events of the microcontroller's modules.
+            Has to be unique across all sources that use the same DataLogger, including the cameras and the other
+            microcontrollers.
+
+    Raises:
+        ValueError: If the parameter source ID is the same as the controller ID.
 
     Attributes:
         _started: Tracks whether the VR system and experiment runtime are currently running.
+        _controller_id: Stores the unique identifier of the microcontroller.
+        _parameter_source_id: Stores the log source ID used by the parameter change events.
         _controller: The main interface for the Ataraxis Micro Controller (AMC) device managing the hardware modules.
-
+        _link_configuration: Stores the parameters of the serial link used to communicate with the microcontroller.
+        _runtime_timer: A PrecisionTimer instance initialized when the communication process is started to compute the
+            message rates reported by the link utilization report.
+        _logger_queue: Stores the DataLogger input queue used to log the parameter change events.
+        _session_directory: Stores the path to the session directory that contains the DataLogger output directory.
+        _event_timer: A PrecisionTimer instance initialized when the communication process is started to timestamp the
+            parameter change events.
     """
 
-    def __init__(self, data_logger: DataLogger) -> None:
+    def __init__(
+        self,
+        data_logger: DataLogger,
+        link_configuration: LinkConfiguration | None = None,
+        *,
+        controller_id: np.uint8 = _CONTROLLED_ID,
+        port: str = _CONTROLLER_PORT,
+        valve_artifact_window: int = int(_VALVE_ARTIFACT_WINDOW),
+        parameter_source_id: np.uint8 = _PARAMETER_SOURCE_ID,
+    ) -> None:
         # Initializes the start state tracker first
         self._started: bool = False
-
-        # Module interfaces:
-        self.left_valve = ValveInterface(
-            module_id=np.uint8(1),
-            valve_calibration_data=_LEFT_VALVE_CALIBRATION_DATA,
-            debug=False,
-        )
-
-        self.right_valve = ValveInterface(
-            module_id=np.uint8(2),
-            valve_calibration_data=_RIGHT_VALVE_CALIBRATION_DATA,
-            debug=False,
-        )
-
-        self.left_lick_sensor = LickInterface(
-            module_id=np.uint8(1),
-            debug=False,
-        )
-
-        self.right_lick_sensor = LickInterface(
-            module_id=np.uint8(2),
-            debug=False,
+        self._controller_id: np.uint8 = np.uint8(controller_id)
+        self._parameter_source_id: np.uint8 = np.uint8(parameter_source_id)
+        if self._parameter_source_id == self._controller_id:
+            message = (
+                f"Unable to initialize the AMC Interface {controller_id}. The parameter source ID has to be different "
+                f"from the controller ID, but both are {controller_id}."
+            )
+            console.error(message=message, error=ValueError)
+        self._port: str = port
+        self._runtime_timer: PrecisionTimer | None = None
+        self._logger_queue = data_logger.input_queue
+        self._session_directory: Path = data_logger.output_directory.parent
+        self._event_timer: PrecisionTimer | None = None
+        self._link_configuration: LinkConfiguration = (
+            link_configuration if link_configuration is not None else LinkConfiguration()
         )
 
-        self.analog_input = AnalogInterface(
-            module_id=np.uint8(1),
-            debug=False,
+        # Module interfaces:
+        self.module_interfaces = create_module_interfaces(
+            controller_id=self._controller_id, valve_artifact_window=valve_artifact_window
         )
-
-        self.module_interfaces = (
-            self.left_valve,
-            self.right_valve,
-            self.left_lick_sensor,
-            self.right_lick_sensor,
-            self.analog_input,
+        self.left_valve, self.right_valve, self.left_lick_sensor, self.right_lick_sensor, self.analog_input = (
+            self.module_interfaces
         )
 
         # Main interface:
         self._controller: MicroControllerInterface = MicroControllerInterface(
-            controller_id=_CONTROLLED_ID,
-            buffer_size=_CONTROLLER_BUFFER_SIZE,
-            port=_CONTROLLER_PORT,
+            controller_id=self._controller_id,
+            buffer_size=self._link_configuration.buffer_size,
+            port=port,
             data_logger=data_logger,
             module_interfaces=self.module_interfaces,
-            baudrate=_CONTROLLER_BAUDRATE,
-            keepalive_interval=_CONTROLLER_KEEPALIVE_INTERVAL,
+            baudrate=self._link_configuration.baudrate,
+            keepalive_interval=self._link_configuration.keepalive_interval,
         )
 
     def __del__(self) -> None:
@@ -630,16 +1563,37 @@ class AMCInterface:
         if self._started:
             return
 
-        message = "Initializing the Ataraxis Micro Controller (AMC) Interface..."
+        message = f"Initializing the Ataraxis Micro Controller (AMC) {self._controller_id} Interface..."
         console.echo(message=message, level=LogLevel.INFO)
 
         # Starts all microcontroller communication process
         self._controller.start()
+        self._runtime_timer = PrecisionTimer("ms")
+
+        # Logs the onset of the parameter change event timestamps. Similar to the microcontroller messages, the events
+        # are timestamped relative to this onset.
+        onset: NDArray[np.uint8] = get_timestamp(output_format=TimestampFormats.BYTES)  # type: ignore[assignment]
+        self._event_timer = PrecisionTimer("us")
+        self._logger_queue.put(
+            LogPackage(
+                source_id=self._parameter_source_id,
+                acquisition_time=np.uint64(0),
+                serialized_data=onset,
+            )
+        )
+
+        # Records the runtime parameters that are not stored in the log, such as the valve artifact window, so that the
+        # session data is processed using the parameters used at runtime.
+        update_session_metadata(
+            output_directory=self._session_directory,
+            section=f"controller_{self._controller_id}",
+            data=asdict(self.parameters),
+        )
 
         # The setup procedure is complete.
         self._started = True
 
-        message = "Ataraxis Micro Controller (AMC) Interface: Initialized."
+        message = f"Ataraxis Micro Controller (AMC) {self._controller_id} Interface: Initialized."
         console.echo(message=message, level=LogLevel.SUCCESS)
 
     def stop(self) -> None:
@@ -650,7 +1604,7 @@ class AMCInterface:
         if not self._started:
             return
 
-        message = "Terminating the Ataraxis Micro Controller (AMC) Interface..."
+        message = f"Terminating the Ataraxis Micro Controller (AMC) {self._controller_id} Interface..."
         console.echo(message=message, level=LogLevel.INFO)
 
         # Resets the _started tracker
@@ -659,7 +1613,7 @@ class AMCInterface:
         # Stops the microcontroller interface. This directly shuts down and resets all managed hardware modules.
         self._controller.stop()
 
-        message = "Ataraxis Micro Controller (AMC) Interface: Terminated."
+        message = f"Ataraxis Micro Controller (AMC) {self._controller_id} Interface: Terminated."
         console.echo(message=message, level=LogLevel.SUCCESS)
 
     def connect_to_smh(self) -> None:
@@ -672,6 +1626,37 @@ class AMCInterface:
         for module in self.module_interfaces:
             module.terminate_remote_assets()
 
+    def apply_parameter_updates(self) -> int:
+        """Sends the parameters requested for the lick sensors and the analog input to the microcontroller and logs
+        each newly applied set of parameters as a parameter change event.
+
+        Notes:
+            This method has to be called periodically from the main runtime loop, after connect_to_smh(). The logged
+            events allow reproducing the runtime lick classification during data processing, even if the lick
+            thresholds were changed during runtime.
+
+        Returns:
+            The number of logged parameter change events.
+        """
+        if not self._started or self._event_timer is None:
+            return 0
+
+        source_id = self._parameter_source_id
+        logged = 0
+        for module in (self.left_lick_sensor, self.right_lick_sensor, self.analog_input):
+            event = module.apply_parameter_updates()
+            if event is None:
+                continue
+            self._logger_queue.put(
+                LogPackage(
+                    source_id=source_id,
+                    acquisition_time=np.uint64(self._event_timer.elapsed),
+                    serialized_data=event.view(np.uint8),
+                )
+            )
+            logged += 1
+        return logged
+
     def dispensed_volume(self) -> np.float64:
         """Returns the total volume of fluid, in microliters, delivered by the two valves during the current
         runtime.
@@ -685,7 +1670,100 @@ class AMCInterface:
 
         return total_volume
 
+    def report_link_utilization(self) -> dict[str, float]:
+        """Prints and returns the utilization of the microcontroller-to-PC serial link by each hardware module.
+
+        Notes:
+            This method has to be called after connect_to_smh() and before disconnect_to_smh(). The utilization is
+            computed relative to the nominal UART link capacity (baudrate / 10 bytes per second). The Teensy USB serial
+            link is not limited by the baudrate, so the report is a conservative estimate of the remaining headroom.
+
+        Returns:
+            A dictionary that maps the name of each module and the 'total' key to the fraction of the link capacity
+            occupied by the module's messages, averaged over the runtime.
+        """
+        duration = max(self._runtime_timer.elapsed / 1000, 1e-3) if self._runtime_timer is not None else 1e-3
+        capacity = self._link_configuration.capacity
+        modules = (
+            ("left_valve", self.left_valve),
+            ("right_valve", self.right_valve),
+            ("left_lick_sensor", self.left_lick_sensor),
+            ("right_lick_sensor", self.right_lick_sensor),
+            ("analog_input", self.analog_input),
+        )
+
+        utilization: dict[str, float] = {}
+        total_rate = 1000 / self._link_configuration.keepalive_interval * _KEEPALIVE_MESSAGE_BYTES
+        peak_rate = total_rate
+        for name, module in modules:
+            messages, size, peak_messages = module.link_statistics
+            peak_messages = max(peak_messages, messages / duration)  # Accounts for the modules that rarely send data
+            byte_rate = size / duration
+            utilization[name] = byte_rate / capacity
+            total_rate += byte_rate
+            peak_rate += peak_messages * (size / messages if messages > 0 else 0)
+            console.echo(
+                message=(
+                    f"{name}: {messages} messages ({messages / duration:.1f} / s, peak {peak_messages:.1f} / s), "
+                    f"{byte_rate:.1f} B / s ({utilization[name]:.2%} of the link capacity)."
+                ),
+                level=LogLevel.INFO,
+            )
+        utilization["total"] = total_rate / capacity
+
+        # Since the module peaks may occur at different times, the sum of the peaks is the upper bound of the peak load.
+        console.echo(
+            message=(
+                f"Serial link utilization of the controller {self._controller_id}: {utilization['total']:.2%} of the "
+                f"{capacity:.0f} B / s link capacity on average, at most {peak_rate / capacity:.2%} at peak load."
+            ),
+            level=LogLevel.SUCCESS if peak_rate < capacity else LogLevel.WARNING,
+        )
+        return utilization
+
+    @property
+    def parameters(self) -> ControllerParameters:
+        """Returns the hardware module parameters used by this instance to interface with the microcontroller."""
+        return ControllerParameters(
+            controller_id=self.controller_id,
+            parameter_source_id=int(self._parameter_source_id),
+            left_valve_scale_coefficient=float(self.left_valve.scale_coefficient),
+            left_valve_nonlinearity_exponent=float(self.left_valve.nonlinearity_exponent),
+            right_valve_scale_coefficient=float(self.right_valve.scale_coefficient),
+            right_valve_nonlinearity_exponent=float(self.right_valve.nonlinearity_exponent),
+            left_lick_threshold=int(self.left_lick_sensor.lick_threshold),
+            right_lick_threshold=int(self.right_lick_sensor.lick_threshold),
+            analog_sample_interval_us=int(self.analog_input.sample_interval),
+            valve_artifact_window_us=self.left_lick_sensor.artifact_window,
+        )
+
+    @property
+    def link_configuration(self) -> LinkConfiguration:
+        """Returns the parameters of the serial link used to communicate with the microcontroller."""
+        return self._link_configuration
+
     @property
     def controller_id(self) -> int:
         """Returns the unique identifier code of the microcontroller."""
-        return int(_CONTROLLED_ID)
+        return int(self._controller_id)
+
+    @property
+    def port(self) -> str:
+        """Returns the serial port used to communicate with the microcontroller."""
+        return self._port
+
+    @property
+    def shared_memory_names(self) -> tuple[str, ...]:
+        """Returns the names of all shared memory buffers created by the interface and its modules.
+
+        The name of the MicroControllerInterface termination buffer follows the naming scheme of the library, as the
+        buffer itself is only created when the interface is started.
+        """
+        names = [f"{self.controller_id}_terminator_array"]
+        names.extend(
+            value.name
+            for module in self.module_interfaces
+            for value in vars(module).values()
+            if isinstance(value, SharedMemoryArray)
+        )
+        return tuple(names)
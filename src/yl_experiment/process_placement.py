@@ -0,0 +1,264 @@
+"""This module provides the process placement policy that assigns the acquisition processes to CPU cores.
+
+The microcontroller communication processes and the DataLogger process handle time-critical data, but they compete for
+the CPU with the video acquisition and encoding processes and the visualizer. The placement policy pins the
+communication and logger processes to reserved cores, raises their scheduling priority, and confines all other
+acquisition processes to the remaining cores. The applied placement is recorded in the session metadata file, so it can
+be related to the timing quality of each session.
+
+Example:
+    processes = SessionProcesses()
+    with processes.track("logger"):
+        data_logger = DataLogger(output_directory=output_dir, instance_name="linear_track")
+        data_logger.start()
+    with processes.track("controller_111"):
+        mc = AMCInterface(data_logger=data_logger)
+        mc.start()
+    ProcessPlacement().apply(output_directory=output_dir, processes=processes)
+"""
+
+import os
+import sys
+import json
+from typing import Any
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from collections.abc import Callable, Iterator
+
+import psutil
+from ataraxis_base_utilities import LogLevel, console
+
+# The name of the file that stores the session metadata in the session output directory.
+SESSION_METADATA_NAME = "session_metadata.json"
+
+# The minimum number of logical cores needed to reserve cores for the time-critical processes.
+_MINIMUM_CORE_COUNT = 4
+
+# The nice value used to raise the priority of the time-critical processes on non-Windows platforms. Lowering the nice
+# value requires elevated privileges on most systems.
+_RAISED_NICE_VALUE = -10
+
+
+def update_session_metadata(output_directory: Path, section: str, data: dict[str, Any]) -> None:
+    """Writes the data to the given section of the session metadata file, preserving all other sections.
+
+    Args:
+        output_directory: The path to the session output directory that stores the metadata file.
+        section: The name of the metadata section to write.
+        data: The JSON-serializable data to write to the section.
+    """
+    metadata_path = output_directory.joinpath(SESSION_METADATA_NAME)
+    metadata = json.loads(metadata_path.read_text(encoding="utf-8")) if metadata_path.exists() else {}
+    metadata[section] = data
+    metadata_path.write_text(json.dumps(metadata, indent=4), encoding="utf-8")
+
+
+def _list_child_processes() -> set[int]:
+    """Returns the IDs of the running child processes of the main process."""
+    return {process.pid for process in psutil.Process().children(recursive=False)}
+
+
+class SessionProcesses:
+    """Identifies the processes started by each component of the acquisition session.
+
+    Notes:
+        The acquisition libraries do not expose the IDs of their processes. Instead, the processes of each component are
+        identified as the child processes of the main process that appear while the component is created or started.
+        This also identifies the multiprocessing Manager server processes started when the DataLogger and the
+        microcontroller interfaces are created, which relay all data sent to the logger and the microcontrollers.
+
+        The components have to be created and started from the main thread, one at a time.
+
+    Args:
+        on_update: The optional callback called with the IDs of the processes started by each tracked component each
+            time a component exits the tracking context. Used to register the processes as soon as they are started.
+
+    Attributes:
+        _processes: Stores the IDs of the processes started by each tracked component.
+        _on_update: Stores the callback called each time a component exits the tracking context.
+    """
+
+    def __init__(self, on_update: Callable[[dict[str, tuple[int, ...]]], None] | None = None) -> None:
+        self._processes: dict[str, list[int]] = {}
+        self._on_update: Callable[[dict[str, tuple[int, ...]]], None] | None = on_update
+
+    @contextmanager
+    def track(self, name: str) -> Iterator[None]:
+        """Attributes all child processes started inside the context to the named component.
+
+        The processes are recorded even if the code inside the context raises an exception, so the processes of the
+        partially started components are also known. Tracking the same component several times adds the newly started
+        processes to its previously tracked processes.
+
+        Args:
+            name: The name of the component. The 'logger' component and the components whose names start with
+                'controller' are treated as time-critical by the ProcessPlacement class.
+        """
+        existing = _list_child_processes()
+        try:
+            yield
+        finally:
+            started = sorted(_list_child_processes() - existing)
+            self._processes.setdefault(name, []).extend(started)
+            if self._on_update is not None:
+                self._on_update(self.processes)
+
+    @property
+    def processes(self) -> dict[str, tuple[int, ...]]:
+        """Returns the IDs of the processes started by each tracked component."""
+        return {name: tuple(pids) for name, pids in self._processes.items()}
+
+
+@dataclass(frozen=True)
+class ProcessPlacement:
+    """Stores the CPU core assignment policy of the acquisition processes.
+
+    Notes:
+        The child processes inherit the core assignment of their parent, so the policy also applies to the FFMPEG
+        encoder processes started by the video system consumer processes.
+    """
+
+    enabled: bool = True
+    """Determines whether to apply the placement policy. If disabled, the operating system schedules all processes."""
+    communication_cores: tuple[int, ...] | None = None
+    """The logical cores reserved for the microcontroller communication processes. If not provided, uses the last
+    logical core."""
+    logger_cores: tuple[int, ...] | None = None
+    """The logical cores reserved for the DataLogger process. If not provided, uses the second to last logical core."""
+    raise_priority: bool = True
+    """Determines whether to raise the scheduling priority of the communication and logger processes."""
+    confine_main_process: bool = True
+    """Determines whether to confine the main process, which runs the task logic and the visualizer, to the shared
+    cores."""
+
+    def _resolve_cores(self) -> tuple[tuple[int, ...], tuple[int, ...], tuple[int, ...]]:
+        """Returns the communication, logger, and shared cores of this PC."""
+        cores = tuple(range(psutil.cpu_count(logical=True) or 1))
+        communication_cores = self.communication_cores if self.communication_cores is not None else cores[-1:]
+        logger_cores = self.logger_cores if self.logger_cores is not None else cores[-2:-1]
+
+        invalid = set(communication_cores + logger_cores) - set(cores)
+        if invalid:
+            message = (
+                f"Unable to apply the process placement. The reserved cores {sorted(invalid)} do not exist on this PC, "
+                f"which has {len(cores)} logical cores."
+            )
+            console.error(message=message, error=ValueError)
+
+        shared_cores = tuple(core for core in cores if core not in communication_cores and core not in logger_cores)
+        if not shared_cores:
+            message = "Unable to apply the process placement. The reserved cores leave no cores for other processes."
+            console.error(message=message, error=ValueError)
+        return communication_cores, logger_cores, shared_cores
+
+    def apply(self, output_directory: Path, processes: SessionProcesses) -> dict[str, Any]:
+        """Assigns all acquisition processes to their cores and records the placement in the session metadata.
+
+        This method has to be called after starting all acquisition components. The processes of the 'logger' component
+        are placed on the logger cores, and the processes of the components whose names start with 'controller' are
+        placed on the communication cores. The processes of all other components are confined to the shared cores.
+
+        Args:
+            output_directory: The path to the session output directory that stores the session metadata file.
+            processes: The SessionProcesses instance used to track the processes started by each session component.
+
+        Returns:
+            The dictionary that stores the applied placement of each process. The dictionary is also written to the
+            'process_placement' section of the session metadata file.
+        """
+        record: dict[str, Any] = {
+            "applied_at": datetime.now().astimezone().isoformat(timespec="seconds"),
+            "policy": asdict(self),
+            "logical_cores": psutil.cpu_count(logical=True),
+            "processes": {},
+        }
+        if not self.enabled:
+            update_session_metadata(output_directory=output_directory, section="process_placement", data=record)
+            return record
+
+        if (psutil.cpu_count(logical=True) or 1) < _MINIMUM_CORE_COUNT:
+            message = (
+                f"Unable to reserve cores for the time-critical processes, as this PC has fewer than "
+                f"{_MINIMUM_CORE_COUNT} logical cores. The operating system schedules all processes."
+            )
+            console.echo(message=message, level=LogLevel.WARNING)
+            record["policy"]["enabled"] = False
+            update_session_metadata(output_directory=output_directory, section="process_placement", data=record)
+            return record
+
+        communication_cores, logger_cores, shared_cores = self._resolve_cores()
+
+        # Assigns the cores and the priority to the processes of each session component.
+        placements: list[tuple[str, tuple[int, ...], tuple[int, ...], bool]] = []
+        for name, pids in processes.processes.items():
+            if name == "logger":
+                placements.append((name, pids, logger_cores, True))
+            elif name.startswith("controller"):
+                placements.append((name, pids, communication_cores, True))
+            else:
+                placements.append((name, pids, shared_cores, False))
+        if self.confine_main_process:
+            placements.append(("main", (os.getpid(),), shared_cores, False))
+
+        for name, pids, cores, critical in placements:
+            record["processes"][name] = [
+                placement
+                for pid in pids
+                if (placement := _place_process(pid=pid, cores=cores, raise_priority=critical and self.raise_priority))
+                is not None
+            ]
+
+        update_session_metadata(output_directory=output_directory, section="process_placement", data=record)
+        console.echo(
+            message=(
+                f"Process placement: applied. Communication cores: {list(communication_cores)}, logger cores: "
+                f"{list(logger_cores)}, shared cores: {list(shared_cores)}."
+            ),
+            level=LogLevel.SUCCESS,
+        )
+        return record
+
+
+def _place_process(pid: int, cores: tuple[int, ...], *, raise_priority: bool) -> dict[str, Any] | None:
+    """Pins the process and its child processes to the cores and optionally raises the process priority.
+
+    Args:
+        pid: The ID of the placed process.
+        cores: The logical cores the process is allowed to run on.
+        raise_priority: Determines whether to raise the scheduling priority of the process.
+
+    Returns:
+        The dictionary that stores the process ID, the applied cores, and the applied priority. The priority is None if
+        it was not changed. If the process is no longer running, returns None.
+    """
+    try:
+        process = psutil.Process(pid)
+    except psutil.NoSuchProcess:
+        console.echo(message=f"Unable to place the process {pid}, as it is not running.", level=LogLevel.WARNING)
+        return None
+    placement: dict[str, Any] = {"pid": pid, "cores": list(cores), "priority": None}
+
+    # The children of the main process are the placed acquisition processes, so they keep their own placement.
+    children = process.children(recursive=True) if pid != os.getpid() else []
+    try:
+        for placed_process in (process, *children):
+            placed_process.cpu_affinity(list(cores))
+    except (psutil.AccessDenied, psutil.NoSuchProcess):
+        console.echo(message=f"Unable to set the core affinity of the process {pid}.", level=LogLevel.WARNING)
+        placement["cores"] = None
+
+    if raise_priority:
+        if sys.platform == "win32":
+            priority = psutil.HIGH_PRIORITY_CLASS
+        else:
+            priority = _RAISED_NICE_VALUE
+        try:
+            process.nice(priority)
+            placement["priority"] = "high" if sys.platform == "win32" else priority
+        except (psutil.AccessDenied, psutil.NoSuchProcess):
+            message = f"Unable to raise the priority of the process {pid}. Elevated privileges may be required."
+            console.echo(message=message, level=LogLevel.WARNING)
+
+    return placement
@@ -0,0 +1,132 @@
+"""This module provides the manifest used to skip the processing steps whose inputs did not change since the last
+processing run.
+
+Each processed data directory stores a processing_manifest.json file. For every processing stage, the manifest
+records the hashes of the input log archives, the version of the parser code, the processing parameters and the
+names of the generated output files. A stage is only re-run if any of these change or if any output file is missing.
+
+The manifest also stores the size and the modification time of each hashed input file, so the inputs that did not
+change since they were last hashed are not hashed again.
+"""
+
+import json
+from typing import Any
+import hashlib
+import inspect
+from pathlib import Path
+
+from file_hashing import hash_file
+import data_processing
+import microcontroller
+
+# The name of the manifest file stored in each processed data directory.
+_MANIFEST_NAME = "processing_manifest.json"
+
+
+def get_parser_version() -> str:
+    """Returns the hash of the source code of the data_processing and the microcontroller modules.
+
+    The parsers depend on the constants and the parameter event layout defined in the microcontroller module. Any change
+    to either module invalidates all previously processed data, which forces the affected stages to be re-run.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for module in (data_processing, microcontroller):
+        digest.update(hash_file(Path(inspect.getfile(module))).encode())
+    return digest.hexdigest()
+
+
+class ProcessingManifest:
+    """Tracks the inputs, parameters, and outputs of each processing stage for a single processed data directory.
+
+    Args:
+        processed_directory: The path to the directory that stores the processed data and the manifest file.
+
+    Attributes:
+        _manifest_path: The path to the manifest .json file.
+        _parser_version: The hash of the parser source code used by this processing run.
+        _stages: Stores the records of all stages that were previously processed.
+        _files: Stores the size, the modification time, and the hash of each previously hashed input file.
+    """
+
+    def __init__(self, processed_directory: Path) -> None:
+        self._manifest_path: Path = processed_directory.joinpath(_MANIFEST_NAME)
+        self._parser_version: str = get_parser_version()
+        self._stages: dict[str, dict[str, Any]] = {}
+        self._files: dict[str, dict[str, Any]] = {}
+
+        # Loads the existing manifest. Unreadable manifests are treated as missing, which re-runs all stages.
+        if self._manifest_path.exists():
+            try:
+                manifest = json.loads(self._manifest_path.read_text(encoding="utf-8"))
+                self._stages = manifest.get("stages", {})
+                self._files = manifest.get("files", {})
+            except (json.JSONDecodeError, AttributeError):
+                self._stages = {}
+                self._files = {}
+
+    def _hash_input(self, path: Path) -> str:
+        """Returns the hash of the input file, reusing the stored hash if the file size and modification time did not
+        change since the file was last hashed.
+        """
+        stat = path.stat()
+        key = path.resolve().as_posix()
+        cached = self._files.get(key)
+        if cached is not None and cached.get("size") == stat.st_size and cached.get("mtime_ns") == stat.st_mtime_ns:
+            return str(cached["hash"])
+
+        file_hash = hash_file(path)
+        self._files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": file_hash}
+        return file_hash
+
+    def create_record(self, inputs: tuple[Path, ...], parameters: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Creates the record that identifies a single run of the processing stage.
+
+        Args:
+            inputs: The paths to the input files used by the stage.
+            parameters: The JSON-serializable parameters used by the stage.
+
+        Returns:
+            The dictionary that stores the parser version, the processing parameters, and the input file hashes.
+        """
+        return {
+            "parser_version": self._parser_version,
+            "parameters": parameters if parameters is not None else {},
+            "inputs": {path.name: self._hash_input(path) for path in sorted(inputs)},
+        }
+
+    def is_current(self, stage: str, record: dict[str, Any]) -> bool:
+        """Determines whether the stage was already processed from the same inputs and parameters.
+
+        Args:
+            stage: The name of the processing stage.
+            record: The record of the pending stage run, generated by the create_record() method.
+
+        Returns:
+            True if the stage does not need to be re-run and False otherwise.
+        """
+        previous = self._stages.get(stage)
+        if previous is None or {key: previous.get(key) for key in record} != record:
+            return False
+
+        # Ensures all outputs generated by the previous run still exist.
+        directory = self._manifest_path.parent
+        return all(directory.joinpath(name).exists() for name in previous.get("outputs", ()))
+
+    def update(self, stage: str, record: dict[str, Any], outputs: tuple[Path, ...]) -> None:
+        """Records the completed stage run and saves the manifest to disk.
+
+        Args:
+            stage: The name of the processing stage.
+            record: The record of the completed stage run, generated by the create_record() method.
+            outputs: The paths to the files generated by the stage.
+        """
+        # Output paths are stored relative to the manifest directory, which supports outputs saved to subdirectories.
+        directory = self._manifest_path.parent
+        self._stages[stage] = {**record, "outputs": sorted(path.relative_to(directory).as_posix() for path in outputs)}
+
+        # Writes the manifest to a temporary file first, so that interrupted runs never leave a corrupted manifest.
+        temporary_path = self._manifest_path.with_suffix(".tmp")
+        temporary_path.write_text(
+            json.dumps({"stages": self._stages, "files": self._files}, indent=4), encoding="utf-8"
+        )
+        temporary_path.replace(self._manifest_path)
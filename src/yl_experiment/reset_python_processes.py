@@ -1,27 +1,23 @@
-import time
-import subprocess
+from session_resources import cleanup_sessions
+from ataraxis_base_utilities import LogLevel, console
 
-_CONTROLLER_PORT = "COM3"  # Update this to your controller's port
 
+def complete_reset() -> None:
+    """Terminates the processes of all crashed or hung sessions, releases their shared memory, and resets their
+    microcontrollers.
 
-def complete_reset():
-    """Completely resets the connection."""
-    # 1. Kill Python processes (Windows)
-    subprocess.run(["taskkill", "/F", "/IM", "python.exe"], check=False, stderr=subprocess.DEVNULL)
-    time.sleep(1)
+    Notes:
+        Only the resources recorded in the session registry are released, so unrelated Python processes keep running.
+        The sessions whose main process is still running and responsive are not affected. The microcontrollers are
+        reset using the ports recorded by each session.
+    """
+    if not console.enabled:
+        console.enable()
 
-    # 2. Reset via serial
-    try:
-        import serial
+    if cleanup_sessions() == 0:
+        console.echo(message="No crashed or hung sessions found.", level=LogLevel.INFO)
+    console.echo(message="Reset complete. Try running your test now.", level=LogLevel.SUCCESS)
 
-        ser = serial.Serial(_CONTROLLER_PORT, 115200)
-        ser.setDTR(False)
-        time.sleep(0.5)
-        ser.setDTR(True)
-        ser.close()
-    except:
-        pass
 
-    time.sleep(3)
-
-    print("Reset complete. Try running your test now.")
+if __name__ == "__main__":
+    complete_reset()
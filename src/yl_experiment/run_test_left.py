@@ -9,6 +9,7 @@ import keyboard
 from visualizers import BehaviorVisualizer
 from data_processing import process_microcontroller_log
 from microcontroller import AMCInterface
+from session_transfer import start_transfer, get_staging_directory
 from ataraxis_base_utilities import LogLevel, console, ensure_directory_exists
 from ataraxis_data_structures import DataLogger, assemble_log_archives
 
@@ -16,9 +17,11 @@ from ataraxis_data_structures import DataLogger, assemble_log_archives
 # with tempfile.TemporaryDirectory(delete=False) as temp_dir_path:
 # output_dir = Path(temp_dir_path).joinpath("test_output")
 
-output_dir = Path(
+_FINAL_OUTPUT_DIR = Path(
     "C:\\Users\\Changwoo\\Dropbox\\Research_projects\\dopamine\\mazes\\linear_track\\lickometer_test"
 ).joinpath("test_output")
+_USE_STAGING = False  # Acquires the data to the local staging directory first to keep the Dropbox client idle.
+output_dir = get_staging_directory(final_directory=_FINAL_OUTPUT_DIR) if _USE_STAGING else _FINAL_OUTPUT_DIR
 
 _REWARD_VOLUME = np.float64(10)  # 5 microliters
 
@@ -59,7 +62,7 @@ def run_test() -> None:
                 if valve_left_active:
                     mc.left_valve.dispense_volume(volume=_REWARD_VOLUME)
                     valve_left_active = False
-                    visualizer.add_left_valve_event()
+                    visualizer.add_left_valve_event(volume=_REWARD_VOLUME)
 
                     valve_left_deactivated_time = time.time()
 
@@ -108,3 +111,7 @@ def run_test() -> None:
 # Run test
 if __name__ == "__main__":
     run_test()
+
+    # Transfers the test data to the (Dropbox-synced) final directory in the background.
+    if _USE_STAGING:
+        start_transfer(source_directory=output_dir, destination_directory=_FINAL_OUTPUT_DIR)
@@ -0,0 +1,248 @@
+"""This module provides the catalog that summarizes all processed sessions of an experiment in a single Parquet file.
+
+The catalog stores one row of summary statistics for each session stored as root/<mouse>/<day>_<date>/processed. It
+is updated incrementally: only the sessions whose processed files changed since the last update are re-scanned.
+
+Example:
+    python session_catalog.py --root path/to/raw_data
+
+    catalog = load_catalog(root_directory=Path("path/to/raw_data"))
+    catalog.filter((pl.col("day") == "day_3") & (pl.col("left_rewards") + pl.col("right_rewards") > 100)).collect()
+"""
+
+import re
+import hashlib
+from pathlib import Path
+import argparse
+
+from tqdm import tqdm
+import polars as pl
+from data_processing import scan_dataframe
+from ataraxis_base_utilities import LogLevel, console
+
+# The name of the catalog file stored in the experiment root directory.
+_CATALOG_NAME = "session_catalog.parquet"
+
+# Extracts the experiment day (e.g. day_3) from the session directory name (e.g. day_3_20260301).
+_DAY_PATTERN = re.compile(r"^(day_\d+)")
+
+# The schema of the catalog table.
+_CATALOG_SCHEMA = {
+    "mouse": pl.String,
+    "session": pl.String,
+    "day": pl.String,
+    "session_path": pl.String,  # Relative to the root directory, so the catalog remains valid if the root is moved.
+    "signature": pl.String,
+    "duration_s": pl.Float64,
+    "left_licks": pl.UInt64,
+    "right_licks": pl.UInt64,
+    "left_rewards": pl.UInt64,
+    "right_rewards": pl.UInt64,
+    "dispensed_volume_uL": pl.Float64,
+    "left_camera_fps": pl.Float64,
+    "top_camera_fps": pl.Float64,
+    "right_camera_fps": pl.Float64,
+    "analog_samples": pl.UInt64,
+}
+
+
+def _find_file(processed_directory: Path, stem: str) -> Path | None:
+    """Returns the path to the processed data file with the given name, saved in any supported format."""
+    for suffix in (".feather", ".parquet"):
+        file = processed_directory.joinpath(f"{stem}{suffix}")
+        if file.exists():
+            return file
+    return None
+
+
+def _compute_signature(processed_directory: Path) -> str:
+    """Computes the signature of the processed data files stored in the directory.
+
+    The signature only depends on the names, sizes, and modification times of the files, so it is computed without
+    reading any data. Any reprocessing of the session changes the signature.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for file in sorted(processed_directory.iterdir()):
+        if file.suffix in {".feather", ".parquet"}:
+            stat = file.stat()
+            digest.update(f"{file.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
+
+
+def _summarize_session(session_directory: Path, signature: str) -> dict[str, object]:
+    """Computes the summary statistics of the processed session.
+
+    Notes:
+        All statistics are computed by aggregation queries over lazily scanned files, so only the aggregated columns
+        are loaded. The statistics that rely on missing files are set to None.
+
+    Args:
+        session_directory: The path to the session directory that stores the 'processed' subdirectory.
+        signature: The signature of the session's processed data files.
+
+    Returns:
+        A dictionary that stores the catalog row of the session.
+    """
+    processed_directory = session_directory.joinpath("processed")
+    day = _DAY_PATTERN.match(session_directory.name)
+    summary: dict[str, object] = {
+        "mouse": session_directory.parent.name,
+        "session": session_directory.name,
+        "day": day.group(1) if day is not None else None,
+        "session_path": f"{session_directory.parent.name}/{session_directory.name}",
+        "signature": signature,
+    }
+
+    # The session duration spans the earliest and the latest timestamp of the continuously sampled streams.
+    starts = []
+    ends = []
+    for stem in ("analog_signal", "left_lick_sensor", "right_lick_sensor"):
+        file = _find_file(processed_directory, stem)
+        if file is None:
+            continue
+        start, end = (
+            scan_dataframe(file)
+            .select(pl.col("time_us").min().alias("start"), pl.col("time_us").max().alias("end"))
+            .collect()
+            .row(0)
+        )
+        if start is not None:
+            starts.append(start)
+            ends.append(end)
+    summary["duration_s"] = (max(ends) - min(starts)) / 1e6 if starts else None
+
+    # The number of licks detected at runtime for each side. The files processed before the lick onsets were stored
+    # only contain the per-readout lick state, so for these files the licks are counted as the lick state rising edges.
+    for side in ("left", "right"):
+        file = _find_file(processed_directory, f"{side}_lick_sensor")
+        licks = None
+        if file is not None:
+            lick_data = scan_dataframe(file)
+            columns = lick_data.collect_schema().names()
+            if "lick_onset" in columns:
+                licks = lick_data.select(pl.col("lick_onset").cast(pl.UInt64).sum()).collect().item()
+            elif "lick_state" in columns:
+                state = pl.col("lick_state") > 0
+                edges = state & ~state.shift(1, fill_value=False)
+                licks = lick_data.select(edges.cast(pl.UInt64).sum()).collect().item()
+        summary[f"{side}_licks"] = licks
+
+    # The number of rewards delivered by each valve and the total dispensed volume.
+    volumes = []
+    for side in ("left", "right"):
+        file = _find_file(processed_directory, f"{side}_valve_pulses")
+        if file is None:
+            summary[f"{side}_rewards"] = None
+            continue
+        rewards, volume = (
+            scan_dataframe(file)
+            .select(pl.len().alias("rewards"), pl.col("dispensed_water_volume_uL").sum().alias("volume"))
+            .collect()
+            .row(0)
+        )
+        summary[f"{side}_rewards"] = rewards
+        volumes.append(volume)
+    summary["dispensed_volume_uL"] = sum(volumes) if volumes else None
+
+    # The acquisition frame rate of each camera.
+    for camera in ("left", "top", "right"):
+        file = _find_file(processed_directory, f"{camera}_camera_timestamps")
+        fps = None
+        if file is not None:
+            frames, start, end = (
+                scan_dataframe(file)
+                .select(pl.len(), pl.col("time_us").min().alias("start"), pl.col("time_us").max().alias("end"))
+                .collect()
+                .row(0)
+            )
+            if frames > 1 and end > start:
+                fps = (frames - 1) / ((end - start) / 1e6)
+        summary[f"{camera}_camera_fps"] = fps
+
+    file = _find_file(processed_directory, "analog_signal")
+    summary["analog_samples"] = scan_dataframe(file).select(pl.len()).collect().item() if file is not None else None
+
+    return summary
+
+
+def update_catalog(root_directory: Path) -> pl.DataFrame:
+    """Updates the session catalog stored in the root directory.
+
+    Notes:
+        Only the sessions that were added or reprocessed since the last update are scanned. The rows of the sessions
+        that no longer have processed data are removed from the catalog. The sessions that cannot be summarized, for
+        example, because their processed files are corrupted, are reported and left out of the catalog until the next
+        update.
+
+    Args:
+        root_directory: The path to the experiment root directory that stores the mouse directories.
+
+    Returns:
+        The updated catalog table.
+    """
+    catalog_path = root_directory.joinpath(_CATALOG_NAME)
+    catalog = pl.read_parquet(catalog_path) if catalog_path.exists() else pl.DataFrame(schema=_CATALOG_SCHEMA)
+    known_signatures = dict(zip(catalog["session_path"].to_list(), catalog["signature"].to_list(), strict=True))
+
+    # Finds the sessions whose processed data is not yet cataloged or has changed since the last update.
+    sessions = sorted(path.parent for path in root_directory.glob("*/*/processed") if path.is_dir())
+    signatures = {session: _compute_signature(session.joinpath("processed")) for session in sessions}
+    pending = [
+        session
+        for session in sessions
+        if known_signatures.get(session.relative_to(root_directory).as_posix()) != signatures[session]
+    ]
+
+    rows = []
+    for session in tqdm(pending, desc="Scanning sessions", unit="session", disable=not pending):
+        try:
+            rows.append(_summarize_session(session_directory=session, signature=signatures[session]))
+        except Exception as error:  # noqa: BLE001
+            # A single unreadable session should not prevent cataloging all other sessions.
+            console.echo(
+                message=f"Unable to summarize the session {session}: {type(error).__name__}: {error}",
+                level=LogLevel.WARNING,
+            )
+
+    # Keeps the unchanged rows of the sessions that still exist and appends the rows of the re-scanned sessions.
+    current_paths = [session.relative_to(root_directory).as_posix() for session in sessions if session not in pending]
+    catalog = pl.concat(
+        [
+            catalog.filter(pl.col("session_path").is_in(current_paths)),
+            pl.DataFrame(rows, schema=_CATALOG_SCHEMA),
+        ]
+    ).sort("mouse", "session")
+
+    catalog.write_parquet(file=catalog_path, compression="zstd", statistics=True)
+    console.echo(
+        message=f"Session catalog: updated. Scanned {len(pending)} out of {len(sessions)} sessions.",
+        level=LogLevel.SUCCESS,
+    )
+    return catalog
+
+
+def load_catalog(root_directory: Path) -> pl.LazyFrame:
+    """Lazily loads the session catalog stored in the root directory.
+
+    Args:
+        root_directory: The path to the experiment root directory that stores the catalog file.
+
+    Returns:
+        The Polars LazyFrame that can be used to query the catalog.
+    """
+    catalog_path = root_directory.joinpath(_CATALOG_NAME)
+    if not catalog_path.exists():
+        message = f"Unable to load the session catalog. No catalog file found in {root_directory}."
+        console.error(message=message, error=FileNotFoundError)
+    return pl.scan_parquet(source=catalog_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Updates the catalog of all processed sessions.")
+    parser.add_argument("--root", type=Path, required=True, help="The experiment root directory.")
+    arguments = parser.parse_args()
+
+    if not console.enabled:
+        console.enable()
+
+    update_catalog(root_directory=arguments.root)
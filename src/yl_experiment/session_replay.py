@@ -0,0 +1,409 @@
+"""This module provides the engine that replays the recorded sessions through the runtime control path.
+
+The engine reads the module messages logged by the AMC microcontroller and feeds the messages received from the valves
+and the lick sensors to the same ValveInterface and LickInterface classes used at runtime, in the order they were
+received. The interfaces and the task logic run on a virtual clock that is advanced to the reception time of each
+message and to the end of each task cycle, so the replay runs as fast as the messages can be processed while
+reproducing the runtime timing. The engine reports the task decisions caused by the replayed inputs, which allows
+regression testing and benchmarking the control path without the hardware.
+
+Example:
+    python session_replay.py path/to/linear_track_data_log/111_log.npz --task-open 300 --output replay.csv
+"""
+
+from pathlib import Path
+import argparse
+from dataclasses import fields, dataclass
+
+import numpy as np
+import polars as pl
+from task_logic import (
+    CYCLE_DURATION_US,
+    ALTERNATION_DELAY_US,
+    ACCLIMATION_DURATION_US,
+    TaskDecisions,
+    AlternationTask,
+)
+from ataraxis_time import PrecisionTimer
+from data_processing import (
+    MODULE_HEADER_SIZE,
+    parse_raw_entry,
+    read_task_times,
+    parse_message_data,
+    read_parameter_events,
+    get_threshold_schedule,
+    read_recorded_parameters,
+)
+from microcontroller import LickInterface, ValveInterface, ControllerParameters, create_module_interfaces
+from ataraxis_base_utilities import LogLevel, console
+from ataraxis_communication_interface import ModuleData, ModuleState
+from ataraxis_communication_interface.communication import SerialProtocols
+
+# The ID used to namespace the SharedMemoryArray instances of the replayed interfaces. Differs from the ID of the
+# runtime microcontroller, so sessions can be replayed on the acquisition PC while another session is running.
+_REPLAY_CONTROLLER_ID = np.uint8(250)
+
+# Maps the precision of the virtual timers to the number of microseconds in each timer unit.
+_PRECISION_FACTORS = {"us": 1, "ms": 1000, "s": 1000000}
+
+# The names of the task decisions reported as the replay events.
+_DECISION_NAMES = tuple(field.name for field in fields(TaskDecisions))
+
+
+class VirtualClock:
+    """Provides the session time to the replayed interfaces and the task logic.
+
+    The clock only moves when the replay engine advances it, so all timers created by the clock measure the session
+    time reconstructed from the logged message timestamps instead of the wall-clock time.
+
+    Attributes:
+        _now_us: Stores the current session time, in microseconds.
+    """
+
+    def __init__(self) -> None:
+        self._now_us: int = 0
+
+    def advance(self, time_us: int) -> None:
+        """Advances the clock to the input session time, in microseconds. The clock never moves backwards."""
+        self._now_us = max(self._now_us, time_us)
+
+    def timer(self, precision: str = "us") -> "VirtualTimer":
+        """Creates the timer that measures the time elapsed on this clock using the requested precision.
+
+        This method is passed to the set_timer_factory() method of the replayed interfaces.
+        """
+        return VirtualTimer(clock=self, precision=precision)
+
+    @property
+    def now_us(self) -> int:
+        """Returns the current session time, in microseconds."""
+        return self._now_us
+
+
+class VirtualTimer:
+    """Mimics the 'elapsed' property and the reset() method of the PrecisionTimer class using the VirtualClock time.
+
+    Args:
+        clock: The VirtualClock instance that provides the session time.
+        precision: The precision of the timer. Supported precisions are 'us', 'ms', and 's'.
+
+    Attributes:
+        _clock: Stores the VirtualClock instance.
+        _factor: Stores the number of microseconds in each timer unit.
+        _start: Stores the session time, in microseconds, at which the timer was last reset.
+    """
+
+    def __init__(self, clock: VirtualClock, precision: str = "us") -> None:
+        if precision not in _PRECISION_FACTORS:
+            message = (
+                f"Unsupported virtual timer precision {precision}. Use one of the supported precisions: "
+                f"{', '.join(_PRECISION_FACTORS)}."
+            )
+            console.error(message=message, error=ValueError)
+        self._clock: VirtualClock = clock
+        self._factor: int = _PRECISION_FACTORS[precision]
+        self._start: int = clock.now_us
+
+    def reset(self) -> None:
+        """Resets the timer to the current session time."""
+        self._start = self._clock.now_us
+
+    @property
+    def elapsed(self) -> int:
+        """Returns the time elapsed since the last reset, in the timer units."""
+        return (self._clock.now_us - self._start) // self._factor
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    """Stores the outcome of replaying a recorded session."""
+
+    events: pl.DataFrame
+    """Stores the task decisions made during the replay. The 'time_us' column stores the absolute UTC time of the task
+    cycle that made each decision, and the 'event' column stores the decision name ('task_opened', 'left_lick',
+    'right_lick', 'left_reward', or 'right_reward')."""
+    recorded_rewards: pl.DataFrame
+    """Stores the rewards dispensed during the recorded session. The 'time_us' column stores the absolute UTC time
+    the valve reported opening, and the 'event' column stores 'left_reward' or 'right_reward'. The rewards dispensed
+    manually during runtime are included."""
+    left_licks: int
+    """The number of licks detected by the replayed left lick sensor."""
+    right_licks: int
+    """The number of licks detected by the replayed right lick sensor."""
+    replayed_duration_s: float
+    """The duration of the replayed session, in seconds."""
+    processing_duration_s: float
+    """The time, in seconds, used to replay the session, excluding the time used to read the log archive."""
+
+    @property
+    def speedup(self) -> float:
+        """Returns the ratio of the replayed session duration to the time used to replay it."""
+        return self.replayed_duration_s / max(self.processing_duration_s, 1e-6)
+
+    def count(self, event: str) -> int:
+        """Returns the number of replayed task decisions with the given name."""
+        return int((self.events["event"] == event).sum())
+
+
+def _read_module_messages(
+    log_path: Path, interfaces: dict[tuple[int, int], ValveInterface | LickInterface]
+) -> tuple[int, list[tuple[int, ValveInterface | LickInterface, ModuleData | ModuleState]]]:
+    """Reads the messages received from the replayed modules from the microcontroller log archive.
+
+    Only the messages whose event codes are processed by the interface of the sending module are read, which matches
+    the messages passed to the interfaces by the communication process at runtime.
+
+    Args:
+        log_path: The path to the .npz log archive of the microcontroller.
+        interfaces: Maps the type and ID codes of each replayed module to its interface.
+
+    Returns:
+        A tuple of two elements. The first element is the onset of the microcontroller log, in microseconds elapsed
+        since UTC epoch onset. The second element is the list of (reception time, interface, message) tuples sorted by
+        the reception time, in microseconds elapsed since the log onset.
+    """
+    onset_us = 0
+    messages = []
+    with np.load(log_path, allow_pickle=False, fix_imports=False) as archive:
+        for item in archive.files:
+            time, payload = parse_raw_entry(archive[item])
+            if time == 0:
+                onset_us = int(payload.view(np.int64).item())
+                continue
+
+            protocol = payload[0]
+            if protocol not in (SerialProtocols.MODULE_DATA, SerialProtocols.MODULE_STATE):
+                continue
+            interface = interfaces.get((int(payload[1]), int(payload[2])))
+            if interface is None or payload[4] not in interface.data_codes:
+                continue
+
+            # The parsed message headers do not include the protocol code. The data message headers end with the code
+            # of the data object prototype.
+            message: ModuleData | ModuleState
+            if protocol == SerialProtocols.MODULE_DATA:
+                data = parse_message_data(payload)
+                if data is None:
+                    continue  # The data messages with unknown prototypes are also discarded at runtime.
+                message = ModuleData(message=payload[1 : MODULE_HEADER_SIZE + 1].copy(), data_object=data)
+            else:
+                message = ModuleState(message=payload[1:MODULE_HEADER_SIZE].copy())
+            messages.append((time, interface, message))
+
+    messages.sort(key=lambda received: received[0])
+    return onset_us, messages
+
+
+def _schedule_threshold_updates(
+    messages: list[tuple[int, ValveInterface | LickInterface, ModuleData | ModuleState]],
+    schedules: dict[LickInterface, tuple[tuple[int, int], ...]],
+) -> dict[int, list[tuple[LickInterface, int]]]:
+    """Maps the runtime lick threshold changes to the replayed messages before which they have to be requested.
+
+    At runtime, each lick sensor switches to the sent threshold before processing the readout whose index is stored as
+    the switch index of the parameter change event. Requesting and publishing the threshold before replaying the same
+    readout reproduces the runtime lick detection exactly.
+
+    Args:
+        messages: The replayed messages returned by the _read_module_messages() function.
+        schedules: Maps each replayed lick sensor to its (switch index, threshold) tuples.
+
+    Returns:
+        A dictionary that maps the indices of the replayed messages to the (lick sensor, threshold) tuples requested
+        before replaying each message.
+    """
+    updates: dict[int, list[tuple[LickInterface, int]]] = {}
+    processed = dict.fromkeys(schedules, 0)
+    pending = {sensor: list(schedule) for sensor, schedule in schedules.items()}
+    for index, (_, interface, _) in enumerate(messages):
+        if not isinstance(interface, LickInterface):
+            continue
+        while pending[interface] and pending[interface][0][0] <= processed[interface]:
+            _, threshold = pending[interface].pop(0)
+            updates.setdefault(index, []).append((interface, threshold))
+        processed[interface] += 1
+    return updates
+
+
+def replay_session(
+    log_path: Path,
+    parameters: ControllerParameters | None = None,
+    *,
+    task_start_us: int | None = None,
+    task_open_us: int | None = None,
+    acclimation_duration_us: int = ACCLIMATION_DURATION_US,
+    alternation_delay_us: int = ALTERNATION_DELAY_US,
+    controller_id: np.uint8 = _REPLAY_CONTROLLER_ID,
+) -> ReplayResult:
+    """Replays the recorded session through the valve and lick sensor interfaces and the task logic.
+
+    Notes:
+        The replayed valve messages are the messages recorded during the session, so the valve artifact suppression
+        windows match the runtime windows. The rewards decided by the replay are reported, but not dispensed.
+
+        The lick thresholds changed during runtime are applied before the same readouts they were applied to at
+        runtime. The task is updated once per task cycle, starting at the task start time, until the last replayed
+        message. Unless overridden, the task start and the manual task opening times are read from the session metadata
+        file. If the session did not record them, the task starts at the onset of the microcontroller log and opens
+        after the acclimation period.
+
+        Replayed sessions use the SharedMemoryArray instances namespaced by the replay controller ID, so sessions
+        replayed at the same time have to use different IDs.
+
+    Args:
+        log_path: The path to the .npz log archive of the microcontroller.
+        parameters: The hardware module parameters used at runtime to acquire the replayed session. If not provided,
+            uses the parameters created from the calibration data defined in the microcontroller module. The valve
+            artifact window is always read from the session metadata, as it is not stored in the log.
+        task_start_us: The time, in microseconds elapsed since the onset of the microcontroller log, at which the task
+            loop started. The acclimation period is counted from this time. If not provided, uses the recorded task
+            start time.
+        task_open_us: The time, in microseconds elapsed since the onset of the microcontroller log, at which the task
+            was opened manually. If not provided, uses the recorded manual opening time, if the task was opened
+            manually.
+        acclimation_duration_us: The duration, in microseconds, of the pre-task acclimation period.
+        alternation_delay_us: The delay, in microseconds, between each reward and the activation of the opposite valve.
+        controller_id: The ID used to namespace the SharedMemoryArray instances of the replayed interfaces.
+
+    Returns:
+        The ReplayResult instance that stores the replayed task decisions and the recorded rewards.
+    """
+    if parameters is None:
+        parameters = ControllerParameters.from_calibration()
+    parameters = read_recorded_parameters(log_directory=log_path.parent, parameters=parameters)
+
+    clock = VirtualClock()
+    left_valve, right_valve, left_sensor, right_sensor, analog_input = create_module_interfaces(
+        controller_id=controller_id, valve_artifact_window=parameters.valve_artifact_window_us
+    )
+    interfaces: dict[tuple[int, int], ValveInterface | LickInterface] = {
+        (int(interface.module_type), int(interface.module_id)): interface
+        for interface in (left_valve, right_valve, left_sensor, right_sensor)
+    }
+    for interface in interfaces.values():
+        interface.set_timer_factory(clock.timer)  # type: ignore[arg-type]
+        interface.initialize_remote_assets()
+
+    try:
+        onset_us, messages = _read_module_messages(log_path=log_path, interfaces=interfaces)
+        recorded_start, recorded_open = read_task_times(
+            session_directory=log_path.parent.parent, controller_id=int(parameters.controller_id)
+        )
+        if task_start_us is None:
+            task_start_us = max(recorded_start - onset_us, 0) if recorded_start is not None else 0
+        if task_open_us is None and recorded_open is not None:
+            task_open_us = recorded_open - onset_us
+        parameter_events = read_parameter_events(log_path.with_name(f"{parameters.parameter_source_id}_log.npz"))
+        updates = _schedule_threshold_updates(
+            messages=messages,
+            schedules={
+                sensor: get_threshold_schedule(parameter_events=parameter_events, module_id=int(sensor.module_id))
+                for sensor in (left_sensor, right_sensor)
+            },
+        )
+
+        valve_sides = {left_valve: "left_reward", right_valve: "right_reward"}
+        recorded_rewards = [
+            (time, valve_sides[interface])
+            for time, interface, message in messages
+            if interface in valve_sides and message.event == np.uint8(51)  # kOpen
+        ]
+
+        task = AlternationTask(
+            acclimation_duration_us=acclimation_duration_us, alternation_delay_us=alternation_delay_us
+        )
+        events: list[tuple[int, str]] = []
+        timer = PrecisionTimer("us")
+        index = 0
+
+        # Replays each message at its reception time. Task cycles end once every cycle duration, and the messages
+        # received before the end of the cycle are processed before the task is updated.
+        def replay_until(cycle_end: int) -> None:
+            nonlocal index
+            while index < len(messages) and messages[index][0] <= cycle_end:
+                time, interface, message = messages[index]
+                for sensor, threshold in updates.get(index, ()):
+                    sensor.update_parameters(lick_threshold=threshold)
+                    sensor.apply_parameter_updates(send=False)
+                clock.advance(time)
+                interface.process_received_data(message=message)
+                index += 1
+            clock.advance(cycle_end)
+
+        replay_until(cycle_end=task_start_us)
+        task.start(
+            time_us=task_start_us, left_licks=int(left_sensor.lick_count), right_licks=int(right_sensor.lick_count)
+        )
+        cycle_time = task_start_us
+        end_time = messages[-1][0] if messages else task_start_us
+        while cycle_time < end_time:
+            cycle_time += CYCLE_DURATION_US
+            replay_until(cycle_end=cycle_time)
+            decisions = task.update(
+                time_us=cycle_time,
+                left_licks=int(left_sensor.lick_count),
+                right_licks=int(right_sensor.lick_count),
+                open_task=task_open_us is not None and cycle_time >= task_open_us,
+            )
+            events.extend((cycle_time, name) for name in _DECISION_NAMES if getattr(decisions, name))
+        processing_duration = timer.elapsed / 1e6
+
+        left_licks, right_licks = int(left_sensor.lick_count), int(right_sensor.lick_count)
+    finally:
+        for interface in interfaces.values():
+            interface.terminate_remote_assets()
+            interface.release_shared_memory()
+        analog_input.release_shared_memory()  # The analog data is not replayed.
+
+    schema = {"time_us": pl.UInt64, "event": pl.String}
+    return ReplayResult(
+        events=pl.DataFrame([(onset_us + time, event) for time, event in events], schema=schema, orient="row"),
+        recorded_rewards=pl.DataFrame(
+            [(onset_us + time, event) for time, event in recorded_rewards], schema=schema, orient="row"
+        ),
+        left_licks=left_licks,
+        right_licks=right_licks,
+        replayed_duration_s=max(end_time - task_start_us, 0) / 1e6,
+        processing_duration_s=processing_duration,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replays a recorded session through the runtime control path.")
+    parser.add_argument("log_path", type=Path, help="The path to the .npz log archive of the microcontroller.")
+    parser.add_argument(
+        "--task-start",
+        type=float,
+        default=None,
+        help="Overrides the recorded task loop start time, in seconds elapsed since the log onset.",
+    )
+    parser.add_argument(
+        "--task-open",
+        type=float,
+        default=None,
+        help="Overrides the recorded manual task opening time, in seconds elapsed since the log onset.",
+    )
+    parser.add_argument("--output", type=Path, default=None, help="The optional .csv file to save the events to.")
+    arguments = parser.parse_args()
+
+    if not console.enabled:
+        console.enable()
+
+    result = replay_session(
+        log_path=arguments.log_path,
+        task_start_us=int(arguments.task_start * 1e6) if arguments.task_start is not None else None,
+        task_open_us=int(arguments.task_open * 1e6) if arguments.task_open is not None else None,
+    )
+    if arguments.output is not None:
+        result.events.write_csv(arguments.output)
+
+    recorded = result.recorded_rewards["event"]
+    console.echo(
+        message=(
+            f"Replayed {result.replayed_duration_s:.1f} s of the session in {result.processing_duration_s:.2f} s "
+            f"({result.speedup:.0f}x real time). Licks: {result.left_licks} left, {result.right_licks} right. "
+            f"Rewards: {result.count('left_reward')} left, {result.count('right_reward')} right (recorded: "
+            f"{int((recorded == 'left_reward').sum())} left, {int((recorded == 'right_reward').sum())} right)."
+        ),
+        level=LogLevel.SUCCESS,
+    )
@@ -0,0 +1,316 @@
+"""This module provides the registry of the processes and shared memory buffers used by each acquisition session and the
+cleanup command that releases them after a crash.
+
+Each running session records the IDs of its processes, the names of its shared memory buffers, and the serial ports of
+its microcontrollers in a registry file. The processes are registered as soon as they are started, so the resources of
+the sessions that crash during startup are also recorded. If the session crashes or hangs, the cleanup command
+terminates only the registered processes, releases the registered shared memory buffers, and resets the registered
+microcontrollers, which returns the rig to a startable state without affecting unrelated Python processes or the other
+sessions running on the same PC.
+
+Example:
+    python session_resources.py
+    python session_resources.py --session 12345
+"""
+
+import os
+import json
+import time
+from typing import Any
+from pathlib import Path
+import argparse
+from datetime import datetime
+import tempfile
+from multiprocessing.shared_memory import SharedMemory
+
+import psutil
+from binding_classes import VideoSystems
+from microcontroller import AMCInterface
+from logger_telemetry import LoggerTelemetry
+from ataraxis_base_utilities import LogLevel, console
+from ataraxis_data_structures import DataLogger
+
+# The directory that stores the registry files of all running sessions.
+REGISTRY_DIRECTORY = Path(tempfile.gettempdir()).joinpath("yl_experiment_resources")
+
+# The maximum time, in seconds, to wait for the terminated processes to exit before killing them.
+_TERMINATION_TIMEOUT = 0.3
+
+# The duration, in seconds, the DTR line is held low to reset the microcontroller.
+_DTR_RESET_DURATION = 0.05
+
+# The maximum difference, in seconds, between the recorded and the actual creation time of a registered process. The
+# creation time distinguishes the registered processes from unrelated processes that reuse their IDs.
+_CREATE_TIME_TOLERANCE = 0.01
+
+# The interval, in seconds, at which the running session refreshes the heartbeat stored in its registry file.
+_HEARTBEAT_INTERVAL = 5.0
+
+# The age, in seconds, of the heartbeat after which the session whose main process is still running is considered hung.
+_HEARTBEAT_TIMEOUT = 60.0
+
+
+def _describe_process(pid: int) -> dict[str, Any] | None:
+    """Returns the ID and the creation time of the process or None, if the process is not running."""
+    try:
+        return {"pid": pid, "create_time": psutil.Process(pid).create_time()}
+    except psutil.NoSuchProcess:
+        return None
+
+
+def _is_running(description: dict[str, Any] | None) -> bool:
+    """Determines whether the described process is still running and its ID was not reused by an unrelated process."""
+    if description is None:
+        return False
+    try:
+        process = psutil.Process(description["pid"])
+        return bool(abs(process.create_time() - description["create_time"]) <= _CREATE_TIME_TOLERANCE)
+    except psutil.NoSuchProcess:
+        return False
+
+
+class ResourceRegistry:
+    """Records the processes, shared memory buffers, and serial ports used by the acquisition session.
+
+    The registry is stored as the 'session_<pid>.json' file in the registry directory, where pid is the ID of the main
+    session process, which also serves as the session ID. The file is rewritten after each registration, so it always
+    reflects the resources of the running session, and is removed when the session ends normally. The running session
+    periodically refreshes the heartbeat stored in the file, which distinguishes hung sessions from healthy ones.
+
+    Args:
+        registry_directory: The path to the directory that stores the registry files of all sessions.
+
+    Attributes:
+        _registry_file: The path to the registry file of the session.
+        _record: The dictionary that stores the registered resources.
+    """
+
+    def __init__(self, registry_directory: Path = REGISTRY_DIRECTORY) -> None:
+        registry_directory.mkdir(parents=True, exist_ok=True)
+        self._registry_file: Path = registry_directory.joinpath(f"session_{os.getpid()}.json")
+        self._record: dict[str, Any] = {
+            "started": datetime.now().astimezone().isoformat(timespec="seconds"),
+            "owner": _describe_process(os.getpid()),
+            "heartbeat": time.time(),
+            "processes": {},
+            "shared_memory": [],
+            "ports": [],
+        }
+        self._write()
+
+    def _write(self) -> None:
+        """Refreshes the heartbeat and atomically writes the registered resources to the registry file."""
+        self._record["heartbeat"] = time.time()
+        partial_file = self._registry_file.with_suffix(".partial")
+        partial_file.write_text(json.dumps(self._record, indent=4), encoding="utf-8")
+        partial_file.replace(self._registry_file)
+
+    def register_processes(self, processes: dict[str, tuple[int, ...]]) -> None:
+        """Registers the processes started by each session component.
+
+        This method is intended to be used as the 'on_update' callback of the SessionProcesses class, which calls it
+        each time a component is created or started.
+
+        Args:
+            processes: The dictionary that maps the name of each session component to the IDs of its processes.
+        """
+        for name, pids in processes.items():
+            self._record["processes"][name] = [
+                description for pid in pids if (description := _describe_process(pid)) is not None
+            ]
+        self._write()
+
+    def register_session(
+        self,
+        data_logger: DataLogger,
+        microcontrollers: tuple[AMCInterface, ...] = (),
+        video_systems: VideoSystems | None = None,
+        telemetry: LoggerTelemetry | None = None,
+    ) -> None:
+        """Registers the shared memory buffers and the serial ports used by the session.
+
+        This method should be called as soon as the DataLogger, the microcontrollers, the video systems, and the
+        DataLogger telemetry monitor are created, before they are started.
+
+        Notes:
+            The termination buffers of the DataLogger, the microcontroller, and the VideoSystem instances are created
+            when the instances are started. Their names are derived from the public identifiers of the instances,
+            following the naming scheme used by the acquisition libraries.
+
+        Args:
+            data_logger: The DataLogger instance used by the session.
+            microcontrollers: The AMCInterface instances used by the session.
+            video_systems: The VideoSystems instance used by the session, if the session acquires video.
+            telemetry: The LoggerTelemetry instance that monitors the DataLogger, if the session monitors it.
+        """
+        names = [f"{data_logger.name}_terminator"]
+        if video_systems is not None:
+            names.extend(f"{camera.system_id}_terminator_array" for camera in video_systems.cameras.values())
+        for controller in microcontrollers:
+            names.extend(controller.shared_memory_names)
+            self._record["ports"].append(controller.port)
+        if telemetry is not None:
+            names.extend(telemetry.shared_memory_names)
+        self._record["shared_memory"] = sorted(set(self._record["shared_memory"]).union(names))
+        self._write()
+
+    def heartbeat(self) -> None:
+        """Refreshes the heartbeat of the session if it is older than the heartbeat interval.
+
+        This method should be called at each cycle of the session runtime loop. Sessions whose heartbeat is not
+        refreshed for more than a minute are treated as hung by the cleanup_sessions() function.
+        """
+        if time.time() - self._record["heartbeat"] >= _HEARTBEAT_INTERVAL:
+            self._write()
+
+    def close(self) -> None:
+        """Removes the registry file. This method should be called after all session resources are released."""
+        self._registry_file.unlink(missing_ok=True)
+
+
+def _terminate_processes(descriptions: list[dict[str, Any]]) -> int:
+    """Terminates the described processes that are still running and returns the number of terminated processes."""
+    processes = []
+    for description in descriptions:
+        if not _is_running(description):
+            continue  # The process has exited or its ID was reused by an unrelated process.
+        try:
+            process = psutil.Process(description["pid"])
+            process.terminate()
+            processes.append(process)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+
+    # Kills the processes that ignore the termination request.
+    _, alive = psutil.wait_procs(processes, timeout=_TERMINATION_TIMEOUT)
+    for process in alive:
+        try:
+            process.kill()
+        except psutil.NoSuchProcess:
+            continue
+    psutil.wait_procs(alive, timeout=_TERMINATION_TIMEOUT)
+    return len(processes)
+
+
+def _release_shared_memory(names: list[str]) -> int:
+    """Releases the named shared memory buffers and returns the number of released buffers.
+
+    On Windows, the buffers are released by the operating system once all processes that use them exit, so this only
+    has an effect on other platforms.
+    """
+    released = 0
+    for name in names:
+        try:
+            buffer = SharedMemory(name=name, create=False, track=False)
+        except FileNotFoundError:
+            continue
+        buffer.close()
+        buffer.unlink()
+        released += 1
+    return released
+
+
+def _reset_controllers(ports: list[str]) -> None:
+    """Resets the microcontrollers connected to the serial ports by toggling the DTR line."""
+    import serial  # noqa: PLC0415
+
+    for port in ports:
+        try:
+            connection = serial.Serial(port)
+            connection.dtr = False
+            time.sleep(_DTR_RESET_DURATION)
+            connection.dtr = True
+            connection.close()
+        except serial.SerialException:
+            console.echo(message=f"Unable to reset the microcontroller connected to {port}.", level=LogLevel.WARNING)
+
+
+def cleanup_sessions(
+    registry_directory: Path = REGISTRY_DIRECTORY,
+    session_ids: tuple[int, ...] | None = None,
+    *,
+    reset_controllers: bool = True,
+) -> int:
+    """Releases the resources of the crashed or hung registered sessions.
+
+    Notes:
+        By default, only the sessions whose main process is no longer running or whose heartbeat is older than one
+        minute are cleaned, so the healthy sessions running on the same PC are not affected. The sessions listed in
+        the 'session_ids' argument are cleaned regardless of their state.
+
+        This function only terminates the processes recorded in the registry files, including the main process of each
+        session, so it does not affect unrelated Python processes. Processes whose IDs were reused by unrelated
+        processes are recognized by their creation time and are not terminated.
+
+    Args:
+        registry_directory: The path to the directory that stores the registry files of all sessions.
+        session_ids: The IDs of the sessions to clean regardless of their state. The session ID is the ID of the main
+            session process. If not provided, only the crashed and hung sessions are cleaned.
+        reset_controllers: Determines whether to reset the microcontrollers used by the cleaned sessions.
+
+    Returns:
+        The number of cleaned sessions.
+    """
+    registry_files = sorted(registry_directory.glob("session_*.json")) if registry_directory.exists() else []
+    cleaned = 0
+    for registry_file in registry_files:
+        session_id = int(registry_file.stem.removeprefix("session_"))
+        if session_id == os.getpid() or (session_ids is not None and session_id not in session_ids):
+            continue
+
+        record = json.loads(registry_file.read_text(encoding="utf-8"))
+        hung = time.time() - record.get("heartbeat", 0.0) > _HEARTBEAT_TIMEOUT
+        if session_ids is None and _is_running(record["owner"]) and not hung:
+            console.echo(
+                message=(
+                    f"The session {session_id} started at {record['started']} is running. To clean it anyway, run "
+                    f"the cleanup with the '--session {session_id}' argument."
+                ),
+                level=LogLevel.INFO,
+            )
+            continue
+
+        # Terminates the main process first to prevent it from restarting the acquisition processes.
+        owner = [record["owner"]] if record["owner"] is not None else []
+        descriptions = [description for component in record["processes"].values() for description in component]
+        terminated = _terminate_processes(owner) + _terminate_processes(descriptions)
+        released = _release_shared_memory(record["shared_memory"])
+        if reset_controllers and record["ports"]:
+            _reset_controllers(record["ports"])
+        registry_file.unlink(missing_ok=True)
+
+        cleaned += 1
+
+        console.echo(
+            message=(
+                f"Cleaned the session {session_id} started at {record['started']}: terminated {terminated} processes "
+                f"and released {released} shared memory buffers."
+            ),
+            level=LogLevel.SUCCESS,
+        )
+    return cleaned
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Releases the resources of crashed or hung acquisition sessions.")
+    parser.add_argument("--registry", type=Path, default=REGISTRY_DIRECTORY, help="The registry file directory.")
+    parser.add_argument("--keep-controllers", action="store_true", help="Does not reset the microcontrollers.")
+    parser.add_argument(
+        "--session",
+        type=int,
+        nargs="+",
+        default=None,
+        help="The IDs of the sessions to clean even if they are running. By default, only crashed or hung sessions.",
+    )
+    arguments = parser.parse_args()
+
+    if not console.enabled:
+        console.enable()
+
+    cleaned = cleanup_sessions(
+        registry_directory=arguments.registry,
+        session_ids=tuple(arguments.session) if arguments.session is not None else None,
+        reset_controllers=not arguments.keep_controllers,
+    )
+    if cleaned == 0:
+        console.echo(message="No crashed or hung sessions found.", level=LogLevel.INFO)
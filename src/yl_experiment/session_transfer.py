@@ -0,0 +1,220 @@
+"""This module provides the tools used to acquire the session data to a fast local staging directory and move it to
+the final (Dropbox-synced) experiment directory after the session ends.
+
+Writing the raw log entries and the video files directly to a synced directory forces the Dropbox client to index and
+upload the files while they are being written, which competes with the acquisition for the disk and CPU time. In the
+staging mode, all session data is written to the local staging directory, and a low-priority background process copies
+the finished session to its final location once the runtime ends.
+
+Example:
+    python session_transfer.py --source path/to/staging/mouse/day --destination path/to/raw_data/mouse/day
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+from pathlib import Path
+import argparse
+from datetime import datetime
+import traceback
+import subprocess
+
+from file_hashing import hash_file
+from ataraxis_base_utilities import console
+
+# The root of the local directory used to acquire the session data before it is transferred to the final directory.
+STAGING_ROOT = Path.home().joinpath("yl_experiment_staging")
+
+# The size, in bytes, of the chunks used to copy and checksum the transferred files.
+_COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+# The name of the file that stores the checksums of all transferred files in the destination directory.
+_TRANSFER_MANIFEST_NAME = "transfer_manifest.json"
+
+# The Windows priority class that lowers both the CPU and the I/O priority of the calling process.
+_PROCESS_MODE_BACKGROUND_BEGIN = 0x00100000
+
+
+def get_staging_directory(final_directory: Path, staging_root: Path = STAGING_ROOT) -> Path:
+    """Returns the path to the local staging directory used to acquire the data of the session.
+
+    Args:
+        final_directory: The path to the final session directory, structured as root/<mouse>/<day>_<date>.
+        staging_root: The path to the local directory that stores all staged sessions.
+
+    Returns:
+        The path to the staging directory, structured as staging_root/<mouse>/<day>_<date>.
+    """
+    return staging_root.joinpath(final_directory.parent.name, final_directory.name)
+
+
+def _get_log_file(source_directory: Path) -> Path:
+    """Returns the path to the transfer log file, which is stored next to the staging directory of the session."""
+    return source_directory.with_name(f"{source_directory.name}_transfer.log")
+
+
+def _write_log(log_file: Path, message: str) -> None:
+    """Appends the timestamped message to the transfer log file."""
+    with log_file.open("a", encoding="utf-8") as log:
+        log.write(f"[{datetime.now().astimezone().isoformat(timespec='seconds')}] {message}\n")
+
+
+def _lower_process_priority() -> None:
+    """Lowers the CPU and I/O scheduling priority of the calling process.
+
+    On Windows, this uses the background processing mode, which also lowers the I/O and memory priority. On other
+    platforms, the CPU priority is lowered with nice, which also lowers the I/O priority for most I/O schedulers.
+    """
+    if sys.platform == "win32":
+        import ctypes  # noqa: PLC0415
+
+        kernel32 = ctypes.windll.kernel32
+        kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), _PROCESS_MODE_BACKGROUND_BEGIN)
+    else:
+        os.nice(19)
+
+
+def _copy_file(source_file: Path, destination_file: Path) -> str:
+    """Copies the file while computing its checksum and verifies the written copy against the checksum.
+
+    Notes:
+        The file is first written under a temporary '.partial' name and renamed only after the verification succeeds,
+        so the destination directory never contains incomplete files.
+
+    Args:
+        source_file: The path to the file to copy.
+        destination_file: The path to the copy of the file.
+
+    Returns:
+        The hexadecimal representation of the file checksum.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    partial_file = destination_file.with_name(f"{destination_file.name}.partial")
+    buffer = bytearray(_COPY_CHUNK_SIZE)
+    view = memoryview(buffer)
+    with source_file.open("rb") as source, partial_file.open("wb") as destination:
+        while size := source.readinto(buffer):
+            digest.update(view[:size])
+            destination.write(view[:size])
+        destination.flush()
+        os.fsync(destination.fileno())
+
+    checksum = digest.hexdigest()
+    if hash_file(partial_file) != checksum:
+        partial_file.unlink()
+        message = (
+            f"Unable to transfer {source_file} to {destination_file}. The checksum of the written copy does not match "
+            f"the checksum of the source file."
+        )
+        console.error(message=message, error=OSError)
+
+    partial_file.replace(destination_file)
+    return checksum
+
+
+def transfer_session(source_directory: Path, destination_directory: Path, *, remove_source: bool = True) -> None:
+    """Copies all files of the staged session to the destination directory and verifies their checksums.
+
+    Notes:
+        The transfer can be safely re-run after an interruption. Files that already exist in the destination directory
+        and match the checksum of the source file are not copied again. The source directory is only removed after
+        all files are transferred and verified.
+
+    Args:
+        source_directory: The path to the staging directory of the session.
+        destination_directory: The path to the final session directory.
+        remove_source: Determines whether to remove the staging directory after the transfer.
+    """
+    if not source_directory.is_dir():
+        message = f"Unable to transfer the session data. The staging directory {source_directory} does not exist."
+        console.error(message=message, error=FileNotFoundError)
+
+    log_file = _get_log_file(source_directory)
+    _write_log(log_file, f"Transferring {source_directory} to {destination_directory}...")
+    checksums: dict[str, str] = {}
+    for source_file in sorted(path for path in source_directory.rglob("*") if path.is_file()):
+        relative_path = source_file.relative_to(source_directory)
+        destination_file = destination_directory.joinpath(relative_path)
+        destination_file.parent.mkdir(parents=True, exist_ok=True)
+
+        if (
+            destination_file.exists()
+            and destination_file.stat().st_size == source_file.stat().st_size
+            and hash_file(destination_file) == (checksum := hash_file(source_file))
+        ):
+            checksums[relative_path.as_posix()] = checksum
+            continue
+
+        checksums[relative_path.as_posix()] = _copy_file(source_file=source_file, destination_file=destination_file)
+        _write_log(log_file, f"Transferred {relative_path.as_posix()}.")
+
+    destination_directory.joinpath(_TRANSFER_MANIFEST_NAME).write_text(
+        json.dumps(checksums, indent=4), encoding="utf-8"
+    )
+    _write_log(log_file, f"Transfer: complete. Verified {len(checksums)} files.")
+
+    if remove_source:
+        shutil.rmtree(source_directory)
+        _write_log(log_file, f"Removed the staging directory {source_directory}.")
+
+
+def start_transfer(source_directory: Path, destination_directory: Path) -> subprocess.Popen[bytes]:
+    """Starts the low-priority background process that transfers the staged session to the destination directory.
+
+    Notes:
+        The transfer process is detached from the calling process, so the acquisition script can exit (and the next
+        session can start) while the transfer is running. The progress and any errors are written to the
+        <session>_transfer.log file next to the staging directory.
+
+    Args:
+        source_directory: The path to the staging directory of the session.
+        destination_directory: The path to the final session directory.
+
+    Returns:
+        The handle of the started transfer process.
+    """
+    creation_flags = 0
+    if sys.platform == "win32":
+        creation_flags = (
+            subprocess.BELOW_NORMAL_PRIORITY_CLASS | subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.CREATE_NO_WINDOW
+        )
+
+    return subprocess.Popen(  # noqa: S603
+        [
+            sys.executable,
+            str(Path(__file__)),
+            "--source",
+            str(source_directory),
+            "--destination",
+            str(destination_directory),
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        creationflags=creation_flags,
+        start_new_session=sys.platform != "win32",
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transfers the staged session data to the final session directory.")
+    parser.add_argument("--source", type=Path, required=True, help="The staging directory of the session.")
+    parser.add_argument("--destination", type=Path, required=True, help="The final directory of the session.")
+    parser.add_argument("--keep-source", action="store_true", help="Keeps the staging directory after the transfer.")
+    arguments = parser.parse_args()
+
+    # The transfer process runs detached from any terminal, so all errors are recorded in the transfer log.
+    _lower_process_priority()
+    try:
+        transfer_session(
+            source_directory=arguments.source,
+            destination_directory=arguments.destination,
+            remove_source=not arguments.keep_source,
+        )
+    except Exception:  # noqa: BLE001
+        log_file = _get_log_file(arguments.source)
+        if log_file.parent.exists():
+            _write_log(log_file, f"Transfer: failed.\n{traceback.format_exc()}")
+        raise SystemExit(1) from None
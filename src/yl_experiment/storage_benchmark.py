@@ -0,0 +1,111 @@
+"""This module provides the benchmark used to select the file format for each processed data stream.
+
+The benchmark re-saves each data file of an already processed session using every supported output format and reports
+the write time, read time, and the file size for each format.
+
+Example:
+    python storage_benchmark.py --session path/to/session/processed
+"""
+
+from pathlib import Path
+import argparse
+import tempfile
+
+import polars as pl
+from ataraxis_time import PrecisionTimer
+from data_processing import OutputFormats, read_dataframe, write_dataframe
+from ataraxis_base_utilities import LogLevel, console
+
+
+def benchmark_output_formats(processed_directory: Path, repetitions: int = 3) -> pl.DataFrame:
+    """Benchmarks all supported output formats using the data files of the processed session.
+
+    Notes:
+        Each measurement is repeated the requested number of times and the fastest repetition is reported, which
+        reduces the impact of the background disk activity. Since the benchmarked files are read back shortly after
+        being written, the reported read times reflect reading from the OS file cache. Reading every column is forced
+        by computing the column maximums, so memory-mapped files are not favored by deferred page loading.
+
+    Args:
+        processed_directory: The path to the directory that stores the processed session data files.
+        repetitions: The number of times to repeat each write and read measurement.
+
+    Returns:
+        A Polars DataFrame with one row for each data file and format combination. The table stores the number of rows
+        in the file, the file size in bytes, the size relative to the uncompressed IPC file, and the write and read
+        times in milliseconds.
+    """
+    data_files = sorted(
+        path for path in processed_directory.iterdir() if path.suffix in {".feather", ".parquet"} and path.is_file()
+    )
+    timer = PrecisionTimer("us")
+    rows = []
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        for data_file in data_files:
+            # Loads the data into memory once, so that the benchmark is not affected by the source file format.
+            dataframe = read_dataframe(file=data_file).rechunk()
+            uncompressed_size = None
+            for output_format in OutputFormats:
+                output_file = Path(temporary_directory).joinpath(data_file.stem)
+
+                write_times = []
+                for _ in range(repetitions):
+                    timer.reset()
+                    output_file = write_dataframe(
+                        dataframe=dataframe, output_file=output_file, output_format=output_format
+                    )
+                    write_times.append(timer.elapsed)
+
+                read_times = []
+                for _ in range(repetitions):
+                    timer.reset()
+                    read_dataframe(file=output_file).select(pl.all().max())
+                    read_times.append(timer.elapsed)
+
+                size = output_file.stat().st_size
+                if output_format == OutputFormats.UNCOMPRESSED_IPC:
+                    uncompressed_size = size
+                output_file.unlink()
+
+                rows.append(
+                    {
+                        "stream": data_file.stem,
+                        "format": str(output_format),
+                        "rows": dataframe.height,
+                        "size_bytes": size,
+                        "relative_size": round(size / uncompressed_size, 3) if uncompressed_size else 1.0,
+                        "write_ms": round(min(write_times) / 1000, 3),
+                        "read_ms": round(min(read_times) / 1000, 3),
+                    }
+                )
+
+    return pl.DataFrame(
+        rows,
+        schema={
+            "stream": pl.String,
+            "format": pl.String,
+            "rows": pl.UInt64,
+            "size_bytes": pl.UInt64,
+            "relative_size": pl.Float64,
+            "write_ms": pl.Float64,
+            "read_ms": pl.Float64,
+        },
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the output formats using the processed session data.")
+    parser.add_argument("--session", type=Path, required=True, help="The processed data directory of the session.")
+    parser.add_argument("--repetitions", type=int, default=3, help="The number of repetitions for each measurement.")
+    parser.add_argument("--output", type=Path, default=None, help="The optional .csv file to save the results to.")
+    arguments = parser.parse_args()
+
+    if not console.enabled:
+        console.enable()
+
+    results = benchmark_output_formats(processed_directory=arguments.session, repetitions=arguments.repetitions)
+    if arguments.output is not None:
+        results.write_csv(arguments.output)
+
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        console.echo(message=f"Output format benchmark results:\n{results}", level=LogLevel.SUCCESS)
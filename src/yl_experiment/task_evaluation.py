@@ -0,0 +1,477 @@
+"""This module provides the evaluator that estimates the rewards the recorded sessions would have produced under
+alternative task parameters.
+
+The evaluator reads the lick onsets detected at runtime from the processed lick sensor data of each session and passes
+them through the reward logic of the linear track task using each evaluated parameter setting. The logic mirrors the
+AlternationTask class used by the experiment runtime and the training protocol of the LinearTrackFunctions class, but
+all settings of a session are simulated at the same time using vectorized state arrays. The sessions are distributed
+over a pool of worker processes. For each setting, the evaluator reports the number of rewards, the dispensed volume,
+and the distribution of the intervals between consecutive rewards.
+
+Notes:
+    The evaluation assumes that the animal would have licked the same way under the alternative parameters, so it
+    estimates the immediate effect of the parameters on the reward delivery, not their effect on the behavior.
+
+Example:
+    python task_evaluation.py --root path/to/raw_data --delays 250 500 1000 --volumes 5 10 --output evaluation.csv
+"""
+
+import os
+from enum import StrEnum
+from pathlib import Path
+import argparse
+import itertools
+import traceback
+from dataclasses import asdict, dataclass
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from tqdm import tqdm
+import numpy as np
+import polars as pl
+from task_logic import CYCLE_DURATION_US, ALTERNATION_DELAY_US, ACCLIMATION_DURATION_US
+from numpy.typing import NDArray
+from data_processing import read_dataframe, read_task_times
+from microcontroller import ControllerParameters
+from ataraxis_base_utilities import LogLevel, console
+
+# The timeout, in microseconds, between the rewards of the second day training protocol.
+_TRAINING_TIMEOUT_US = 10_000_000
+
+# The reward volume, in microliters, dispensed by the experiment runtime.
+_REWARD_VOLUME = 10.0
+
+# The names of the columns that store the parameters of each evaluated setting.
+_SETTING_COLUMNS = ("protocol", "alternation_delay_us", "acclimation_duration_us", "timeout_us", "reward_volume_ul")
+
+# The glob patterns used to discover the processed data directories when the root directory is the experiment
+# directory, a mouse directory, or a single session directory.
+_PROCESSED_DIRECTORY_PATTERNS = ("*/*/processed", "*/processed", "processed")
+
+# The quantiles of the pooled reward intervals reported for each setting.
+_INTERVAL_QUANTILES = {"interval_p10_s": 0.1, "interval_median_s": 0.5, "interval_p90_s": 0.9}
+
+
+class TaskProtocols(StrEnum):
+    """Stores the reward protocols supported by the evaluator."""
+
+    ALTERNATION = "alternation"
+    """The alternation protocol used by the run_experiment() function. After each reward, the opposite lick-port is
+    rewarded once the alternation delay elapses."""
+    TRAINING = "training"
+    """The training protocol used by the LinearTrackFunctions class. Only the right lick-port is used, and licks are
+    rewarded once the timeout elapses since the previous reward."""
+
+
+@dataclass(frozen=True)
+class TaskSettings:
+    """Stores the task parameters evaluated by the counterfactual evaluator."""
+
+    protocol: TaskProtocols = TaskProtocols.ALTERNATION
+    """The evaluated reward protocol."""
+    alternation_delay_us: int = ALTERNATION_DELAY_US
+    """The delay, in microseconds, between each reward and the activation of the opposite valve. Only used by the
+    alternation protocol."""
+    acclimation_duration_us: int = ACCLIMATION_DURATION_US
+    """The duration, in microseconds, of the pre-task acclimation period. Only used by the alternation protocol."""
+    timeout_us: int = _TRAINING_TIMEOUT_US
+    """The time, in microseconds, that has to elapse since the previous reward before a lick is rewarded again. Only
+    used by the training protocol."""
+    reward_volume_ul: float = _REWARD_VOLUME
+    """The volume of fluid, in microliters, dispensed by each reward."""
+
+
+def build_settings_grid(
+    protocol: TaskProtocols = TaskProtocols.ALTERNATION,
+    alternation_delays_us: tuple[int, ...] = (ALTERNATION_DELAY_US,),
+    acclimation_durations_us: tuple[int, ...] = (ACCLIMATION_DURATION_US,),
+    timeouts_us: tuple[int, ...] = (_TRAINING_TIMEOUT_US,),
+    reward_volumes_ul: tuple[float, ...] = (_REWARD_VOLUME,),
+) -> tuple[TaskSettings, ...]:
+    """Creates the settings for every combination of the input parameter values used by the evaluated protocol.
+
+    The values of the parameters that are not used by the protocol are ignored, so each setting is evaluated once.
+    """
+    if protocol == TaskProtocols.ALTERNATION:
+        timeouts_us = (_TRAINING_TIMEOUT_US,)
+    else:
+        alternation_delays_us = (ALTERNATION_DELAY_US,)
+        acclimation_durations_us = (ACCLIMATION_DURATION_US,)
+    return tuple(
+        TaskSettings(
+            protocol=protocol,
+            alternation_delay_us=delay,
+            acclimation_duration_us=acclimation,
+            timeout_us=timeout,
+            reward_volume_ul=volume,
+        )
+        for delay, acclimation, timeout, volume in itertools.product(
+            alternation_delays_us, acclimation_durations_us, timeouts_us, reward_volumes_ul
+        )
+    )
+
+
+def _get_lick_cycles(
+    left_onsets: NDArray[np.int64], right_onsets: NDArray[np.int64], start: int
+) -> tuple[NDArray[np.int64], NDArray[np.bool_], NDArray[np.bool_]]:
+    """Assigns the lick onsets to the task cycles that observe them.
+
+    At runtime, the task is updated at the end of each task cycle, and all licks detected during the cycle are
+    observed as a single lick of each sensor. The licks detected before the task start are never observed.
+
+    Returns:
+        A tuple of three elements. The first element stores the end time of each task cycle that observed at least one
+        lick, in microseconds. The second and the third elements mark the cycles that observed the left and the right
+        licks.
+    """
+    left_onsets = left_onsets[left_onsets >= start]
+    right_onsets = right_onsets[right_onsets >= start]
+    left_cycles = np.unique(np.maximum(-(-(left_onsets - start) // CYCLE_DURATION_US), 1))
+    right_cycles = np.unique(np.maximum(-(-(right_onsets - start) // CYCLE_DURATION_US), 1))
+    cycles = np.union1d(left_cycles, right_cycles)
+    return start + cycles * CYCLE_DURATION_US, np.isin(cycles, left_cycles), np.isin(cycles, right_cycles)
+
+
+def _simulate_alternation(
+    cycle_times: NDArray[np.int64],
+    left_licks: NDArray[np.bool_],
+    right_licks: NDArray[np.bool_],
+    start: int,
+    *,
+    delays: NDArray[np.int64],
+    acclimations: NDArray[np.int64],
+    manual_open: int | None = None,
+) -> tuple[NDArray[np.int64], NDArray[np.int64], NDArray[np.int64]]:
+    """Simulates the alternation protocol for all evaluated settings at the same time.
+
+    Notes:
+        The task state only affects the decisions of the cycles that observe licks, so the state is only updated at
+        these cycles. The opening and the delay expiration checks use the same inclusive comparisons as the
+        AlternationTask class, which makes the simulated decisions identical to the runtime decisions.
+
+        If the task was opened manually during runtime, the task of each setting opens at the manual opening time or
+        once its acclimation period elapses, whichever comes first.
+
+    Returns:
+        A tuple of three elements that store the setting index, the time, and the side (0 for left, 1 for right) of
+        each simulated reward, in the order the rewards were dispensed.
+    """
+    count = delays.size
+    opened = np.zeros(count, dtype=np.bool_)
+    active = np.zeros((2, count), dtype=np.bool_)  # The left (0) and the right (1) valve activation state.
+    delay_active = np.zeros(count, dtype=np.bool_)
+    delay_start = np.full(count, start, dtype=np.int64)
+    rewarded_side = np.zeros(count, dtype=np.int64)
+
+    settings, times, sides = [], [], []
+    cycles = zip(cycle_times.tolist(), left_licks.tolist(), right_licks.tolist(), strict=True)
+    for time, left_lick, right_lick in cycles:
+        opening = ~opened & ((time - start >= acclimations) | (manual_open is not None and time >= manual_open))
+        active[:, opening] = True
+        opened |= opening
+
+        # Activates the valve opposite to the rewarded one once the alternation delay elapses.
+        expired = np.flatnonzero(delay_active & (time - delay_start >= delays))
+        active[1 - rewarded_side[expired], expired] = True
+        delay_active[expired] = False
+
+        for side, lick in enumerate((left_lick, right_lick)):
+            if not lick:
+                continue
+            rewarded = np.flatnonzero(active[side])
+            active[:, rewarded] = False
+            delay_active[rewarded] = True
+            delay_start[rewarded] = time
+            rewarded_side[rewarded] = side
+            settings.append(rewarded)
+            times.append(np.full(rewarded.size, time, dtype=np.int64))
+            sides.append(np.full(rewarded.size, side, dtype=np.int64))
+
+    if not settings:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    return np.concatenate(settings), np.concatenate(times), np.concatenate(sides)
+
+
+def _simulate_training(
+    cycle_times: NDArray[np.int64], licks: NDArray[np.bool_], start: int, timeouts: NDArray[np.int64]
+) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+    """Simulates the training protocol for all evaluated settings at the same time.
+
+    Returns:
+        A tuple of two elements that store the setting index and the time of each simulated reward, in the order the
+        rewards were dispensed.
+    """
+    active = np.ones(timeouts.size, dtype=np.bool_)
+    last_reward = np.full(timeouts.size, start, dtype=np.int64)
+
+    settings, times = [], []
+    for time in cycle_times[licks].tolist():
+        active |= time - last_reward >= timeouts
+        rewarded = np.flatnonzero(active)
+        active[rewarded] = False
+        last_reward[rewarded] = time
+        settings.append(rewarded)
+        times.append(np.full(rewarded.size, time, dtype=np.int64))
+
+    if not settings:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+    return np.concatenate(settings), np.concatenate(times)
+
+
+def _read_lick_onsets(processed_directory: Path, side: str) -> tuple[NDArray[np.int64], int, int]:
+    """Reads the lick onsets detected at runtime by the lick sensor on the given side.
+
+    Returns:
+        A tuple of three elements. The first element stores the timestamps of the lick onsets. The second and the third
+        elements store the timestamps of the first and the last sensor readout. All timestamps are in microseconds
+        elapsed since UTC epoch onset.
+    """
+    dataframe = read_dataframe(
+        file=processed_directory.joinpath(f"{side}_lick_sensor.feather"), columns=["time_us", "lick_onset"]
+    )
+    timestamps = dataframe["time_us"].to_numpy().astype(np.int64)
+    onsets = timestamps[dataframe["lick_onset"].to_numpy() == 1]
+    if timestamps.size == 0:
+        return onsets, 0, 0
+    return onsets, int(timestamps[0]), int(timestamps[-1])
+
+
+def evaluate_session(
+    processed_directory: Path, settings: tuple[TaskSettings, ...], controller_id: int | None = None
+) -> pl.DataFrame:
+    """Estimates the rewards the session would have produced under each evaluated setting.
+
+    Notes:
+        The task start and the manual task opening times are read from the session metadata file. If the session did
+        not record them, the task is assumed to start at the onset of the microcontroller log. If the log is also not
+        available, the task is assumed to start with the first lick sensor readout.
+
+    Args:
+        processed_directory: The path to the processed data directory of the session.
+        settings: The evaluated task settings.
+        controller_id: The ID of the microcontroller whose log onset is used as the task start of the sessions that
+            did not record it. If not provided, uses the ID of the microcontroller defined in the microcontroller
+            module.
+
+    Returns:
+        A Polars DataFrame with one row for each setting. The table stores the setting parameters, the session
+        directory, the session duration, the number of left and right licks, the number of left and right rewards, the
+        dispensed volume, the time from the task start to the first reward, and the list of intervals between
+        consecutive rewards.
+    """
+    left_onsets, left_start, left_end = _read_lick_onsets(processed_directory=processed_directory, side="left")
+    right_onsets, right_start, right_end = _read_lick_onsets(processed_directory=processed_directory, side="right")
+    if controller_id is None:
+        controller_id = ControllerParameters.from_calibration().controller_id
+    start, manual_open = read_task_times(session_directory=processed_directory.parent, controller_id=controller_id)
+    if start is None:
+        starts = [time for time in (left_start, right_start) if time > 0]
+        start = min(starts) if starts else 0
+    duration = max(max(left_end, right_end) - start, 0) / 1e6
+    cycle_times, left_licks, right_licks = _get_lick_cycles(
+        left_onsets=left_onsets, right_onsets=right_onsets, start=start
+    )
+
+    # Simulates each protocol once for all settings that use it.
+    reward_settings, reward_times, reward_sides = [], [], []
+    for protocol in TaskProtocols:
+        indices = np.array([index for index, setting in enumerate(settings) if setting.protocol == protocol])
+        if indices.size == 0:
+            continue
+        if protocol == TaskProtocols.ALTERNATION:
+            rewarded, times, sides = _simulate_alternation(
+                cycle_times=cycle_times,
+                left_licks=left_licks,
+                right_licks=right_licks,
+                start=start,
+                delays=np.array([settings[index].alternation_delay_us for index in indices], dtype=np.int64),
+                acclimations=np.array([settings[index].acclimation_duration_us for index in indices], dtype=np.int64),
+                manual_open=manual_open,
+            )
+        else:
+            rewarded, times = _simulate_training(
+                cycle_times=cycle_times,
+                licks=right_licks,
+                start=start,
+                timeouts=np.array([settings[index].timeout_us for index in indices], dtype=np.int64),
+            )
+            sides = np.ones(rewarded.size, dtype=np.int64)
+        reward_settings.append(indices[rewarded])
+        reward_times.append(times)
+        reward_sides.append(sides)
+
+    setting_index = np.concatenate(reward_settings) if reward_settings else np.empty(0, dtype=np.int64)
+    reward_time = np.concatenate(reward_times) if reward_times else np.empty(0, dtype=np.int64)
+    reward_side = np.concatenate(reward_sides) if reward_sides else np.empty(0, dtype=np.int64)
+
+    # Sorts the rewards by setting and time to compute the intervals between the consecutive rewards of each setting.
+    order = np.lexsort((reward_time, setting_index))
+    setting_index, reward_time, reward_side = setting_index[order], reward_time[order], reward_side[order]
+    boundaries = np.searchsorted(setting_index, np.arange(len(settings) + 1))
+
+    rows = []
+    for index, setting in enumerate(settings):
+        times = reward_time[boundaries[index] : boundaries[index + 1]]
+        right_rewards = int(reward_side[boundaries[index] : boundaries[index + 1]].sum())
+        rows.append(
+            {
+                **asdict(setting),
+                "session": str(processed_directory.parent),
+                "duration_s": duration,
+                "left_licks": int(left_onsets.size),
+                "right_licks": int(right_onsets.size),
+                "left_rewards": times.size - right_rewards,
+                "right_rewards": right_rewards,
+                "rewards": times.size,
+                "volume_ul": times.size * setting.reward_volume_ul,
+                "first_reward_s": (times[0] - start) / 1e6 if times.size > 0 else None,
+                "reward_intervals_s": (np.diff(times) / 1e6).tolist(),
+            }
+        )
+    return pl.DataFrame(rows, schema_overrides={"protocol": pl.String, "reward_intervals_s": pl.List(pl.Float64)})
+
+
+def _evaluate_session_safely(
+    processed_directory: Path, settings: tuple[TaskSettings, ...], controller_id: int | None
+) -> tuple[Path, pl.DataFrame | None, str | None]:
+    """Runs evaluate_session() and returns the error message instead of raising, so that a single failed session
+    does not abort the whole evaluation.
+    """
+    try:
+        result = evaluate_session(
+            processed_directory=processed_directory, settings=settings, controller_id=controller_id
+        )
+    except Exception as error:  # noqa: BLE001
+        return processed_directory, None, f"{type(error).__name__}: {error}\n{traceback.format_exc()}"
+    return processed_directory, result, None
+
+
+def summarize_evaluation(sessions: pl.DataFrame) -> pl.DataFrame:
+    """Summarizes the per-session evaluation results for each setting.
+
+    Args:
+        sessions: The per-session results returned by the evaluate_session() or the evaluate_cohort() function.
+
+    Returns:
+        A Polars DataFrame with one row for each setting. The table stores the setting parameters, the number of
+        evaluated sessions, the mean and the total number of rewards, the mean dispensed volume per session, the mean
+        time to the first reward, and the quantiles of the intervals between consecutive rewards pooled across sessions.
+    """
+    return (
+        sessions.group_by(_SETTING_COLUMNS)
+        .agg(
+            pl.len().alias("sessions"),
+            pl.col("rewards").mean().alias("mean_rewards"),
+            pl.col("rewards").sum().alias("total_rewards"),
+            pl.col("volume_ul").mean().alias("mean_volume_ul"),
+            pl.col("first_reward_s").mean().alias("mean_first_reward_s"),
+            *(
+                pl.col("reward_intervals_s").list.explode().quantile(quantile).alias(name)
+                for name, quantile in _INTERVAL_QUANTILES.items()
+            ),
+        )
+        .sort(_SETTING_COLUMNS)
+    )
+
+
+def evaluate_cohort(
+    processed_directories: tuple[Path, ...],
+    settings: tuple[TaskSettings, ...],
+    workers: int | None = None,
+    controller_id: int | None = None,
+) -> tuple[pl.DataFrame, pl.DataFrame]:
+    """Evaluates the settings for all input sessions in parallel.
+
+    Each session is evaluated by a separate worker process, which simulates all settings for the session.
+
+    Args:
+        processed_directories: The paths to the processed data directories of the evaluated sessions.
+        settings: The evaluated task settings.
+        workers: The number of sessions to evaluate in parallel. If not provided, uses all available CPU cores.
+        controller_id: The ID of the microcontroller whose log onset is used as the task start of the sessions that
+            did not record it. If not provided, uses the ID of the microcontroller defined in the microcontroller
+            module.
+
+    Returns:
+        A tuple of two elements. The first element is the Polars DataFrame that stores the results of each session,
+        and the second element is the summary of each setting returned by the summarize_evaluation() function.
+    """
+    if not processed_directories or not settings:
+        message = "Unable to evaluate the task settings, as no sessions or settings were provided."
+        console.error(message=message, error=ValueError)
+
+    workers = max(1, min(workers if workers is not None else (os.cpu_count() or 1), len(processed_directories)))
+    console.echo(
+        message=f"Evaluating {len(settings)} settings for {len(processed_directories)} sessions...",
+        level=LogLevel.INFO,
+    )
+
+    results: list[pl.DataFrame] = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_evaluate_session_safely, directory, settings, controller_id)
+            for directory in processed_directories
+        ]
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Evaluating sessions", unit="session"):
+            directory, result, error = future.result()
+            if result is None:
+                tqdm.write(f"Unable to evaluate {directory}: {error}")
+                continue
+            results.append(result)
+
+    if not results:
+        message = "Unable to evaluate the task settings, as none of the sessions could be evaluated."
+        console.error(message=message, error=RuntimeError)
+
+    sessions = pl.concat(results).sort("session", *_SETTING_COLUMNS)
+    return sessions, summarize_evaluation(sessions=sessions)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluates alternative task parameters using the recorded sessions.")
+    parser.add_argument("--root", type=Path, required=True, help="The experiment, mouse, or session directory.")
+    parser.add_argument(
+        "--protocol", type=TaskProtocols, choices=tuple(TaskProtocols), default=TaskProtocols.ALTERNATION
+    )
+    parser.add_argument("--delays", type=float, nargs="+", default=[500], help="The alternation delays, in ms.")
+    parser.add_argument("--acclimation", type=float, nargs="+", default=[480], help="The acclimation durations, in s.")
+    parser.add_argument("--timeouts", type=float, nargs="+", default=[10], help="The training timeouts, in s.")
+    parser.add_argument("--volumes", type=float, nargs="+", default=[_REWARD_VOLUME], help="The reward volumes, in uL.")
+    parser.add_argument("--workers", type=int, default=None, help="The number of sessions to evaluate in parallel.")
+    parser.add_argument(
+        "--controller-id", type=int, default=None, help="The ID of the microcontroller whose log onset starts the task."
+    )
+    parser.add_argument("--output", type=Path, default=None, help="The optional .csv file to save the summary to.")
+    arguments = parser.parse_args()
+
+    if not console.enabled:
+        console.enable()
+
+    directories = tuple(
+        sorted(
+            {
+                path.parent
+                for pattern in _PROCESSED_DIRECTORY_PATTERNS
+                for path in arguments.root.glob(f"{pattern}/*_lick_sensor.*")
+            }
+        )
+    )
+    evaluated_settings = build_settings_grid(
+        protocol=arguments.protocol,
+        alternation_delays_us=tuple(int(delay * 1000) for delay in arguments.delays),
+        acclimation_durations_us=tuple(int(duration * 1e6) for duration in arguments.acclimation),
+        timeouts_us=tuple(int(timeout * 1e6) for timeout in arguments.timeouts),
+        reward_volumes_ul=tuple(arguments.volumes),
+    )
+    _, summary = evaluate_cohort(
+        processed_directories=directories,
+        settings=evaluated_settings,
+        workers=arguments.workers,
+        controller_id=arguments.controller_id,
+    )
+    if arguments.output is not None:
+        summary.write_csv(arguments.output)
+
+    with pl.Config(tbl_rows=-1, tbl_cols=-1):
+        console.echo(message=f"Task parameter evaluation results:\n{summary}", level=LogLevel.SUCCESS)
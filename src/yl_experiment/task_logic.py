@@ -0,0 +1,160 @@
+"""This module provides the reward alternation logic of the linear track task.
+
+The logic does not depend on the hardware or the clock. The experiment runtime drives it using the lick counts reported
+by the live lick sensors and the session time, and the session replay engine drives it using the lick counts reproduced
+from the logged sensor data and the virtual session time. Both therefore make the same reward decisions for the same
+inputs.
+"""
+
+from dataclasses import dataclass
+
+# The duration, in microseconds, of the pre-task acclimation period. During this period, the experimenter attaches the
+# fiber and the animal acclimates to the arena, so licks are not rewarded. 8 minutes.
+ACCLIMATION_DURATION_US = 480_000_000
+
+# The delay, in microseconds, between each reward and the activation of the opposite valve.
+ALTERNATION_DELAY_US = 500_000
+
+# The duration, in microseconds, of each task cycle. The runtime updates the task once per cycle.
+CYCLE_DURATION_US = 20_000
+
+# The name of the session metadata section that stores the task start and opening times recorded by the runtime. The
+# times are stored in microseconds elapsed since UTC epoch onset, which is the time base of the processed data.
+TASK_METADATA_SECTION = "task"
+
+
+@dataclass(frozen=True)
+class TaskDecisions:
+    """Stores the decisions made by the AlternationTask during a single task cycle."""
+
+    task_opened: bool = False
+    """Determines whether the task opened (the valves were activated for the first time) during the cycle."""
+    left_lick: bool = False
+    """Determines whether the left lick sensor detected new licks during the cycle."""
+    right_lick: bool = False
+    """Determines whether the right lick sensor detected new licks during the cycle."""
+    left_reward: bool = False
+    """Determines whether the left valve has to dispense the reward."""
+    right_reward: bool = False
+    """Determines whether the right valve has to dispense the reward."""
+
+
+class AlternationTask:
+    """Implements the reward alternation logic of the linear track task.
+
+    The task opens once the acclimation period elapses or when it is opened manually. Once the task is open, the first
+    lick on either side is rewarded. Each reward deactivates both valves, and the valve opposite to the rewarded one is
+    activated after the alternation delay, so the animal has to alternate between the lick-ports to collect the rewards.
+
+    Notes:
+        The task is updated once per task cycle. All licks detected by the same sensor during one cycle count as a
+        single lick, so the decisions depend on the cycle duration used by the caller.
+
+    Args:
+        acclimation_duration_us: The duration, in microseconds, of the pre-task acclimation period.
+        alternation_delay_us: The delay, in microseconds, between each reward and the activation of the opposite valve.
+
+    Attributes:
+        _acclimation_duration: Stores the duration of the acclimation period.
+        _alternation_delay: Stores the alternation delay.
+        _start_time: Stores the session time, in microseconds, at which the task started.
+        _delay_start: Stores the session time, in microseconds, at which the current alternation delay started.
+        _opened: Tracks whether the task is open.
+        _left_active: Tracks whether the left lick is rewarded.
+        _right_active: Tracks whether the right lick is rewarded.
+        _delay_active: Tracks whether the alternation delay is in progress.
+        _rewarded_side: Stores the side ('left' or 'right') rewarded before the current alternation delay.
+        _previous_left: Stores the left lick count observed during the previous cycle.
+        _previous_right: Stores the right lick count observed during the previous cycle.
+    """
+
+    def __init__(
+        self, acclimation_duration_us: int = ACCLIMATION_DURATION_US, alternation_delay_us: int = ALTERNATION_DELAY_US
+    ) -> None:
+        self._acclimation_duration: int = acclimation_duration_us
+        self._alternation_delay: int = alternation_delay_us
+        self._start_time: int = 0
+        self._delay_start: int = 0
+        self._opened: bool = False
+        self._left_active: bool = False
+        self._right_active: bool = False
+        self._delay_active: bool = False
+        self._rewarded_side: str | None = None
+        self._previous_left: int = 0
+        self._previous_right: int = 0
+
+    def start(self, time_us: int, left_licks: int, right_licks: int) -> None:
+        """Starts the acclimation period.
+
+        Args:
+            time_us: The current session time, in microseconds.
+            left_licks: The number of licks detected by the left lick sensor so far.
+            right_licks: The number of licks detected by the right lick sensor so far.
+        """
+        self._start_time = time_us
+        self._delay_start = time_us
+        self._previous_left = int(left_licks)
+        self._previous_right = int(right_licks)
+
+    def update(self, time_us: int, left_licks: int, right_licks: int, *, open_task: bool = False) -> TaskDecisions:
+        """Updates the task state using the lick counts observed during the current cycle.
+
+        Args:
+            time_us: The current session time, in microseconds.
+            left_licks: The number of licks detected by the left lick sensor so far.
+            right_licks: The number of licks detected by the right lick sensor so far.
+            open_task: Determines whether to open the task before the acclimation period elapses.
+
+        Returns:
+            The decisions made during the cycle. The caller is responsible for dispensing the rewards.
+        """
+        left_licks = int(left_licks)
+        right_licks = int(right_licks)
+        task_opened = left_reward = right_reward = False
+
+        if not self._opened and (time_us - self._start_time >= self._acclimation_duration or open_task):
+            self._left_active = True
+            self._right_active = True
+            self._opened = True
+            task_opened = True
+
+        # Activates the valve opposite to the rewarded one once the alternation delay elapses.
+        if self._delay_active and time_us - self._delay_start >= self._alternation_delay:
+            if self._rewarded_side == "left":
+                self._right_active = True
+            elif self._rewarded_side == "right":
+                self._left_active = True
+            self._delay_active = False
+            self._rewarded_side = None
+
+        left_lick = left_licks > self._previous_left
+        if left_lick and self._left_active:
+            left_reward = True
+            self._start_delay(time_us=time_us, side="left")
+
+        right_lick = right_licks > self._previous_right
+        if right_lick and self._right_active:
+            right_reward = True
+            self._start_delay(time_us=time_us, side="right")
+
+        self._previous_left, self._previous_right = left_licks, right_licks
+        return TaskDecisions(
+            task_opened=task_opened,
+            left_lick=left_lick,
+            right_lick=right_lick,
+            left_reward=left_reward,
+            right_reward=right_reward,
+        )
+
+    def _start_delay(self, time_us: int, side: str) -> None:
+        """Deactivates both valves and starts the alternation delay after rewarding the given side."""
+        self._left_active = False
+        self._right_active = False
+        self._delay_active = True
+        self._rewarded_side = side
+        self._delay_start = time_us
+
+    @property
+    def task_open(self) -> bool:
+        """Returns True if the task is open."""
+        return self._opened
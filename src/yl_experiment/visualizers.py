@@ -2,7 +2,8 @@
 real-time feedback on the animal's task performance and task parameters.
 
 Modified from the original Ataraxis Visualizer class to suit the needs of the Yapici lab. Bscially, the class is
-stripped down to only visualize the lick sensor and valve states, and runs on Windows OS. (WJ)
+stripped down to only visualize the lick sensor and valve states, the analog (photometry) input signal, and the
+session overview, and runs on Windows OS. (WJ)
 """
 
 import numpy as np
@@ -39,6 +40,16 @@ _palette_dict = {
 }
 
 
+# The number of bins used to display the analog input signal. Each bin is drawn as a vertical segment between the
+# minimum and the maximum sample received during the bin, so the panel always draws twice this number of points,
+# regardless of the sampling rate and the displayed time window.
+_ANALOG_BINS = 500
+
+# The maximum session duration, in minutes, covered by the session overview. The overview counters are allocated once,
+# and the events of longer sessions are added to the last minute.
+_OVERVIEW_DURATION = 240
+
+
 def _plt_palette(color: str) -> tuple[float, float, float]:
     """Converts colloquial color names to pyplot RGB color codes.
 
@@ -94,8 +105,191 @@ def _plt_line_styles(line_style: str) -> str:
         raise KeyError(message)  # pragma: no cover
 
 
+class _MinMaxDecimator:
+    """Decimates a continuous signal into a fixed number of time bins, each storing the minimum and the maximum value
+    received during the bin.
+
+    Notes:
+        The samples do not carry timestamps. The samples added by each call are spread evenly over the bins that
+        elapsed since the previous call, so the time resolution of the displayed signal is limited by the interval
+        between the calls.
+
+    Args:
+        window: The displayed time window, in seconds.
+        bins: The number of bins used to display the time window.
+
+    Attributes:
+        _bins: Stores the number of bins.
+        _bin_duration: Stores the duration of each bin, in milliseconds.
+        _bin_index: Stores the index of the current (last) bin, counted from the decimator onset.
+        _minimum: Stores the minimum value of each bin. The last bin is the current bin, which is still being filled.
+        _maximum: Stores the maximum value of each bin.
+        _timestamps: Stores the time of each displayed point, in seconds relative to the current bin.
+    """
+
+    def __init__(self, window: float, bins: int = _ANALOG_BINS) -> None:
+        self._bins: int = bins
+        self._bin_duration: float = window * 1000 / bins
+        self._bin_index: int = 0
+        self._minimum: NDArray[np.float32] = np.full(shape=bins, fill_value=np.nan, dtype=np.float32)
+        self._maximum: NDArray[np.float32] = np.full(shape=bins, fill_value=np.nan, dtype=np.float32)
+        self._timestamps: NDArray[np.float32] = np.repeat(
+            np.linspace(start=-window, stop=0, num=bins, dtype=np.float32), repeats=2
+        )
+
+    def add(self, samples: NDArray[np.uint16], time: float) -> None:
+        """Folds the input samples into the bins and advances the current bin to the input time.
+
+        Args:
+            samples: The samples received since the previous call, in the order they were received.
+            time: The time, in milliseconds since the decimator onset, at which the samples were received.
+        """
+        bin_index = int(time // self._bin_duration)
+        elapsed = min(bin_index - self._bin_index, self._bins)
+        if elapsed > 0:
+            self._bin_index = bin_index
+            self._minimum = np.roll(self._minimum, shift=-elapsed)
+            self._maximum = np.roll(self._maximum, shift=-elapsed)
+            self._minimum[-elapsed:] = np.nan
+            self._maximum[-elapsed:] = np.nan
+
+        if samples.size == 0:
+            return
+
+        # Splits the samples into equal segments, one for the previously current bin and one for each elapsed bin.
+        # Empty segments are skipped, as reduceat() requires strictly increasing segment starts.
+        segments = min(elapsed + 1, self._bins)
+        bounds = np.linspace(start=0, stop=samples.size, num=segments + 1).astype(np.intp)
+        filled = bounds[:-1] < bounds[1:]
+        starts = bounds[:-1][filled]
+        positions = np.arange(start=-segments, stop=0)[filled]
+        self._minimum[positions] = np.fmin(self._minimum[positions], np.minimum.reduceat(samples, starts))
+        self._maximum[positions] = np.fmax(self._maximum[positions], np.maximum.reduceat(samples, starts))
+
+    @property
+    def timestamps(self) -> NDArray[np.float32]:
+        """Returns the time of each displayed point, in seconds relative to the current bin."""
+        return self._timestamps
+
+    @property
+    def values(self) -> NDArray[np.float32]:
+        """Returns the displayed points, alternating between the minimum and the maximum value of each bin.
+
+        The bins that did not receive any samples display the value of the preceding bin.
+        """
+        received = ~np.isnan(self._minimum)
+        indices = np.where(received, np.arange(self._bins), 0)
+        np.maximum.accumulate(indices, out=indices)
+        values = np.empty(shape=self._bins * 2, dtype=np.float32)
+        values[0::2] = self._minimum[indices]
+        values[1::2] = self._maximum[indices]
+        return values
+
+
+class _SessionOverview:
+    """Counts the lick and reward events and the dispensed volume in one-minute bins over the whole session.
+
+    Notes:
+        All counters are allocated at initialization. Each event only increments the counter of the current minute,
+        and the running peaks used to scale the plots are updated with the counters, so neither adding the events nor
+        displaying the counters requires scanning the session history.
+
+    Args:
+        duration: The maximum session duration, in minutes, covered by the counters.
+
+    Attributes:
+        _duration: Stores the maximum session duration, in minutes.
+        _minute: Stores the index of the current minute.
+        _minutes: Stores the start time of each minute, in minutes since the session onset.
+        _left_licks: Stores the number of left lick events detected during each minute.
+        _right_licks: Stores the number of right lick events detected during each minute.
+        _rewards: Stores the number of rewards dispensed by both valves during each minute.
+        _volume: Stores the total volume of water, in microliters, dispensed by the end of each minute.
+        _total_volume: Stores the total volume of water, in microliters, dispensed since the session onset.
+        _peak_rate: Stores the largest number of events counted by any counter during any minute.
+    """
+
+    def __init__(self, duration: int = _OVERVIEW_DURATION) -> None:
+        self._duration: int = duration
+        self._minute: int = 0
+        self._minutes: NDArray[np.float32] = np.arange(duration, dtype=np.float32)
+        self._left_licks: NDArray[np.uint32] = np.zeros(shape=duration, dtype=np.uint32)
+        self._right_licks: NDArray[np.uint32] = np.zeros(shape=duration, dtype=np.uint32)
+        self._rewards: NDArray[np.uint32] = np.zeros(shape=duration, dtype=np.uint32)
+        self._volume: NDArray[np.float64] = np.zeros(shape=duration, dtype=np.float64)
+        self._total_volume: float = 0.0
+        self._peak_rate: int = 0
+
+    def advance(self, minute: int) -> None:
+        """Advances the current minute to the input minute, carrying the dispensed volume over to the new minutes."""
+        minute = min(minute, self._duration - 1)
+        while self._minute < minute:
+            self._minute += 1
+            self._volume[self._minute] = self._total_volume
+
+    def _increment(self, counts: NDArray[np.uint32]) -> None:
+        """Increments the current minute's value of the input counter and updates the peak event rate."""
+        counts[self._minute] += 1
+        self._peak_rate = max(self._peak_rate, int(counts[self._minute]))
+
+    def add_left_lick(self) -> None:
+        """Counts a left lick event during the current minute."""
+        self._increment(self._left_licks)
+
+    def add_right_lick(self) -> None:
+        """Counts a right lick event during the current minute."""
+        self._increment(self._right_licks)
+
+    def add_reward(self, volume: float) -> None:
+        """Counts a reward event during the current minute and adds its volume, in microliters, to the total."""
+        self._increment(self._rewards)
+        self._total_volume += volume
+        self._volume[self._minute] = self._total_volume
+
+    @property
+    def minutes(self) -> NDArray[np.float32]:
+        """Returns the start time of each elapsed minute, including the current minute."""
+        return self._minutes[: self._minute + 1]
+
+    @property
+    def left_licks(self) -> NDArray[np.uint32]:
+        """Returns the number of left lick events detected during each elapsed minute."""
+        return self._left_licks[: self._minute + 1]
+
+    @property
+    def right_licks(self) -> NDArray[np.uint32]:
+        """Returns the number of right lick events detected during each elapsed minute."""
+        return self._right_licks[: self._minute + 1]
+
+    @property
+    def rewards(self) -> NDArray[np.uint32]:
+        """Returns the number of rewards dispensed during each elapsed minute."""
+        return self._rewards[: self._minute + 1]
+
+    @property
+    def volume(self) -> NDArray[np.float64]:
+        """Returns the total volume of water, in microliters, dispensed by the end of each elapsed minute."""
+        return self._volume[: self._minute + 1]
+
+    @property
+    def total_volume(self) -> float:
+        """Returns the total volume of water, in microliters, dispensed since the session onset."""
+        return self._total_volume
+
+    @property
+    def peak_rate(self) -> int:
+        """Returns the largest number of events counted by any counter during any minute."""
+        return self._peak_rate
+
+    @property
+    def elapsed_minutes(self) -> int:
+        """Returns the number of minutes covered by the counters, including the current minute."""
+        return self._minute + 1
+
+
 class BehaviorVisualizer:
-    """Visualizes lick, valve, and running speed data in real time.
+    """Visualizes lick, valve, and analog input data in real time and summarizes the task performance over the whole
+    session.
 
     This class is used to visualize the key behavioral metrics collected from animals performing experiment or training
     sessions in the YL lickometer system. Note, the class is statically configured to generate the plots for all
@@ -108,6 +302,17 @@ class BehaviorVisualizer:
         Calling this initializer does not open the visualizer plot window. Call the open() class method to finalize
         the visualizer initialization before starting runtime.
 
+        The analog input signal is decimated into a fixed number of bins, so the cost of rendering the analog panel
+        does not depend on the analog sampling rate or the displayed analog time window.
+
+        The session overview panels display the number of lick and reward events detected during each minute of the
+        session and the cumulative dispensed volume. The events are counted in preallocated one-minute bins as they are
+        added, so updating the overview does not depend on the session duration.
+
+    Args:
+        analog_window: The time window, in seconds, of the analog input panel. For example, use 10 to match the lick
+            and valve panels or 300 to display the last 5 minutes of the signal.
+
     Attributes:
         _left_event_tick_true: Stores a NumPy uint8 value of 1 to expedite visualization data processing.
         _left_event_tick_false: Stores a NumPy uint8 value of 0 to expedite visualization data processing.
@@ -129,6 +334,19 @@ class BehaviorVisualizer:
         _figure: Stores the matplotlib figure instance used to display the plots.
         _left_lick_axis: The axis object used to plot the lick sensor data during visualization runtime.
         _left_valve_axis: The axis object used to plot the solenoid valve data during visualization runtime.
+        _analog_window: Stores the time window, in seconds, of the analog input panel.
+        _analog_decimator: The decimator that bins the analog input samples into the displayed points.
+        _analog_timer: The PrecisionTimer instance used to assign the analog input samples to the decimator bins.
+        _analog_line: Stores the line class used to plot the analog input data.
+        _analog_axis: The axis object used to plot the analog input data during visualization runtime.
+        _overview: Stores the one-minute lick, reward, and dispensed volume counters of the session overview.
+        _overview_timer: The PrecisionTimer instance used to assign the events to the session overview minutes.
+        _left_lick_rate_line: Stores the line class used to plot the left lick rate.
+        _right_lick_rate_line: Stores the line class used to plot the right lick rate.
+        _reward_rate_line: Stores the line class used to plot the reward rate.
+        _volume_line: Stores the line class used to plot the cumulative dispensed volume.
+        _rate_axis: The axis object used to plot the lick and reward rates during visualization runtime.
+        _volume_axis: The axis object used to plot the cumulative dispensed volume during visualization runtime.
         _once: This flag is used to limit certain visualizer operations to only be called once during runtime.
         _is_open: Tracks whether the visualizer plot has been created.
     """
@@ -139,9 +357,7 @@ class BehaviorVisualizer:
     _right_event_tick_true = np.uint8(1)
     _right_event_tick_false = np.uint8(0)
 
-    def __init__(
-        self,
-    ) -> None:
+    def __init__(self, analog_window: int = 10) -> None:
         # Currently, the class is statically configured to visualize the sliding window of 10 seconds updated every 25
         # ms.
         self._time_window: int = 10
@@ -162,11 +378,23 @@ class BehaviorVisualizer:
         self._right_valve_event: bool = False
         self._right_lick_event: bool = False
 
+        self._analog_window: int = analog_window
+        self._analog_decimator: _MinMaxDecimator = _MinMaxDecimator(window=analog_window)
+        self._analog_timer = PrecisionTimer("ms")
+
+        self._overview: _SessionOverview = _SessionOverview()
+        self._overview_timer = PrecisionTimer("s")
+
         # Line objects (to be created during open())
         self._left_lick_line: Line2D | None = None
         self._left_valve_line: Line2D | None = None
         self._right_lick_line: Line2D | None = None
         self._right_valve_line: Line2D | None = None
+        self._analog_line: Line2D | None = None
+        self._left_lick_rate_line: Line2D | None = None
+        self._right_lick_rate_line: Line2D | None = None
+        self._reward_rate_line: Line2D | None = None
+        self._volume_line: Line2D | None = None
 
         # Figure objects (to be created during open())
         self._figure: Figure | None = None
@@ -174,6 +402,9 @@ class BehaviorVisualizer:
         self._left_valve_axis: Axes | None = None
         self._right_lick_axis: Axes | None = None
         self._right_valve_axis: Axes | None = None
+        self._analog_axis: Axes | None = None
+        self._rate_axis: Axes | None = None
+        self._volume_axis: Axes | None = None
 
         # Tracks if the visualizer is opened
         self._is_open: bool = False
@@ -187,25 +418,26 @@ class BehaviorVisualizer:
         if self._is_open:
             return  # Already open
 
-        # Creates the figure with two subplots sharing the same x-axis
-        self._figure, axes = plt.subplots(
-            2,
-            2,
-            figsize=(12, 6),
-            sharex=True,
-            num="Runtime Behavior Visualizer",
-            gridspec_kw={"hspace": 0.3, "left": 0.15, "height_ratios": [1, 1]},
-        )
-        self._left_lick_axis = axes[0, 0]
-        self._left_valve_axis = axes[1, 0]
-        self._right_lick_axis = axes[0, 1]
-        self._right_valve_axis = axes[1, 1]
+        # Creates the figure with four lick and valve subplots sharing the same x-axis, the analog input subplot
+        # spanning the third row, and the session overview subplots in the bottom row
+        self._figure = plt.figure(figsize=(12, 12), num="Runtime Behavior Visualizer")
+        grid = self._figure.add_gridspec(4, 2, hspace=0.5, left=0.15, height_ratios=[1, 1, 1.5, 1.5])
+        self._left_lick_axis = self._figure.add_subplot(grid[0, 0])
+        self._left_valve_axis = self._figure.add_subplot(grid[1, 0], sharex=self._left_lick_axis)
+        self._right_lick_axis = self._figure.add_subplot(grid[0, 1], sharex=self._left_lick_axis)
+        self._right_valve_axis = self._figure.add_subplot(grid[1, 1], sharex=self._left_lick_axis)
+        self._analog_axis = self._figure.add_subplot(grid[2, :])
+        self._rate_axis = self._figure.add_subplot(grid[3, 0])
+        self._volume_axis = self._figure.add_subplot(grid[3, 1], sharex=self._rate_axis)
 
         # Sets consistent y-label padding for all axes
         self._left_lick_axis.yaxis.labelpad = 15
         self._left_valve_axis.yaxis.labelpad = 15
         self._right_lick_axis.yaxis.labelpad = 15
         self._right_valve_axis.yaxis.labelpad = 15
+        self._analog_axis.yaxis.labelpad = 15
+        self._rate_axis.yaxis.labelpad = 15
+        self._volume_axis.yaxis.labelpad = 15
 
         # Set up axes properties
         # Lick axis
@@ -238,9 +470,28 @@ class BehaviorVisualizer:
         self._right_valve_axis.yaxis.set_major_locator(FixedLocator([0, 1]))
         self._right_valve_axis.yaxis.set_major_formatter(FixedFormatter(["Closed", "Open"]))
 
+        # Analog input axis
+        self._analog_axis.set_title("Analog Input Signal", fontdict=_fontdict_title)
+        self._analog_axis.set_ylabel("ADC units", fontdict=_fontdict_axis_label)
+        self._analog_axis.set_xlabel("Time (s)", fontdict=_fontdict_axis_label)
+        self._analog_axis.set_ylim(0, 4095)
+
+        # Session overview axes
+        self._rate_axis.set_title("Events per Minute", fontdict=_fontdict_title)
+        self._rate_axis.set_ylabel("Events", fontdict=_fontdict_axis_label)
+        self._rate_axis.set_xlabel("Session time (min)", fontdict=_fontdict_axis_label)
+        self._rate_axis.set_ylim(0, 10)
+        self._rate_axis.set_xlim(0, 10)
+
+        self._volume_axis.set_title("Dispensed Volume", fontdict=_fontdict_title)
+        self._volume_axis.set_ylabel("Volume (uL)", fontdict=_fontdict_axis_label)
+        self._volume_axis.set_xlabel("Session time (min)", fontdict=_fontdict_axis_label)
+        self._volume_axis.set_ylim(0, 100)
+
         # Sets x-limits for all axes (shared x-axis)
         self._left_valve_axis.set_xlim(-self._time_window, 0)
         self._right_valve_axis.set_xlim(-self._time_window, 0)
+        self._analog_axis.set_xlim(-self._analog_window, 0)
 
         # Hides x-tick labels for top plots
         plt.setp(self._left_lick_axis.get_xticklabels(), visible=False)
@@ -248,7 +499,15 @@ class BehaviorVisualizer:
 
         # Aligns all y-labels
         self._figure.align_ylabels(
-            [self._left_lick_axis, self._left_valve_axis, self._right_lick_axis, self._right_valve_axis]
+            [
+                self._left_lick_axis,
+                self._left_valve_axis,
+                self._right_lick_axis,
+                self._right_valve_axis,
+                self._analog_axis,
+                self._rate_axis,
+                self._volume_axis,
+            ]
         )
 
         # Creates the plot artists
@@ -294,11 +553,62 @@ class BehaviorVisualizer:
             linestyle="solid",
         )
 
+        # Analog input plot
+        (self._analog_line,) = self._analog_axis.plot(
+            self._analog_decimator.timestamps,
+            self._analog_decimator.values,
+            color=_plt_palette("green"),
+            linewidth=1,
+            alpha=1.0,
+            linestyle="solid",
+        )
+
+        # Session overview plots
+        (self._left_lick_rate_line,) = self._rate_axis.plot(
+            self._overview.minutes,
+            self._overview.left_licks,
+            drawstyle="steps-post",
+            color=_plt_palette("red"),
+            linewidth=2,
+            linestyle="solid",
+            label="Left licks",
+        )
+        (self._right_lick_rate_line,) = self._rate_axis.plot(
+            self._overview.minutes,
+            self._overview.right_licks,
+            drawstyle="steps-post",
+            color=_plt_palette("orange"),
+            linewidth=2,
+            linestyle="dashed",
+            label="Right licks",
+        )
+        (self._reward_rate_line,) = self._rate_axis.plot(
+            self._overview.minutes,
+            self._overview.rewards,
+            drawstyle="steps-post",
+            color=_plt_palette("blue"),
+            linewidth=2,
+            linestyle="dotted",
+            label="Rewards",
+        )
+        self._rate_axis.legend(loc="upper left", prop=_fontdict_legend)
+
+        (self._volume_line,) = self._volume_axis.plot(
+            self._overview.minutes,
+            self._overview.volume,
+            drawstyle="steps-post",
+            color=_plt_palette("blue"),
+            linewidth=2,
+            linestyle="solid",
+        )
+
         # Generates the figure object and updates it
         plt.show(block=False)
         self._figure.canvas.draw()
         self._figure.canvas.flush_events()
 
+        self._analog_timer.reset()
+        self._overview_timer.reset()
         self._is_open = True
 
     def __del__(self) -> None:
@@ -335,6 +645,8 @@ class BehaviorVisualizer:
         self._left_valve_line.set_data(self._timestamps, self._left_valve_data)  # type: ignore
         self._right_lick_line.set_data(self._timestamps, self._right_lick_data)  # type: ignore
         self._right_valve_line.set_data(self._timestamps, self._right_valve_data)  # type: ignore
+        self._update_analog_plot()
+        self._update_overview_plot()
 
         # Renders the changes
         self._figure.canvas.draw()  # type: ignore
@@ -385,21 +697,83 @@ class BehaviorVisualizer:
             self._right_valve_data[-1] = self._right_event_tick_false
         self._right_valve_event = False  # Resets the valve event flag
 
+    def _update_analog_plot(self) -> None:
+        """Updates the analog input plot with the decimated signal and rescales the y-axis to fit the signal."""
+        values = self._analog_decimator.values
+        self._analog_line.set_data(self._analog_decimator.timestamps, values)  # type: ignore[union-attr]
+
+        # Does not rescale the axis until the signal is received
+        if np.isnan(values).all():
+            return
+        minimum, maximum = float(np.nanmin(values)), float(np.nanmax(values))
+        margin = max((maximum - minimum) * 0.05, 1.0)
+        self._analog_axis.set_ylim(minimum - margin, maximum + margin)  # type: ignore[union-attr]
+
+    def _update_overview_plot(self) -> None:
+        """Updates the session overview plots with the counters of all elapsed minutes and rescales the axes to fit
+        them.
+
+        Notes:
+            The rate of the current minute is still being counted, so it is displayed as lower than the rates of the
+            completed minutes until the minute ends.
+        """
+        self._overview.advance(minute=self._overview_timer.elapsed // 60)
+        minutes = self._overview.minutes
+        self._left_lick_rate_line.set_data(minutes, self._overview.left_licks)  # type: ignore[union-attr]
+        self._right_lick_rate_line.set_data(minutes, self._overview.right_licks)  # type: ignore[union-attr]
+        self._reward_rate_line.set_data(minutes, self._overview.rewards)  # type: ignore[union-attr]
+        self._volume_line.set_data(minutes, self._overview.volume)  # type: ignore[union-attr]
+
+        # The steps-post lines end at the start of the current minute, so the axis extends one minute further to show
+        # the current minute.
+        self._rate_axis.set_xlim(0, max(self._overview.elapsed_minutes, 10))  # type: ignore[union-attr]
+        self._rate_axis.set_ylim(0, max(self._overview.peak_rate * 1.1, 10))  # type: ignore[union-attr]
+        self._volume_axis.set_ylim(0, max(self._overview.total_volume * 1.1, 100))  # type: ignore[union-attr]
+
+    def add_analog_samples(self, samples: NDArray[np.uint16]) -> None:
+        """Adds the analog input samples received since the previous call to the displayed signal.
+
+        Notes:
+            Call this method every runtime cycle, even if the visualizer is not updated during the cycle, using the
+            samples returned by the AnalogInterface's read_samples() method. The samples are decimated as they are
+            added, so the method does not accumulate the samples between the visualizer updates.
+
+        Args:
+            samples: The one-dimensional numpy array that stores the new samples, in 12-bit ADC units.
+        """
+        if not self._is_open:
+            return
+        self._analog_decimator.add(samples=samples, time=self._analog_timer.elapsed)
+
     def add_left_lick_event(self) -> None:
         """Configures the visualizer to render a new lick event during the next update cycle."""
         self._left_lick_event = True
+        self._overview.add_left_lick()
 
     def add_right_lick_event(self) -> None:
         """Configures the visualizer to render a new right lick event during the next update cycle."""
         self._right_lick_event = True
+        self._overview.add_right_lick()
+
+    def add_left_valve_event(self, volume: float = 0.0) -> None:
+        """Configures the visualizer to render a new left valve activation event during the next update cycle.
 
-    def add_left_valve_event(self) -> None:
-        """Configures the visualizer to render a new left valve activation event during the next update cycle."""
+        Args:
+            volume: The volume of water, in microliters, dispensed by the valve activation. The volume is added to the
+                cumulative dispensed volume displayed by the session overview.
+        """
         self._left_valve_event = True
+        self._overview.add_reward(volume=float(volume))
+
+    def add_right_valve_event(self, volume: float = 0.0) -> None:
+        """Configures the visualizer to render a new right valve activation event during the next update cycle.
 
-    def add_right_valve_event(self) -> None:
-        """Configures the visualizer to render a new right valve activation event during the next update cycle."""
+        Args:
+            volume: The volume of water, in microliters, dispensed by the valve activation. The volume is added to the
+                cumulative dispensed volume displayed by the session overview.
+        """
         self._right_valve_event = True
+        self._overview.add_reward(volume=float(volume))
 
     @property
     def is_open(self) -> bool:
@@ -0,0 +1,67 @@
+"""Provides the synthetic microcontroller log entries shared by the processing and the replay tests."""
+
+import numpy as np
+import pytest
+from numpy.typing import NDArray
+from microcontroller import ModuleTypeCodes
+from ataraxis_communication_interface.communication import SerialProtocols, SerialPrototypes
+
+# The ID of the microcontroller that generated the synthetic log entries.
+CONTROLLER_ID = 111
+
+# The onset of the synthetic session, in microseconds elapsed since UTC epoch onset.
+ONSET_US = 1_700_000_000_000_000
+
+# The time, in microseconds elapsed since the log onset, at which the left valve opens. The left lick sensor reports the
+# valve artifact readout 5 ms later.
+VALVE_OPEN_US = 2_000_000
+
+
+def make_entry(source_id: int, time_us: int, payload: NDArray[np.uint8]) -> NDArray[np.uint8]:
+    """Packages the payload into the raw log entry logged by the source at the given time."""
+    header = np.concatenate(
+        (np.array([source_id], dtype=np.uint8), np.array([time_us], dtype=np.uint64).view(np.uint8))
+    )
+    return np.concatenate((header, payload))
+
+
+def _state(module_type: int, module_id: int, event: int) -> NDArray[np.uint8]:
+    """Returns the payload of the module state message."""
+    return np.array([SerialProtocols.MODULE_STATE, module_type, module_id, 1, event], dtype=np.uint8)
+
+
+def _data(module_type: int, module_id: int, event: int, value: int) -> NDArray[np.uint8]:
+    """Returns the payload of the module data message that stores the uint16 value."""
+    header = np.array(
+        [SerialProtocols.MODULE_DATA, module_type, module_id, 1, event, SerialPrototypes.ONE_UINT16], dtype=np.uint8
+    )
+    return np.concatenate((header, np.array([value], dtype=np.uint16).view(np.uint8)))
+
+
+@pytest.fixture
+def session_entries() -> dict[int, NDArray[np.uint8]]:
+    """Returns the raw log entries of the synthetic session, keyed by their acquisition time.
+
+    The session contains one left lick, one right lick, one left valve pulse followed by the valve artifact on the left
+    lick sensor, and a few analog readouts. The lick sensors report 1000 during the contact and 0 otherwise.
+    """
+    valve, lick, analog = ModuleTypeCodes.VALVE_MODULE, ModuleTypeCodes.LICK_MODULE, ModuleTypeCodes.ANALOG_MODULE
+    payloads = {
+        0: np.array([ONSET_US], dtype=np.int64).view(np.uint8),
+        100: _state(valve, 1, 52),
+        101: _state(valve, 2, 52),
+        200: _state(valve, 1, 10),  # Service message, which is not processed.
+        1_000_000: _data(lick, 1, 51, 0),
+        1_100_000: _data(lick, 1, 51, 1000),
+        1_200_000: _data(lick, 1, 51, 0),
+        1_500_000: _data(lick, 2, 51, 0),
+        1_700_000: _data(lick, 2, 51, 1000),
+        1_800_000: _data(lick, 2, 51, 0),
+        VALVE_OPEN_US: _state(valve, 1, 51),
+        VALVE_OPEN_US + 5_000: _data(lick, 1, 51, 1000),
+        VALVE_OPEN_US + 10_000: _data(lick, 1, 51, 0),
+        VALVE_OPEN_US + 50_000: _state(valve, 1, 52),
+    }
+    for index in range(5):
+        payloads[300_000 + index * 1000] = _data(analog, 1, 51, 100 * index)
+    return {time: make_entry(CONTROLLER_ID, time, payload) for time, payload in sorted(payloads.items())}
@@ -0,0 +1,186 @@
+"""Contains the tests for the lick classification, the valve pulse pairing, and the raw log reader."""
+
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+from conftest import ONSET_US, CONTROLLER_ID
+from numpy.typing import NDArray
+import data_processing
+from data_processing import (
+    read_dataframe,
+    _load_checkpoint,
+    _save_checkpoint,
+    _pair_valve_cycles,
+    build_threshold_array,
+    classify_runtime_licks,
+    extract_microcontroller_data,
+    extract_raw_microcontroller_data,
+)
+from microcontroller import ControllerParameters
+
+
+def _write_raw_entries(log_directory: Path, entries: dict[int, NDArray[np.uint8]]) -> None:
+    """Saves the entries as the raw .npy entry files generated by the DataLogger."""
+    log_directory.mkdir(parents=True, exist_ok=True)
+    for time, entry in entries.items():
+        np.save(log_directory.joinpath(f"{CONTROLLER_ID:03d}_{time:020d}.npy"), entry)
+
+
+def _read_outputs(files: tuple[Path, ...]) -> dict[str, pl.DataFrame]:
+    """Reads the files generated by the extraction functions, keyed by their names."""
+    return {file.name: read_dataframe(file) for file in files}
+
+
+def test_classify_runtime_licks() -> None:
+    """Verifies that only the first readout at or above the threshold after a zero readout is a lick onset."""
+    voltages = np.array([900, 0, 500, 900, 950, 0, 0, 900, 100, 0, 800], dtype=np.uint16)
+    onsets = classify_runtime_licks(voltages=voltages, lick_threshold=np.uint16(800))
+
+    # The readout that precedes the first zero readout and the repeated readouts above the threshold are not licks.
+    assert np.flatnonzero(onsets).tolist() == [3, 7, 10]
+
+
+def test_classify_runtime_licks_threshold_schedule() -> None:
+    """Verifies that the per-readout thresholds are used for the readouts they were applied to."""
+    voltages = np.array([0, 600, 0, 600], dtype=np.uint16)
+    thresholds = np.array([800, 800, 500, 500], dtype=np.uint16)
+    onsets = classify_runtime_licks(voltages=voltages, lick_threshold=thresholds)
+    assert np.flatnonzero(onsets).tolist() == [3]
+
+
+def test_classify_runtime_licks_zero_threshold() -> None:
+    """Verifies that the zero readouts are never classified as licks."""
+    voltages = np.array([0, 0, 1, 1, 0], dtype=np.uint16)
+    onsets = classify_runtime_licks(voltages=voltages, lick_threshold=np.uint16(0))
+    assert np.flatnonzero(onsets).tolist() == [2]
+
+
+def test_build_threshold_array() -> None:
+    """Verifies that each readout uses the threshold of the last switch applied before it."""
+    schedule = ((2, 500), (2, 600), (5, 700), (9, 800))
+    thresholds = build_threshold_array(readout_count=8, lick_threshold=900, threshold_schedule=schedule)
+    assert thresholds.tolist() == [900, 900, 600, 600, 600, 700, 700, 700]
+    assert build_threshold_array(readout_count=3, lick_threshold=900).tolist() == [900, 900, 900]
+
+
+def test_pair_valve_cycles() -> None:
+    """Verifies that the repeated open and closed messages do not start or end the valve pulses."""
+    onsets, offsets = _pair_valve_cycles(
+        open_timestamps=np.array([10, 15, 40], dtype=np.uint64),
+        closed_timestamps=np.array([5, 20, 25, 50], dtype=np.uint64),
+    )
+    assert onsets.tolist() == [10, 40]
+    assert offsets.tolist() == [20, 50]
+
+
+def test_pair_valve_cycles_unterminated_pulse() -> None:
+    """Verifies that the pulse that is still open at the end of the data is returned as the extra onset."""
+    onsets, offsets = _pair_valve_cycles(
+        open_timestamps=np.array([10, 30], dtype=np.uint64), closed_timestamps=np.array([20], dtype=np.uint64)
+    )
+    assert onsets.tolist() == [10, 30]
+    assert offsets.tolist() == [20]
+
+
+def test_checkpoint_round_trip(tmp_path: Path) -> None:
+    """Verifies that the entries saved across several checkpoint chunks are restored in order."""
+    entries = [np.arange(size, dtype=np.uint8) for size in (10, 12, 15)]
+    _save_checkpoint(tmp_path, onset_us=ONSET_US, last_time=5, skipped=0, entries=entries[:2])
+    _save_checkpoint(tmp_path, onset_us=ONSET_US, last_time=9, skipped=1, entries=entries[2:])
+
+    onset_us, last_time, skipped, restored = _load_checkpoint(tmp_path)
+    assert (onset_us, last_time, skipped) == (ONSET_US, 9, 1)
+    assert [entry.tolist() for entry in restored] == [entry.tolist() for entry in entries]
+
+
+def test_load_missing_checkpoint(tmp_path: Path) -> None:
+    """Verifies that the missing checkpoint restores the initial reader state."""
+    assert _load_checkpoint(tmp_path.joinpath("missing")) == (None, -1, 0, [])
+
+
+def test_raw_extraction_matches_archive_extraction(
+    tmp_path: Path, session_entries: dict[int, NDArray[np.uint8]]
+) -> None:
+    """Verifies that the raw log reader extracts the same data as the log archive reader and skips truncated
+    entries.
+    """
+    parameters = ControllerParameters.from_calibration()
+    log_directory = tmp_path.joinpath("session", "test_data_log")
+    _write_raw_entries(log_directory=log_directory, entries=session_entries)
+    np.savez(
+        tmp_path.joinpath(f"{CONTROLLER_ID}_log.npz"),
+        **{f"{CONTROLLER_ID:03d}_{time:020d}": entry for time, entry in session_entries.items()},
+    )
+
+    # Simulates the entry that was being written when the runtime crashed.
+    truncated_file = log_directory.joinpath(f"{CONTROLLER_ID:03d}_{9_000_000:020d}.npy")
+    np.save(truncated_file, session_entries[1_100_000])
+    truncated_file.write_bytes(truncated_file.read_bytes()[:-3])
+
+    tmp_path.joinpath("archive").mkdir()
+    tmp_path.joinpath("raw").mkdir()
+    archive_outputs = extract_microcontroller_data(
+        log_path=tmp_path.joinpath(f"{CONTROLLER_ID}_log.npz"),
+        output_directory=tmp_path.joinpath("archive"),
+        parameters=parameters,
+        workers=1,
+    )
+    raw_outputs = extract_raw_microcontroller_data(
+        log_directory=log_directory, output_directory=tmp_path.joinpath("raw"), parameters=parameters
+    )
+
+    archive_data = _read_outputs(archive_outputs)
+    raw_data = _read_outputs(raw_outputs)
+    assert archive_data.keys() == raw_data.keys()
+    for name, dataframe in archive_data.items():
+        assert dataframe.equals(raw_data[name]), name
+
+
+def test_raw_extraction_resumes_from_checkpoint(
+    tmp_path: Path, session_entries: dict[int, NDArray[np.uint8]], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Verifies that the interrupted raw log reader resumes from the checkpoint and removes it once done."""
+    parameters = ControllerParameters.from_calibration()
+    log_directory = tmp_path.joinpath("session", "test_data_log")
+    _write_raw_entries(log_directory=log_directory, entries=session_entries)
+    tmp_path.joinpath("expected").mkdir()
+    expected = _read_outputs(
+        extract_raw_microcontroller_data(
+            log_directory=log_directory, output_directory=tmp_path.joinpath("expected"), parameters=parameters
+        )
+    )
+
+    # Interrupts the reader after it saves several checkpoint chunks.
+    output_directory = tmp_path.joinpath("resumed")
+    output_directory.mkdir()
+    read_raw_entry = data_processing._read_raw_entry
+    calls = 0
+
+    def interrupted_read(file: Path) -> NDArray[np.uint8] | None:
+        nonlocal calls
+        calls += 1
+        if calls > len(session_entries) // 2:
+            raise KeyboardInterrupt
+        return read_raw_entry(file)
+
+    monkeypatch.setattr(data_processing, "_CHECKPOINT_INTERVAL", 2)
+    monkeypatch.setattr(data_processing, "_read_raw_entry", interrupted_read)
+    with pytest.raises(KeyboardInterrupt):
+        extract_raw_microcontroller_data(
+            log_directory=log_directory, output_directory=output_directory, parameters=parameters
+        )
+    checkpoint_directory = output_directory.joinpath(f"{CONTROLLER_ID}_raw_log_checkpoint")
+    assert any(checkpoint_directory.glob("chunk_*.npz"))
+
+    monkeypatch.setattr(data_processing, "_read_raw_entry", read_raw_entry)
+    resumed = _read_outputs(
+        extract_raw_microcontroller_data(
+            log_directory=log_directory, output_directory=output_directory, parameters=parameters
+        )
+    )
+    assert not checkpoint_directory.exists()
+    assert resumed.keys() == expected.keys()
+    for name, dataframe in expected.items():
+        assert dataframe.equals(resumed[name]), name
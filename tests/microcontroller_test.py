@@ -0,0 +1,55 @@
+"""Contains the tests for the runtime parameter updates of the microcontroller module interfaces."""
+
+from collections.abc import Iterator
+
+import numpy as np
+import pytest
+from microcontroller import PARAMETER_EVENT_COLUMNS, AnalogInterface
+
+# The ID of the microcontroller that manages the tested interfaces. Differs from the IDs used by the other tests to keep
+# the shared memory array names unique.
+_CONTROLLER_ID = 201
+
+
+@pytest.fixture
+def analog_input(monkeypatch: pytest.MonkeyPatch) -> Iterator[AnalogInterface]:
+    """Returns the AnalogInterface that records the sent commands and parameters instead of sending them."""
+    interface = AnalogInterface(module_id=np.uint8(1), controller_id=np.uint8(_CONTROLLER_ID))
+    monkeypatch.setattr(interface, "send_command", lambda **_: None)
+    monkeypatch.setattr(interface, "send_parameters", lambda **_: None)
+    interface.initialize_remote_assets()
+    try:
+        yield interface
+    finally:
+        interface.release_shared_memory()
+
+
+def _receive_messages(interface: AnalogInterface, count: int) -> None:
+    """Simulates the communication process receiving the given number of messages from the module."""
+    for _ in range(count):
+        interface._switch_parameters()
+        interface._processed_messages += 1
+
+
+def _event_values(event: np.ndarray | None) -> dict[str, int]:
+    """Returns the values of the parameter change event keyed by their column names."""
+    assert event is not None
+    return dict(zip(PARAMETER_EVENT_COLUMNS, event.tolist(), strict=True))
+
+
+def test_batched_interval_is_logged(analog_input: AnalogInterface) -> None:
+    """Verifies that the sampling interval of the batched acquisition is logged once the first batch is received."""
+    analog_input.check_state_batched(repetition_delay=np.uint32(2000), batch_size=np.uint8(10))
+    assert analog_input.apply_parameter_updates() is None
+
+    _receive_messages(interface=analog_input, count=3)
+    event = _event_values(analog_input.apply_parameter_updates())
+    assert (event["switch_index"], event["polling_delay_us"]) == (0, 2000)
+    assert analog_input.apply_parameter_updates() is None
+
+    # The interval changes requested during the batched acquisition are logged after the same handshake.
+    analog_input.update_parameters(polling_delay=4000)
+    assert analog_input.apply_parameter_updates() is None
+    _receive_messages(interface=analog_input, count=1)
+    event = _event_values(analog_input.apply_parameter_updates())
+    assert (event["switch_index"], event["polling_delay_us"]) == (3, 4000)
@@ -0,0 +1,82 @@
+"""Contains the tests for the session replay engine."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+from conftest import ONSET_US, CONTROLLER_ID
+from task_logic import TASK_METADATA_SECTION
+from numpy.typing import NDArray
+from session_replay import VirtualClock, VirtualTimer, replay_session
+from process_placement import update_session_metadata
+
+
+@pytest.fixture
+def log_path(tmp_path: Path, session_entries: dict[int, NDArray[np.uint8]]) -> Path:
+    """Saves the synthetic session entries as the microcontroller log archive and returns the path to the archive."""
+    log_directory = tmp_path.joinpath("session", "test_data_log")
+    log_directory.mkdir(parents=True)
+    path = log_directory.joinpath(f"{CONTROLLER_ID}_log.npz")
+    np.savez(path, **{f"{CONTROLLER_ID:03d}_{time:020d}": entry for time, entry in session_entries.items()})
+    return path
+
+
+def test_virtual_timer() -> None:
+    """Verifies that the virtual timers measure the time of the clock that created them."""
+    clock = VirtualClock()
+    timer = clock.timer("ms")
+    clock.advance(time_us=25_000)
+    assert timer.elapsed == 25
+
+    # The clock never moves backwards.
+    clock.advance(time_us=10_000)
+    assert clock.now_us == 25_000
+
+    timer.reset()
+    assert timer.elapsed == 0
+
+
+def test_virtual_timer_precision() -> None:
+    """Verifies that the unsupported timer precisions are rejected."""
+    with pytest.raises(ValueError, match="precision"):
+        VirtualTimer(clock=VirtualClock(), precision="ns")
+
+
+def test_replay_decisions(log_path: Path) -> None:
+    """Verifies that the replay reproduces the licks and the alternating rewards of the recorded session."""
+    result = replay_session(log_path=log_path, task_open_us=500_000)
+    assert result.count("task_opened") == 1
+    assert result.count("left_reward") == 1
+    assert result.count("right_reward") == 1
+    assert result.recorded_rewards["event"].to_list() == ["left_reward"]
+
+    # The session was recorded without the valve artifact window, so the valve artifact is counted as a lick.
+    assert (result.left_licks, result.right_licks) == (2, 1)
+
+
+def test_replay_recorded_artifact_window(log_path: Path) -> None:
+    """Verifies that the replay uses the valve artifact window recorded for the session."""
+    update_session_metadata(
+        output_directory=log_path.parent.parent,
+        section=f"controller_{CONTROLLER_ID}",
+        data={"valve_artifact_window_us": 20_000},
+    )
+    result = replay_session(log_path=log_path, task_open_us=500_000)
+    assert (result.left_licks, result.right_licks) == (1, 1)
+
+
+def test_replay_recorded_task_times(log_path: Path) -> None:
+    """Verifies that the replay uses the recorded task start and manual opening times unless they are overridden."""
+    update_session_metadata(
+        output_directory=log_path.parent.parent,
+        section=TASK_METADATA_SECTION,
+        data={"start_us": ONSET_US + 1_400_000, "open_us": ONSET_US + 1_500_000, "manual_open": True},
+    )
+
+    # The left lick precedes the recorded task start, so only the right lick is rewarded.
+    result = replay_session(log_path=log_path)
+    assert result.count("task_opened") == 1
+    assert (result.count("left_reward"), result.count("right_reward")) == (0, 1)
+
+    result = replay_session(log_path=log_path, task_start_us=0, task_open_us=500_000)
+    assert (result.count("left_reward"), result.count("right_reward")) == (1, 1)
@@ -0,0 +1,86 @@
+"""Contains the tests for the counterfactual task parameter evaluator."""
+
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+from conftest import ONSET_US, CONTROLLER_ID, make_entry
+from task_logic import CYCLE_DURATION_US, TASK_METADATA_SECTION, AlternationTask
+from data_processing import OutputFormats, write_dataframe
+from task_evaluation import TaskSettings, evaluate_session, build_settings_grid
+from process_placement import update_session_metadata
+
+# The time, in microseconds elapsed since the log onset, at which the task starts.
+_TASK_START_US = 3_000_000
+
+# The duration, in microseconds, of the evaluated sessions.
+_SESSION_DURATION_US = 120_000_000
+
+
+def _write_session(tmp_path: Path, seed: int) -> tuple[Path, dict[str, np.ndarray]]:
+    """Saves the lick sensor data of the random session and returns the processed directory and the lick onsets."""
+    processed_directory = tmp_path.joinpath("session", "processed")
+    processed_directory.mkdir(parents=True)
+    generator = np.random.default_rng(seed)
+    onsets = {}
+    for side in ("left", "right"):
+        times = np.sort(generator.choice(_SESSION_DURATION_US, size=200, replace=False)).astype(np.uint64)
+        times += np.uint64(ONSET_US)
+        onsets[side] = times
+        write_dataframe(
+            dataframe=pl.DataFrame({"time_us": times, "lick_onset": np.ones(times.size, dtype=np.uint8)}),
+            output_file=processed_directory.joinpath(f"{side}_lick_sensor.feather"),
+            output_format=OutputFormats.UNCOMPRESSED_IPC,
+        )
+    return processed_directory, onsets
+
+
+def _run_task(onsets: dict[str, np.ndarray], settings: TaskSettings, start: int, manual_open: int | None) -> int:
+    """Runs the AlternationTask over the session cycle by cycle and returns the number of rewards."""
+    task = AlternationTask(
+        acclimation_duration_us=settings.acclimation_duration_us, alternation_delay_us=settings.alternation_delay_us
+    )
+    task.start(time_us=start, left_licks=0, right_licks=0)
+    rewards = 0
+    end = int(max(onsets["left"][-1], onsets["right"][-1]))
+    for time in range(start + CYCLE_DURATION_US, end + CYCLE_DURATION_US, CYCLE_DURATION_US):
+        decisions = task.update(
+            time_us=time,
+            left_licks=int(np.sum((onsets["left"] >= start) & (onsets["left"] <= time))),
+            right_licks=int(np.sum((onsets["right"] >= start) & (onsets["right"] <= time))),
+            open_task=manual_open is not None and time >= manual_open,
+        )
+        rewards += decisions.left_reward + decisions.right_reward
+    return rewards
+
+
+@pytest.mark.parametrize("manual_open_us", [None, 20_000_000])
+def test_evaluation_matches_task_logic(tmp_path: Path, manual_open_us: int | None) -> None:
+    """Verifies that the evaluator uses the recorded task times and matches the runtime task logic."""
+    processed_directory, onsets = _write_session(tmp_path=tmp_path, seed=1)
+    start = ONSET_US + _TASK_START_US
+    manual_open = start + manual_open_us if manual_open_us is not None else None
+    update_session_metadata(
+        output_directory=processed_directory.parent,
+        section=TASK_METADATA_SECTION,
+        data={"start_us": start, "open_us": manual_open, "manual_open": manual_open is not None},
+    )
+
+    settings = build_settings_grid(alternation_delays_us=(250_000, 1_000_000), acclimation_durations_us=(60_000_000,))
+    result = evaluate_session(processed_directory=processed_directory, settings=settings)
+    for setting, rewards in zip(settings, result["rewards"].to_list(), strict=True):
+        assert rewards == _run_task(onsets=onsets, settings=setting, start=start, manual_open=manual_open)
+
+
+def test_evaluation_uses_log_onset(tmp_path: Path) -> None:
+    """Verifies that the sessions that did not record the task start use the microcontroller log onset."""
+    processed_directory, onsets = _write_session(tmp_path=tmp_path, seed=2)
+    log_directory = processed_directory.parent.joinpath("test_data_log")
+    log_directory.mkdir()
+    onset_entry = make_entry(CONTROLLER_ID, 0, np.array([ONSET_US], dtype=np.int64).view(np.uint8))
+    np.savez(log_directory.joinpath(f"{CONTROLLER_ID}_log.npz"), **{f"{CONTROLLER_ID:03d}_{0:020d}": onset_entry})
+
+    settings = (TaskSettings(acclimation_duration_us=30_000_000),)
+    result = evaluate_session(processed_directory=processed_directory, settings=settings, controller_id=CONTROLLER_ID)
+    assert result["rewards"].item() == _run_task(onsets=onsets, settings=settings[0], start=ONSET_US, manual_open=None)
@@ -0,0 +1,73 @@
+"""Contains the tests for the reward alternation logic of the linear track task."""
+
+from task_logic import CYCLE_DURATION_US, AlternationTask
+
+# The acclimation duration and the alternation delay used by the tests, in microseconds.
+_ACCLIMATION_US = 1_000_000
+_DELAY_US = 100_000
+
+
+def _create_task() -> AlternationTask:
+    """Creates the AlternationTask that starts at the session time 0 with no licks."""
+    task = AlternationTask(acclimation_duration_us=_ACCLIMATION_US, alternation_delay_us=_DELAY_US)
+    task.start(time_us=0, left_licks=0, right_licks=0)
+    return task
+
+
+def test_task_opens_after_acclimation() -> None:
+    """Verifies that the licks are not rewarded until the acclimation period elapses."""
+    task = _create_task()
+    decisions = task.update(time_us=_ACCLIMATION_US - CYCLE_DURATION_US, left_licks=1, right_licks=0)
+    assert decisions.left_lick
+    assert not decisions.left_reward
+    assert not task.task_open
+
+    decisions = task.update(time_us=_ACCLIMATION_US, left_licks=2, right_licks=0)
+    assert decisions.task_opened
+    assert decisions.left_reward
+    assert task.task_open
+
+
+def test_task_opens_manually() -> None:
+    """Verifies that the task can be opened before the acclimation period elapses."""
+    task = _create_task()
+    decisions = task.update(time_us=CYCLE_DURATION_US, left_licks=0, right_licks=1, open_task=True)
+    assert decisions.task_opened
+    assert decisions.right_reward
+
+    # The task only opens once.
+    decisions = task.update(time_us=2 * CYCLE_DURATION_US, left_licks=0, right_licks=1, open_task=True)
+    assert not decisions.task_opened
+
+
+def test_rewards_alternate() -> None:
+    """Verifies that each reward deactivates both valves and activates the opposite valve after the delay."""
+    task = _create_task()
+    time_us = CYCLE_DURATION_US
+    assert task.update(time_us=time_us, left_licks=1, right_licks=0, open_task=True).left_reward
+
+    # Neither side is rewarded during the alternation delay.
+    time_us += CYCLE_DURATION_US
+    decisions = task.update(time_us=time_us, left_licks=2, right_licks=1)
+    assert not decisions.left_reward
+    assert not decisions.right_reward
+
+    # After the delay, only the opposite side is rewarded.
+    time_us += _DELAY_US
+    decisions = task.update(time_us=time_us, left_licks=3, right_licks=1)
+    assert decisions.left_lick
+    assert not decisions.left_reward
+
+    time_us += CYCLE_DURATION_US
+    assert task.update(time_us=time_us, left_licks=3, right_licks=2).right_reward
+
+
+def test_licks_within_cycle_count_once() -> None:
+    """Verifies that the lick counts are compared to the counts observed during the previous cycle."""
+    task = _create_task()
+    task.update(time_us=CYCLE_DURATION_US, left_licks=0, right_licks=0, open_task=True)
+    decisions = task.update(time_us=2 * CYCLE_DURATION_US, left_licks=5, right_licks=0)
+    assert decisions.left_reward
+
+    decisions = task.update(time_us=3 * CYCLE_DURATION_US, left_licks=5, right_licks=0)
+    assert not decisions.left_lick